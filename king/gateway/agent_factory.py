@@ -8,6 +8,7 @@ import json
 import asyncio
 from typing import Dict, Any, Optional, List
 import google.generativeai as genai
+from memory.mem0_client import get_mem0
 
 # Lazy initialization to avoid import-time failures
 _factory_model = None
@@ -287,24 +288,6 @@ async def call_registered_agent(agent_name: str, input_data: Dict[str, Any]) ->
         return response.json()
 
 
-# Lazy Mem0 client
-_mem0_client = None
-
-
-def _get_mem0_client():
-    """Lazy init for Mem0 client."""
-    global _mem0_client
-    if _mem0_client is None:
-        from mem0 import MemoryClient
-        api_key = os.getenv("MEM0_API_KEY")
-        if api_key:
-            _mem0_client = MemoryClient(api_key=api_key.strip())
-        else:
-            print("Warning: MEM0_API_KEY not set. Memory disabled.")
-            _mem0_client = False
-    return _mem0_client if _mem0_client else None
-
-
 # ============================================================================
 # MEMORY STORAGE - Now delegated to Smart Memory Orchestrator
 # ============================================================================
@@ -329,9 +312,13 @@ async def _store_memory(
     - Which layer (user/session/kingdom)
     - Whether to enable graph for entities
 
-    No hardcoded rules. Context-aware decisions.
+    Turns are debounced per user: rapid consecutive messages are coalesced
+    into one orchestrator decision, and memory/session context is fetched
+    once per batch rather than once per turn.
+
+    Returns True when the turn was queued for orchestration.
     """
-    from memory.reflection import orchestrate_memory
+    from memory.reflection import schedule_memory_orchestration
 
     # Update in-memory session history first (synchronous, fast)
     if session_id:
@@ -340,24 +327,21 @@ async def _store_memory(
     if not user_id:
         return False
 
-    try:
-        # Get memory summary for context
+    async def _load_context():
+        # Deferred to flush time so context reflects the latest turn
         memory_summary = await _fetch_user_memory(user_id, user_message)
-
-        # Get session context
         session_context = await _fetch_session_memory(session_id, user_message)
+        return memory_summary, session_context
 
-        # Let the orchestrator decide
-        result = await orchestrate_memory(
+    try:
+        schedule_memory_orchestration(
             user_id=user_id,
             session_id=session_id,
             user_message=user_message,
             assistant_response=assistant_response,
-            memory_summary=memory_summary,
-            session_context=session_context
+            context_loader=_load_context
         )
-
-        return result.get("stored", False)
+        return True
 
     except Exception as e:
         print(f"⚠️ Memory orchestrator failed: {e}")
@@ -369,14 +353,13 @@ async def _fetch_user_memory(user_id: str, query: str) -> str:
     if not user_id:
         return "No user context available"
 
-    client = _get_mem0_client()
+    client = get_mem0()
     if not client:
         return "Memory system unavailable"
 
     try:
         # Get all user memories with v2 API - must use filters dict
-        result = await asyncio.to_thread(
-            client.get_all,
+        result = await client.aget_all(
             filters={"user_id": user_id},
             limit=100
         )
@@ -435,13 +418,12 @@ async def _fetch_session_memory(session_id: str, query: str) -> str:
             return "\n".join(formatted)
 
     # Fallback: Query Mem0 for deeper history (slower, persistent)
-    client = _get_mem0_client()
+    client = get_mem0()
     if not client:
         return "New session - no prior context"
 
     try:
-        result = await asyncio.to_thread(
-            client.get_all,
+        result = await client.aget_all(
             filters={"user_id": f"session_{session_id}"},
             limit=50
         )
@@ -1,16 +1,24 @@
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Request
 from pydantic import BaseModel
 import httpx
 import os
 import time
 from typing import Dict, Any, List, Optional
 from state_manager import StateManager
-from mem0 import MemoryClient
 import json
 from dataclasses import asdict
-from memory import MemoryResolver, EntityResolver
-from memory.reflection import reflect_on_run
+from memory import MemoryResolver, EntityResolver, RelevanceScorer
+from memory.mem0_client import get_mem0_metrics
+from memory.local_store import get_memory_store, get_local_store_stats
+from memory.reflection import reflect_on_run, get_memory_debouncer
+from memory.taxonomy import flush_taxonomy_writes
+from memory.seeding import build_seed_indexes
+from memory.context_packer import ContextItem, pack_context, budget_for
+from memory.anomaly import get_anomaly_accumulator
+from memory.resolution_cache import get_resolution_cache, memory_epoch
+from memory.resilience import get_resilience_stats
 from agent_factory import spawn_agent, smart_spawn, EphemeralAgent
+from tracing import span, server_span, inject, server_timing_ms, current_trace_id, get_span_exporter, render_waterfall
 import asyncio
 import logging
 
@@ -22,28 +30,20 @@ state_manager = StateManager()
 # Orchestrator URL (king-orchestrator service)
 ORCHESTRATOR_URL = os.getenv("ORCHESTRATOR_URL", "")
 ORCHESTRATOR_TIMEOUT = 30.0
+# "split": /king/decide then execute here (default). "fused": /king/decide-execute,
+# where the orchestrator calls registered agents and returns their output in the
+# same response. The agent body is parsed once complete; the saving is the
+# second gateway round trip, not streaming latency.
+ORCHESTRATOR_MODE = os.getenv("ORCHESTRATOR_MODE", "split")
+AGENT_TIMEOUT = 60.0
+
+# Cap on memories injected into agent context (memory_selector lineage rule: 5-7)
+MAX_INJECTED_MEMORIES = 7
 
 # Lazy initialization to avoid import-time failures
-_mem0_client = None
 _entity_resolver = None
 _memory_resolver = None
-
-
-def _get_mem0_client():
-    """Lazy init for Mem0 client."""
-    global _mem0_client
-    if _mem0_client is None:
-        mem0_api_key = os.getenv("MEM0_API_KEY")
-        if mem0_api_key:
-            try:
-                _mem0_client = MemoryClient(api_key=mem0_api_key.strip())
-            except Exception as e:
-                print(f"Warning: Failed to init Mem0 client: {e}")
-                _mem0_client = False
-        else:
-            print("Warning: MEM0_API_KEY is not set. Memory functions will be disabled.")
-            _mem0_client = False
-    return _mem0_client if _mem0_client else None
+_relevance_scorer = None
 
 
 def _get_entity_resolver():
@@ -62,14 +62,24 @@ def _get_memory_resolver():
     """Lazy init for MemoryResolver."""
     global _memory_resolver
     if _memory_resolver is None:
-        mem0 = _get_mem0_client()
+        mem0 = get_memory_store()
         entity = _get_entity_resolver()
         if mem0 and entity:
-            _memory_resolver = MemoryResolver(mem0_client=mem0, entity_resolver=entity)
+            _memory_resolver = MemoryResolver(
+                mem0_client=mem0, entity_resolver=entity, cache=get_resolution_cache()
+            )
         else:
             _memory_resolver = False
     return _memory_resolver if _memory_resolver else None
 
+
+def _get_relevance_scorer() -> RelevanceScorer:
+    """Lazy init for the local memory relevance scorer."""
+    global _relevance_scorer
+    if _relevance_scorer is None:
+        _relevance_scorer = RelevanceScorer()
+    return _relevance_scorer
+
 class ExecuteRequest(BaseModel):
     agent_name: str
     input_data: Dict[str, Any]
@@ -92,23 +102,71 @@ async def _call_agent_service(agent_name: str, input_data: Dict) -> Dict:
 
     async with httpx.AsyncClient() as client:
         try:
-            response = await client.post(
-                f"{service_url}/execute",
-                json=input_data,
-                timeout=60.0
-            )
-            response.raise_for_status()
+            with span("agent", kind="client", agent=agent_name) as agent_span:
+                response = await client.post(
+                    f"{service_url}/execute",
+                    json=input_data,
+                    headers=inject(),
+                    timeout=60.0
+                )
+                agent_span.set(http_status=response.status_code, server_ms=server_timing_ms(response.headers))
+                response.raise_for_status()
             return response.json()
         except httpx.HTTPStatusError as e:
             raise HTTPException(status_code=e.response.status_code, detail=f"Agent Service Error: {e.response.text}")
         except Exception as e:
             raise HTTPException(status_code=502, detail=f"Gateway Error calling '{agent_name}': {str(e)}")
 
+@app.middleware("http")
+async def trace_requests(request: Request, call_next):
+    """Server span per request, continuing the caller's W3C traceparent (bot)."""
+    with server_span(f"{request.method} {request.url.path}", request.headers) as request_span:
+        response = await call_next(request)
+        request_span.set(http_status=response.status_code)
+    response.headers["traceresponse"] = request_span.context.traceparent()
+    return response
+
+@app.on_event("startup")
+def warm_seed_indexes():
+    """Build collective/lineage memory indexes before the first request."""
+    build_seed_indexes()
+
+@app.on_event("shutdown")
+async def flush_pending_memories():
+    """Don't drop debounced turns, taxonomy writes or anomaly state on shutdown."""
+    await get_memory_debouncer().flush_all()
+    await flush_taxonomy_writes()
+    await get_anomaly_accumulator().flush()
+
 @app.get("/health")
 def health_check():
     """Basic health check."""
     return {"status": "ok", "service": "KING Gateway"}
 
+@app.get("/metrics/mem0")
+def mem0_metrics():
+    """Latency/error metrics for the shared Mem0 client, local L1 tier, resolution cache and dependency breakers."""
+    return {
+        "mem0": get_mem0_metrics(),
+        "local": get_local_store_stats(),
+        "resolution_cache": get_resolution_cache().stats(),
+        "resilience": get_resilience_stats()
+    }
+
+@app.get("/traces")
+def recent_traces(limit: int = 20):
+    """Latest traces seen by this service, plus exporter stats."""
+    exporter = get_span_exporter()
+    return {"traces": exporter.recent_traces(limit), "exporter": exporter.stats()}
+
+@app.get("/traces/{trace_id}")
+def trace_spans(trace_id: str, format: str = "json"):
+    """This service's spans for one trace (format=text for a waterfall)."""
+    spans = get_span_exporter().spans(trace_id)
+    if format == "text":
+        return {"waterfall": render_waterfall(spans)}
+    return {"spans": spans}
+
 @app.get("/agents/list")
 def list_agents():
     """List all registered active agents."""
@@ -141,34 +199,63 @@ async def execute_agent(agent_name: str, request: ExecuteRequest):
         query = enriched_input.get("query") or str(enriched_input)
 
         # Use the resolver for multi-tier search (async call)
-        memory_results = await memory_resolver.resolve(
-            query=query,
-            user_id=user_id,
-            agent_id=agent_name,
-            session_id=session_id,
-            resolve_entity=True # Enable entity resolution
-        )
+        with span("memory", agent=agent_name):
+            memory_results = await memory_resolver.resolve(
+                query=query,
+                user_id=user_id,
+                agent_id=agent_name,
+                session_id=session_id,
+                resolve_entity=True # Enable entity resolution
+            )
         
         candidate_memories = memory_results.get_all_flat()
         
         if candidate_memories:
-            try:
-                # Run memory_selector service to filter
-                selector_input = {
-                    "query": query, 
-                    "candidate_memories": [{"content": m.content, "importance": m.importance, "memory_type": m.memory_type.value} for m in candidate_memories] # Convert to dict compatible format
-                }
-                selection_result = await _call_agent_service("memory_selector", selector_input)
-                
-                # Inject approved memories into the context for the target agent
-                if selection_result.get("approved_memories"):
-                    if "context" not in enriched_input:
-                        enriched_input["context"] = {}
-                    enriched_input["context"]["memory"] = selection_result["approved_memories"]
-
-            except Exception as e:
-                print(f"Memory selection failed for user {user_id}: {e}")
-                # Continue without memory enrichment on failure
+            # Local triage: clear-cut memories are decided in-process,
+            # only the ambiguous band goes to the memory_selector LLM.
+            scorer = _get_relevance_scorer()
+            triage = scorer.triage(query, candidate_memories)
+            approved = [
+                ContextItem(text=s.memory.content, score=s.score, source=s.memory.memory_type.value)
+                for s in triage.approved
+            ]
+
+            if triage.needs_escalation:
+                try:
+                    selector_input = {
+                        "query": query, 
+                        "candidate_memories": [{"content": s.memory.content, "importance": s.memory.importance, "memory_type": s.memory.memory_type.value} for s in triage.ambiguous] # Convert to dict compatible format
+                    }
+                    with span("selector", candidates=len(triage.ambiguous)):
+                        selection_result = await _call_agent_service("memory_selector", selector_input)
+                    # Selector-approved memories sit in the ambiguous band; keep their local score
+                    ambiguous_scores = {s.memory.content: s for s in triage.ambiguous}
+                    for content in selection_result.get("approved_memories", []):
+                        scored = ambiguous_scores.get(content)
+                        approved.append(ContextItem(
+                            text=content,
+                            score=scored.score if scored else scorer.reject_threshold,
+                            source=scored.memory.memory_type.value if scored else "semantic"
+                        ))
+
+                    # Log selector decisions for offline threshold calibration
+                    state_manager.log_run(
+                        agent_name="memory_selector",
+                        input_data=selector_input,
+                        output_data=selection_result,
+                        success=True
+                    )
+
+                except Exception as e:
+                    print(f"Memory selection failed for user {user_id}: {e}")
+                    # Continue with locally approved memories only
+
+            # Inject the best approved memories that fit the agent's context budget
+            packed = pack_context(approved, budget=budget_for(agent_name), max_items=MAX_INJECTED_MEMORIES)
+            if packed.items:
+                if "context" not in enriched_input:
+                    enriched_input["context"] = {}
+                enriched_input["context"]["memory"] = packed.texts
 
     # 2. Call Target Agent Service
     output = None
@@ -187,25 +274,27 @@ async def execute_agent(agent_name: str, request: ExecuteRequest):
     finally:
         # 3. Log Execution to Supabase
         duration_ms = int((time.time() - start_time) * 1000)
-        state_manager.log_run(
-            agent_name=agent_name,
-            input_data=request.input_data, # Log original request
-            output_data=output,
-            success=success,
-            error=error_msg,
-            duration_ms=duration_ms
-        )
+        with span("logging", table="agent_runs"):
+            state_manager.log_run(
+                agent_name=agent_name,
+                input_data=request.input_data, # Log original request
+                output_data=output,
+                success=success,
+                error=error_msg,
+                duration_ms=duration_ms
+            )
         
         # 4. Add result to Mem0 (Episodic Memory)
-        mem0_client = _get_mem0_client()
+        mem0_client = get_memory_store()
         if user_id and success and mem0_client:
             try:
                 # Store structured episodic memory
-                mem0_client.add(
-                    f"Interaction with '{agent_name}'. Output: {json.dumps(output)}",
-                    user_id=user_id,
-                    metadata={"agent_id": agent_name, "category": "episodic"}
-                )
+                with span("memory_write"):
+                    await mem0_client.aadd(
+                        f"Interaction with '{agent_name}'. Output: {json.dumps(output)}",
+                        user_id=user_id,
+                        metadata={"agent_id": agent_name, "category": "episodic"}
+                    )
             except Exception as e:
                 print(f"Mem0 add failed for user {user_id}: {e}")
 
@@ -277,23 +366,111 @@ async def _call_orchestrator_decide(user_id: str, message: str, session_id: str
 
     async with httpx.AsyncClient() as client:
         try:
-            response = await client.post(
-                f"{ORCHESTRATOR_URL}/king/decide",
-                json={
-                    "user_id": user_id or "anonymous",
-                    "message": message,
-                    "session_id": session_id,
-                    "context": context
-                },
-                timeout=ORCHESTRATOR_TIMEOUT
-            )
-            response.raise_for_status()
+            with span("decide", kind="client"):
+                response = await client.post(
+                    f"{ORCHESTRATOR_URL}/king/decide",
+                    json={
+                        "user_id": user_id or "anonymous",
+                        "message": message,
+                        "session_id": session_id,
+                        "context": context,
+                        "memory_epoch": memory_epoch(user_id)
+                    },
+                    headers=inject(),
+                    timeout=ORCHESTRATOR_TIMEOUT
+                )
+                response.raise_for_status()
             return response.json()
         except Exception as e:
             logger.error(f"Orchestrator call failed: {e}")
             return None  # Fallback to local
 
 
+async def _call_orchestrator_fused(user_id: str, message: str, session_id: str = None, context: dict = None):
+    """
+    Call orchestrator /king/decide-execute (fused mode).
+
+    Returns (decision, output); output is None when the orchestrator left
+    execution to the gateway (blocked/pipeline/ephemeral). If the decision
+    line is missing or malformed, the decision is fetched again from
+    /king/decide, unless the orchestrator already dispatched the agent
+    (re-deciding would run it twice), in which case output is an error.
+    Returns None if the orchestrator is unreachable.
+    """
+    if not ORCHESTRATOR_URL:
+        return None
+
+    decision = None
+    dispatched = False
+    trace_id = None
+    received = bytearray()
+    async with httpx.AsyncClient() as client:
+        try:
+            with span("decide", kind="client", fused=True) as decide_span:
+                async with client.stream(
+                    "POST",
+                    f"{ORCHESTRATOR_URL}/king/decide-execute",
+                    json={
+                        "user_id": user_id or "anonymous",
+                        "message": message,
+                        "session_id": session_id,
+                        "context": context,
+                        "memory_epoch": memory_epoch(user_id)
+                    },
+                    headers=inject(),
+                    timeout=ORCHESTRATOR_TIMEOUT + AGENT_TIMEOUT
+                ) as response:
+                    response.raise_for_status()
+                    dispatched = response.headers.get("X-King-Dispatch") == "orchestrator"
+                    trace_id = response.headers.get("X-King-Trace-Id")
+                    decide_span.set(dispatch=response.headers.get("X-King-Dispatch"))
+                    async for chunk in response.aiter_bytes():
+                        received += chunk
+                        if decision is None and b"\n" in received:
+                            head, _, rest = bytes(received).partition(b"\n")
+                            decision = _parse_decision(head)
+                            if decision is None or not dispatched:
+                                break  # Nothing else to read
+                            received = bytearray(rest)  # Agent body from here on
+        except Exception as e:
+            logger.error(f"Orchestrator fused call failed: {e}")
+            if dispatched:
+                return decision or _dispatched_without_decision(trace_id), {"error": f"Agent response interrupted: {e}"}
+            if decision is None:
+                return None
+
+    if decision is None and dispatched:
+        logger.error("Orchestrator dispatched the agent but sent no valid decision line; not re-running it")
+        return _dispatched_without_decision(trace_id), {"error": "Orchestrator returned a malformed decision for a dispatched agent"}
+    if decision is None:
+        logger.error("Orchestrator fused response had no valid decision line, falling back to /king/decide")
+        decision = await _call_orchestrator_decide(user_id, message, session_id, context)
+        return (decision, None) if decision else None
+    if not dispatched:
+        return decision, None
+    try:
+        return decision, json.loads(received)
+    except ValueError:
+        return decision, {"error": "Agent returned an invalid or truncated response"}
+
+
+def _dispatched_without_decision(trace_id: Optional[str]) -> dict:
+    return {
+        "action": "execute",
+        "trace_id": trace_id or "unknown",
+        "reasoning": "Fused decision line unreadable",
+        "verdict": {"agent_type": "registered", "agent_name": "unknown"},
+    }
+
+
+def _parse_decision(head: bytes) -> Optional[dict]:
+    try:
+        decision = json.loads(head)
+    except ValueError:
+        return None
+    return decision if isinstance(decision, dict) else None
+
+
 async def _execute_verdict(verdict: dict, enriched_input: dict) -> dict:
     """Execute the orchestrator's verdict."""
     agent_type = verdict.get("agent_type")
@@ -303,7 +480,11 @@ async def _execute_verdict(verdict: dict, enriched_input: dict) -> dict:
         service_url = verdict.get("service_url")
         if service_url:
             async with httpx.AsyncClient() as client:
-                resp = await client.post(f"{service_url}/execute", json=enriched_input, timeout=60)
+                with span("agent", kind="client", agent=agent_name) as agent_span:
+                    resp = await client.post(
+                        f"{service_url}/execute", json=enriched_input, headers=inject(), timeout=AGENT_TIMEOUT
+                    )
+                    agent_span.set(http_status=resp.status_code, server_ms=server_timing_ms(resp.headers))
                 return resp.json()
         # Fallback: try via state_manager
         return await _call_agent_service(agent_name, enriched_input)
@@ -315,11 +496,12 @@ async def _execute_verdict(verdict: dict, enriched_input: dict) -> dict:
     elif agent_type == "ephemeral":
         # Spawn ephemeral agent locally (fallback path)
         spec = verdict.get("spec", {})
-        result = await smart_spawn(
-            task_description=spec.get("task", ""),
-            input_data=enriched_input,
-            user_context=spec.get("memory_context")
-        )
+        with span("agent", agent="ephemeral"):
+            result = await smart_spawn(
+                task_description=spec.get("task", ""),
+                input_data=enriched_input,
+                user_context=spec.get("memory_context")
+            )
         return result.get("output", {})
 
     return {"error": f"Unknown agent_type: {agent_type}"}
@@ -337,18 +519,31 @@ async def spawn_and_execute(request: SpawnRequest):
     4. Log + reflect
 
     Fallback: If orchestrator unreachable, use local smart_spawn
+
+    ORCHESTRATOR_MODE=fused folds steps 1 and 3 into one orchestrator call
+    for registered agents (/king/decide-execute).
     """
     start_time = time.time()
     user_id = request.input_data.get("user_id")
     session_id = request.input_data.get("session_id")
 
     # === Step 1: Call Orchestrator for Decision ===
-    orchestrator_response = await _call_orchestrator_decide(
-        user_id=user_id,
-        message=request.task_description,
-        session_id=session_id,
-        context=request.user_context
-    )
+    fused_output = None
+    if ORCHESTRATOR_MODE == "fused":
+        fused = await _call_orchestrator_fused(
+            user_id=user_id,
+            message=request.task_description,
+            session_id=session_id,
+            context=request.user_context
+        )
+        orchestrator_response, fused_output = fused if fused else (None, None)
+    else:
+        orchestrator_response = await _call_orchestrator_decide(
+            user_id=user_id,
+            message=request.task_description,
+            session_id=session_id,
+            context=request.user_context
+        )
 
     # === Step 2: Handle Orchestrator Response or Fallback ===
     if orchestrator_response:
@@ -371,8 +566,11 @@ async def spawn_and_execute(request: SpawnRequest):
         verdict = orchestrator_response.get("verdict")
         enriched_input = orchestrator_response.get("enriched_input", request.input_data)
 
-        # Execute verdict
-        output = await _execute_verdict(verdict, enriched_input)
+        # Execute verdict (already executed by the orchestrator in fused mode)
+        if fused_output is not None:
+            output = fused_output
+        else:
+            output = await _execute_verdict(verdict, enriched_input)
         decision = verdict.get("agent_type", "unknown")
         agent_name = verdict.get("agent_name", "unknown")
         agent_spec = verdict
@@ -380,17 +578,18 @@ async def spawn_and_execute(request: SpawnRequest):
     else:
         # Fallback: local smart_spawn (orchestrator unreachable)
         logger.warning("Orchestrator unreachable, using local smart_spawn")
-        result = await smart_spawn(
-            task_description=request.task_description,
-            input_data=request.input_data,
-            user_context=request.user_context
-        )
+        with span("agent", agent="smart_spawn", fallback=True):
+            result = await smart_spawn(
+                task_description=request.task_description,
+                input_data=request.input_data,
+                user_context=request.user_context
+            )
         decision = result.get("decision", "spawned")
         agent_spec = result.get("agent_spec", {})
         output = result.get("output", {})
         reasoning = result.get("reasoning", "")
         agent_name = agent_spec.get("agent_name", "unknown") if isinstance(agent_spec, dict) else "unknown"
-        trace_id = "local"
+        trace_id = current_trace_id() or "local"
 
     # === Step 3: Determine Success ===
     success = isinstance(output, dict) and "error" not in output
@@ -398,14 +597,16 @@ async def spawn_and_execute(request: SpawnRequest):
     duration_ms = int((time.time() - start_time) * 1000)
 
     # === Step 4: Log Execution ===
-    state_manager.log_run(
-        agent_name=f"{decision}:{agent_name}",
-        input_data=request.input_data,
-        output_data=output,
-        success=success,
-        error=error_msg,
-        duration_ms=duration_ms
-    )
+    with span("logging", table="agent_runs"):
+        state_manager.log_run(
+            agent_name=agent_name,
+            input_data=request.input_data,
+            output_data=output,
+            success=success,
+            error=error_msg,
+            duration_ms=duration_ms,
+            decision=decision
+        )
 
     # === Step 5: Persist if Requested ===
     persisted = False
@@ -427,7 +628,7 @@ async def spawn_and_execute(request: SpawnRequest):
     # === Step 6: Self-reflection (non-blocking) ===
     asyncio.create_task(
         reflect_on_run(
-            agent_name=f"{decision}:{agent_name}",
+            agent_name=agent_name,
             input_data={"task": request.task_description, **request.input_data},
             output_data=output or {},
             success=success,
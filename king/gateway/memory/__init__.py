@@ -7,12 +7,18 @@ from .types import (
     MEMORY_CONFIGS,
     EntityType,
 )
-from .seeding import get_collective_memories, get_lineage_memories
+from .seeding import (
+    get_collective_memories,
+    get_lineage_memories,
+    search_collective_memories,
+    search_lineage_memories,
+)
 from .decay import calculate_importance
 from .resolver import MemoryResolver
 from .curator import create_search_plan
 from .entity_resolver import EntityResolver
 from .schema import MemoryRecord, validate_memory
+from .relevance import RelevanceScorer, HashingEmbedder, TriageResult
 
 __all__ = [
     "Memory",
@@ -24,10 +30,15 @@ __all__ = [
     "EntityType",
     "get_collective_memories",
     "get_lineage_memories",
+    "search_collective_memories",
+    "search_lineage_memories",
     "calculate_importance",
     "MemoryResolver",
     "create_search_plan",
     "EntityResolver",
     "MemoryRecord",
     "validate_memory",
+    "RelevanceScorer",
+    "HashingEmbedder",
+    "TriageResult",
 ]
@@ -0,0 +1,251 @@
+"""
+KING Anomaly Accumulator - Streaming identity-suspicion per user.
+
+Each anomaly signal from fingerprinting (contradiction, style_change,
+knowledge_gap, ...) feeds an exponentially decayed counter:
+
+    suspicion(t) = suspicion(t0) * 2^(-(t - t0) / half_life) + severity
+
+- O(1) per event, O(anomaly types) per query, no LLM or history scan
+- One compact row per user in Supabase `user_anomaly_state`
+  ({type: [value, updated_at, count]}). Each instance flushes only the
+  increments it accumulated since its last flush; the merge_anomaly_counters_batch
+  RPC folds them into the stored counters (decayed counters add), so
+  concurrent gateway instances never overwrite each other's increments
+- Cached in-process (LRU, reloaded after ANOMALY_STATE_TTL_SECONDS so other
+  instances' increments become visible)
+"""
+import os
+import time
+import math
+import asyncio
+import logging
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Dict, Iterable, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+TABLE = "user_anomaly_state"
+
+ANOMALY_HALF_LIFE_SECONDS = float(os.getenv("ANOMALY_HALF_LIFE_SECONDS", str(7 * 24 * 3600)))
+ANOMALY_FLAG_THRESHOLD = float(os.getenv("ANOMALY_FLAG_THRESHOLD", "1.5"))
+ANOMALY_FLUSH_INTERVAL_SECONDS = 30.0
+ANOMALY_STATE_TTL_SECONDS = float(os.getenv("ANOMALY_STATE_TTL_SECONDS", "300"))
+ANOMALY_MAX_USERS = int(os.getenv("ANOMALY_MAX_USERS", "10000"))
+
+# Lazy Supabase client
+_supabase_client = None
+
+
+def _get_supabase():
+    global _supabase_client
+    if _supabase_client is None:
+        from supabase import create_client
+        url = os.getenv("SUPABASE_URL")
+        key = os.getenv("SUPABASE_SERVICE_KEY")
+        if url and key:
+            _supabase_client = create_client(url, key)
+        else:
+            print("Warning: Supabase not configured for anomaly accumulator")
+            _supabase_client = False
+    return _supabase_client if _supabase_client else None
+
+
+@dataclass
+class DecayedCounter:
+    value: float = 0.0
+    updated_at: float = 0.0
+    count: int = 0
+
+    def at(self, now: float, half_life: float) -> float:
+        if not self.value:
+            return 0.0
+        return self.value * math.pow(2.0, -max(0.0, now - self.updated_at) / half_life)
+
+    def add(self, amount: float, now: float, half_life: float) -> float:
+        self.value = self.at(now, half_life) + amount
+        self.updated_at = now
+        self.count += 1
+        return self.value
+
+    def merge(self, other: "DecayedCounter", half_life: float) -> None:
+        """Fold another counter in (decayed sums add at a common timestamp)."""
+        now = max(self.updated_at, other.updated_at)
+        self.value = self.at(now, half_life) + other.at(now, half_life)
+        self.updated_at = now
+        self.count += other.count
+
+    def to_row(self) -> list:
+        return [round(self.value, 6), self.updated_at, self.count]
+
+
+class AnomalyAccumulator:
+    """Per-user decayed suspicion counters with batched persistence."""
+
+    def __init__(
+        self,
+        half_life_seconds: float = ANOMALY_HALF_LIFE_SECONDS,
+        flag_threshold: float = ANOMALY_FLAG_THRESHOLD,
+        persist: bool = True,
+        ttl_seconds: float = ANOMALY_STATE_TTL_SECONDS,
+        max_users: int = ANOMALY_MAX_USERS,
+    ):
+        self.half_life = half_life_seconds
+        self.flag_threshold = flag_threshold
+        self.ttl = ttl_seconds
+        self.max_users = max_users
+        self._persist = persist
+        self._users: "OrderedDict[str, Tuple[float, Dict[str, DecayedCounter]]]" = OrderedDict()  # user -> (loaded at, counters)
+        self._load_locks: Dict[str, asyncio.Lock] = {}
+        # Increments not yet flushed, kept apart from the cache so they survive eviction
+        self._pending: Dict[str, Dict[str, DecayedCounter]] = {}
+        self._flush_task: Optional[asyncio.Task] = None
+
+    # --- Events ---
+
+    async def record(
+        self,
+        user_id: str,
+        events: Iterable[Tuple[str, float]],
+        now: Optional[float] = None
+    ) -> Dict[str, DecayedCounter]:
+        """Add (anomaly_type, severity) events. Returns the user's counters."""
+        counters = await self._ensure_loaded(user_id)
+        now = now if now is not None else time.time()
+        for anomaly_type, severity in events:
+            counters.setdefault(anomaly_type, DecayedCounter()).add(severity, now, self.half_life)
+            if self._persist:
+                pending = self._pending.setdefault(user_id, {})
+                pending.setdefault(anomaly_type, DecayedCounter()).add(severity, now, self.half_life)
+        if self._pending:
+            self._ensure_flush_loop()
+        return counters
+
+    # --- Queries ---
+
+    def suspicion(self, user_id: str, now: Optional[float] = None) -> Dict[str, float]:
+        """Current decayed suspicion per anomaly type (in-memory only)."""
+        now = now if now is not None else time.time()
+        entry = self._users.get(user_id)
+        return {
+            t: round(c.at(now, self.half_life), 4)
+            for t, c in (entry[1] if entry else {}).items()
+        }
+
+    def total(self, user_id: str, now: Optional[float] = None) -> float:
+        return sum(self.suspicion(user_id, now).values())
+
+    def is_flagged(self, user_id: str, now: Optional[float] = None) -> bool:
+        return self.total(user_id, now) >= self.flag_threshold
+
+    async def get(self, user_id: str) -> Dict[str, float]:
+        """Suspicion per type, loading the user's state on first access."""
+        await self._ensure_loaded(user_id)
+        return self.suspicion(user_id)
+
+    # --- Persistence ---
+
+    def _cached(self, user_id: str) -> Optional[Dict[str, DecayedCounter]]:
+        entry = self._users.get(user_id)
+        if entry is None:
+            return None
+        if time.monotonic() - entry[0] >= self.ttl:
+            del self._users[user_id]
+            return None
+        self._users.move_to_end(user_id)
+        return entry[1]
+
+    def _store(self, user_id: str, counters: Dict[str, DecayedCounter]) -> Dict[str, DecayedCounter]:
+        """Cache persisted counters plus this instance's unflushed increments."""
+        for anomaly_type, delta in self._pending.get(user_id, {}).items():
+            counters.setdefault(anomaly_type, DecayedCounter()).merge(delta, self.half_life)
+        self._users[user_id] = (time.monotonic(), counters)
+        self._users.move_to_end(user_id)
+        while len(self._users) > self.max_users:
+            self._users.popitem(last=False)
+        return counters
+
+    async def _ensure_loaded(self, user_id: str) -> Dict[str, DecayedCounter]:
+        counters = self._cached(user_id)
+        if counters is not None:
+            return counters
+
+        lock = self._load_locks.setdefault(user_id, asyncio.Lock())
+        async with lock:
+            counters = self._cached(user_id)
+            if counters is not None:
+                return counters
+            counters = self._store(user_id, await self._read(user_id))
+            self._load_locks.pop(user_id, None)
+            return counters
+
+    async def _read(self, user_id: str) -> Dict[str, DecayedCounter]:
+        client = _get_supabase() if self._persist else None
+        if not client:
+            return {}
+        try:
+            result = await asyncio.to_thread(
+                lambda: client.table(TABLE).select("counters").eq("user_id", user_id).execute()
+            )
+            rows = result.data or []
+            raw = rows[0].get("counters") or {} if rows else {}
+            return {t: DecayedCounter(*v) for t, v in raw.items()}
+        except Exception as e:
+            logger.error(f"Anomaly state read failed for {user_id}: {e}")
+            return {}
+
+    def _ensure_flush_loop(self) -> None:
+        if self._flush_task is None or self._flush_task.done():
+            self._flush_task = asyncio.create_task(self._flush_loop())
+
+    async def _flush_loop(self) -> None:
+        while self._pending:
+            await asyncio.sleep(ANOMALY_FLUSH_INTERVAL_SECONDS)
+            await self.flush()
+
+    async def flush(self) -> int:
+        """Merge all unflushed increments server-side in one RPC. Returns users written."""
+        pending, self._pending = self._pending, {}
+        client = _get_supabase() if self._persist else None
+        if not pending or not client:
+            return 0
+
+        items = [
+            {"user_id": user_id, "counters": {t: c.to_row() for t, c in deltas.items()}}
+            for user_id, deltas in pending.items()
+        ]
+        try:
+            result = await asyncio.to_thread(
+                lambda: client.rpc(
+                    "merge_anomaly_counters_batch",
+                    {"p_items": items, "p_half_life": self.half_life},
+                ).execute()
+            )
+        except Exception as e:
+            logger.error(f"Anomaly state flush failed: {e}")
+            # Keep the deltas (and any recorded meanwhile) for the next flush
+            for user_id, deltas in pending.items():
+                current = self._pending.setdefault(user_id, {})
+                for anomaly_type, delta in deltas.items():
+                    current.setdefault(anomaly_type, DecayedCounter()).merge(delta, self.half_life)
+            return 0
+
+        # The merged rows include other instances' increments; refresh cached users
+        for row in result.data or []:
+            user_id = row.get("out_user_id")
+            if user_id in self._users:
+                raw = row.get("out_counters") or {}
+                self._store(user_id, {t: DecayedCounter(*v) for t, v in raw.items()})
+        return len(items)
+
+
+# Process-wide accumulator
+_accumulator: Optional[AnomalyAccumulator] = None
+
+
+def get_anomaly_accumulator() -> AnomalyAccumulator:
+    global _accumulator
+    if _accumulator is None:
+        _accumulator = AnomalyAccumulator()
+    return _accumulator
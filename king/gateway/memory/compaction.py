@@ -0,0 +1,444 @@
+"""
+KING Memory Compaction - Summarize aged episodic memories into semantic ones.
+
+Heavy users accumulate thousands of episodic memories, which slows every
+Mem0 search and bloats selector candidate sets. For each user with at
+least COMPACTION_MIN_MEMORIES episodic memories:
+
+1. Page through get_all; leave semantic memories and the newest
+   COMPACTION_KEEP_RECENT episodic ones alone
+2. Group the rest by time window, then by topic (greedy clustering on
+   hashed embeddings) into groups of COMPACTION_MIN_GROUP..MAX_GROUP
+3. Summarize each group (Gemini, extractive fallback) into one semantic
+   memory, then batch-delete the originals
+
+Writes go through a rate limiter. A JSON checkpoint records finished
+users and ids whose summary was written but not yet deleted, so an
+interrupted run resumes without duplicating summaries or orphaning
+originals. Run via scripts/compact_memories.py.
+"""
+import os
+import json
+import time
+import asyncio
+from dataclasses import dataclass, field, asdict
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+import google.generativeai as genai
+from .mem0_client import get_mem0
+from .promotion import list_memory_users, fetch_all_memories, PROMOTION_DELETE_BATCH
+from .relevance import HashingEmbedder, cosine
+from .context_packer import ContextItem, pack_context
+
+COMPACTION_MIN_MEMORIES = int(os.getenv("COMPACTION_MIN_MEMORIES", "300"))
+COMPACTION_KEEP_RECENT = int(os.getenv("COMPACTION_KEEP_RECENT", "100"))
+COMPACTION_WINDOW_DAYS = 7
+COMPACTION_TOPIC_SIMILARITY = 0.35
+COMPACTION_MIN_GROUP = 3
+COMPACTION_MAX_GROUP = 20
+COMPACTION_SUMMARY_TOKENS = 200
+COMPACTION_WRITES_PER_SECOND = float(os.getenv("COMPACTION_WRITES_PER_SECOND", "2"))
+COMPACTION_USER_CONCURRENCY = 2
+COMPACTION_MIN_INTERVAL_HOURS = 24.0  # Skip users compacted more recently
+
+# Lazy initialization
+_compaction_model = None
+
+
+def _get_compaction_model():
+    """Lazy init for Gemini summarization model."""
+    global _compaction_model
+    if _compaction_model is None:
+        gemini_api_key = os.getenv("GEMINI_API_KEY")
+        if gemini_api_key:
+            genai.configure(api_key=gemini_api_key.strip())
+            _compaction_model = genai.GenerativeModel("gemini-2.0-flash-exp")
+        else:
+            print("Warning: GEMINI_API_KEY not set. Compaction will use extractive summaries.")
+            _compaction_model = False
+    return _compaction_model if _compaction_model else None
+
+
+COMPACTION_PROMPT = """Merge these memories about one user into a few concise, durable facts.
+Keep preferences, decisions and stable facts; drop chit-chat and one-off details.
+Do not invent anything. Reply with plain text, one fact per line, at most 5 lines.
+
+Period: {period}
+
+Memories:
+{memories}"""
+
+
+# ============================================================================
+# GROUPING
+# ============================================================================
+
+def _timestamp(memory: Dict) -> Optional[datetime]:
+    raw = memory.get("created_at") or memory.get("updated_at")
+    if not raw:
+        return None
+    try:
+        ts = datetime.fromisoformat(str(raw).replace("Z", "+00:00"))
+    except ValueError:
+        return None
+    return ts if ts.tzinfo else ts.replace(tzinfo=timezone.utc)
+
+
+def _is_episodic(memory: Dict) -> bool:
+    meta = memory.get("metadata") or {}
+    return meta.get("type") != "semantic" and meta.get("category") != "semantic"
+
+
+def group_memories(
+    memories: List[Dict],
+    window_days: int = COMPACTION_WINDOW_DAYS,
+    similarity: float = COMPACTION_TOPIC_SIMILARITY,
+    min_group: int = COMPACTION_MIN_GROUP,
+    max_group: int = COMPACTION_MAX_GROUP,
+    embedder: Optional[HashingEmbedder] = None,
+) -> List[List[Dict]]:
+    """
+    Bucket memories by time window, then greedily cluster each bucket by topic.
+
+    Returns groups of min_group..max_group memories, oldest window first.
+    Memories that don't land in a big enough group are left out.
+    """
+    embedder = embedder or HashingEmbedder()
+    window_seconds = window_days * 86400
+    buckets: Dict[int, List[Dict]] = {}
+    for m in memories:
+        ts = _timestamp(m)
+        key = int(ts.timestamp() // window_seconds) if ts else -1
+        buckets.setdefault(key, []).append(m)
+
+    groups: List[List[Dict]] = []
+    for key in sorted(buckets):
+        bucket = buckets[key]
+        vectors = embedder.embed([m.get("memory", "") for m in bucket])
+        clusters: List[Dict[str, Any]] = []  # {"members": [...], "centroid": [...]}
+        for m, vec in zip(bucket, vectors):
+            best, best_sim = None, similarity
+            for c in clusters:
+                if len(c["members"]) >= max_group:
+                    continue
+                sim = cosine(vec, c["centroid"])
+                if sim >= best_sim:
+                    best, best_sim = c, sim
+            if best is None:
+                clusters.append({"members": [m], "centroid": list(vec)})
+            else:
+                best["members"].append(m)
+                best["centroid"] = [a + b for a, b in zip(best["centroid"], vec)]
+        groups.extend(c["members"] for c in clusters if len(c["members"]) >= min_group)
+    return groups
+
+
+def _period(group: List[Dict]) -> str:
+    stamps = sorted(ts for ts in (_timestamp(m) for m in group) if ts)
+    if not stamps:
+        return "unknown"
+    return f"{stamps[0].date().isoformat()} to {stamps[-1].date().isoformat()}"
+
+
+# ============================================================================
+# SUMMARIZATION
+# ============================================================================
+
+def extractive_summary(texts: List[str], budget: int = COMPACTION_SUMMARY_TOKENS) -> str:
+    """Distinct texts in their original order, packed into the token budget."""
+    items = [ContextItem(text=t, score=1.0, source="episodic") for t in texts]
+    packed = pack_context(items, budget=budget)
+    return "\n".join(packed.texts)
+
+
+async def summarize_group(group: List[Dict]) -> str:
+    texts = [m.get("memory", "") for m in group if m.get("memory")]
+    model = _get_compaction_model()
+    if model:
+        prompt = COMPACTION_PROMPT.format(
+            period=_period(group),
+            memories="\n".join(f"- {t}" for t in texts)
+        )
+        try:
+            response = await asyncio.to_thread(model.generate_content, prompt)
+            summary = (response.text or "").strip()
+            if summary:
+                return summary
+        except Exception as e:
+            print(f"⚠️ Compaction summary failed, using extractive: {e}")
+    return extractive_summary(texts)
+
+
+# ============================================================================
+# RATE LIMITING / CHECKPOINTS
+# ============================================================================
+
+class RateLimiter:
+    """Spaces acquisitions at least 1/rate seconds apart (shared across tasks)."""
+
+    def __init__(self, rate_per_second: float):
+        self.interval = 1.0 / rate_per_second if rate_per_second > 0 else 0.0
+        self._next = 0.0
+        self._lock = asyncio.Lock()
+
+    async def acquire(self) -> None:
+        if not self.interval:
+            return
+        async with self._lock:
+            now = time.monotonic()
+            wait = self._next - now
+            self._next = max(now, self._next) + self.interval
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+
+class CompactionCheckpoint:
+    """
+    JSON progress file:
+        {"users": {user_id: {"completed_at": iso, "compacted": n}},
+         "pending_deletes": {user_id: [memory_id, ...]}}
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path
+        self.data: Dict[str, Dict[str, Any]] = {"users": {}, "pending_deletes": {}}
+        if path and os.path.exists(path):
+            with open(path, encoding="utf-8") as f:
+                loaded = json.load(f)
+            self.data["users"].update(loaded.get("users", {}))
+            self.data["pending_deletes"].update(loaded.get("pending_deletes", {}))
+
+    def save(self) -> None:
+        if not self.path:
+            return
+        tmp = f"{self.path}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(self.data, f, indent=2)
+        os.replace(tmp, self.path)
+
+    def recently_completed(self, user_id: str, min_interval_hours: float) -> bool:
+        entry = self.data["users"].get(user_id)
+        if not entry:
+            return False
+        completed = datetime.fromisoformat(entry["completed_at"])
+        return (datetime.now(timezone.utc) - completed).total_seconds() < min_interval_hours * 3600
+
+    def pending(self, user_id: str) -> List[str]:
+        return list(self.data["pending_deletes"].get(user_id, []))
+
+    def add_pending(self, user_id: str, memory_ids: List[str]) -> None:
+        self.data["pending_deletes"].setdefault(user_id, []).extend(memory_ids)
+        self.save()
+
+    def clear_pending(self, user_id: str, memory_ids: List[str]) -> None:
+        done = set(memory_ids)
+        remaining = [m for m in self.data["pending_deletes"].get(user_id, []) if m not in done]
+        if remaining:
+            self.data["pending_deletes"][user_id] = remaining
+        else:
+            self.data["pending_deletes"].pop(user_id, None)
+        self.save()
+
+    def complete(self, user_id: str, compacted: int) -> None:
+        self.data["users"][user_id] = {
+            "completed_at": datetime.now(timezone.utc).isoformat(),
+            "compacted": compacted,
+        }
+        self.save()
+
+
+# ============================================================================
+# JOB
+# ============================================================================
+
+@dataclass
+class CompactionGroup:
+    period: str
+    memory_ids: List[str]
+    summary: str = ""
+
+
+@dataclass
+class UserCompactionReport:
+    user_id: str
+    memories_scanned: int = 0
+    episodic: int = 0
+    pages: int = 0
+    skipped: str = ""
+    groups: List[CompactionGroup] = field(default_factory=list)
+    summaries_added: int = 0
+    deleted: int = 0
+    resumed_deletes: int = 0
+    errors: List[str] = field(default_factory=list)
+    elapsed_ms: float = 0.0
+
+
+@dataclass
+class CompactionReport:
+    dry_run: bool
+    users: List[UserCompactionReport] = field(default_factory=list)
+    elapsed_ms: float = 0.0
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "dry_run": self.dry_run,
+            "users": len(self.users),
+            "users_compacted": sum(1 for u in self.users if u.groups and not u.skipped),
+            "memories_scanned": sum(u.memories_scanned for u in self.users),
+            "groups": sum(len(u.groups) for u in self.users),
+            "summaries_added": sum(u.summaries_added for u in self.users),
+            "deleted": sum(u.deleted + u.resumed_deletes for u in self.users),
+            "errors": sum(len(u.errors) for u in self.users),
+            "elapsed_ms": round(self.elapsed_ms, 1),
+        }
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"summary": self.summary(), "users": [asdict(u) for u in self.users]}
+
+
+class CompactionJob:
+    """
+    Scheduled compaction over whole users.
+
+    Add-then-delete per group: a failed add keeps the originals, and a
+    failed delete is retried from the checkpoint on the next run.
+    """
+
+    def __init__(
+        self,
+        client=None,
+        dry_run: bool = True,
+        checkpoint: Optional[CompactionCheckpoint] = None,
+        min_memories: int = COMPACTION_MIN_MEMORIES,
+        keep_recent: int = COMPACTION_KEEP_RECENT,
+        window_days: int = COMPACTION_WINDOW_DAYS,
+        writes_per_second: float = COMPACTION_WRITES_PER_SECOND,
+        user_concurrency: int = COMPACTION_USER_CONCURRENCY,
+        min_interval_hours: float = COMPACTION_MIN_INTERVAL_HOURS,
+        page_size: int = 200,
+    ):
+        self.client = client or get_mem0()
+        self.dry_run = dry_run
+        self.checkpoint = checkpoint or CompactionCheckpoint()
+        self.min_memories = min_memories
+        self.keep_recent = keep_recent
+        self.window_days = window_days
+        self.limiter = RateLimiter(writes_per_second)
+        self.user_concurrency = user_concurrency
+        self.min_interval_hours = min_interval_hours
+        self.page_size = page_size
+
+    async def run_user(self, user_id: str) -> UserCompactionReport:
+        start = time.perf_counter()
+        report = UserCompactionReport(user_id=user_id)
+        try:
+            await self._compact_user(user_id, report)
+        except Exception as e:
+            report.errors.append(f"compaction: {e}")
+        report.elapsed_ms = (time.perf_counter() - start) * 1000
+        return report
+
+    async def _compact_user(self, user_id: str, report: UserCompactionReport) -> None:
+        if not self.dry_run:
+            await self._resume_pending(user_id, report)
+        if self.checkpoint.recently_completed(user_id, self.min_interval_hours):
+            report.skipped = "recently compacted"
+            return
+
+        memories, report.pages = await fetch_all_memories(self.client, user_id, self.page_size)
+        report.memories_scanned = len(memories)
+
+        episodic = [m for m in memories if m.get("id") and m.get("memory") and _is_episodic(m)]
+        report.episodic = len(episodic)
+        if len(episodic) < self.min_memories:
+            report.skipped = "below threshold"
+            return
+
+        # Newest memories stay verbatim; undated ones count as oldest
+        epoch = datetime.min.replace(tzinfo=timezone.utc)
+        episodic.sort(key=lambda m: _timestamp(m) or epoch)
+        candidates = episodic[:max(0, len(episodic) - self.keep_recent)]
+
+        for group in group_memories(candidates, window_days=self.window_days):
+            entry = CompactionGroup(period=_period(group), memory_ids=[m["id"] for m in group])
+            report.groups.append(entry)
+            if self.dry_run:
+                continue
+            await self._compact_group(user_id, group, entry, report)
+
+        if not self.dry_run:
+            self.checkpoint.complete(user_id, report.deleted)
+
+    async def _compact_group(
+        self,
+        user_id: str,
+        group: List[Dict],
+        entry: CompactionGroup,
+        report: UserCompactionReport
+    ) -> None:
+        entry.summary = await summarize_group(group)
+        if not entry.summary:
+            return
+
+        # Add first: a failed add must not lose the originals
+        await self.limiter.acquire()
+        try:
+            await self.client.aadd(
+                messages=[{"role": "assistant", "content": entry.summary}],
+                user_id=user_id,
+                metadata={
+                    "type": "semantic",
+                    "importance": 0.7,
+                    "source": "compaction",
+                    "compacted_from_count": len(group),
+                    "period": entry.period,
+                },
+                infer=False
+            )
+            report.summaries_added += 1
+        except Exception as e:
+            report.errors.append(f"add: {e}")
+            return
+
+        self.checkpoint.add_pending(user_id, entry.memory_ids)
+        report.deleted += await self._delete(user_id, entry.memory_ids, report)
+
+    async def _delete(self, user_id: str, memory_ids: List[str], report: UserCompactionReport) -> int:
+        deleted = 0
+        for i in range(0, len(memory_ids), PROMOTION_DELETE_BATCH):
+            chunk = memory_ids[i:i + PROMOTION_DELETE_BATCH]
+            await self.limiter.acquire()
+            try:
+                await self.client.abatch_delete([{"memory_id": mid} for mid in chunk])
+            except Exception as e:
+                report.errors.append(f"delete: {e}")
+                continue
+            self.checkpoint.clear_pending(user_id, chunk)
+            deleted += len(chunk)
+        return deleted
+
+    async def _resume_pending(self, user_id: str, report: UserCompactionReport) -> None:
+        pending = self.checkpoint.pending(user_id)
+        if pending:
+            report.resumed_deletes = await self._delete(user_id, pending, report)
+
+    async def run(self, user_ids: Optional[List[str]] = None) -> CompactionReport:
+        """Run for the given users (default: every Mem0 user)."""
+        start = time.perf_counter()
+        report = CompactionReport(dry_run=self.dry_run)
+        if not self.client:
+            print("Compaction job skipped: Mem0 not configured")
+            return report
+
+        if user_ids is None:
+            user_ids = await list_memory_users(self.client)
+
+        semaphore = asyncio.Semaphore(self.user_concurrency)
+
+        async def _bounded(uid: str) -> UserCompactionReport:
+            async with semaphore:
+                return await self.run_user(uid)
+
+        report.users = list(await asyncio.gather(*(_bounded(u) for u in user_ids)))
+        report.elapsed_ms = (time.perf_counter() - start) * 1000
+        return report
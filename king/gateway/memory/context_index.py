@@ -0,0 +1,213 @@
+"""
+KING Context Index - Materialized per-user context map for fingerprinting.
+
+Replaces the per-message Mem0 `get_all` scan in fingerprint._fetch_user_contexts
+with an incrementally maintained index:
+
+    user_id → {context_id → UserContext}
+
+- Updated on every store_context (merge counts, confidence, attributes)
+- Persisted to Supabase `user_contexts` (one row per user/context)
+- Cached in-process (LRU, reloaded after CONTEXT_INDEX_TTL_SECONDS so rows
+  written by other gateway instances are picked up); lookups are
+  O(contexts), independent of memory count
+- Users not yet in the table are backfilled once from a Mem0 scan
+"""
+import os
+import time
+import asyncio
+import logging
+from collections import OrderedDict
+from datetime import datetime
+from typing import Dict, List, Optional, Callable, Awaitable, Tuple
+
+from .fingerprint import UserContext
+
+logger = logging.getLogger(__name__)
+
+TABLE = "user_contexts"
+CONTEXT_INDEX_TTL_SECONDS = float(os.getenv("CONTEXT_INDEX_TTL_SECONDS", "300"))
+CONTEXT_INDEX_MAX_USERS = int(os.getenv("CONTEXT_INDEX_MAX_USERS", "10000"))
+
+# Lazy Supabase client
+_supabase_client = None
+
+
+def _get_supabase():
+    global _supabase_client
+    if _supabase_client is None:
+        from supabase import create_client
+        url = os.getenv("SUPABASE_URL")
+        key = os.getenv("SUPABASE_SERVICE_KEY")
+        if url and key:
+            _supabase_client = create_client(url, key)
+        else:
+            print("Warning: Supabase not configured for context index")
+            _supabase_client = False
+    return _supabase_client if _supabase_client else None
+
+
+def _to_row(user_id: str, ctx: UserContext) -> Dict:
+    return {
+        "user_id": user_id,
+        "context_id": ctx.context_id,
+        "context_type": ctx.context_type,
+        "name": ctx.name,
+        "attributes": ctx.attributes,
+        "confidence": ctx.confidence,
+        "mention_count": ctx.mention_count,
+        "last_referenced": ctx.last_referenced.isoformat(),
+    }
+
+
+def _from_row(row: Dict) -> UserContext:
+    last = row.get("last_referenced")
+    try:
+        last_referenced = datetime.fromisoformat(last.replace("Z", "+00:00")).replace(tzinfo=None) if last else datetime.utcnow()
+    except (ValueError, AttributeError):
+        last_referenced = datetime.utcnow()
+    return UserContext(
+        context_id=row["context_id"],
+        context_type=row.get("context_type") or "unknown",
+        name=row.get("name") or "unnamed",
+        attributes=row.get("attributes") or {},
+        confidence=row.get("confidence", 0.5),
+        last_referenced=last_referenced,
+        mention_count=row.get("mention_count", 1),
+    )
+
+
+class ContextIndex:
+    """In-process, write-through index of user contexts."""
+
+    def __init__(
+        self,
+        backfill: Optional[Callable[[str], Awaitable[List[UserContext]]]] = None,
+        persist: bool = True,
+        ttl_seconds: float = CONTEXT_INDEX_TTL_SECONDS,
+        max_users: int = CONTEXT_INDEX_MAX_USERS,
+    ):
+        """
+        Args:
+            backfill: Async loader for users with no indexed contexts yet
+                      (defaults to none; fingerprint wires in a Mem0 scan)
+            persist: Write through to Supabase `user_contexts`
+            ttl_seconds: Reload a user's contexts after this long
+            max_users: Least recently used users beyond this are dropped
+        """
+        self._backfill = backfill
+        self._persist = persist
+        self.ttl = ttl_seconds
+        self.max_users = max_users
+        self._users: "OrderedDict[str, Tuple[float, Dict[str, UserContext]]]" = OrderedDict()  # user -> (loaded at, contexts)
+        self._load_locks: Dict[str, asyncio.Lock] = {}
+
+    async def get_contexts(self, user_id: str) -> List[UserContext]:
+        """All known contexts for a user (cached for up to ttl_seconds)."""
+        return list((await self._ensure_loaded(user_id)).values())
+
+    async def get(self, user_id: str, context_id: str) -> Optional[UserContext]:
+        return (await self._ensure_loaded(user_id)).get(context_id)
+
+    async def upsert(self, user_id: str, context: UserContext) -> UserContext:
+        """Merge a referenced context into the index and persist it."""
+        contexts = await self._ensure_loaded(user_id)
+        existing = contexts.get(context.context_id)
+
+        if existing:
+            merged = UserContext(
+                context_id=context.context_id,
+                context_type=context.context_type or existing.context_type,
+                name=context.name or existing.name,
+                attributes={**existing.attributes, **context.attributes},
+                confidence=context.confidence,
+                last_referenced=datetime.utcnow(),
+                mention_count=max(existing.mention_count + 1, context.mention_count),
+            )
+        else:
+            merged = context
+            merged.last_referenced = datetime.utcnow()
+
+        contexts[context.context_id] = merged
+        await self._write([_to_row(user_id, merged)])
+        return merged
+
+    def invalidate(self, user_id: Optional[str] = None) -> None:
+        """Drop cached contexts (all users if user_id is None)."""
+        if user_id is None:
+            self._users.clear()
+        else:
+            self._users.pop(user_id, None)
+
+    def _cached(self, user_id: str) -> Optional[Dict[str, UserContext]]:
+        entry = self._users.get(user_id)
+        if entry is None:
+            return None
+        if time.monotonic() - entry[0] >= self.ttl:
+            del self._users[user_id]
+            return None
+        self._users.move_to_end(user_id)
+        return entry[1]
+
+    async def _ensure_loaded(self, user_id: str) -> Dict[str, UserContext]:
+        contexts = self._cached(user_id)
+        if contexts is not None:
+            return contexts
+
+        lock = self._load_locks.setdefault(user_id, asyncio.Lock())
+        async with lock:
+            # Another waiter may have loaded it meanwhile (single-flight)
+            contexts = self._cached(user_id)
+            if contexts is not None:
+                return contexts
+
+            contexts = {c.context_id: c for c in await self._read(user_id)}
+            if not contexts and self._backfill:
+                backfilled = await self._backfill(user_id)
+                contexts = {c.context_id: c for c in backfilled}
+                if contexts:
+                    await self._write([_to_row(user_id, c) for c in contexts.values()])
+                    logger.info(f"Backfilled {len(contexts)} contexts for user {user_id}")
+
+            self._users[user_id] = (time.monotonic(), contexts)
+            while len(self._users) > self.max_users:
+                self._users.popitem(last=False)
+            self._load_locks.pop(user_id, None)
+            return contexts
+
+    async def _read(self, user_id: str) -> List[UserContext]:
+        client = _get_supabase() if self._persist else None
+        if not client:
+            return []
+        try:
+            result = await asyncio.to_thread(
+                lambda: client.table(TABLE).select("*").eq("user_id", user_id).execute()
+            )
+            return [_from_row(r) for r in (result.data or [])]
+        except Exception as e:
+            logger.error(f"Context index read failed for {user_id}: {e}")
+            return []
+
+    async def _write(self, rows: List[Dict]) -> None:
+        client = _get_supabase() if self._persist else None
+        if not client or not rows:
+            return
+        try:
+            await asyncio.to_thread(
+                lambda: client.table(TABLE).upsert(rows, on_conflict="user_id,context_id").execute()
+            )
+        except Exception as e:
+            logger.error(f"Context index write failed: {e}")
+
+
+# Process-wide index
+_context_index: Optional[ContextIndex] = None
+
+
+def get_context_index() -> ContextIndex:
+    """Shared context index, backfilling from Mem0 for unindexed users."""
+    global _context_index
+    if _context_index is None:
+        from .fingerprint import _scan_mem0_contexts
+        _context_index = ContextIndex(backfill=_scan_mem0_contexts)
+    return _context_index
@@ -0,0 +1,136 @@
+"""
+KING Near-Duplicate Detection - MinHash/LSH clustering of memory texts.
+
+Used by the offline promotion job instead of one Mem0 search per memory:
+
+    shingles → MinHash signature → LSH bands → candidate pairs
+    → verified by estimated Jaccard → union-find clusters
+
+Pure Python, no external deps. Cost is linear in the number of memories
+(plus candidate pairs), so a user's full memory set clusters in one pass.
+"""
+import hashlib
+from typing import Dict, Iterable, List, Sequence, Set, Tuple
+
+from .relevance import words
+
+# Mersenne prime for universal hashing
+_PRIME = (1 << 61) - 1
+_MAX_HASH = (1 << 32) - 1
+
+DEFAULT_NUM_PERM = 64
+DEFAULT_BANDS = 16
+DEFAULT_JACCARD_THRESHOLD = 0.6
+
+
+def shingles(text: str, k: int = 3) -> Set[str]:
+    """Word k-shingles in any script (falls back to the token set for short texts)."""
+    tokens = words(text)
+    if len(tokens) < k:
+        return set(tokens)
+    return {" ".join(tokens[i:i + k]) for i in range(len(tokens) - k + 1)}
+
+
+def _hash32(value: str) -> int:
+    return int.from_bytes(hashlib.blake2b(value.encode("utf-8"), digest_size=4).digest(), "little")
+
+
+class MinHasher:
+    """Fixed family of `num_perm` hash permutations."""
+
+    def __init__(self, num_perm: int = DEFAULT_NUM_PERM, seed: int = 1):
+        self.num_perm = num_perm
+        # Deterministic (a, b) pairs so signatures are stable across runs
+        params = []
+        for i in range(num_perm):
+            digest = hashlib.blake2b(f"{seed}:{i}".encode(), digest_size=16).digest()
+            a = int.from_bytes(digest[:8], "little") % (_PRIME - 1) + 1
+            b = int.from_bytes(digest[8:], "little") % _PRIME
+            params.append((a, b))
+        self._params = params
+
+    def signature(self, shingle_set: Iterable[str]) -> Tuple[int, ...]:
+        hashes = [_hash32(s) for s in shingle_set]
+        if not hashes:
+            return tuple([_MAX_HASH] * self.num_perm)
+        return tuple(
+            min(((a * h + b) % _PRIME) & _MAX_HASH for h in hashes)
+            for a, b in self._params
+        )
+
+
+def estimated_jaccard(sig_a: Sequence[int], sig_b: Sequence[int]) -> float:
+    if not sig_a:
+        return 0.0
+    return sum(1 for x, y in zip(sig_a, sig_b) if x == y) / len(sig_a)
+
+
+class _UnionFind:
+    def __init__(self, n: int):
+        self.parent = list(range(n))
+
+    def find(self, x: int) -> int:
+        while self.parent[x] != x:
+            self.parent[x] = self.parent[self.parent[x]]
+            x = self.parent[x]
+        return x
+
+    def union(self, a: int, b: int) -> None:
+        ra, rb = self.find(a), self.find(b)
+        if ra != rb:
+            self.parent[rb] = ra
+
+
+def cluster_near_duplicates(
+    texts: Sequence[str],
+    threshold: float = DEFAULT_JACCARD_THRESHOLD,
+    num_perm: int = DEFAULT_NUM_PERM,
+    bands: int = DEFAULT_BANDS,
+    min_size: int = 2,
+) -> List[List[int]]:
+    """
+    Group texts that are near-duplicates of each other.
+
+    Args:
+        texts: Memory contents
+        threshold: Minimum estimated Jaccard similarity to link two texts
+        num_perm: MinHash signature length (must be divisible by bands)
+        bands: LSH bands; more bands → higher recall, more candidates
+        min_size: Drop clusters smaller than this
+
+    Returns:
+        Clusters as lists of indexes into `texts`, largest first.
+        Texts without any words are never clustered.
+    """
+    if num_perm % bands:
+        raise ValueError("num_perm must be divisible by bands")
+    rows = num_perm // bands
+
+    hasher = MinHasher(num_perm)
+    shingle_sets = [shingles(t) for t in texts]
+    # Empty sets would all share one signature (Jaccard 1.0); leave them out
+    signatures = {idx: hasher.signature(s) for idx, s in enumerate(shingle_sets) if s}
+    uf = _UnionFind(len(texts))
+
+    for band in range(bands):
+        buckets: Dict[Tuple[int, ...], List[int]] = {}
+        lo = band * rows
+        for idx, sig in signatures.items():
+            buckets.setdefault(sig[lo:lo + rows], []).append(idx)
+        for members in buckets.values():
+            if len(members) < 2:
+                continue
+            for i, a in enumerate(members):
+                for b in members[i + 1:]:
+                    if uf.find(a) == uf.find(b):
+                        continue
+                    if estimated_jaccard(signatures[a], signatures[b]) >= threshold:
+                        uf.union(a, b)
+
+    groups: Dict[int, List[int]] = {}
+    for idx in range(len(texts)):
+        groups.setdefault(uf.find(idx), []).append(idx)
+
+    clusters = [g for g in groups.values() if len(g) >= min_size]
+    clusters.sort(key=len, reverse=True)
+    return clusters
@@ -4,6 +4,7 @@ import logging
 from typing import Optional, Dict, Any
 from supabase import create_async_client, Client
 from .types import EntityType
+from .resilience import DependencyUnavailable, get_dependency
 
 logger = logging.getLogger(__name__)
 
@@ -19,6 +20,7 @@ class EntityResolver:
             raise ValueError("SUPABASE_URL and SUPABASE_SERVICE_KEY must be set")
         
         self._client: Optional[Client] = None
+        self._supabase = get_dependency("supabase")
 
     async def _get_client(self) -> Client:
         """Lazy init for async client."""
@@ -34,14 +36,18 @@ class EntityResolver:
         3. Create new entity if not found (optimistic).
         """
         raw_handle = raw_handle.strip()
+        if not self._supabase.available():
+            # Fail fast: minting a temporary entity during an outage would
+            # hand callers an id that never resolves again
+            raise DependencyUnavailable("supabase circuit open")
         client = await self._get_client()
         
         # 1. Search by canonical name
         try:
-            res = await client.table("entities")\
+            res = await self._supabase.call(lambda: client.table("entities")\
                 .select("*")\
                 .eq("canonical_name", raw_handle)\
-                .execute()
+                .execute(), hedge=True)
             
             if res.data:
                 return res.data[0]
@@ -51,16 +57,19 @@ class EntityResolver:
         # 2. Search by alias containment
         # JSONB contains check: aliases @> '["handle"]'
         try:
-            res = await client.table("entities")\
+            res = await self._supabase.call(lambda: client.table("entities")\
                 .select("*")\
                 .contains("aliases", f'["{raw_handle}"]')\
-                .execute()
+                .execute(), hedge=True)
             
             if res.data:
                 return res.data[0]
         except Exception as e:
             logger.error(f"Error searching alias '{raw_handle}': {e}")
 
+        if not self._supabase.available():
+            raise DependencyUnavailable("supabase circuit opened during lookup")
+
         # 3. Create new entity if not found (Optimistic)
         # Defaulting to SYSTEM type as we don't know enough to classify yet
         new_entity = {
@@ -70,9 +79,9 @@ class EntityResolver:
         }
         
         try:
-            res = await client.table("entities")\
+            res = await self._supabase.call(lambda: client.table("entities")\
                 .insert(new_entity)\
-                .execute()
+                .execute(), timeout=False)
             
             if res.data:
                 logger.info(f"Created new entity: {raw_handle}")
@@ -81,10 +90,10 @@ class EntityResolver:
             # Handle race condition where entity was created between search and insert
             logger.warning(f"Failed to create entity '{raw_handle}', retrying fetch: {e}")
             try:
-                res = await client.table("entities")\
+                res = await self._supabase.call(lambda: client.table("entities")\
                     .select("*")\
                     .eq("canonical_name", raw_handle)\
-                    .execute()
+                    .execute())
                 if res.data:
                     return res.data[0]
             except Exception as e2:
@@ -102,11 +111,11 @@ class EntityResolver:
         """Retrieve entity by UUID."""
         client = await self._get_client()
         try:
-            res = await client.table("entities")\
+            res = await self._supabase.call(lambda: client.table("entities")\
                 .select("*")\
                 .eq("id", entity_id)\
                 .single()\
-                .execute()
+                .execute(), hedge=True, stale_key=("entity", entity_id))
             return res.data
         except Exception as e:
             logger.error(f"Error retrieving entity {entity_id}: {e}")
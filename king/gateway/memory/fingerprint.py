@@ -11,6 +11,7 @@ import asyncio
 from typing import Dict, Any, List, Optional
 from dataclasses import dataclass, field
 from datetime import datetime
+from .mem0_client import get_mem0
 
 # Lazy imports
 _gemini_model = None
@@ -157,6 +158,7 @@ async def match_context(
     
     # Extract context from message
     extraction = await extract_context(message, known_contexts, session_history)
+    await detect_anomalies(user_id, extraction, known_contexts)
     
     matched = None
     if extraction.get("matched_context_id"):
@@ -175,17 +177,20 @@ async def match_context(
 
 
 async def _fetch_user_contexts(user_id: str) -> List[UserContext]:
-    """Fetch user's known contexts from Mem0 graph memory."""
-    from mem0 import MemoryClient
-    api_key = os.getenv("MEM0_API_KEY")
-    if not api_key:
+    """Fetch user's known contexts from the materialized context index."""
+    from memory.context_index import get_context_index
+    return await get_context_index().get_contexts(user_id)
+
+
+async def _scan_mem0_contexts(user_id: str) -> List[UserContext]:
+    """Full Mem0 metadata scan. Only used to backfill the context index."""
+    client = get_mem0()
+    if not client:
         return []
 
     try:
-        client = MemoryClient(api_key=api_key.strip())
         # Fetch memories with context metadata
-        result = await asyncio.to_thread(
-            client.get_all,
+        result = await client.aget_all(
             filters={"user_id": user_id},
             limit=100
         )
@@ -220,14 +225,15 @@ async def store_context(
     message: str,
     response: str
 ) -> bool:
-    """Store/update a user context in Mem0 with graph enabled."""
-    from mem0 import MemoryClient
-    api_key = os.getenv("MEM0_API_KEY")
-    if not api_key:
+    """Store/update a user context in the context index and Mem0 (graph enabled)."""
+    from memory.context_index import get_context_index
+    context = await get_context_index().upsert(user_id, context)
+
+    client = get_mem0()
+    if not client:
         return False
 
     try:
-        client = MemoryClient(api_key=api_key.strip())
         messages = [
             {"role": "user", "content": message},
             {"role": "assistant", "content": response}
@@ -242,8 +248,7 @@ async def store_context(
             "mention_count": context.mention_count
         }
 
-        await asyncio.to_thread(
-            client.add,
+        await client.aadd(
             messages,
             user_id=user_id,
             metadata=metadata,
@@ -261,33 +266,58 @@ async def detect_anomalies(
     extraction: Dict[str, Any],
     known_contexts: List[UserContext]
 ) -> List[AnomalySignal]:
-    """Detect identity anomalies from extracted context vs known history."""
-    anomalies = []
-    raw_anomalies = extraction.get("anomalies", [])
+    """
+    Detect identity anomalies from extracted context vs known history.
 
+    Significant signals feed the user's decayed suspicion counters
+    (memory.anomaly); returned signals carry the accumulated score.
+    """
+    from memory.anomaly import get_anomaly_accumulator
+
+    raw_anomalies = [
+        a for a in extraction.get("anomalies", [])
+        if a.get("severity", 0) > 0.3  # Only track significant anomalies
+    ]
+    if not raw_anomalies:
+        return []
+
+    counters = await get_anomaly_accumulator().record(
+        user_id,
+        [(a.get("type", "unknown"), a.get("severity", 0.5)) for a in raw_anomalies]
+    )
+
+    anomalies = []
     for a in raw_anomalies:
-        if a.get("severity", 0) > 0.3:  # Only track significant anomalies
-            anomalies.append(AnomalySignal(
-                anomaly_type=a.get("type", "unknown"),
-                expected=a.get("expected", ""),
-                received=a.get("received", ""),
-                suspicion_score=a.get("severity", 0.5)
-            ))
-
-    # TODO: Persist anomalies and accumulate suspicion over time
+        counter = counters[a.get("type", "unknown")]
+        anomalies.append(AnomalySignal(
+            anomaly_type=a.get("type", "unknown"),
+            expected=a.get("expected", ""),
+            received=a.get("received", ""),
+            suspicion_score=round(counter.value, 4),
+            occurrences=counter.count
+        ))
     return anomalies
 
 
 async def get_context_summary(user_id: str) -> str:
     """Get a summary of user's known contexts for the router."""
+    from memory.anomaly import get_anomaly_accumulator
+
     contexts = await _fetch_user_contexts(user_id)
+    accumulator = get_anomaly_accumulator()
+    suspicion = await accumulator.get(user_id)
+    identity_note = ""
+    if accumulator.is_flagged(user_id):
+        top = ", ".join(f"{t}={v:.1f}" for t, v in sorted(suspicion.items(), key=lambda x: -x[1])[:3])
+        identity_note = f"\n⚠️ Identity anomalies accumulating ({top}) - possible shared account, confirm before using personal context"
+
     if not contexts:
-        return "New user - no known contexts"
+        return "New user - no known contexts" + identity_note
 
     summary = []
     for ctx in sorted(contexts, key=lambda c: c.confidence, reverse=True)[:5]:
         attrs = ", ".join([f"{k}={v}" for k, v in list(ctx.attributes.items())[:3]])
         summary.append(f"- {ctx.name} ({ctx.context_type}): {attrs} [conf: {ctx.confidence:.1f}]")
 
-    return "\n".join(summary)
+    return "\n".join(summary) + identity_note
 
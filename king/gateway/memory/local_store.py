@@ -0,0 +1,376 @@
+"""
+KING Local Memory Store - L1 tier in front of Mem0.
+
+SQLite with FTS5 (lexical) and a compact int8 vector column (similarity),
+exposing the same search/add interface MemoryResolver and the orchestrator
+use on the Mem0 client:
+
+    asearch(query, user_id, limit)  → {"results": [{"id", "memory", "score", "metadata"}]}
+    aadd(messages, user_id, ...)    → local insert, then Mem0 add (write-through)
+
+- Warm users (reconciled with Mem0 recently) are answered locally
+- Cold users fall through to Mem0; a background reconcile then pulls
+  their canonical memories so later recalls stay local. Users go cold
+  again after RECONCILE_TTL_SECONDS, so that is also the staleness bound
+- Users with more than RECONCILE_MAX_MEMORIES are pulled partially and
+  never served locally (a truncated set would silently drop recalls); the
+  partial pull is not repeated until it goes stale
+- Writes are applied locally (provisional until Mem0 has processed them)
+  and do not trigger a reconcile of their own
+- Searches with filters or other Mem0-specific options bypass the local tier
+- Works with no Mem0 at all (offline tests, local development)
+
+Off by default (LOCAL_MEMORY_ENABLED=true to enable) until sized for
+production load.
+"""
+import os
+import json
+import time
+import uuid
+import array
+import asyncio
+import logging
+import sqlite3
+import threading
+from typing import Any, Dict, List, Optional
+
+from .relevance import HashingEmbedder, cosine, lexical_overlap, tokenize
+from .resolution_cache import notify_memory_write
+
+logger = logging.getLogger(__name__)
+
+LOCAL_MEMORY_DB = os.getenv("LOCAL_MEMORY_DB", "/tmp/king_memory.db")
+LOCAL_MEMORY_ENABLED = os.getenv("LOCAL_MEMORY_ENABLED", "false").lower() == "true"
+LOCAL_VECTOR_DIM = 256
+LOCAL_LEXICAL_WEIGHT = 0.4
+LOCAL_SCAN_LIMIT = 2000  # Max rows scored by vector per query
+
+RECONCILE_TTL_SECONDS = 600  # How long a reconciled user is served locally
+RECONCILE_PAGE_SIZE = 200
+RECONCILE_MAX_MEMORIES = 2000
+PROVISIONAL_TTL_SECONDS = 900  # Keep unconfirmed local writes this long
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS memories (
+    id TEXT PRIMARY KEY,
+    user_id TEXT NOT NULL,
+    memory TEXT NOT NULL,
+    metadata TEXT,
+    vector BLOB,
+    provisional INTEGER DEFAULT 0,
+    created_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_memories_user ON memories(user_id, created_at DESC);
+CREATE VIRTUAL TABLE IF NOT EXISTS memories_fts USING fts5(
+    memory, content='memories', content_rowid='rowid'
+);
+CREATE TRIGGER IF NOT EXISTS memories_ai AFTER INSERT ON memories BEGIN
+    INSERT INTO memories_fts(rowid, memory) VALUES (new.rowid, new.memory);
+END;
+CREATE TRIGGER IF NOT EXISTS memories_ad AFTER DELETE ON memories BEGIN
+    INSERT INTO memories_fts(memories_fts, rowid, memory) VALUES ('delete', old.rowid, old.memory);
+END;
+CREATE TABLE IF NOT EXISTS reconciled_users (
+    user_id TEXT PRIMARY KEY,
+    reconciled_at REAL NOT NULL,
+    complete INTEGER NOT NULL DEFAULT 0
+);
+"""
+
+
+def _pack(vec: List[float]) -> bytes:
+    """Quantize a unit vector to int8 (dim bytes per memory)."""
+    return array.array("b", (max(-127, min(127, int(round(v * 127)))) for v in vec)).tobytes()
+
+
+def _unpack(blob: bytes) -> List[float]:
+    return [v / 127 for v in array.array("b", blob)]
+
+
+def _messages_text(messages: Any) -> str:
+    if isinstance(messages, str):
+        return messages
+    if isinstance(messages, dict):
+        messages = [messages]
+    return "\n".join(m.get("content", "") for m in messages or [] if isinstance(m, dict))
+
+
+def _fts_query(query: str) -> str:
+    # Quote tokens so user text can't inject FTS syntax
+    return " OR ".join(f'"{t}"' for t in tokenize(query))
+
+
+class LocalMemoryStore:
+    """SQLite-backed memory index. Thread-safe; async callers use to_thread."""
+
+    def __init__(self, path: str = LOCAL_MEMORY_DB, embedder: Optional[HashingEmbedder] = None):
+        self.path = path
+        self.embedder = embedder or HashingEmbedder(dim=LOCAL_VECTOR_DIM)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        if path != ":memory:":
+            self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(_SCHEMA)
+        columns = {r["name"] for r in self._conn.execute("PRAGMA table_info(reconciled_users)")}
+        if "complete" not in columns:  # Store files created before partial pulls were tracked
+            self._conn.execute("ALTER TABLE reconciled_users ADD COLUMN complete INTEGER NOT NULL DEFAULT 0")
+
+    # --- Writes ---
+
+    def upsert(
+        self,
+        user_id: str,
+        memory: str,
+        memory_id: Optional[str] = None,
+        metadata: Optional[Dict] = None,
+        provisional: bool = False
+    ) -> str:
+        memory_id = memory_id or f"local-{uuid.uuid4()}"
+        vector = _pack(self.embedder.embed_one(memory))
+        with self._lock, self._conn:
+            # Delete+insert keeps the external-content FTS index consistent
+            self._conn.execute("DELETE FROM memories WHERE id = ?", (memory_id,))
+            self._conn.execute(
+                "INSERT INTO memories (id, user_id, memory, metadata, vector, provisional, created_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (memory_id, user_id, memory, json.dumps(metadata or {}), vector, int(provisional), time.time())
+            )
+        return memory_id
+
+    def delete(self, memory_id: str) -> None:
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM memories WHERE id = ?", (memory_id,))
+
+    def replace_user(self, user_id: str, memories: List[Dict], complete: bool = True) -> None:
+        """Swap in Mem0's canonical set, keeping recent provisional writes.
+
+        complete=False records a truncated pull: the user is not served locally.
+        """
+        cutoff = time.time() - PROVISIONAL_TTL_SECONDS
+        rows = []
+        for m in memories:
+            text = m.get("memory")
+            if not text or not m.get("id"):
+                continue
+            rows.append((
+                m["id"], user_id, text, json.dumps(m.get("metadata") or {}),
+                _pack(self.embedder.embed_one(text)), 0, time.time()
+            ))
+        with self._lock, self._conn:
+            self._conn.execute(
+                "DELETE FROM memories WHERE user_id = ? AND (provisional = 0 OR created_at < ?)",
+                (user_id, cutoff)
+            )
+            self._conn.executemany("DELETE FROM memories WHERE id = ?", [(r[0],) for r in rows])
+            self._conn.executemany(
+                "INSERT INTO memories (id, user_id, memory, metadata, vector, provisional, created_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                rows
+            )
+            self._conn.execute(
+                "INSERT OR REPLACE INTO reconciled_users (user_id, reconciled_at, complete) VALUES (?, ?, ?)",
+                (user_id, time.time(), int(complete))
+            )
+
+    # --- Reads ---
+
+    def reconcile_state(self, user_id: str) -> Optional[bool]:
+        """None if not reconciled within the TTL, else whether that pull was complete."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT reconciled_at, complete FROM reconciled_users WHERE user_id = ?", (user_id,)
+            ).fetchone()
+        if not row or time.time() - row["reconciled_at"] >= RECONCILE_TTL_SECONDS:
+            return None
+        return bool(row["complete"])
+
+    def is_warm(self, user_id: str) -> bool:
+        return self.reconcile_state(user_id) is True
+
+    def search(self, query: str, user_id: str, limit: int = 5) -> List[Dict[str, Any]]:
+        """Hybrid lexical + vector search over one user's memories."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT id, memory, metadata, vector FROM memories WHERE user_id = ? "
+                "ORDER BY created_at DESC LIMIT ?",
+                (user_id, LOCAL_SCAN_LIMIT)
+            ).fetchall()
+            fts = _fts_query(query)
+            if fts:
+                # Lexical hits outside the recency window still get scored
+                rows += self._conn.execute(
+                    "SELECT m.id, m.memory, m.metadata, m.vector FROM memories_fts "
+                    "JOIN memories m ON m.rowid = memories_fts.rowid "
+                    "WHERE memories_fts MATCH ? AND m.user_id = ? ORDER BY bm25(memories_fts) LIMIT ?",
+                    (fts, user_id, limit * 4)
+                ).fetchall()
+
+        if not rows:
+            return []
+
+        query_vec = self.embedder.embed_one(query)
+        query_tokens = tokenize(query)
+        scored = {}
+        for row in rows:
+            if row["id"] in scored:
+                continue
+            vector_score = max(0.0, cosine(query_vec, _unpack(row["vector"])))
+            lexical = lexical_overlap(query_tokens, tokenize(row["memory"]))
+            scored[row["id"]] = {
+                "id": row["id"],
+                "memory": row["memory"],
+                "metadata": json.loads(row["metadata"] or "{}"),
+                "score": round((1 - LOCAL_LEXICAL_WEIGHT) * vector_score + LOCAL_LEXICAL_WEIGHT * lexical, 4),
+            }
+        results = sorted(scored.values(), key=lambda r: r["score"], reverse=True)
+        return results[:limit]
+
+    def count(self, user_id: str) -> int:
+        with self._lock:
+            return self._conn.execute(
+                "SELECT COUNT(*) FROM memories WHERE user_id = ?", (user_id,)
+            ).fetchone()[0]
+
+
+class L1MemoryClient:
+    """
+    Mem0-compatible client: local store first, Mem0 behind it.
+
+    Methods not overridden here (get_all, get, batch_delete, ...) go
+    straight to the wrapped Mem0 client.
+    """
+
+    def __init__(self, store: LocalMemoryStore, remote=None):
+        self.store = store
+        self.remote = remote
+        self._reconciling: Dict[str, asyncio.Task] = {}
+        self.stats = {"local_hits": 0, "remote_fallbacks": 0, "degraded": 0, "reconciles": 0, "partial": 0, "bypassed": 0}
+
+    def __getattr__(self, name: str) -> Any:
+        remote = self.__dict__.get("remote")
+        if remote is None:
+            raise AttributeError(name)
+        return getattr(remote, name)
+
+    async def asearch(self, query: str, user_id: Optional[str] = None, limit: int = 5, **kwargs) -> Dict:
+        if not user_id:
+            return await self.remote.asearch(query=query, limit=limit, **kwargs) if self.remote else {"results": []}
+
+        if self.remote is not None and any(v is not None for v in kwargs.values()):
+            # filters/enable_graph/... aren't modelled locally; let Mem0 apply them
+            self.stats["bypassed"] += 1
+            return await self.remote.asearch(query=query, user_id=user_id, limit=limit, **kwargs)
+
+        state = True if self.remote is None else self.store.reconcile_state(user_id)
+        if state:
+            self.stats["local_hits"] += 1
+            results = await asyncio.to_thread(self.store.search, query, user_id, limit)
+            return {"results": results}
+
+        # Cold user: answer from Mem0 now, warm the local tier in background
+        # (unless a fresh pull was partial; re-pulling would truncate again)
+        self.stats["remote_fallbacks"] += 1
+        if state is None:
+            self.schedule_reconcile(user_id)
+        try:
+            return await self.remote.asearch(query=query, user_id=user_id, limit=limit, **kwargs)
+        except Exception as e:
+            # Mem0 down or slow: a partial local answer beats none
+            logger.warning(f"Remote search failed for {user_id}, serving local tier: {e}")
+            self.stats["degraded"] += 1
+            results = await asyncio.to_thread(self.store.search, query, user_id, limit)
+            return {"results": results}
+
+    async def aadd(self, messages: Any, user_id: Optional[str] = None, metadata: Optional[Dict] = None, **kwargs) -> Any:
+        text = _messages_text(messages)
+        if user_id and text:
+            await asyncio.to_thread(
+                self.store.upsert, user_id, text, None, metadata, self.remote is not None
+            )
+        if self.remote is None:
+            notify_memory_write(user_id)
+            return {"results": [{"event": "ADD", "memory": text}]}
+
+        # The local copy already has the write; Mem0's processed version
+        # arrives with the next reconcile (cold start or staleness), not per write
+        return await self.remote.aadd(messages, user_id=user_id, metadata=metadata, **kwargs)
+
+    async def adelete(self, memory_id: str, *args, **kwargs) -> Any:
+        await asyncio.to_thread(self.store.delete, memory_id)
+        if self.remote is None:
+            notify_memory_write(None)
+            return {"message": "deleted"}
+        return await self.remote.adelete(memory_id, *args, **kwargs)
+
+    def schedule_reconcile(self, user_id: str) -> None:
+        """Start a background reconcile for the user unless one is running."""
+        task = self._reconciling.get(user_id)
+        if task and not task.done():
+            return
+        task = asyncio.create_task(self.reconcile(user_id))
+        self._reconciling[user_id] = task
+
+        def _forget(done: asyncio.Task) -> None:
+            if self._reconciling.get(user_id) is done:
+                del self._reconciling[user_id]
+
+        task.add_done_callback(_forget)
+
+    async def reconcile(self, user_id: str) -> int:
+        """Pull the user's canonical memories from Mem0 into the local store."""
+        if self.remote is None:
+            return 0
+        memories: List[Dict] = []
+        page = 1
+        complete = False
+        try:
+            while len(memories) < RECONCILE_MAX_MEMORIES:
+                result = await self.remote.aget_all(
+                    filters={"user_id": user_id}, page=page, page_size=RECONCILE_PAGE_SIZE
+                )
+                batch = result.get("results", []) if isinstance(result, dict) else result
+                memories.extend(batch or [])
+                if not (isinstance(result, dict) and result.get("next")) or not batch:
+                    complete = True
+                    break
+                page += 1
+        except Exception as e:
+            logger.error(f"Local memory reconcile failed for {user_id}: {e}")
+            return 0
+
+        await asyncio.to_thread(self.store.replace_user, user_id, memories, complete)
+        self.stats["reconciles"] += 1
+        if not complete:
+            logger.info(f"Partial local memory pull for {user_id} ({len(memories)} memories); serving from Mem0")
+            self.stats["partial"] += 1
+        return len(memories)
+
+
+# Lazy process-wide L1 client
+_l1_client = None
+
+
+def get_memory_store():
+    """
+    Memory client for search/add: the L1-wrapped Mem0 client, or the plain
+    Mem0 client when LOCAL_MEMORY_ENABLED is false. None if neither is available.
+    """
+    global _l1_client
+    from .mem0_client import get_mem0
+
+    remote = get_mem0()
+    if not LOCAL_MEMORY_ENABLED:
+        return remote
+    if _l1_client is None:
+        try:
+            _l1_client = L1MemoryClient(LocalMemoryStore(), remote)
+        except Exception as e:
+            print(f"Warning: Local memory store unavailable: {e}")
+            _l1_client = False
+    return _l1_client if _l1_client else remote
+
+
+def get_local_store_stats() -> Dict[str, int]:
+    """Local hit / Mem0 fallback counters (empty if the L1 tier is not in use)."""
+    return dict(_l1_client.stats) if _l1_client else {}
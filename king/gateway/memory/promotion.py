@@ -1,17 +1,31 @@
 """
 Memory tier promotion based on pattern detection.
 Episodic (1x) → Semantic (3x repeated)
-"""
-from mem0 import MemoryClient
-from typing import Optional
-import os
 
-mem0_api_key = os.getenv("MEM0_API_KEY")
-mem0_client = MemoryClient(api_key=mem0_api_key) if mem0_api_key else None
+Two entry points:
+- check_and_promote: per-write check (one Mem0 search per memory)
+- PromotionJob: offline batch job — pages a user's memories, clusters
+  near-duplicates with MinHash/LSH and bulk promotes/deletes. Run nightly
+  via scripts/promote_memories.py so promotion adds no write latency.
+"""
+import time
+import asyncio
+from dataclasses import dataclass, field, asdict
+from typing import Any, Dict, List, Optional, Tuple
+from .mem0_client import get_mem0
+from .dedup import cluster_near_duplicates, DEFAULT_JACCARD_THRESHOLD
 
 SIMILARITY_THRESHOLD = 0.85
 PROMOTION_COUNT = 3
 
+# Offline job settings
+PROMOTION_PAGE_SIZE = 200
+PROMOTION_DELETE_BATCH = 100  # Mem0 batch_delete limit is 1000
+PROMOTION_USER_CONCURRENCY = 4
+
+# Mem0 entities that are not real users
+_SKIP_USER_PREFIXES = ("session_", "__")
+
 def check_and_promote(
     content: str,
     user_id: str,
@@ -23,6 +37,7 @@ def check_and_promote(
     2. If found 3+, promote to semantic tier
     3. Return True if promoted (skip storing duplicate)
     """
+    mem0_client = get_mem0()
     if not mem0_client:
         return False
 
@@ -33,44 +48,244 @@ def check_and_promote(
             user_id=user_id,
             limit=5
         )
-        
+
         # Count high-similarity matches
         matches = [m for m in similar if m.get("score", 0) > SIMILARITY_THRESHOLD]
-        
+
         if len(matches) >= PROMOTION_COUNT:
             # Promote: store as semantic, delete episodic duplicates
-            _promote_to_semantic(content, matches, user_id)
+            _promote_to_semantic(mem0_client, content, matches, user_id)
             return True
-            
+
     except Exception as e:
         print(f"Promotion check failed: {e}")
-    
+
     return False
 
-def _promote_to_semantic(content: str, duplicates: list, user_id: str):
+def _promote_to_semantic(mem0_client, content: str, duplicates: list, user_id: str):
     """Merge duplicates into single semantic memory."""
-    if not mem0_client:
-        return
+    # Delete old episodic versions in one call
+    try:
+        mem0_client.batch_delete([{"memory_id": mem["id"]} for mem in duplicates])
+    except Exception as e:
+        print(f"Failed to delete duplicate memories: {e}")
 
-    # Delete old episodic versions
-    for mem in duplicates:
-        try:
-            mem0_client.delete(mem["id"])
-        except Exception as e:
-            print(f"Failed to delete duplicate memory {mem.get('id')}: {e}")
-    
     # Store as semantic with high importance
     try:
         mem0_client.add(
             messages=[{"role": "assistant", "content": content}],
             user_id=user_id,
-            metadata={
-                "type": "semantic",
-                "importance": 0.8,
-                "source": "promotion",
-                "promoted_from_count": len(duplicates)
-            }
+            metadata=_semantic_metadata(len(duplicates))
         )
     except Exception as e:
         print(f"Failed to add semantic memory: {e}")
 
+
+def _semantic_metadata(count: int) -> Dict[str, Any]:
+    return {
+        "type": "semantic",
+        "importance": 0.8,
+        "source": "promotion",
+        "promoted_from_count": count
+    }
+
+
+# ============================================================================
+# OFFLINE PROMOTION JOB
+# ============================================================================
+
+@dataclass
+class PromotionCluster:
+    canonical: str
+    memory_ids: List[str]
+    samples: List[str]
+
+
+@dataclass
+class UserPromotionReport:
+    user_id: str
+    memories_scanned: int = 0
+    pages: int = 0
+    clusters: List[PromotionCluster] = field(default_factory=list)
+    promoted: int = 0
+    deleted: int = 0
+    errors: List[str] = field(default_factory=list)
+    elapsed_ms: float = 0.0
+
+
+@dataclass
+class PromotionReport:
+    dry_run: bool
+    users: List[UserPromotionReport] = field(default_factory=list)
+    elapsed_ms: float = 0.0
+
+    def summary(self) -> Dict[str, Any]:
+        scanned = sum(u.memories_scanned for u in self.users)
+        seconds = self.elapsed_ms / 1000 if self.elapsed_ms else 0.0
+        return {
+            "dry_run": self.dry_run,
+            "users": len(self.users),
+            "memories_scanned": scanned,
+            "clusters": sum(len(u.clusters) for u in self.users),
+            "promoted": sum(u.promoted for u in self.users),
+            "deleted": sum(u.deleted for u in self.users),
+            "errors": sum(len(u.errors) for u in self.users),
+            "elapsed_ms": round(self.elapsed_ms, 1),
+            "memories_per_second": round(scanned / seconds, 1) if seconds else 0.0,
+        }
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"summary": self.summary(), "users": [asdict(u) for u in self.users]}
+
+
+async def list_memory_users(client) -> List[str]:
+    """All Mem0 user entities, minus session/kingdom pseudo-users."""
+    result = await asyncio.to_thread(client.raw.users)
+    entities = result.get("results", []) if isinstance(result, dict) else result
+    users = []
+    for e in entities or []:
+        if e.get("type", "user") != "user":
+            continue
+        name = e.get("name") or e.get("id")
+        if name and not name.startswith(_SKIP_USER_PREFIXES):
+            users.append(name)
+    return users
+
+
+async def fetch_all_memories(client, user_id: str, page_size: int = PROMOTION_PAGE_SIZE) -> Tuple[List[Dict], int]:
+    """Page through a user's memories. Returns (memories, pages fetched)."""
+    memories: List[Dict] = []
+    page = 1
+    while True:
+        result = await client.aget_all(
+            filters={"user_id": user_id},
+            page=page,
+            page_size=page_size
+        )
+        batch = result.get("results", []) if isinstance(result, dict) else result
+        memories.extend(batch or [])
+        has_next = isinstance(result, dict) and result.get("next")
+        if not has_next or not batch:
+            return memories, page
+        page += 1
+
+
+def _pick_canonical(memories: List[Dict]) -> Dict:
+    """Most recently updated memory wins; longest text breaks ties."""
+    return max(memories, key=lambda m: (m.get("updated_at") or m.get("created_at") or "", len(m.get("memory", ""))))
+
+
+class PromotionJob:
+    """
+    Batch promotion over whole users.
+
+    For each user: page through get_all, cluster episodic near-duplicates,
+    and for every cluster of PROMOTION_COUNT+ memories add one semantic
+    memory and batch-delete the originals.
+    """
+
+    def __init__(
+        self,
+        client=None,
+        dry_run: bool = True,
+        page_size: int = PROMOTION_PAGE_SIZE,
+        min_cluster_size: int = PROMOTION_COUNT,
+        threshold: float = DEFAULT_JACCARD_THRESHOLD,
+        user_concurrency: int = PROMOTION_USER_CONCURRENCY,
+    ):
+        self.client = client or get_mem0()
+        self.dry_run = dry_run
+        self.page_size = page_size
+        self.min_cluster_size = min_cluster_size
+        self.threshold = threshold
+        self.user_concurrency = user_concurrency
+
+    async def list_users(self) -> List[str]:
+        return await list_memory_users(self.client)
+
+    async def _fetch_all(self, user_id: str, report: UserPromotionReport) -> List[Dict]:
+        memories, report.pages = await fetch_all_memories(self.client, user_id, self.page_size)
+        return memories
+
+    async def run_user(self, user_id: str) -> UserPromotionReport:
+        start = time.perf_counter()
+        report = UserPromotionReport(user_id=user_id)
+        try:
+            memories = await self._fetch_all(user_id, report)
+        except Exception as e:
+            report.errors.append(f"fetch: {e}")
+            report.elapsed_ms = (time.perf_counter() - start) * 1000
+            return report
+
+        report.memories_scanned = len(memories)
+
+        # Already-promoted memories are not candidates
+        episodic = [
+            m for m in memories
+            if m.get("id") and m.get("memory")
+            and (m.get("metadata") or {}).get("type") != "semantic"
+        ]
+        clusters = cluster_near_duplicates(
+            [m["memory"] for m in episodic],
+            threshold=self.threshold,
+            min_size=self.min_cluster_size,
+        )
+
+        for idxs in clusters:
+            members = [episodic[i] for i in idxs]
+            canonical = _pick_canonical(members)
+            cluster = PromotionCluster(
+                canonical=canonical["memory"],
+                memory_ids=[m["id"] for m in members],
+                samples=[m["memory"][:120] for m in members[:3]],
+            )
+            report.clusters.append(cluster)
+            if not self.dry_run:
+                await self._promote_cluster(user_id, cluster, report)
+
+        report.elapsed_ms = (time.perf_counter() - start) * 1000
+        return report
+
+    async def _promote_cluster(self, user_id: str, cluster: PromotionCluster, report: UserPromotionReport) -> None:
+        # Add first: a failed add must not lose the originals
+        try:
+            await self.client.aadd(
+                messages=[{"role": "assistant", "content": cluster.canonical}],
+                user_id=user_id,
+                metadata=_semantic_metadata(len(cluster.memory_ids)),
+                infer=False
+            )
+            report.promoted += 1
+        except Exception as e:
+            report.errors.append(f"add: {e}")
+            return
+
+        ids = cluster.memory_ids
+        for i in range(0, len(ids), PROMOTION_DELETE_BATCH):
+            chunk = ids[i:i + PROMOTION_DELETE_BATCH]
+            try:
+                await self.client.abatch_delete([{"memory_id": mid} for mid in chunk])
+                report.deleted += len(chunk)
+            except Exception as e:
+                report.errors.append(f"delete: {e}")
+
+    async def run(self, user_ids: Optional[List[str]] = None) -> PromotionReport:
+        """Run for the given users (default: every Mem0 user)."""
+        start = time.perf_counter()
+        report = PromotionReport(dry_run=self.dry_run)
+        if not self.client:
+            print("Promotion job skipped: Mem0 not configured")
+            return report
+
+        if user_ids is None:
+            user_ids = await self.list_users()
+
+        semaphore = asyncio.Semaphore(self.user_concurrency)
+
+        async def _bounded(uid: str) -> UserPromotionReport:
+            async with semaphore:
+                return await self.run_user(uid)
+
+        report.users = list(await asyncio.gather(*(_bounded(u) for u in user_ids)))
+        report.elapsed_ms = (time.perf_counter() - start) * 1000
+        return report
@@ -11,32 +11,16 @@ KING Memory v1.0 - Aligned with Mem0 Platform native layers:
 import asyncio
 import os
 import json
-from typing import Dict, Any, Optional, List
+from typing import Dict, Any, Optional, List, Callable, Awaitable, Tuple
+from dataclasses import dataclass, field
 from datetime import datetime, timezone
 import google.generativeai as genai
-from mem0 import MemoryClient
+from .local_store import get_memory_store
 
 # Lazy initialization
-_mem0_client = None
 _reflection_model = None
 
 
-def _get_mem0_client():
-    """Lazy init for Mem0 client."""
-    global _mem0_client
-    if _mem0_client is None:
-        mem0_api_key = os.getenv("MEM0_API_KEY")
-        if mem0_api_key:
-            try:
-                _mem0_client = MemoryClient(api_key=mem0_api_key.strip())
-            except Exception as e:
-                print(f"Warning: Failed to init Mem0 client: {e}")
-                _mem0_client = False
-        else:
-            _mem0_client = False
-    return _mem0_client if _mem0_client else None
-
-
 def _get_reflection_model():
     """Lazy init for Gemini reflection model."""
     global _reflection_model
@@ -75,8 +59,7 @@ Recent memory summary: {memory_summary}
 Session context (recent turns): {session_context}
 
 ## CURRENT INTERACTION
-User message: {user_message}
-Assistant response: {assistant_response}
+{interaction}
 
 ## DECISION FRAMEWORK
 Think about:
@@ -145,6 +128,41 @@ If no lesson worth learning: {{"should_remember": false, "memories": []}}
 # Track last interaction time per user for time gap calculation
 _last_interaction: Dict[str, datetime] = {}
 
+# Debounce: coalesce rapid consecutive turns into one orchestration decision
+MEMORY_DEBOUNCE_SECONDS = float(os.getenv("MEMORY_DEBOUNCE_SECONDS", "4"))
+MEMORY_DEBOUNCE_MAX_WAIT_SECONDS = 20.0
+MEMORY_DEBOUNCE_MAX_TURNS = 8
+
+# Max concurrent Mem0 writes per orchestration decision
+MEMORY_WRITE_CONCURRENCY = 4
+
+
+def _format_time_gap(now: datetime, last_time: Optional[datetime]) -> str:
+    if not last_time:
+        return "first interaction"
+    gap = now - last_time
+    if gap.days > 0:
+        return f"{gap.days} days ago"
+    elif gap.seconds > 3600:
+        return f"{gap.seconds // 3600} hours ago"
+    elif gap.seconds > 60:
+        return f"{gap.seconds // 60} minutes ago"
+    return "just now (same session)"
+
+
+def _format_interaction(turns: List[Dict[str, str]]) -> str:
+    """Render one or more turns for the orchestrator prompt."""
+    if len(turns) == 1:
+        t = turns[0]
+        return f"User message: {t['user_message'][:500]}\nAssistant response: {t['assistant_response'][:500]}"
+    blocks = []
+    for i, t in enumerate(turns, 1):
+        blocks.append(
+            f"Turn {i}:\nUser message: {t['user_message'][:300]}\n"
+            f"Assistant response: {t['assistant_response'][:300]}"
+        )
+    return "\n\n".join(blocks)
+
 
 async def orchestrate_memory(
     user_id: str,
@@ -173,30 +191,44 @@ async def orchestrate_memory(
     Returns:
         Dict with decision details
     """
+    return await orchestrate_memory_batch(
+        user_id=user_id,
+        session_id=session_id,
+        turns=[{
+            "user_message": user_message,
+            "assistant_response": assistant_response,
+            "at": datetime.now(timezone.utc),
+        }],
+        memory_summary=memory_summary,
+        session_context=session_context
+    )
+
+
+async def orchestrate_memory_batch(
+    user_id: str,
+    session_id: str,
+    turns: List[Dict[str, Any]],
+    memory_summary: Optional[str] = None,
+    session_context: Optional[str] = None
+) -> Dict[str, Any]:
+    """
+    One orchestration decision for one or more coalesced turns.
+
+    Chosen memories are written to Mem0 concurrently
+    (bounded by MEMORY_WRITE_CONCURRENCY).
+    """
     model = _get_reflection_model()
-    client = _get_mem0_client()
+    client = get_memory_store()
 
-    if not model or not client:
+    if not model or not client or not turns:
         return {"stored": False, "reason": "Memory system unavailable"}
 
-    # Calculate time gap since last interaction
+    # Time gap is measured from the previous decision to the first coalesced turn
     now = datetime.now(timezone.utc)
-    last_time = _last_interaction.get(user_id)
-    if last_time:
-        gap = now - last_time
-        if gap.days > 0:
-            time_gap = f"{gap.days} days ago"
-        elif gap.seconds > 3600:
-            time_gap = f"{gap.seconds // 3600} hours ago"
-        elif gap.seconds > 60:
-            time_gap = f"{gap.seconds // 60} minutes ago"
-        else:
-            time_gap = "just now (same session)"
-    else:
-        time_gap = "first interaction"
+    time_gap = _format_time_gap(turns[0].get("at", now), _last_interaction.get(user_id))
 
     # Update last interaction time
-    _last_interaction[user_id] = now
+    _last_interaction[user_id] = turns[-1].get("at", now)
 
     # Build orchestrator prompt with full context
     prompt = MEMORY_ORCHESTRATOR_PROMPT.format(
@@ -205,8 +237,7 @@ async def orchestrate_memory(
         time_gap=time_gap,
         memory_summary=memory_summary or "No previous memories",
         session_context=session_context or "New session",
-        user_message=user_message[:500],
-        assistant_response=assistant_response[:500]
+        interaction=_format_interaction(turns)
     )
 
     try:
@@ -215,53 +246,21 @@ async def orchestrate_memory(
 
         if not decision.get("should_store"):
             print(f"🧠 Memory skip: {decision.get('reasoning', 'no reason')[:50]}")
-            return {"stored": False, "reason": decision.get("reasoning")}
-
-        # Store each memory to appropriate layer
-        stored_count = 0
-        for mem in decision.get("memories", []):
-            layer = mem.get("layer", "user")
-            enable_graph = mem.get("enable_graph", False)
-
-            # Map layer to Mem0 identifiers
-            if layer == "session":
-                mem0_user_id = user_id
-                mem0_session_id = session_id
-            elif layer == "kingdom":
-                mem0_user_id = "__kingdom__"
-                mem0_session_id = None
-            else:  # user (default)
-                mem0_user_id = user_id
-                mem0_session_id = None
-
-            messages = [
-                {"role": "user", "content": user_message},
-                {"role": "assistant", "content": assistant_response}
-            ]
-
-            # Build add kwargs
-            add_kwargs = {
-                "user_id": mem0_user_id,
-                "metadata": {
-                    "importance": mem.get("importance", 0.5),
-                    "source": "memory_orchestrator",
-                    "timestamp": now.isoformat()
-                }
-            }
-
-            if mem0_session_id:
-                add_kwargs["session_id"] = mem0_session_id
+            return {"stored": False, "reason": decision.get("reasoning"), "turns": len(turns)}
 
-            if enable_graph:
-                add_kwargs["enable_graph"] = True
+        messages = []
+        for t in turns:
+            messages.append({"role": "user", "content": t["user_message"]})
+            messages.append({"role": "assistant", "content": t["assistant_response"]})
 
-            await asyncio.to_thread(client.add, messages, **add_kwargs)
-            stored_count += 1
-            print(f"💾 Memory stored: layer={layer}, graph={enable_graph}")
+        stored_count = await _store_memories_batch(
+            client, decision.get("memories", []), messages, user_id, session_id, now
+        )
 
         return {
-            "stored": True,
+            "stored": stored_count > 0,
             "count": stored_count,
+            "turns": len(turns),
             "reasoning": decision.get("reasoning")
         }
 
@@ -270,6 +269,206 @@ async def orchestrate_memory(
         return {"stored": False, "reason": str(e)}
 
 
+async def _store_memories_batch(
+    client,
+    memories: List[Dict[str, Any]],
+    messages: List[Dict[str, str]],
+    user_id: str,
+    session_id: str,
+    now: datetime
+) -> int:
+    """Write all chosen memories concurrently. Returns number stored."""
+    semaphore = asyncio.Semaphore(MEMORY_WRITE_CONCURRENCY)
+
+    async def _store_one(mem: Dict[str, Any]) -> bool:
+        layer = mem.get("layer", "user")
+        enable_graph = mem.get("enable_graph", False)
+
+        # Map layer to Mem0 identifiers
+        if layer == "session":
+            mem0_user_id = user_id
+            mem0_session_id = session_id
+        elif layer == "kingdom":
+            mem0_user_id = "__kingdom__"
+            mem0_session_id = None
+        else:  # user (default)
+            mem0_user_id = user_id
+            mem0_session_id = None
+
+        # Build add kwargs
+        add_kwargs = {
+            "user_id": mem0_user_id,
+            "metadata": {
+                "importance": mem.get("importance", 0.5),
+                "source": "memory_orchestrator",
+                "timestamp": now.isoformat()
+            }
+        }
+
+        if mem0_session_id:
+            add_kwargs["session_id"] = mem0_session_id
+
+        if enable_graph:
+            add_kwargs["enable_graph"] = True
+
+        async with semaphore:
+            try:
+                await client.aadd(messages, **add_kwargs)
+            except Exception as e:
+                print(f"⚠️ Memory store failed: layer={layer}: {e}")
+                return False
+        print(f"💾 Memory stored: layer={layer}, graph={enable_graph}")
+        return True
+
+    results = await asyncio.gather(*(_store_one(m) for m in memories))
+    return sum(results)
+
+
+# ============================================================================
+# DEBOUNCER - Coalesce chatty users' turns into one orchestration decision
+# ============================================================================
+
+# Loads (memory_summary, session_context) once per flush instead of per turn
+ContextLoader = Callable[[], Awaitable[Tuple[Optional[str], Optional[str]]]]
+
+
+@dataclass
+class _PendingTurns:
+    session_id: str
+    turns: List[Dict[str, Any]] = field(default_factory=list)
+    context_loader: Optional[ContextLoader] = None
+    first_at: float = 0.0
+    timer: Optional[asyncio.Task] = None
+
+
+class MemoryDebouncer:
+    """
+    Per-user debouncer for orchestrate_memory.
+
+    Each turn (re)starts a quiet-period timer. The batch is flushed when the
+    user goes quiet for `debounce_seconds`, when `max_wait_seconds` has passed
+    since the first buffered turn, when `max_turns` is reached, or when the
+    session changes.
+    """
+
+    def __init__(
+        self,
+        debounce_seconds: float = MEMORY_DEBOUNCE_SECONDS,
+        max_wait_seconds: float = MEMORY_DEBOUNCE_MAX_WAIT_SECONDS,
+        max_turns: int = MEMORY_DEBOUNCE_MAX_TURNS,
+        flush_fn: Optional[Callable[..., Awaitable[Dict[str, Any]]]] = None
+    ):
+        self.debounce_seconds = debounce_seconds
+        self.max_wait_seconds = max_wait_seconds
+        self.max_turns = max_turns
+        self._flush_fn = flush_fn or orchestrate_memory_batch
+        self._pending: Dict[str, _PendingTurns] = {}
+        self._inflight: set = set()
+
+    def submit(
+        self,
+        user_id: str,
+        session_id: str,
+        user_message: str,
+        assistant_response: str,
+        context_loader: Optional[ContextLoader] = None
+    ) -> None:
+        """Buffer a turn. Must be called from within the event loop."""
+        loop = asyncio.get_running_loop()
+        pending = self._pending.get(user_id)
+
+        if pending and pending.session_id != session_id:
+            self._flush_now(user_id)
+            pending = None
+
+        if pending is None:
+            pending = _PendingTurns(session_id=session_id, first_at=loop.time())
+            self._pending[user_id] = pending
+
+        pending.turns.append({
+            "user_message": user_message,
+            "assistant_response": assistant_response,
+            "at": datetime.now(timezone.utc),
+        })
+        if context_loader:
+            pending.context_loader = context_loader  # Latest loader wins
+
+        if len(pending.turns) >= self.max_turns:
+            self._flush_now(user_id)
+            return
+
+        if pending.timer:
+            pending.timer.cancel()
+        remaining = self.max_wait_seconds - (loop.time() - pending.first_at)
+        delay = max(0.0, min(self.debounce_seconds, remaining))
+        pending.timer = asyncio.create_task(self._timer(user_id, delay))
+
+    async def _timer(self, user_id: str, delay: float) -> None:
+        await asyncio.sleep(delay)
+        self._flush_now(user_id)
+
+    def _flush_now(self, user_id: str) -> None:
+        pending = self._pending.pop(user_id, None)
+        if not pending:
+            return
+        if pending.timer and pending.timer is not asyncio.current_task():
+            pending.timer.cancel()
+        task = asyncio.create_task(self._run(user_id, pending))
+        self._inflight.add(task)
+        task.add_done_callback(self._inflight.discard)
+
+    async def _run(self, user_id: str, pending: _PendingTurns) -> Dict[str, Any]:
+        memory_summary = session_context = None
+        if pending.context_loader:
+            try:
+                memory_summary, session_context = await pending.context_loader()
+            except Exception as e:
+                print(f"⚠️ Memory context load failed: {e}")
+        if len(pending.turns) > 1:
+            print(f"🧠 Coalesced {len(pending.turns)} turns for user {user_id}")
+        return await self._flush_fn(
+            user_id=user_id,
+            session_id=pending.session_id,
+            turns=pending.turns,
+            memory_summary=memory_summary,
+            session_context=session_context
+        )
+
+    async def flush_all(self) -> None:
+        """Flush every pending batch and wait for in-flight decisions."""
+        for user_id in list(self._pending):
+            self._flush_now(user_id)
+        if self._inflight:
+            await asyncio.gather(*list(self._inflight), return_exceptions=True)
+
+    def pending_turns(self, user_id: str) -> int:
+        pending = self._pending.get(user_id)
+        return len(pending.turns) if pending else 0
+
+
+_debouncer: Optional[MemoryDebouncer] = None
+
+
+def get_memory_debouncer() -> MemoryDebouncer:
+    global _debouncer
+    if _debouncer is None:
+        _debouncer = MemoryDebouncer()
+    return _debouncer
+
+
+def schedule_memory_orchestration(
+    user_id: str,
+    session_id: str,
+    user_message: str,
+    assistant_response: str,
+    context_loader: Optional[ContextLoader] = None
+) -> None:
+    """Debounced entry point: buffer the turn, orchestrate once the user goes quiet."""
+    get_memory_debouncer().submit(
+        user_id, session_id, user_message, assistant_response, context_loader
+    )
+
+
 async def reflect_on_error(
     agent_name: str,
     input_data: Dict[str, Any],
@@ -282,7 +481,7 @@ async def reflect_on_error(
     Runs in background, never blocks response.
     """
     model = _get_reflection_model()
-    client = _get_mem0_client()
+    client = get_memory_store()
 
     if not model or not client:
         return
@@ -308,8 +507,7 @@ async def reflect_on_error(
                 user_id=user_id
             )
 
-            await asyncio.to_thread(
-                client.add,
+            await client.aadd(
                 messages=[{"role": "assistant", "content": mem["content"]}],
                 user_id=mem0_user_id,
                 metadata={
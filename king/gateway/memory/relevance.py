@@ -0,0 +1,295 @@
+"""
+KING Relevance Scorer - In-process memory triage before the memory_selector.
+
+Scores each candidate memory against the query with a blend of:
+- Lexical overlap (query term coverage, stopwords removed)
+- Vector similarity (cosine over a pluggable CPU embedder)
+
+Clear-cut memories are approved/rejected locally. Only the ambiguous band
+between the two thresholds is escalated to the memory_selector LLM.
+Thresholds are calibrated offline against logged selector decisions
+(see scripts/eval_relevance.py).
+"""
+import os
+import re
+import math
+import hashlib
+from dataclasses import dataclass, field
+from typing import List, Dict, Any, Optional, Protocol, Sequence, Tuple
+from .types import Memory
+
+
+# Conservative defaults (wide escalation band). Tighten per deployment via env
+# using the thresholds reported by scripts/eval_relevance.py.
+DEFAULT_APPROVE_THRESHOLD = float(os.getenv("RELEVANCE_APPROVE_THRESHOLD", "0.55"))
+DEFAULT_REJECT_THRESHOLD = float(os.getenv("RELEVANCE_REJECT_THRESHOLD", "0.15"))
+DEFAULT_LEXICAL_WEIGHT = 0.5
+
+# Words in any script: runs of anything but whitespace and punctuation, so
+# combining vowel signs (Devanagari, Tamil, ...) stay inside their word
+_TOKEN_RE = re.compile(r"[^\s!-/:-@\[-^`{-~\u2000-\u206f\u3000-\u303f\uff00-\uff0f\u0964\u0965]+")
+
+STOPWORDS = frozenset({
+    "a", "an", "the", "and", "or", "but", "if", "then", "of", "to", "in", "on",
+    "for", "with", "at", "by", "from", "as", "is", "are", "was", "were", "be",
+    "been", "it", "its", "this", "that", "these", "those", "i", "me", "my", "we",
+    "our", "you", "your", "he", "she", "they", "them", "their", "what", "which",
+    "who", "how", "do", "does", "did", "can", "could", "should", "would", "will",
+    "please", "about", "into", "so", "not", "no", "yes", "just", "some", "any",
+})
+
+
+def words(text: str) -> List[str]:
+    """Casefolded word tokens in any script, stopwords kept."""
+    return _TOKEN_RE.findall((text or "").casefold())
+
+
+def tokenize(text: str) -> List[str]:
+    """Casefolded word tokens with stopwords removed."""
+    return [t for t in words(text) if t not in STOPWORDS]
+
+
+class Embedder(Protocol):
+    """Pluggable embedder. Must return one L2-normalized vector per text."""
+
+    def embed(self, texts: Sequence[str]) -> List[List[float]]:
+        ...
+
+
+class HashingEmbedder:
+    """
+    Dependency-free CPU embedder using feature hashing.
+
+    Hashes word unigrams and character trigrams into a fixed-size vector,
+    so morphological variants ("deploy" / "deployment") still overlap.
+    Swap in a sentence-transformer by implementing Embedder.
+    """
+
+    def __init__(self, dim: int = 512, char_ngram: int = 3):
+        self.dim = dim
+        self.char_ngram = char_ngram
+
+    def _bucket(self, feature: str) -> Tuple[int, float]:
+        digest = hashlib.blake2b(feature.encode(), digest_size=8).digest()
+        value = int.from_bytes(digest, "little")
+        sign = 1.0 if value & 1 else -1.0
+        return (value >> 1) % self.dim, sign
+
+    def embed_one(self, text: str) -> List[float]:
+        vec = [0.0] * self.dim
+        for token in tokenize(text):
+            idx, sign = self._bucket(f"w:{token}")
+            vec[idx] += sign * 2.0
+            padded = f"#{token}#"
+            for i in range(len(padded) - self.char_ngram + 1):
+                idx, sign = self._bucket(f"c:{padded[i:i + self.char_ngram]}")
+                vec[idx] += sign
+        norm = math.sqrt(sum(v * v for v in vec))
+        return [v / norm for v in vec] if norm else vec
+
+    def embed(self, texts: Sequence[str]) -> List[List[float]]:
+        return [self.embed_one(t) for t in texts]
+
+
+def cosine(a: Sequence[float], b: Sequence[float]) -> float:
+    """Cosine similarity of two L2-normalized vectors, clamped to [0, 1]."""
+    return max(0.0, min(1.0, sum(x * y for x, y in zip(a, b))))
+
+
+def lexical_overlap(query_tokens: List[str], content_tokens: List[str]) -> float:
+    """Fraction of distinct query terms present in the content."""
+    q = set(query_tokens)
+    if not q:
+        return 0.0
+    return len(q & set(content_tokens)) / len(q)
+
+
+@dataclass
+class ScoredMemory:
+    memory: Memory
+    score: float
+    lexical: float
+    vector: float
+
+
+@dataclass
+class TriageResult:
+    """Local triage outcome. Only `ambiguous` needs the LLM selector."""
+    approved: List[ScoredMemory] = field(default_factory=list)
+    rejected: List[ScoredMemory] = field(default_factory=list)
+    ambiguous: List[ScoredMemory] = field(default_factory=list)
+
+    @property
+    def needs_escalation(self) -> bool:
+        return bool(self.ambiguous)
+
+
+class RelevanceScorer:
+    """
+    Blends lexical and vector similarity, then triages with two thresholds:
+    score >= approve_threshold → approve, score < reject_threshold → reject,
+    everything in between → escalate to memory_selector.
+    """
+
+    def __init__(
+        self,
+        embedder: Optional[Embedder] = None,
+        approve_threshold: float = DEFAULT_APPROVE_THRESHOLD,
+        reject_threshold: float = DEFAULT_REJECT_THRESHOLD,
+        lexical_weight: float = DEFAULT_LEXICAL_WEIGHT,
+    ):
+        if reject_threshold > approve_threshold:
+            raise ValueError("reject_threshold must not exceed approve_threshold")
+        self.embedder = embedder or HashingEmbedder()
+        self.approve_threshold = approve_threshold
+        self.reject_threshold = reject_threshold
+        self.lexical_weight = lexical_weight
+
+    def score_texts(self, query: str, contents: Sequence[str]) -> List[Tuple[float, float, float]]:
+        """Return (score, lexical, vector) for each content string."""
+        if not contents:
+            return []
+        query_tokens = tokenize(query)
+        vectors = self.embedder.embed([query, *contents])
+        query_vec, content_vecs = vectors[0], vectors[1:]
+
+        scores = []
+        for content, vec in zip(contents, content_vecs):
+            lex = lexical_overlap(query_tokens, tokenize(content))
+            vsim = cosine(query_vec, vec)
+            blended = self.lexical_weight * lex + (1 - self.lexical_weight) * vsim
+            scores.append((blended, lex, vsim))
+        return scores
+
+    def score(self, query: str, memories: Sequence[Memory]) -> List[ScoredMemory]:
+        """Score memories, highest first."""
+        scored = [
+            ScoredMemory(memory=m, score=s, lexical=lex, vector=vec)
+            for m, (s, lex, vec) in zip(memories, self.score_texts(query, [m.content for m in memories]))
+        ]
+        return sorted(scored, key=lambda s: s.score, reverse=True)
+
+    def classify(self, score: float) -> str:
+        if score >= self.approve_threshold:
+            return "approve"
+        if score < self.reject_threshold:
+            return "reject"
+        return "escalate"
+
+    def triage(self, query: str, memories: Sequence[Memory]) -> TriageResult:
+        """Split memories into approved / rejected / ambiguous."""
+        result = TriageResult()
+        if not tokenize(query):
+            # Stopword-only query: every score would be 0, so don't reject locally
+            result.ambiguous = self.score(query, memories)
+            return result
+        for scored in self.score(query, memories):
+            decision = self.classify(scored.score)
+            if decision == "approve":
+                result.approved.append(scored)
+            elif decision == "reject":
+                result.rejected.append(scored)
+            else:
+                result.ambiguous.append(scored)
+        return result
+
+
+# =============================================================================
+# Offline calibration & evaluation against logged selector decisions
+# =============================================================================
+
+def samples_from_selector_runs(runs: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Flatten logged memory_selector runs (agent_runs rows) into labelled samples.
+
+    Each sample: {"query", "content", "approved"}.
+    """
+    samples = []
+    for run in runs:
+        inp = run.get("input_json") or {}
+        out = run.get("output_json") or {}
+        query = inp.get("query")
+        if not query:
+            continue
+        approved = {str(a) for a in out.get("approved_memories", [])}
+        for cand in inp.get("candidate_memories", []):
+            content = cand.get("content") if isinstance(cand, dict) else str(cand)
+            if content:
+                samples.append({"query": query, "content": content, "approved": content in approved})
+    return samples
+
+
+def score_samples(scorer: RelevanceScorer, samples: List[Dict[str, Any]]) -> List[Tuple[float, bool]]:
+    """Score labelled samples, returning (score, selector_approved) pairs."""
+    scored = []
+    for s in samples:
+        (score, _, _), = scorer.score_texts(s["query"], [s["content"]])
+        scored.append((score, bool(s["approved"])))
+    return scored
+
+
+def calibrate_thresholds(
+    scored: List[Tuple[float, bool]],
+    target_precision: float = 0.95,
+) -> Tuple[float, float]:
+    """
+    Pick (reject_threshold, approve_threshold) so local decisions agree with
+    the selector at >= target_precision, minimising the escalated band.
+
+    approve_threshold: lowest score whose approvals above it are >= target precise.
+    reject_threshold: highest score whose rejections below it are >= target precise.
+    """
+    if not scored:
+        return DEFAULT_REJECT_THRESHOLD, DEFAULT_APPROVE_THRESHOLD
+
+    ordered = sorted(scored, key=lambda x: x[0])
+    n = len(ordered)
+
+    # Approve side: scan from the top, extend downward while precision holds
+    approve_threshold = 1.0 + 1e-9
+    hits = 0
+    for i in range(n - 1, -1, -1):
+        hits += ordered[i][1]
+        if hits / (n - i) >= target_precision:
+            approve_threshold = ordered[i][0]
+
+    # Reject side: scan from the bottom, extend upward while precision holds
+    reject_threshold = 0.0
+    negatives = 0
+    for i in range(n):
+        negatives += not ordered[i][1]
+        if negatives / (i + 1) >= target_precision:
+            # Rejection is strict (<), so the threshold sits at the next score up
+            reject_threshold = ordered[i + 1][0] if i + 1 < n else ordered[i][0] + 1e-9
+
+    reject_threshold = min(reject_threshold, approve_threshold)
+    return reject_threshold, approve_threshold
+
+
+def evaluate(scorer: RelevanceScorer, samples: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Agreement of local decisions with logged selector decisions."""
+    scored = score_samples(scorer, samples)
+    approved_ok = approved_total = rejected_ok = rejected_total = escalated = 0
+    for score, label in scored:
+        decision = scorer.classify(score)
+        if decision == "approve":
+            approved_total += 1
+            approved_ok += label
+        elif decision == "reject":
+            rejected_total += 1
+            rejected_ok += not label
+        else:
+            escalated += 1
+
+    total = len(scored)
+    local = approved_total + rejected_total
+    return {
+        "samples": total,
+        "approve_threshold": scorer.approve_threshold,
+        "reject_threshold": scorer.reject_threshold,
+        "local_rate": local / total if total else 0.0,
+        "escalation_rate": escalated / total if total else 0.0,
+        "approve_precision": approved_ok / approved_total if approved_total else None,
+        "reject_precision": rejected_ok / rejected_total if rejected_total else None,
+        "local_agreement": (approved_ok + rejected_ok) / local if local else None,
+    }
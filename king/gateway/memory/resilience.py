@@ -0,0 +1,352 @@
+"""
+KING Resilience - Circuit breakers, hedged reads and adaptive timeouts
+for remote dependencies (Mem0, Supabase).
+
+Each named dependency keeps:
+- A circuit breaker: after N consecutive transient failures calls fail
+  fast for a cool-down, then a single probe decides whether to close
+- A rolling latency window: timeout = clamp(p99 * 2, min, max), and
+  reads still pending after the p95 latency get one hedged duplicate
+  (first success wins, the loser is cancelled)
+- A small last-good cache so reads can degrade to stale data instead of
+  waiting out a brownout
+
+Only idempotent reads should be hedged. Writes get the breaker only.
+
+Mirrored in orchestrator/services/resilience.py (services deploy
+separately, so each keeps its own copy); keep the two in sync.
+"""
+import os
+import time
+import asyncio
+import logging
+import threading
+from collections import OrderedDict, deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional
+
+logger = logging.getLogger(__name__)
+
+FAILURE_THRESHOLD = int(os.getenv("RESILIENCE_FAILURE_THRESHOLD", "5"))
+RECOVERY_SECONDS = float(os.getenv("RESILIENCE_RECOVERY_SECONDS", "30"))
+MIN_TIMEOUT_SECONDS = 0.5
+MAX_TIMEOUT_SECONDS = float(os.getenv("RESILIENCE_MAX_TIMEOUT_SECONDS", "10"))
+TIMEOUT_MULTIPLIER = 2.0
+HEDGE_PERCENTILE = 95.0
+MIN_SAMPLES = 20  # Below this, no hedging and the max timeout applies
+STALE_MAX_AGE_SECONDS = 600.0
+STALE_MAX_ENTRIES = 512
+
+# Matched by class name anywhere in the MRO: httpx, postgrest and mem0ai
+# error classes differ across versions
+_TRANSIENT_ERROR_NAMES = {
+    "TransportError", "TimeoutException", "NetworkError", "RateLimitError",
+    "RemoteProtocolError", "PoolTimeout",
+}
+
+# Shared pool for sync calls that need a timeout or a hedge
+_executor = ThreadPoolExecutor(max_workers=32, thread_name_prefix="resilience")
+
+
+class DependencyUnavailable(Exception):
+    """Raised instead of calling a dependency whose circuit is open."""
+
+
+def is_transient(exc: BaseException) -> bool:
+    """Errors that say the dependency is unhealthy (vs. a bad request)."""
+    if isinstance(exc, (asyncio.TimeoutError, TimeoutError, ConnectionError)):
+        return True
+    return any(c.__name__ in _TRANSIENT_ERROR_NAMES for c in type(exc).__mro__)
+
+
+class CircuitBreaker:
+    """Consecutive-failure breaker with a single half-open probe."""
+
+    CLOSED, OPEN, HALF_OPEN = "closed", "open", "half_open"
+
+    def __init__(self, failure_threshold: int = FAILURE_THRESHOLD, recovery_seconds: float = RECOVERY_SECONDS):
+        self.failure_threshold = failure_threshold
+        self.recovery_seconds = recovery_seconds
+        self.state = self.CLOSED
+        self.failures = 0
+        self.trips = 0
+        self._opened_at = 0.0
+        self._probe_started: Optional[float] = None
+        self._lock = threading.Lock()
+
+    def available(self) -> bool:
+        """Whether a call would currently be let through (doesn't take the probe)."""
+        with self._lock:
+            if self.state == self.CLOSED:
+                return True
+            if self.state == self.OPEN:
+                return time.monotonic() - self._opened_at >= self.recovery_seconds
+            return self._probe_started is None
+
+    def allow(self) -> bool:
+        with self._lock:
+            now = time.monotonic()
+            if self.state == self.CLOSED:
+                return True
+            if self.state == self.OPEN:
+                if now - self._opened_at < self.recovery_seconds:
+                    return False
+                self.state = self.HALF_OPEN
+                self._probe_started = None
+            # Half-open: one probe at a time (a lost probe expires after the cool-down)
+            if self._probe_started is not None and now - self._probe_started < self.recovery_seconds:
+                return False
+            self._probe_started = now
+            return True
+
+    def record_success(self) -> None:
+        with self._lock:
+            self.state = self.CLOSED
+            self.failures = 0
+            self._probe_started = None
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self.failures += 1
+            self._probe_started = None
+            if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+                if self.state != self.OPEN:
+                    self.trips += 1
+                    logger.warning(f"Circuit opened after {self.failures} consecutive failures")
+                self.state = self.OPEN
+                self._opened_at = time.monotonic()
+
+
+class LatencyWindow:
+    """Rolling window of successful call latencies (ms)."""
+
+    def __init__(self, size: int = 256):
+        self._values = deque(maxlen=size)
+        self._lock = threading.Lock()
+
+    def record(self, latency_ms: float) -> None:
+        with self._lock:
+            self._values.append(latency_ms)
+
+    def percentile(self, pct: float) -> Optional[float]:
+        with self._lock:
+            if len(self._values) < MIN_SAMPLES:
+                return None
+            ordered = sorted(self._values)
+        return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+class Dependency:
+    """Breaker + adaptive timeout + hedging + stale fallback for one remote service."""
+
+    def __init__(
+        self,
+        name: str,
+        failure_threshold: int = FAILURE_THRESHOLD,
+        recovery_seconds: float = RECOVERY_SECONDS,
+        min_timeout: float = MIN_TIMEOUT_SECONDS,
+        max_timeout: float = MAX_TIMEOUT_SECONDS,
+    ):
+        self.name = name
+        self.breaker = CircuitBreaker(failure_threshold, recovery_seconds)
+        self.latency = LatencyWindow()
+        self.min_timeout = min_timeout
+        self.max_timeout = max_timeout
+        self._stale: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._stale_lock = threading.Lock()
+        self.counters = {
+            "calls": 0, "failures": 0, "timeouts": 0, "rejected": 0,
+            "hedges": 0, "hedge_wins": 0, "stale_served": 0,
+        }
+
+    # --- Policy ---
+
+    def timeout(self) -> float:
+        p99 = self.latency.percentile(99)
+        if p99 is None:
+            return self.max_timeout
+        return min(self.max_timeout, max(self.min_timeout, p99 / 1000 * TIMEOUT_MULTIPLIER))
+
+    def hedge_delay(self) -> Optional[float]:
+        p = self.latency.percentile(HEDGE_PERCENTILE)
+        return p / 1000 if p is not None else None
+
+    def available(self) -> bool:
+        return self.breaker.available()
+
+    # --- Calls ---
+
+    async def call(
+        self,
+        fn: Callable[[], Awaitable[Any]],
+        hedge: bool = False,
+        timeout: bool = True,
+        stale_key: Optional[Hashable] = None,
+    ) -> Any:
+        """
+        Await fn() under the breaker. fn must build a fresh awaitable per call
+        (it is invoked twice when hedged).
+
+        Raises DependencyUnavailable when the circuit is open, or the call's
+        error, unless a last-good result for stale_key can be served.
+        """
+        if not self._admit():
+            return self._degrade(stale_key, DependencyUnavailable(f"{self.name} circuit open"))
+        start = time.perf_counter()
+        try:
+            if hedge or timeout:
+                result = await self._run_async(fn, hedge)
+            else:
+                result = await fn()
+        except Exception as e:
+            return self._on_failure(e, start, stale_key)
+        return self._on_success(result, start, stale_key)
+
+    def call_sync(
+        self,
+        fn: Callable[[], Any],
+        hedge: bool = False,
+        timeout: bool = True,
+        stale_key: Optional[Hashable] = None,
+    ) -> Any:
+        """Blocking counterpart of call(); timed/hedged attempts run on a shared pool."""
+        if not self._admit():
+            return self._degrade(stale_key, DependencyUnavailable(f"{self.name} circuit open"))
+        start = time.perf_counter()
+        try:
+            result = self._run_sync(fn, hedge) if (hedge or timeout) else fn()
+        except Exception as e:
+            return self._on_failure(e, start, stale_key)
+        return self._on_success(result, start, stale_key)
+
+    async def _run_async(self, fn: Callable[[], Awaitable[Any]], hedge: bool) -> Any:
+        budget = self.timeout()
+        delay = self.hedge_delay() if hedge else None
+        deadline = time.monotonic() + budget
+        tasks = [asyncio.ensure_future(fn())]
+        try:
+            if delay is not None and delay < budget:
+                done, _ = await asyncio.wait(tasks, timeout=delay)
+                if not done:
+                    self.counters["hedges"] += 1
+                    tasks.append(asyncio.ensure_future(fn()))
+
+            pending, error = set(tasks), None
+            while pending:
+                remaining = deadline - time.monotonic()
+                done, pending = await asyncio.wait(
+                    pending, timeout=max(0.0, remaining), return_when=asyncio.FIRST_COMPLETED
+                )
+                if not done:
+                    raise asyncio.TimeoutError(f"{self.name} call exceeded {budget:.2f}s")
+                for task in done:
+                    if task.exception() is None:
+                        if task is not tasks[0]:
+                            self.counters["hedge_wins"] += 1
+                        return task.result()
+                    error = task.exception()
+            raise error
+        finally:
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+
+    def _run_sync(self, fn: Callable[[], Any], hedge: bool) -> Any:
+        budget = self.timeout()
+        delay = self.hedge_delay() if hedge else None
+        deadline = time.monotonic() + budget
+        futures = [_executor.submit(fn)]
+        try:
+            if delay is not None and delay < budget:
+                done, _ = wait(futures, timeout=delay)
+                if not done:
+                    self.counters["hedges"] += 1
+                    futures.append(_executor.submit(fn))
+
+            pending, error = set(futures), None
+            while pending:
+                remaining = deadline - time.monotonic()
+                done, pending = wait(pending, timeout=max(0.0, remaining), return_when=FIRST_COMPLETED)
+                if not done:
+                    raise TimeoutError(f"{self.name} call exceeded {budget:.2f}s")
+                for future in done:
+                    if future.exception() is None:
+                        if future is not futures[0]:
+                            self.counters["hedge_wins"] += 1
+                        return future.result()
+                    error = future.exception()
+            raise error
+        finally:
+            for future in futures:
+                future.cancel()  # No-op once running; the thread finishes in the background
+
+    # --- Bookkeeping ---
+
+    def _admit(self) -> bool:
+        self.counters["calls"] += 1
+        if self.breaker.allow():
+            return True
+        self.counters["rejected"] += 1
+        return False
+
+    def _on_success(self, result: Any, start: float, stale_key: Optional[Hashable]) -> Any:
+        self.latency.record((time.perf_counter() - start) * 1000)
+        self.breaker.record_success()
+        if stale_key is not None:
+            with self._stale_lock:
+                self._stale[stale_key] = (time.monotonic(), result)
+                self._stale.move_to_end(stale_key)
+                while len(self._stale) > STALE_MAX_ENTRIES:
+                    self._stale.popitem(last=False)
+        return result
+
+    def _on_failure(self, exc: Exception, start: float, stale_key: Optional[Hashable]) -> Any:
+        if not is_transient(exc):
+            # The dependency answered; the request itself was bad
+            self.breaker.record_success()
+            raise exc
+        if isinstance(exc, (asyncio.TimeoutError, TimeoutError)):
+            self.counters["timeouts"] += 1
+            # Timeouts count as slow samples so the adaptive timeout widens
+            self.latency.record((time.perf_counter() - start) * 1000)
+        self.counters["failures"] += 1
+        self.breaker.record_failure()
+        return self._degrade(stale_key, exc)
+
+    def _degrade(self, stale_key: Optional[Hashable], exc: Exception) -> Any:
+        if stale_key is not None:
+            with self._stale_lock:
+                entry = self._stale.get(stale_key)
+            if entry and time.monotonic() - entry[0] < STALE_MAX_AGE_SECONDS:
+                self.counters["stale_served"] += 1
+                return entry[1]
+        raise exc
+
+    def stats(self) -> Dict[str, Any]:
+        hedge_after = self.hedge_delay()
+        return {
+            **self.counters,
+            "state": self.breaker.state,
+            "trips": self.breaker.trips,
+            "timeout_s": round(self.timeout(), 3),
+            "hedge_after_ms": round(hedge_after * 1000, 1) if hedge_after is not None else None,
+        }
+
+
+# Process-wide dependencies by name
+_dependencies: Dict[str, Dependency] = {}
+_dependencies_lock = threading.Lock()
+
+
+def get_dependency(name: str, **config) -> Dependency:
+    """Get (or create with config on first use) the named dependency."""
+    with _dependencies_lock:
+        if name not in _dependencies:
+            _dependencies[name] = Dependency(name, **config)
+        return _dependencies[name]
+
+
+def get_resilience_stats() -> Dict[str, Dict[str, Any]]:
+    with _dependencies_lock:
+        deps = list(_dependencies.values())
+    return {d.name: d.stats() for d in deps}
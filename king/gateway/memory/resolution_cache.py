@@ -0,0 +1,173 @@
+"""
+KING Resolution Cache - Short-TTL cache for MemoryResolver.resolve.
+
+Back-to-back /execute calls in a pipeline or conversation ask near-identical
+questions; this serves repeats from memory instead of re-running entity
+resolution, the curator plan and every tier search.
+
+Keys:
+    ("entity", user_id)                                   → canonical user id
+    ("plan", canonical_user, agent, query_hash)           → curator plan
+    ("result", canonical_user, session, query_hash, plan) → MemorySearchResult
+
+Any memory write for a user (memory.mem0_client / memory.local_store write
+paths call notify_memory_write) drops that user's entries and bumps the
+user's memory_epoch, which the orchestrator keys its decision cache on.
+Epochs are per process: a write made by another gateway instance (or by
+the orchestrator itself) does not change this instance's memory_epoch.
+"""
+import os
+import re
+import json
+import time
+import hashlib
+import threading
+import unicodedata
+import uuid
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Iterable, Optional, Set, Tuple
+
+RESOLUTION_CACHE_TTL_SECONDS = float(os.getenv("RESOLUTION_CACHE_TTL_SECONDS", "60"))
+RESOLUTION_CACHE_MAX_ENTRIES = 5000
+
+# Per-user epochs are kept this long after the user's last write. Longer than
+# the orchestrator decision cache TTL, so a pruned user's epoch restarting at
+# 0 can't match a decision cached before that write.
+MEMORY_EPOCH_RETENTION_SECONDS = 600
+
+# Sentence punctuation before a space or the end; symbols ("c++", "c#") and
+# every script's letters are kept as-is.
+_PUNCTUATION_RE = re.compile(r"[.,!?;:…。、！？，]+(?=\s|$)")
+_SPACE_RE = re.compile(r"\s+")
+
+
+def normalize_text(text: str) -> str:
+    """NFKC + casefold, sentence punctuation dropped, whitespace collapsed."""
+    text = unicodedata.normalize("NFKC", text or "").casefold()
+    return _SPACE_RE.sub(" ", _PUNCTUATION_RE.sub("", text)).strip()
+
+
+def query_hash(query: str) -> str:
+    """Hash of the query with case, spacing and sentence punctuation normalized away."""
+    return hashlib.sha1(normalize_text(query).encode("utf-8")).hexdigest()[:16]
+
+
+def plan_hash(plan: Dict[str, Any]) -> str:
+    return hashlib.sha1(json.dumps(plan, sort_keys=True, default=str).encode("utf-8")).hexdigest()[:16]
+
+
+class ResolutionCache:
+    """Thread-safe LRU with per-entry TTL and per-user invalidation."""
+
+    def __init__(self, ttl_seconds: float = RESOLUTION_CACHE_TTL_SECONDS, max_entries: int = RESOLUTION_CACHE_MAX_ENTRIES):
+        self.ttl = ttl_seconds
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[Hashable, Tuple[float, Any, Tuple[str, ...]]]" = OrderedDict()
+        self._by_user: Dict[str, Set[Hashable]] = {}
+        self._stats = {"hits": 0, "misses": 0, "invalidations": 0, "evictions": 0}
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] < time.monotonic():
+                if entry is not None:
+                    self._remove(key)
+                self._stats["misses"] += 1
+                return None
+            self._entries.move_to_end(key)
+            self._stats["hits"] += 1
+            return entry[1]
+
+    def put(self, key: Hashable, value: Any, users: Iterable[Optional[str]]) -> None:
+        tags = tuple({u for u in users if u})
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (time.monotonic() + self.ttl, value, tags)
+            for u in tags:
+                self._by_user.setdefault(u, set()).add(key)
+            while len(self._entries) > self.max_entries:
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+                self._stats["evictions"] += 1
+
+    def invalidate_user(self, user_id: Optional[str]) -> int:
+        """Drop every entry tagged with the user (all entries if user_id is None)."""
+        with self._lock:
+            if user_id is None:
+                dropped = len(self._entries)
+                self._entries.clear()
+                self._by_user.clear()
+            else:
+                keys = self._by_user.pop(user_id, set())
+                for key in keys:
+                    self._remove(key)
+                dropped = len(keys)
+            if dropped:
+                self._stats["invalidations"] += 1
+            return dropped
+
+    def _remove(self, key: Hashable) -> None:
+        entry = self._entries.pop(key, None)
+        if entry:
+            for u in entry[2]:
+                keys = self._by_user.get(u)
+                if keys:
+                    keys.discard(key)
+                    if not keys:
+                        del self._by_user[u]
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self._stats["hits"] + self._stats["misses"]
+            return {
+                **self._stats,
+                "entries": len(self._entries),
+                "hit_rate": round(self._stats["hits"] / lookups, 4) if lookups else 0.0,
+            }
+
+
+# Process-wide cache shared by the resolver and the write paths
+_resolution_cache = ResolutionCache()
+
+
+def get_resolution_cache() -> ResolutionCache:
+    return _resolution_cache
+
+
+# Write counters for memory_epoch; the boot token keeps epochs from different
+# processes (or before a restart) from colliding
+_BOOT_TOKEN = uuid.uuid4().hex[:8]
+_epoch_lock = threading.Lock()
+_global_epoch = 0
+_user_epochs: "OrderedDict[str, Tuple[int, float]]" = OrderedDict()  # user -> (epoch, last write), oldest first
+
+
+def _prune_epochs(now: float) -> None:
+    while _user_epochs:
+        user, (_, written) = next(iter(_user_epochs.items()))
+        if now - written < MEMORY_EPOCH_RETENTION_SECONDS:
+            break
+        del _user_epochs[user]
+
+
+def notify_memory_write(user_id: Optional[str]) -> None:
+    """Called by memory write paths; user_id None means 'unknown user'."""
+    global _global_epoch
+    now = time.monotonic()
+    with _epoch_lock:
+        if user_id is None:
+            _global_epoch += 1
+        else:
+            epoch = _user_epochs.pop(user_id, (0, now))[0] + 1
+            _user_epochs[user_id] = (epoch, now)
+        _prune_epochs(now)
+    _resolution_cache.invalidate_user(user_id)
+
+
+def memory_epoch(user_id: Optional[str]) -> str:
+    """Changes whenever this process writes memory that may belong to the user (process-local)."""
+    with _epoch_lock:
+        epoch = _user_epochs.get(user_id or "", (0, 0.0))[0]
+        return f"{_BOOT_TOKEN}.{_global_epoch}.{epoch}"
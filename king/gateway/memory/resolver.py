@@ -6,10 +6,12 @@ import time
 import logging
 from typing import Optional, List, Dict, Any
 from .types import Memory, MemoryType, MemorySearchResult, MEMORY_RESOLUTION_ORDER
-from .seeding import get_collective_memories, get_lineage_memories
+from .seeding import search_collective_memories, search_lineage_memories
 from .decay import apply_decay_to_memories, filter_expired_memories
 from .curator import create_search_plan
 from .entity_resolver import EntityResolver
+from .resolution_cache import ResolutionCache, query_hash, plan_hash
+from .resilience import DependencyUnavailable
 
 logger = logging.getLogger(__name__)
 
@@ -18,16 +20,21 @@ class MemoryResolver:
     Resolves memories across all tiers with inheritance.
     """
     
-    def __init__(self, mem0_client=None, entity_resolver: Optional[EntityResolver] = None):
+    def __init__(
+        self,
+        mem0_client=None,
+        entity_resolver: Optional[EntityResolver] = None,
+        cache: Optional[ResolutionCache] = None
+    ):
         """
         Args:
-            mem0_client: Mem0 client for searching episodic/semantic memories
+            mem0_client: Shared Mem0 client (memory.mem0_client) for episodic/semantic search
             entity_resolver: Optional resolver for normalizing entity handles
+            cache: Optional short-TTL resolution cache (memory.resolution_cache)
         """
         self.mem0_client = mem0_client
         self.entity_resolver = entity_resolver
-        self._collective_cache: Optional[List[Memory]] = None
-        self._lineage_cache: Dict[str, List[Memory]] = {}
+        self.cache = cache
     
     async def resolve(
         self,
@@ -40,32 +47,89 @@ class MemoryResolver:
     ) -> MemorySearchResult:
         """
         Resolve memories using AI-generated plan.
+
+        Repeat lookups (same canonical user, session, normalized query and
+        plan) are served from the resolution cache until the TTL expires or
+        the user's memories change. Calls with working memories bypass it.
         """
         start_time = time.time()
-        result = MemorySearchResult()
+        cache = self.cache if working_memories is None else None
         
-        canonical_user_id = user_id
-        if resolve_entity and user_id and self.entity_resolver:
-            try:
-                entity = await self.entity_resolver.resolve(user_id)
-                if entity and "id" in entity:
-                    canonical_user_id = str(entity["id"])
-                    logger.info(f"Resolved user '{user_id}' to entity '{canonical_user_id}'")
-            except Exception as e:
-                logger.error(f"Entity resolution failed for '{user_id}': {e}")
+        canonical_user_id = await self._canonical_user(user_id, resolve_entity, cache)
 
         # AI decides search strategy
-        plan = await create_search_plan(
-            query=query, 
-            user_id=canonical_user_id, 
-            agent_name=agent_id or "unknown",
-            session_context={"session_id": session_id}
+        qhash = query_hash(query)
+        plan_key = ("plan", canonical_user_id, agent_id, qhash)
+        plan = cache.get(plan_key) if cache else None
+        if plan is None:
+            plan = await create_search_plan(
+                query=query, 
+                user_id=canonical_user_id, 
+                agent_name=agent_id or "unknown",
+                session_context={"session_id": session_id}
+            )
+            if cache:
+                cache.put(plan_key, plan, users=(user_id, canonical_user_id))
+
+        result_key = ("result", canonical_user_id, session_id, qhash, plan_hash(plan))
+        cached = cache.get(result_key) if cache else None
+        if cached is not None:
+            return MemorySearchResult(
+                memories=dict(cached.memories),
+                total_count=cached.total_count,
+                search_time_ms=(time.time() - start_time) * 1000
+            )
+
+        result = await self._resolve_with_plan(
+            plan, query, canonical_user_id, agent_id, session_id, working_memories
         )
+        result.search_time_ms = (time.time() - start_time) * 1000
+        if cache:
+            cache.put(result_key, result, users=(user_id, canonical_user_id))
+        return result
+
+    async def _canonical_user(
+        self,
+        user_id: Optional[str],
+        resolve_entity: bool,
+        cache: Optional[ResolutionCache]
+    ) -> Optional[str]:
+        if not (resolve_entity and user_id and self.entity_resolver):
+            return user_id
+
+        entity_key = ("entity", user_id)
+        canonical = cache.get(entity_key) if cache else None
+        if canonical is not None:
+            return canonical
+
+        canonical_user_id = user_id
+        try:
+            entity = await self.entity_resolver.resolve(user_id)
+            if entity and "id" in entity:
+                canonical_user_id = str(entity["id"])
+                logger.info(f"Resolved user '{user_id}' to entity '{canonical_user_id}'")
+                if cache:
+                    # Identity mapping doesn't change on memory writes: no user tags
+                    cache.put(entity_key, canonical_user_id, users=())
+        except Exception as e:
+            logger.error(f"Entity resolution failed for '{user_id}': {e}")
+        return canonical_user_id
+
+    async def _resolve_with_plan(
+        self,
+        plan: Dict[str, Any],
+        query: str,
+        canonical_user_id: Optional[str],
+        agent_id: Optional[str],
+        session_id: Optional[str],
+        working_memories: Optional[List[Memory]]
+    ) -> MemorySearchResult:
+        result = MemorySearchResult()
         
         logger.info(f"Memory Search Plan: {plan.get('reasoning')}")
         
         limit_per_tier = plan.get("limit_per_tier", 5)
-        filters = plan.get("filters", {})
+        filters = dict(plan.get("filters", {}))  # Plan may be cached; don't mutate it
         
         # Override user_id/agent_id from filters if AI suggests (e.g. for cross-user search if allowed)
         # But for security, we usually respect the passed user_id or ensure the AI doesn't hallucinate access.
@@ -86,7 +150,7 @@ class MemoryResolver:
                 logger.warning(f"Invalid memory tier suggested by curator: {tier_name}")
                 continue
 
-            tier_memories = self._search_tier(
+            tier_memories = await self._search_tier(
                 mem_type, 
                 search_query, 
                 canonical_user_id, 
@@ -108,10 +172,9 @@ class MemoryResolver:
             if plan.get("early_stop") and result.total_count >= limit_per_tier * 2:
                 break
         
-        result.search_time_ms = (time.time() - start_time) * 1000
         return result
     
-    def _search_tier(
+    async def _search_tier(
         self,
         mem_type: MemoryType,
         query: str,
@@ -127,31 +190,19 @@ class MemoryResolver:
             return (working_memories or [])[:limit]
         
         elif mem_type == MemoryType.COLLECTIVE:
-            return self._get_collective()[:limit]
+            return search_collective_memories(query, limit)
         
         elif mem_type == MemoryType.LINEAGE:
             if agent_id:
-                return self._get_lineage(agent_id)[:limit]
+                return search_lineage_memories(agent_id, query, limit)
             return []
         
         elif mem_type in (MemoryType.EPISODIC, MemoryType.SEMANTIC):
-            return self._search_mem0(query, user_id, agent_id, mem_type, limit)
+            return await self._search_mem0(query, user_id, agent_id, mem_type, limit)
         
         return []
     
-    def _get_collective(self) -> List[Memory]:
-        """Get cached collective memories."""
-        if self._collective_cache is None:
-            self._collective_cache = get_collective_memories()
-        return self._collective_cache
-    
-    def _get_lineage(self, agent_id: str) -> List[Memory]:
-        """Get cached lineage memories for agent."""
-        if agent_id not in self._lineage_cache:
-            self._lineage_cache[agent_id] = get_lineage_memories(agent_id)
-        return self._lineage_cache[agent_id]
-    
-    def _search_mem0(
+    async def _search_mem0(
         self,
         query: str,
         user_id: Optional[str],
@@ -164,7 +215,7 @@ class MemoryResolver:
             return []
         
         try:
-            results = self.mem0_client.search(
+            results = await self.mem0_client.asearch(
                 query=query,
                 user_id=user_id,
                 limit=limit * 2  # Get extra for filtering
@@ -189,6 +240,10 @@ class MemoryResolver:
             
             return memories[:limit]
             
+        except DependencyUnavailable:
+            # Circuit open: skip the tier instead of waiting on Mem0
+            logger.debug("Mem0 unavailable, skipping tier search")
+            return []
         except Exception as e:
             logger.error(f"Mem0 search failed: {e}")
             return []
@@ -2,9 +2,14 @@
 KING Memory Seeding - Childhood memories for Kingdom DNA and Agent Expertise.
 
 These are pre-loaded on startup and never decay.
+
+Retrieval goes through SeedIndex (BM25 + hashing vectors), so the resolver
+gets the seeded memories most relevant to the query instead of the first N.
 """
-from typing import List, Dict, Any
+import math
+from typing import List, Dict, Any, Optional, Sequence, Tuple
 from .types import Memory, MemoryType
+from .relevance import HashingEmbedder, tokenize, cosine
 
 # =============================================================================
 # COLLECTIVE MEMORIES - Kingdom DNA (shared by ALL agents, ALL users)
@@ -105,3 +110,130 @@ def get_all_lineage_memories() -> Dict[str, List[Memory]]:
         for agent_id in LINEAGE_MEMORIES.keys()
     }
 
+
+
+# =============================================================================
+# SEED INDEX - Query-relevant retrieval over seeded memories
+# =============================================================================
+
+BM25_K1 = 1.2
+BM25_B = 0.75
+SEED_VECTOR_WEIGHT = 0.5
+
+
+class SeedIndex:
+    """
+    Precomputed BM25 + vector index over a fixed list of memories.
+
+    Built once; search cost is O(query terms + docs) with no I/O.
+    Falls back to seed order when nothing in the query matches.
+    """
+
+    def __init__(self, memories: Sequence[Memory], embedder: Optional[HashingEmbedder] = None):
+        self.memories = list(memories)
+        self.embedder = embedder or HashingEmbedder(dim=256)
+        docs = [tokenize(m.content) for m in self.memories]
+        self._lengths = [len(d) for d in docs]
+        self._avg_len = (sum(self._lengths) / len(docs)) if docs else 0.0
+
+        # term → [(doc index, term frequency)]
+        self._postings: Dict[str, List[Tuple[int, int]]] = {}
+        for idx, tokens in enumerate(docs):
+            counts: Dict[str, int] = {}
+            for t in tokens:
+                counts[t] = counts.get(t, 0) + 1
+            for term, tf in counts.items():
+                self._postings.setdefault(term, []).append((idx, tf))
+
+        n = len(docs)
+        self._idf = {
+            term: math.log(1 + (n - len(p) + 0.5) / (len(p) + 0.5))
+            for term, p in self._postings.items()
+        }
+        self._vectors = self.embedder.embed([m.content for m in self.memories]) if self.memories else []
+
+    def _bm25(self, query_tokens: List[str]) -> Dict[int, float]:
+        scores: Dict[int, float] = {}
+        for term in set(query_tokens):
+            idf = self._idf.get(term)
+            if idf is None:
+                continue
+            for idx, tf in self._postings[term]:
+                norm = 1 - BM25_B + BM25_B * self._lengths[idx] / (self._avg_len or 1)
+                scores[idx] = scores.get(idx, 0.0) + idf * tf * (BM25_K1 + 1) / (tf + BM25_K1 * norm)
+        return scores
+
+    def search(self, query: str, limit: int = 5) -> List[Memory]:
+        """Top `limit` memories for the query, best first."""
+        if not self.memories or limit <= 0:
+            return []
+        query_tokens = tokenize(query)
+        if not query_tokens:
+            return self.memories[:limit]
+
+        bm25 = self._bm25(query_tokens)
+        top_bm25 = max(bm25.values()) if bm25 else 0.0
+        query_vec = self.embedder.embed_one(query)
+
+        ranked = []
+        for idx, vec in enumerate(self._vectors):
+            lexical = bm25.get(idx, 0.0) / top_bm25 if top_bm25 else 0.0
+            score = (1 - SEED_VECTOR_WEIGHT) * lexical + SEED_VECTOR_WEIGHT * cosine(query_vec, vec)
+            ranked.append((score, -idx))  # Ties keep seed order
+        ranked.sort(reverse=True)
+
+        if ranked[0][0] <= 0:
+            return self.memories[:limit]
+        return [self.memories[-neg_idx] for score, neg_idx in ranked[:limit]]
+
+
+# Built lazily; rebuilt when the seed lists are replaced or resized
+_collective_index: Optional[SeedIndex] = None
+_lineage_indexes: Dict[str, SeedIndex] = {}
+_seed_signature: Optional[Tuple] = None
+
+
+def _current_signature() -> Tuple:
+    return (
+        id(COLLECTIVE_MEMORIES), len(COLLECTIVE_MEMORIES),
+        id(LINEAGE_MEMORIES), tuple((k, len(v)) for k, v in LINEAGE_MEMORIES.items()),
+    )
+
+
+def rebuild_seed_indexes() -> None:
+    """Drop built indexes (call after editing seed memories in place)."""
+    global _collective_index, _seed_signature
+    _collective_index = None
+    _lineage_indexes.clear()
+    _seed_signature = _current_signature()
+
+
+def _check_seed_signature() -> None:
+    if _seed_signature != _current_signature():
+        rebuild_seed_indexes()
+
+
+def search_collective_memories(query: str, limit: int = 5) -> List[Memory]:
+    """Kingdom DNA memories most relevant to the query."""
+    global _collective_index
+    _check_seed_signature()
+    if _collective_index is None:
+        _collective_index = SeedIndex(get_collective_memories())
+    return _collective_index.search(query, limit)
+
+
+def search_lineage_memories(agent_id: str, query: str, limit: int = 5) -> List[Memory]:
+    """Expertise memories for an agent type most relevant to the query."""
+    _check_seed_signature()
+    index = _lineage_indexes.get(agent_id)
+    if index is None:
+        index = SeedIndex(get_lineage_memories(agent_id))
+        _lineage_indexes[agent_id] = index
+    return index.search(query, limit)
+
+
+def build_seed_indexes() -> None:
+    """Build every seed index up front (called at gateway startup)."""
+    search_collective_memories("", 1)
+    for agent_id in LINEAGE_MEMORIES:
+        search_lineage_memories(agent_id, "", 1)
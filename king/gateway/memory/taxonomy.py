@@ -22,10 +22,18 @@ class TaxonomyType(str, Enum):
     ACTION = "action"
 
 
-# In-memory cache with TTL
+# In-memory cache with TTL. Stale entries are served while a single
+# background refresh runs, so expiry never blocks or stampedes callers.
 _taxonomy_cache: Dict[str, Tuple[List[str], datetime]] = {}
+_refresh_tasks: Dict[str, asyncio.Task] = {}
 CACHE_TTL_SECONDS = 300  # 5 minutes
 
+# Pending writes, flushed in bulk every TAXONOMY_FLUSH_INTERVAL_SECONDS
+TAXONOMY_FLUSH_INTERVAL_SECONDS = float(os.getenv("TAXONOMY_FLUSH_INTERVAL_SECONDS", "10"))
+_pending_values: Dict[Tuple[str, str], Dict[str, Any]] = {}
+_pending_usage: Dict[Tuple[str, str], int] = {}
+_flush_task: Optional[asyncio.Task] = None
+
 
 # Lazy Supabase client
 _supabase_client = None
@@ -60,20 +68,36 @@ def _get_model():
 
 
 async def get_taxonomy_values(taxonomy_type: TaxonomyType) -> List[str]:
-    """Fetch all values for a taxonomy type from Supabase (cached)."""
+    """Fetch all values for a taxonomy type (cached, refreshed in background)."""
     cache_key = taxonomy_type.value
-    
-    # Check cache
+
+    # Serve from cache; stale entries trigger a background refresh
     if cache_key in _taxonomy_cache:
         values, cached_at = _taxonomy_cache[cache_key]
-        if datetime.utcnow() - cached_at < timedelta(seconds=CACHE_TTL_SECONDS):
-            return values
-    
-    # Fetch from Supabase
+        if datetime.utcnow() - cached_at >= timedelta(seconds=CACHE_TTL_SECONDS):
+            _refresh(taxonomy_type)
+        return values
+
+    # Cold cache: all concurrent callers share one fetch
+    values = await asyncio.shield(_refresh(taxonomy_type))
+    return values if values is not None else _get_fallback_values(taxonomy_type)
+
+
+def _refresh(taxonomy_type: TaxonomyType) -> asyncio.Task:
+    """Start (or join) the single in-flight fetch for a taxonomy type."""
+    cache_key = taxonomy_type.value
+    task = _refresh_tasks.get(cache_key)
+    if task is None or task.done():
+        task = asyncio.create_task(_fetch_values(taxonomy_type))
+        _refresh_tasks[cache_key] = task
+    return task
+
+
+async def _fetch_values(taxonomy_type: TaxonomyType) -> Optional[List[str]]:
     client = _get_supabase()
     if not client:
-        return _get_fallback_values(taxonomy_type)
-    
+        return None
+
     try:
         result = await asyncio.to_thread(
             lambda: client.table("taxonomies")
@@ -83,11 +107,15 @@ async def get_taxonomy_values(taxonomy_type: TaxonomyType) -> List[str]:
                 .execute()
         )
         values = [row["value"] for row in result.data]
-        _taxonomy_cache[cache_key] = (values, datetime.utcnow())
+        # Keep values added locally but not yet flushed
+        for (t, v) in _pending_values:
+            if t == taxonomy_type.value and v not in values:
+                values.append(v)
+        _taxonomy_cache[taxonomy_type.value] = (values, datetime.utcnow())
         return values
     except Exception as e:
         print(f"Taxonomy fetch error: {e}")
-        return _get_fallback_values(taxonomy_type)
+        return None
 
 
 def _get_fallback_values(taxonomy_type: TaxonomyType) -> List[str]:
@@ -109,45 +137,87 @@ async def add_taxonomy_value(
     description: str = None,
     created_by: str = "ai"
 ) -> bool:
-    """Add new taxonomy value to Supabase."""
-    client = _get_supabase()
-    if not client:
-        return False
-    
-    try:
-        await asyncio.to_thread(
-            lambda: client.table("taxonomies").upsert({
-                "taxonomy_type": taxonomy_type.value,
-                "value": value.lower().replace(" ", "_"),
-                "description": description,
-                "created_by": created_by,
-                "usage_count": 1
-            }, on_conflict="taxonomy_type,value").execute()
-        )
-        # Invalidate cache
-        if taxonomy_type.value in _taxonomy_cache:
-            del _taxonomy_cache[taxonomy_type.value]
+    """
+    Add new taxonomy value. Visible in the local cache immediately;
+    written to Supabase in the next bulk flush.
+    """
+    normalized = value.lower().replace(" ", "_")
+    key = (taxonomy_type.value, normalized)
+    if key not in _pending_values:
+        _pending_values[key] = {
+            "taxonomy_type": taxonomy_type.value,
+            "value": normalized,
+            "description": description,
+            "created_by": created_by,
+            "usage_count": 1
+        }
         print(f"📚 New {taxonomy_type.value} added: {value}")
-        return True
-    except Exception as e:
-        print(f"Taxonomy add error: {e}")
-        return False
+
+    cached = _taxonomy_cache.get(taxonomy_type.value)
+    if cached and normalized not in cached[0]:
+        cached[0].append(normalized)
+
+    _ensure_flush_loop()
+    return True
 
 
 async def increment_usage(taxonomy_type: TaxonomyType, value: str) -> None:
-    """Increment usage count for a taxonomy value."""
+    """Increment usage count for a taxonomy value (batched)."""
+    key = (taxonomy_type.value, value)
+    _pending_usage[key] = _pending_usage.get(key, 0) + 1
+    _ensure_flush_loop()
+
+
+def _ensure_flush_loop() -> None:
+    global _flush_task
+    if _flush_task is None or _flush_task.done():
+        _flush_task = asyncio.create_task(_flush_loop())
+
+
+async def _flush_loop() -> None:
+    while _pending_values or _pending_usage:
+        await asyncio.sleep(TAXONOMY_FLUSH_INTERVAL_SECONDS)
+        await flush_taxonomy_writes()
+
+
+async def flush_taxonomy_writes() -> Dict[str, int]:
+    """Write pending new values and usage increments in bulk."""
+    global _pending_values, _pending_usage
+    values, usage = _pending_values, _pending_usage
+    _pending_values, _pending_usage = {}, {}
+    if not values and not usage:
+        return {"values": 0, "usage": 0}
+
     client = _get_supabase()
     if not client:
-        return
-    try:
-        await asyncio.to_thread(
-            lambda: client.rpc("increment_taxonomy_usage", {
-                "p_type": taxonomy_type.value,
-                "p_value": value
-            }).execute()
-        )
-    except:
-        pass  # Non-critical
+        return {"values": 0, "usage": 0}
+
+    written = {"values": 0, "usage": 0}
+    if values:
+        try:
+            # ignore_duplicates: never reset usage_count of an existing value
+            await asyncio.to_thread(
+                lambda: client.table("taxonomies")
+                    .upsert(list(values.values()), on_conflict="taxonomy_type,value", ignore_duplicates=True)
+                    .execute()
+            )
+            written["values"] = len(values)
+        except Exception as e:
+            print(f"Taxonomy add error: {e}")
+            for key, row in values.items():
+                _pending_values.setdefault(key, row)
+
+    if usage:
+        items = [{"taxonomy_type": t, "value": v, "count": n} for (t, v), n in usage.items()]
+        try:
+            await asyncio.to_thread(
+                lambda: client.rpc("increment_taxonomy_usage_batch", {"p_items": items}).execute()
+            )
+            written["usage"] = len(items)
+        except Exception as e:
+            print(f"Taxonomy usage flush error: {e}")  # Non-critical, counts dropped
+
+    return written
 
 
 MATCH_PROMPT = """You are a taxonomy classifier. Given existing values and context, either match or suggest new.
@@ -205,7 +275,7 @@ async def match_or_create(
 
         # High confidence match - use existing
         if matched and confidence >= threshold and matched in existing:
-            asyncio.create_task(increment_usage(taxonomy_type, matched))
+            await increment_usage(taxonomy_type, matched)
             return matched
 
         # Low confidence or no match - create new if suggested
@@ -215,7 +285,7 @@ async def match_or_create(
 
         # Fallback to best match or first existing
         if matched and matched in existing:
-            asyncio.create_task(increment_usage(taxonomy_type, matched))
+            await increment_usage(taxonomy_type, matched)
             return matched
 
         return existing[0] if existing else "general"
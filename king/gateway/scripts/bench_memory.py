@@ -0,0 +1,353 @@
+#!/usr/bin/env python3
+"""
+Memory subsystem benchmark with in-process fakes for Mem0, Supabase
+entities and the Gemini models (curator, orchestrator, fingerprinting).
+
+No API keys or network needed. Fake latency and result sizes are
+configurable, so numbers show the gateway's own overhead plus how it
+behaves when dependencies are slow.
+
+Scenarios:
+    resolve     MemoryResolver.resolve (entity resolution + curator + tiers)
+    enrich      resolve + local relevance triage (as in /execute)
+    write       orchestrate_memory (orchestrator decision + Mem0 writes)
+    fingerprint match_context (context index + extraction)
+    promote     PromotionJob dry run over each user's memories
+
+Usage (from king/gateway/):
+    python scripts/bench_memory.py [--users 10 100 1000] [--ops 5]
+        [--scenario resolve enrich ...] [--mem0-latency-ms 80]
+        [--llm-latency-ms 300] [--db-latency-ms 20] [--memories 200]
+        [--local] [--json out.json]
+
+Every memory performance change should quote before/after numbers from this.
+"""
+import os
+import sys
+import json
+import time
+import uuid
+import random
+import asyncio
+import threading
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+# Add gateway root to path for imports
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+# Keep real services out of the benchmark
+for _var in ("MEM0_API_KEY", "SUPABASE_URL", "SUPABASE_SERVICE_KEY", "GEMINI_API_KEY"):
+    os.environ.pop(_var, None)
+
+from memory import curator, reflection, fingerprint, taxonomy, local_store
+from memory import mem0_client as mem0_module
+from memory.mem0_client import Mem0Client, _percentile
+from memory.context_index import ContextIndex
+from memory import context_index as context_index_module
+from memory.resolver import MemoryResolver
+from memory.relevance import RelevanceScorer
+from memory.promotion import PromotionJob
+
+SCENARIOS = ["resolve", "enrich", "write", "fingerprint", "promote"]
+
+_WORDS = (
+    "python apollo deploy cloud run fastapi supabase video reel hook script "
+    "budget launch client design review test docker gemini memory agent "
+    "project deadline marketing festival offer instagram tiktok audience"
+).split()
+
+
+def _sentence(rng: random.Random, n: int = 10) -> str:
+    return " ".join(rng.choice(_WORDS) for _ in range(n))
+
+
+class _Latency:
+    """Sleep for a jittered latency (±25%). Zero disables sleeping."""
+
+    def __init__(self, ms: float):
+        self.ms = ms
+
+    def seconds(self) -> float:
+        return self.ms / 1000 * random.uniform(0.75, 1.25) if self.ms else 0.0
+
+    def sleep(self) -> None:
+        if self.ms:
+            time.sleep(self.seconds())
+
+    async def asleep(self) -> None:
+        if self.ms:
+            await asyncio.sleep(self.seconds())
+
+
+# =============================================================================
+# FAKES
+# =============================================================================
+
+class FakeMem0SDK:
+    """Sync stand-in for mem0.MemoryClient (wrapped by Mem0Client like the real one)."""
+
+    def __init__(self, latency_ms: float = 80, memories_per_user: int = 200, seed: int = 7):
+        self.latency = _Latency(latency_ms)
+        self.memories_per_user = memories_per_user
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._store: Dict[str, List[Dict[str, Any]]] = {}
+
+    def _user(self, user_id: str) -> List[Dict[str, Any]]:
+        with self._lock:
+            if user_id not in self._store:
+                self._store[user_id] = [
+                    {"id": str(uuid.uuid4()), "memory": _sentence(self._rng), "metadata": {}}
+                    for _ in range(self.memories_per_user)
+                ]
+            return self._store[user_id]
+
+    def search(self, query: str, user_id: Optional[str] = None, limit: int = 10, **kwargs) -> Dict:
+        self.latency.sleep()
+        terms = set(query.lower().split())
+        scored = []
+        for m in self._user(user_id or "__anon__"):
+            overlap = len(terms & set(m["memory"].split()))
+            if overlap:
+                scored.append({**m, "score": min(1.0, overlap / (len(terms) or 1))})
+        scored.sort(key=lambda m: m["score"], reverse=True)
+        return {"results": scored[:limit]}
+
+    def add(self, messages: Any, user_id: Optional[str] = None, metadata: Optional[Dict] = None, **kwargs) -> Dict:
+        self.latency.sleep()
+        text = messages if isinstance(messages, str) else " ".join(
+            m.get("content", "") for m in (messages if isinstance(messages, list) else [messages])
+        )
+        entry = {"id": str(uuid.uuid4()), "memory": text[:300], "metadata": metadata or {}}
+        memories = self._user(user_id or "__anon__")
+        with self._lock:
+            memories.append(entry)
+        return {"results": [{"id": entry["id"], "event": "ADD", "memory": entry["memory"]}]}
+
+    def get_all(self, filters: Optional[Dict] = None, page: int = 1, page_size: int = 100, limit: Optional[int] = None, **kwargs) -> Dict:
+        self.latency.sleep()
+        memories = self._user((filters or {}).get("user_id", "__anon__"))
+        size = limit or page_size
+        start = (page - 1) * size
+        chunk = memories[start:start + size]
+        return {"results": chunk, "next": "more" if start + size < len(memories) else None}
+
+    def get(self, memory_id: str) -> Dict:
+        self.latency.sleep()
+        return {"id": memory_id}
+
+    def delete(self, memory_id: str) -> Dict:
+        self.latency.sleep()
+        return {"message": "deleted"}
+
+    def batch_delete(self, memories: List[Dict]) -> Dict:
+        self.latency.sleep()
+        return {"message": f"deleted {len(memories)}"}
+
+    def users(self) -> Dict:
+        self.latency.sleep()
+        with self._lock:
+            return {"results": [{"type": "user", "name": u} for u in self._store]}
+
+
+class FakeEntityResolver:
+    """Stand-in for EntityResolver backed by an in-memory entities table."""
+
+    def __init__(self, latency_ms: float = 20):
+        self.latency = _Latency(latency_ms)
+        self._entities: Dict[str, Dict[str, Any]] = {}
+
+    async def resolve(self, raw_handle: str) -> Dict[str, Any]:
+        await self.latency.asleep()
+        entity = self._entities.get(raw_handle)
+        if entity is None:
+            entity = {"id": str(uuid.uuid4()), "canonical_name": raw_handle, "aliases": [raw_handle]}
+            self._entities[raw_handle] = entity
+        return entity
+
+
+class _FakeResponse:
+    def __init__(self, text: str):
+        self.text = text
+
+
+class FakeGeminiModel:
+    """Stand-in for GenerativeModel: returns a canned JSON reply per prompt type."""
+
+    def __init__(self, latency_ms: float = 300, tiers_per_plan: int = 5, memories_per_decision: int = 2):
+        self.latency = _Latency(latency_ms)
+        self.tiers_per_plan = tiers_per_plan
+        self.memories_per_decision = memories_per_decision
+        self.calls = 0
+
+    def generate_content(self, prompt: str) -> _FakeResponse:
+        self.latency.sleep()
+        self.calls += 1
+        if "Context Curator" in prompt:
+            tiers = ["working", "episodic", "semantic", "lineage", "collective"][:self.tiers_per_plan]
+            body = {"tiers": tiers, "limit_per_tier": 5, "filters": {"keywords": []},
+                    "early_stop": False, "reasoning": "bench"}
+        elif "CURRENT INTERACTION" in prompt:
+            body = {"should_store": True, "reasoning": "bench", "memories": [
+                {"layer": "user", "importance": 0.6, "enable_graph": False}
+                for _ in range(self.memories_per_decision)
+            ]}
+        else:
+            body = {"matched_context_id": None, "match_confidence": 0.4, "is_new_context": False,
+                    "extracted_attributes": {"language": "python"}, "anomalies": [], "reasoning": "bench"}
+        return _FakeResponse(json.dumps(body))
+
+
+# =============================================================================
+# WIRING
+# =============================================================================
+
+class BenchEnv:
+    """Installs the fakes into the gateway memory modules."""
+
+    def __init__(self, args):
+        self.sdk = FakeMem0SDK(args.mem0_latency_ms, args.memories)
+        self.mem0 = Mem0Client(self.sdk)
+        self.model = FakeGeminiModel(args.llm_latency_ms)
+        self.entities = FakeEntityResolver(args.db_latency_ms)
+
+        mem0_module._mem0 = self.mem0
+        curator.curator_model = self.model
+        reflection._reflection_model = self.model
+        fingerprint._gemini_model = self.model
+        taxonomy._supabase_client = False
+        context_index_module._context_index = ContextIndex(
+            backfill=fingerprint._scan_mem0_contexts, persist=False
+        )
+
+        if args.local:
+            local_store._l1_client = local_store.L1MemoryClient(
+                local_store.LocalMemoryStore(":memory:"), self.mem0
+            )
+            self.store = local_store._l1_client
+        else:
+            local_store._l1_client = False
+            self.store = self.mem0
+
+        self.resolver = MemoryResolver(mem0_client=self.store, entity_resolver=self.entities)
+        self.scorer = RelevanceScorer()
+
+
+def _scenario(env: BenchEnv, name: str) -> Callable[[str, int], Any]:
+    rng = random.Random(11)
+
+    async def resolve(user: str, i: int):
+        await env.resolver.resolve(
+            query=_sentence(rng, 8), user_id=user, agent_id="code_writer",
+            session_id=f"{user}-s", resolve_entity=True
+        )
+
+    async def enrich(user: str, i: int):
+        query = _sentence(rng, 8)
+        result = await env.resolver.resolve(
+            query=query, user_id=user, agent_id="code_writer", resolve_entity=True
+        )
+        candidates = [m for tier in result.memories.values() for m in tier]
+        env.scorer.triage(query, candidates)
+
+    async def write(user: str, i: int):
+        await reflection.orchestrate_memory(
+            user_id=user, session_id=f"{user}-s",
+            user_message=_sentence(rng, 12), assistant_response=_sentence(rng, 20)
+        )
+
+    async def fingerprint_match(user: str, i: int):
+        await fingerprint.match_context(_sentence(rng, 10), user)
+
+    async def promote(user: str, i: int):
+        await PromotionJob(client=env.mem0, dry_run=True).run_user(user)
+
+    return {
+        "resolve": resolve, "enrich": enrich, "write": write,
+        "fingerprint": fingerprint_match, "promote": promote,
+    }[name]
+
+
+async def _run(fn, users: int, ops: int) -> Dict[str, Any]:
+    latencies: List[float] = []
+    errors = 0
+
+    async def user_loop(u: int):
+        nonlocal errors
+        user_id = f"bench-user-{u}"
+        for i in range(ops):
+            start = time.perf_counter()
+            try:
+                await fn(user_id, i)
+            except Exception:
+                errors += 1
+            latencies.append((time.perf_counter() - start) * 1000)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(user_loop(u) for u in range(users)))
+    wall = time.perf_counter() - start
+
+    latencies.sort()
+    return {
+        "users": users,
+        "ops": len(latencies),
+        "errors": errors,
+        "wall_s": round(wall, 3),
+        "throughput_ops_s": round(len(latencies) / wall, 1) if wall else 0.0,
+        "p50_ms": round(_percentile(latencies, 50), 1),
+        "p95_ms": round(_percentile(latencies, 95), 1),
+        "p99_ms": round(_percentile(latencies, 99), 1),
+    }
+
+
+def run_benchmarks(args) -> Dict[str, List[Dict[str, Any]]]:
+    results: Dict[str, List[Dict[str, Any]]] = {}
+    for name in args.scenario:
+        results[name] = []
+        for users in args.users:
+            env = BenchEnv(args)  # Fresh fakes per run
+            results[name].append(asyncio.run(_run(_scenario(env, name), users, args.ops)))
+    return results
+
+
+def _print_table(results: Dict[str, List[Dict[str, Any]]]) -> None:
+    header = f"{'scenario':<12}{'users':>7}{'ops':>8}{'err':>6}{'ops/s':>10}{'p50':>9}{'p95':>9}{'p99':>9}"
+    print(header)
+    print("-" * len(header))
+    for name, rows in results.items():
+        for r in rows:
+            print(f"{name:<12}{r['users']:>7}{r['ops']:>8}{r['errors']:>6}{r['throughput_ops_s']:>10}"
+                  f"{r['p50_ms']:>9}{r['p95_ms']:>9}{r['p99_ms']:>9}")
+
+
+def build_parser():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Benchmark the gateway memory subsystem with in-process fakes")
+    parser.add_argument("--users", type=int, nargs="+", default=[10, 100, 1000], help="Concurrent users per run")
+    parser.add_argument("--ops", type=int, default=5, help="Sequential operations per user")
+    parser.add_argument("--scenario", nargs="+", choices=SCENARIOS, default=SCENARIOS)
+    parser.add_argument("--mem0-latency-ms", type=float, default=80)
+    parser.add_argument("--llm-latency-ms", type=float, default=300)
+    parser.add_argument("--db-latency-ms", type=float, default=20)
+    parser.add_argument("--memories", type=int, default=200, help="Seeded memories per user")
+    parser.add_argument("--local", action="store_true", help="Put the local L1 store in front of fake Mem0")
+    parser.add_argument("--json", help="Also write results to this JSON file")
+    return parser
+
+
+def main():
+    args = build_parser().parse_args()
+    print(f"Fakes: mem0={args.mem0_latency_ms}ms llm={args.llm_latency_ms}ms "
+          f"db={args.db_latency_ms}ms memories/user={args.memories} local={args.local}\n")
+    results = run_benchmarks(args)
+    _print_table(results)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+        print(f"\nResults written to {args.json}")
+
+
+if __name__ == "__main__":
+    main()
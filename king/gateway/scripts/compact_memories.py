@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+Scheduled memory compaction: summarize aged episodic memories of heavy
+users into semantic memories and bulk-delete the originals.
+
+Dry-run by default — prints the groups it would compact. Pass --apply to
+write summaries and delete originals. With --checkpoint, progress is
+saved after every group so an interrupted run can simply be re-run.
+
+Usage (from king/gateway/):
+    python scripts/compact_memories.py [--apply] [--user USER_ID ...]
+                                       [--checkpoint compaction.json]
+                                       [--min-memories 300] [--keep-recent 100]
+                                       [--rate 2] [--report report.json]
+
+Schedule daily (e.g. Cloud Run job / cron) with --apply --checkpoint.
+
+Env vars: MEM0_API_KEY, GEMINI_API_KEY (optional; extractive summaries without it)
+"""
+import asyncio
+import json
+import sys
+from pathlib import Path
+
+# Add gateway root to path for imports
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from memory.mem0_client import get_mem0, get_mem0_metrics
+from memory.compaction import (
+    CompactionJob,
+    CompactionCheckpoint,
+    COMPACTION_MIN_MEMORIES,
+    COMPACTION_KEEP_RECENT,
+    COMPACTION_WINDOW_DAYS,
+    COMPACTION_WRITES_PER_SECOND,
+)
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Compact aged episodic memories into semantic summaries")
+    parser.add_argument("--apply", action="store_true", help="Write changes (default: dry run)")
+    parser.add_argument("--user", action="append", dest="users", help="Limit to user id (repeatable)")
+    parser.add_argument("--checkpoint", help="Progress file for resumable runs")
+    parser.add_argument("--min-memories", type=int, default=COMPACTION_MIN_MEMORIES,
+                        help="Only compact users with at least this many episodic memories")
+    parser.add_argument("--keep-recent", type=int, default=COMPACTION_KEEP_RECENT,
+                        help="Newest episodic memories to leave untouched")
+    parser.add_argument("--window-days", type=int, default=COMPACTION_WINDOW_DAYS)
+    parser.add_argument("--rate", type=float, default=COMPACTION_WRITES_PER_SECOND,
+                        help="Max Mem0 writes per second")
+    parser.add_argument("--report", help="Write full JSON report to this path")
+    args = parser.parse_args()
+
+    client = get_mem0()
+    if not client:
+        print("MEM0_API_KEY not configured")
+        sys.exit(1)
+
+    job = CompactionJob(
+        client=client,
+        dry_run=not args.apply,
+        checkpoint=CompactionCheckpoint(args.checkpoint),
+        min_memories=args.min_memories,
+        keep_recent=args.keep_recent,
+        window_days=args.window_days,
+        writes_per_second=args.rate,
+    )
+    report = asyncio.run(job.run(args.users))
+
+    for user in report.users:
+        if not user.groups and not user.errors:
+            continue
+        print(f"\n👤 {user.user_id}: {user.episodic} episodic, {len(user.groups)} groups")
+        for group in user.groups:
+            print(f"  [{len(group.memory_ids)}x] {group.period} {group.summary[:80]}")
+        for err in user.errors:
+            print(f"  ⚠️ {err}")
+
+    print("\n=== Summary ===")
+    print(json.dumps(report.summary(), indent=2))
+    print("\n=== Mem0 latency ===")
+    print(json.dumps(get_mem0_metrics(), indent=2))
+
+    if args.report:
+        with open(args.report, "w", encoding="utf-8") as f:
+            json.dump(report.to_dict(), f, indent=2)
+        print(f"\nReport written to {args.report}")
+
+
+if __name__ == "__main__":
+    main()
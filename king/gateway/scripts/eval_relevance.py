@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Evaluate the local RelevanceScorer against logged memory_selector decisions.
+
+Reads memory_selector rows from agent_runs, reports how often local triage
+agrees with the LLM selector, and suggests calibrated thresholds.
+
+Usage (from king/gateway/):
+    python scripts/eval_relevance.py [--limit 2000] [--target-precision 0.95]
+
+Env vars: SUPABASE_URL, SUPABASE_SERVICE_KEY
+"""
+import json
+import os
+import sys
+from pathlib import Path
+
+# Add gateway root to path for imports
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from supabase import create_client
+from memory.relevance import (
+    RelevanceScorer,
+    samples_from_selector_runs,
+    score_samples,
+    calibrate_thresholds,
+    evaluate,
+)
+
+
+def fetch_selector_runs(limit: int) -> list:
+    """Fetch logged memory_selector decisions from agent_runs."""
+    url = os.getenv("SUPABASE_URL")
+    key = os.getenv("SUPABASE_SERVICE_KEY")
+    if not url or not key:
+        raise ValueError("SUPABASE_URL and SUPABASE_SERVICE_KEY must be set")
+
+    client = create_client(url, key)
+    result = client.table("agent_runs") \
+        .select("input_json, output_json") \
+        .eq("agent_role", "memory_selector") \
+        .order("created_at", desc=True) \
+        .limit(limit) \
+        .execute()
+    return result.data or []
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Evaluate local memory relevance triage")
+    parser.add_argument("--limit", type=int, default=2000, help="Max selector runs to load")
+    parser.add_argument("--target-precision", type=float, default=0.95,
+                        help="Required agreement with the selector for local decisions")
+    parser.add_argument("--input", help="Read runs from a JSON file instead of Supabase")
+    args = parser.parse_args()
+
+    if args.input:
+        with open(args.input, encoding="utf-8") as f:
+            runs = json.load(f)
+    else:
+        runs = fetch_selector_runs(args.limit)
+
+    samples = samples_from_selector_runs(runs)
+    print(f"Loaded {len(runs)} selector runs → {len(samples)} labelled memories")
+    if not samples:
+        print("Nothing to evaluate")
+        sys.exit(1)
+
+    current = RelevanceScorer()
+    print("\n=== Current thresholds ===")
+    print(json.dumps(evaluate(current, samples), indent=2))
+
+    reject_t, approve_t = calibrate_thresholds(
+        score_samples(current, samples), target_precision=args.target_precision
+    )
+    calibrated = RelevanceScorer(approve_threshold=approve_t, reject_threshold=reject_t)
+    print(f"\n=== Calibrated (target precision {args.target_precision}) ===")
+    print(json.dumps(evaluate(calibrated, samples), indent=2))
+
+    print("\nSet on the gateway service:")
+    print(f"  RELEVANCE_APPROVE_THRESHOLD={approve_t}")
+    print(f"  RELEVANCE_REJECT_THRESHOLD={reject_t}")
+
+
+if __name__ == "__main__":
+    main()
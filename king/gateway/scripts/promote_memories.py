@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+Nightly memory promotion: cluster near-duplicate episodic memories and
+promote each cluster to a single semantic memory.
+
+Dry-run by default — prints the clusters it would promote. Pass --apply
+to add semantic memories and bulk-delete the originals.
+
+Usage (from king/gateway/):
+    python scripts/promote_memories.py [--apply] [--user USER_ID ...]
+                                       [--threshold 0.6] [--min-cluster 3]
+                                       [--report report.json]
+
+Schedule nightly (e.g. Cloud Run job / cron) with --apply.
+
+Env vars: MEM0_API_KEY
+"""
+import asyncio
+import json
+import sys
+from pathlib import Path
+
+# Add gateway root to path for imports
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from memory.mem0_client import get_mem0, get_mem0_metrics
+from memory.promotion import PromotionJob, PROMOTION_COUNT, PROMOTION_PAGE_SIZE
+from memory.dedup import DEFAULT_JACCARD_THRESHOLD
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Promote near-duplicate memories to semantic tier")
+    parser.add_argument("--apply", action="store_true", help="Write changes (default: dry run)")
+    parser.add_argument("--user", action="append", dest="users", help="Limit to user id (repeatable)")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_JACCARD_THRESHOLD,
+                        help="Min estimated Jaccard similarity for near-duplicates")
+    parser.add_argument("--min-cluster", type=int, default=PROMOTION_COUNT,
+                        help="Min cluster size to promote")
+    parser.add_argument("--page-size", type=int, default=PROMOTION_PAGE_SIZE)
+    parser.add_argument("--report", help="Write full JSON report to this path")
+    args = parser.parse_args()
+
+    client = get_mem0()
+    if not client:
+        print("MEM0_API_KEY not configured")
+        sys.exit(1)
+
+    job = PromotionJob(
+        client=client,
+        dry_run=not args.apply,
+        page_size=args.page_size,
+        min_cluster_size=args.min_cluster,
+        threshold=args.threshold,
+    )
+    report = asyncio.run(job.run(args.users))
+
+    for user in report.users:
+        if not user.clusters and not user.errors:
+            continue
+        print(f"\n👤 {user.user_id}: {user.memories_scanned} memories, {len(user.clusters)} clusters")
+        for cluster in user.clusters:
+            print(f"  [{len(cluster.memory_ids)}x] {cluster.canonical[:100]}")
+        for err in user.errors:
+            print(f"  ⚠️ {err}")
+
+    print("\n=== Summary ===")
+    print(json.dumps(report.summary(), indent=2))
+    print("\n=== Mem0 latency ===")
+    print(json.dumps(get_mem0_metrics(), indent=2))
+
+    if args.report:
+        with open(args.report, "w", encoding="utf-8") as f:
+            json.dump(report.to_dict(), f, indent=2)
+        print(f"\nReport written to {args.report}")
+
+
+if __name__ == "__main__":
+    main()
@@ -3,6 +3,7 @@ import time
 import threading
 from supabase import create_client, Client
 from typing import Optional, Dict, Any
+from memory.resilience import DependencyUnavailable, get_dependency
 
 class StateManager:
     _instance = None
@@ -15,6 +16,9 @@ class StateManager:
     REGISTRY_TTL = 60  # 60 seconds
     SPEC_TTL = 300     # 5 minutes
 
+    # Breaker/adaptive timeout shared with other Supabase callers
+    _supabase = get_dependency("supabase")
+
     def __new__(cls):
         if cls._instance is None:
             cls._instance = super(StateManager, cls).__new__(cls)
@@ -51,10 +55,10 @@ class StateManager:
         try:
             # If cache is totally stale or empty, refresh all
             if (now - self._registry_last_updated) >= self.REGISTRY_TTL:
-                response = client.table("agent_registry") \
+                response = self._supabase.call_sync(lambda: client.table("agent_registry") \
                     .select("agent_name, service_url") \
                     .eq("status", "active") \
-                    .execute()
+                    .execute(), hedge=True)
                 
                 if response.data:
                     self._registry_cache = {
@@ -65,6 +69,8 @@ class StateManager:
             
             return self._registry_cache.get(agent_name)
             
+        except DependencyUnavailable:
+            return self._registry_cache.get(agent_name)
         except Exception as e:
             print(f"Error fetching agent URL: {e}")
             # Return stale data if available
@@ -84,37 +90,53 @@ class StateManager:
             return None
 
         try:
-            response = client.table("agent_specs") \
+            response = self._supabase.call_sync(lambda: client.table("agent_specs") \
                 .select("dna_rules, output_schema") \
                 .eq("agent_name", agent_name) \
                 .single() \
-                .execute()
+                .execute(), hedge=True)
             
             if response.data:
                 self._spec_cache[agent_name] = response.data
                 self._spec_last_updated[agent_name] = now
                 return response.data
             return None
+        except DependencyUnavailable:
+            return self._spec_cache.get(agent_name)
         except Exception as e:
             print(f"Error fetching DNA for {agent_name}: {e}")
             return self._spec_cache.get(agent_name)
 
     def log_run(self, agent_name: str, input_data: Dict, output_data: Optional[Dict], 
-                success: bool, error: Optional[str] = None, duration_ms: int = 0):
-        """Log execution to agent_runs table."""
+                success: bool, error: Optional[str] = None, duration_ms: int = 0,
+                decision: Optional[str] = None):
+        """Log execution to agent_runs table (decision: spawn decision type, if any)."""
         client = self.get_client()
-        if not client:
-            return
+        if not client or not self._supabase.available():
+            return  # Drop run logs during a Supabase outage rather than pile up threads
 
         try:
             payload = {
                 "agent_role": agent_name,  # DB column is agent_role, not agent_name
                 "input_json": input_data,  # DB column is input_json, not input
                 "output_json": output_data,  # DB column is output_json, not output
-                "confidence": output_data.get("confidence") if isinstance(output_data, dict) else None
-                # Note: success, error, duration_ms not in original schema - omitted
+                "confidence": output_data.get("confidence") if isinstance(output_data, dict) else None,
+                # Columns added by 20251203150000_fix_agent_registry_and_runs; the orchestrator router
+                # learns from runs by agent_name where success is true
+                "agent_name": agent_name,
+                "success": success,
+                "error": error,
+                "duration_ms": duration_ms,
             }
+            if decision:
+                payload["decision"] = decision  # Column from 20251205130000_agent_runs_decision
             # Fire and forget (in a real app, maybe use background task)
-            threading.Thread(target=lambda: client.table("agent_runs").insert(payload).execute()).start()
+            threading.Thread(target=self._insert_run, args=(client, payload)).start()
+        except Exception as e:
+            print(f"Error logging run: {e}")
+
+    def _insert_run(self, client: Client, payload: Dict[str, Any]) -> None:
+        try:
+            self._supabase.call_sync(lambda: client.table("agent_runs").insert(payload).execute(), timeout=False)
         except Exception as e:
             print(f"Error logging run: {e}")
@@ -0,0 +1,304 @@
+"""
+KING Tracing - W3C trace-context propagation and per-stage spans.
+
+One trace follows a request across bot -> gateway -> orchestrator -> agent
+services:
+
+- Incoming `traceparent` headers are continued (server span per request);
+  outgoing calls send the current span's `traceparent` (inject())
+- span(name) times a stage; the active span lives in a ContextVar, so
+  asyncio tasks and to_thread calls started inside it are its children
+- Finished spans go to a ring buffer (served on /traces/{trace_id}) and,
+  if TRACE_EXPORT_PATH is set, are appended to that file as JSON lines
+- to_otlp() converts spans to OTLP/JSON for a real collector;
+  render_waterfall() draws one trace as text
+  (orchestrator/scripts/trace_waterfall.py)
+
+Agent services don't export spans; they echo the trace context and report
+their own time in a Server-Timing header, recorded on the caller's span.
+
+Mirrored in orchestrator/services/tracing.py (services deploy separately,
+so each keeps its own copy); keep the two in sync.
+"""
+import os
+import re
+import json
+import time
+import logging
+import secrets
+import threading
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Any, Deque, Dict, Iterable, Iterator, List, Mapping, Optional
+
+logger = logging.getLogger(__name__)
+
+SERVICE_NAME = os.getenv("TRACE_SERVICE_NAME", "king-gateway")
+TRACE_EXPORT_PATH = os.getenv("TRACE_EXPORT_PATH", "")
+TRACE_BUFFER_SPANS = 5000
+
+TRACEPARENT = "traceparent"
+_TRACEPARENT_RE = re.compile(r"^([0-9a-f]{2})-([0-9a-f]{32})-([0-9a-f]{16})-([0-9a-f]{2})$")
+_SERVER_TIMING_RE = re.compile(r"dur=([0-9.]+)")
+_OTLP_KINDS = {"internal": 1, "server": 2, "client": 3}
+
+
+@dataclass(frozen=True)
+class SpanContext:
+    trace_id: str  # 32 hex chars
+    span_id: str  # 16 hex chars
+    sampled: bool = True
+
+    def traceparent(self) -> str:
+        return f"00-{self.trace_id}-{self.span_id}-{'01' if self.sampled else '00'}"
+
+
+def parse_traceparent(header: Optional[str]) -> Optional[SpanContext]:
+    """SpanContext from a W3C traceparent header, or None if absent/invalid."""
+    m = _TRACEPARENT_RE.match((header or "").strip().lower())
+    if not m or m.group(1) == "ff" or set(m.group(2)) == {"0"} or set(m.group(3)) == {"0"}:
+        return None
+    return SpanContext(m.group(2), m.group(3), bool(int(m.group(4), 16) & 1))
+
+
+def new_trace_id() -> str:
+    return secrets.token_hex(16)
+
+
+def new_span_id() -> str:
+    return secrets.token_hex(8)
+
+
+@dataclass
+class Span:
+    name: str
+    context: SpanContext
+    parent_id: Optional[str] = None
+    kind: str = "internal"  # "internal" | "server" | "client"
+    service: str = SERVICE_NAME
+    start_ns: int = field(default_factory=time.time_ns)
+    end_ns: Optional[int] = None
+    attributes: Dict[str, Any] = field(default_factory=dict)
+    error: Optional[str] = None
+
+    def set(self, **attributes: Any) -> None:
+        self.attributes.update(attributes)
+
+    @property
+    def duration_ms(self) -> float:
+        end = self.end_ns if self.end_ns is not None else time.time_ns()
+        return (end - self.start_ns) / 1e6
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "traceId": self.context.trace_id,
+            "spanId": self.context.span_id,
+            "parentSpanId": self.parent_id,
+            "name": self.name,
+            "kind": self.kind,
+            "service": self.service,
+            "startTimeUnixNano": self.start_ns,
+            "endTimeUnixNano": self.end_ns,
+            "attributes": self.attributes,
+            "status": "error" if self.error else "ok",
+            "error": self.error,
+        }
+
+
+_current: ContextVar[Optional[SpanContext]] = ContextVar("king_trace_span", default=None)
+
+
+def current_context() -> Optional[SpanContext]:
+    return _current.get()
+
+
+def current_trace_id() -> Optional[str]:
+    ctx = _current.get()
+    return ctx.trace_id if ctx else None
+
+
+@contextmanager
+def span(name: str, kind: str = "internal", parent: Optional[SpanContext] = None, **attributes: Any) -> Iterator[Span]:
+    """Time a stage as a child of `parent` (default: the active span)."""
+    parent = parent or _current.get()
+    ctx = SpanContext(parent.trace_id if parent else new_trace_id(), new_span_id(), parent.sampled if parent else True)
+    s = Span(name, ctx, parent.span_id if parent else None, kind, attributes=dict(attributes))
+    token = _current.set(ctx)
+    try:
+        yield s
+    except BaseException as e:
+        s.error = f"{type(e).__name__}: {e}"[:200]
+        raise
+    finally:
+        s.end_ns = time.time_ns()
+        _current.reset(token)
+        if ctx.sampled:
+            get_span_exporter().export(s)
+
+
+def server_span(name: str, headers: Mapping[str, str], **attributes: Any):
+    """Span for an incoming request, continuing the caller's traceparent if any."""
+    return span(name, kind="server", parent=parse_traceparent(headers.get(TRACEPARENT)), **attributes)
+
+
+def inject(headers: Optional[Dict[str, str]] = None) -> Dict[str, str]:
+    """Outgoing headers with the active span's traceparent."""
+    headers = dict(headers or {})
+    ctx = _current.get()
+    if ctx:
+        headers[TRACEPARENT] = ctx.traceparent()
+    return headers
+
+
+def server_timing_ms(headers: Mapping[str, str]) -> Optional[float]:
+    """Callee's own duration from a Server-Timing header (agent services)."""
+    m = _SERVER_TIMING_RE.search(headers.get("server-timing", ""))
+    return float(m.group(1)) if m else None
+
+
+class SpanExporter:
+    """Ring buffer of finished spans, optionally appended to a JSONL file."""
+
+    def __init__(self, path: str = TRACE_EXPORT_PATH, max_spans: int = TRACE_BUFFER_SPANS):
+        self.path = path
+        self._lock = threading.Lock()
+        self._spans: Deque[Dict[str, Any]] = deque(maxlen=max_spans)
+        self.exported = 0
+        self.write_errors = 0
+
+    def export(self, s: Span) -> None:
+        record = s.to_dict()
+        with self._lock:
+            self._spans.append(record)
+            self.exported += 1
+            if self.path:
+                try:
+                    with open(self.path, "a", encoding="utf-8") as f:
+                        f.write(json.dumps(record, default=str) + "\n")
+                except OSError as e:
+                    self.write_errors += 1
+                    if self.write_errors == 1:
+                        logger.warning(f"Trace export to {self.path} failed: {e}")
+
+    def spans(self, trace_id: Optional[str] = None) -> List[Dict[str, Any]]:
+        with self._lock:
+            return [s for s in self._spans if trace_id is None or s["traceId"] == trace_id]
+
+    def recent_traces(self, limit: int = 20) -> List[Dict[str, Any]]:
+        """Latest root-in-this-process spans (one per trace), newest first."""
+        with self._lock:
+            local_ids = {s["spanId"] for s in self._spans}
+            roots = [s for s in self._spans if s["parentSpanId"] not in local_ids]
+        out, seen = [], set()
+        for s in reversed(roots):
+            if s["traceId"] not in seen:
+                seen.add(s["traceId"])
+                out.append({
+                    "trace_id": s["traceId"],
+                    "name": s["name"],
+                    "duration_ms": round((s["endTimeUnixNano"] - s["startTimeUnixNano"]) / 1e6, 2),
+                    "status": s["status"],
+                })
+            if len(out) >= limit:
+                break
+        return out
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {"buffered": len(self._spans), "exported": self.exported, "path": self.path or None, "write_errors": self.write_errors}
+
+
+_span_exporter: Optional[SpanExporter] = None
+
+
+def get_span_exporter() -> SpanExporter:
+    global _span_exporter
+    if _span_exporter is None:
+        _span_exporter = SpanExporter()
+    return _span_exporter
+
+
+def load_spans(lines: Iterable[str]) -> List[Dict[str, Any]]:
+    """Spans from JSON lines (TRACE_EXPORT_PATH files); bad lines are skipped."""
+    spans = []
+    for line in lines:
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            spans.append(json.loads(line))
+        except ValueError:
+            continue
+    return spans
+
+
+def _otlp_value(value: Any) -> Dict[str, Any]:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+def to_otlp(spans: Iterable[Dict[str, Any]]) -> Dict[str, Any]:
+    """OTLP/JSON ExportTraceServiceRequest body (POST to a collector's /v1/traces)."""
+    by_service: Dict[str, List[Dict[str, Any]]] = {}
+    for s in spans:
+        by_service.setdefault(s.get("service", "unknown"), []).append({
+            "traceId": s["traceId"],
+            "spanId": s["spanId"],
+            "parentSpanId": s.get("parentSpanId") or "",
+            "name": s["name"],
+            "kind": _OTLP_KINDS.get(s.get("kind", "internal"), 1),
+            "startTimeUnixNano": str(s["startTimeUnixNano"]),
+            "endTimeUnixNano": str(s["endTimeUnixNano"]),
+            "attributes": [{"key": k, "value": _otlp_value(v)} for k, v in (s.get("attributes") or {}).items()],
+            "status": {"code": 2, "message": s.get("error") or ""} if s.get("status") == "error" else {"code": 1},
+        })
+    return {"resourceSpans": [
+        {
+            "resource": {"attributes": [{"key": "service.name", "value": {"stringValue": service}}]},
+            "scopeSpans": [{"scope": {"name": "king.tracing"}, "spans": service_spans}],
+        }
+        for service, service_spans in by_service.items()
+    ]}
+
+
+def render_waterfall(spans: List[Dict[str, Any]], width: int = 40) -> str:
+    """Text waterfall of one trace: offset, duration, service and span tree."""
+    if not spans:
+        return "(no spans)"
+    spans = sorted(spans, key=lambda s: s["startTimeUnixNano"])
+    ids = {s["spanId"] for s in spans}
+    children: Dict[Optional[str], List[Dict[str, Any]]] = {}
+    for s in spans:
+        parent = s.get("parentSpanId") if s.get("parentSpanId") in ids else None
+        children.setdefault(parent, []).append(s)
+
+    t0 = spans[0]["startTimeUnixNano"]
+    t1 = max(s["endTimeUnixNano"] for s in spans)
+    total = max(t1 - t0, 1)
+    lines = [f"trace {spans[0]['traceId']}  {len(spans)} spans  {total / 1e6:.1f}ms"]
+
+    def walk(parent: Optional[str], depth: int) -> None:
+        for s in children.get(parent, []):
+            start, end = s["startTimeUnixNano"] - t0, s["endTimeUnixNano"] - t0
+            left = int(start * width / total)
+            bar = max(int(end * width / total) - left, 1)
+            label = ("  " * depth + s["name"])[:36]
+            extra = "  !" + s["error"] if s.get("error") else ""
+            agent_ms = (s.get("attributes") or {}).get("server_ms")
+            if agent_ms is not None:
+                extra += f"  (callee {agent_ms}ms)"
+            lines.append(
+                f"{start / 1e6:>9.1f}ms {(end - start) / 1e6:>9.1f}ms  {s.get('service', '?')[:18]:<18} "
+                f"{label:<36} |{' ' * left}{'#' * bar}{' ' * (width - left - bar)}|{extra}"
+            )
+            walk(s["spanId"], depth + 1)
+
+    walk(None, 0)
+    return "\n".join(lines)
@@ -1,15 +1,20 @@
 import json
+import asyncio
 from typing import Optional, Dict, Any
 from agents.agent_factory import AgentFactory
 from agents.base_agent import AgentResponse
-from services.gemini import call_gemini
+from services.gemini import call_gemini, acall_gemini
 from agents.guardian_minister import GuardianMinister
 from agents.validator_minister import ValidatorMinister
 from agents.audit_minister import AuditMinister
 from agents.spec_designer import SpecDesignerAgent
+from services.verdict_cache import get_verdict_cache
 
 
 class AgentRunner:
+    # Roles handled without Gemini
+    DETERMINISTIC_ROLES = {"guardian_minister", "validator_minister", "audit_minister"}
+
     def run(self, role: str, input_data: dict) -> AgentResponse:
         print(f"DEBUG: AgentRunner.run role={role} input={input_data}")
         # --- Deterministic Ministers (Phase 1) & Special Agents ---
@@ -20,8 +25,10 @@ class AgentRunner:
         if role == "guardian_minister":
             content = input_data.get("code") or input_data.get("content") or input_data.get("input", "")
             context = input_data.get("context", "code")
-            minister = GuardianMinister(str(content), context=context)
-            decision = minister.get_decision()
+            decision = get_verdict_cache().get_or_compute(
+                role, f"{context}\0{content}",
+                lambda: GuardianMinister(str(content), context=context).get_decision()
+            )
             return AgentResponse(
                 agent=role,
                 status="success",
@@ -32,8 +39,9 @@ class AgentRunner:
             
         if role == "validator_minister":
             spec = input_data.get("spec") or input_data
-            minister = ValidatorMinister()
-            decision = minister.validate_spec(spec)
+            decision = get_verdict_cache().get_or_compute(
+                role, spec, lambda: ValidatorMinister().validate_spec(spec)
+            )
             return AgentResponse(
                 agent=role,
                 status="success",
@@ -62,15 +70,43 @@ class AgentRunner:
         try:
             raw_output = call_gemini(prompt)
         except Exception as e:
-            return AgentResponse(
-                agent=role,
-                status="error",
-                error={"type": "GEMINI_ERROR", "details": str(e)},
-                confidence=0.0,
-                needs_clarification=True,
-                output=None
-            )
+            return self._gemini_error(role, e)
+
+        return self._parse_output(role, raw_output)
+
+    async def arun(self, role: str, input_data: dict) -> AgentResponse:
+        """
+        Async run for request handlers: LLM roles await Gemini instead of
+        blocking the event loop. Deterministic ministers run inline.
+        """
+        if role in self.DETERMINISTIC_ROLES:
+            return self.run(role, input_data)
+        if role == "spec_designer":
+            # SpecDesignerAgent drives Gemini synchronously itself
+            return await asyncio.to_thread(self.run, role, input_data)
+
+        prompt = AgentFactory.generate_prompt(input_data, role)
+
+        try:
+            raw_output = await acall_gemini(prompt)
+        except Exception as e:
+            return self._gemini_error(role, e)
+
+        return self._parse_output(role, raw_output)
+
+    @staticmethod
+    def _gemini_error(role: str, e: Exception) -> AgentResponse:
+        return AgentResponse(
+            agent=role,
+            status="error",
+            error={"type": "GEMINI_ERROR", "details": str(e)},
+            confidence=0.0,
+            needs_clarification=True,
+            output=None
+        )
 
+    @staticmethod
+    def _parse_output(role: str, raw_output: str) -> AgentResponse:
         # Strip markdown fencing if Gemini still adds it
         cleaned = raw_output.strip()
         if cleaned.startswith("```json"):
@@ -1,7 +1,8 @@
 import re
 import logging
 from typing import Dict, Any, List, Tuple
-from services.guardrails import RequestGuard
+from services.guardrails import CONTENT_RULES, RequestGuard
+from services.safety_scanner import SafetyRule, SafetyScanner, StreamScanner
 from services.agent_dependencies import AGENT_DEPENDENCIES
 
 logger = logging.getLogger(__name__)
@@ -51,8 +52,34 @@ class GuardianMinister(RequestGuard):
         r"os\.putenv": ("ENV_VARS", "Environment variable modification."),
     }
     
+    # Bounded forms for stream(): ".*" spans capped at 256 chars, so every
+    # match fits the stream scanner's overlap window
+    STREAM_BLOCKLIST_PATTERNS = {
+        r"open\(.*['\"]w['\"].*\)": r"open\([^\n]{0,256}['\"]w['\"][^\n]{0,256}\)",
+        r"open\(.*['\"]a['\"].*\)": r"open\([^\n]{0,256}['\"]a['\"][^\n]{0,256}\)",
+        r"open\(.*['\"]x['\"].*\)": r"open\([^\n]{0,256}['\"]x['\"][^\n]{0,256}\)",
+        r"pathlib\.Path\(.*\)\.write_text": r"pathlib\.Path\([^\n]{0,256}\)\.write_text",
+        r"exec\(.*\)": r"exec\([^\n]{0,256}\)",
+        r"eval\(.*\)": r"eval\([^\n]{0,256}\)",
+        r"os\.environ\[.*\]\s*=": r"os\.environ\[[^\n]{0,256}\]\s{0,64}=",
+    }
+    
     SECRET_KEYWORDS = ["password", "secret", "api_key", "token", "credential"]
 
+    # Content, blocklist and (for output) secret rules compiled into one scanner each,
+    # so validation is a single pass over the content
+    _BLOCKLIST_RULES = [
+        SafetyRule(pattern, v_type, reason, stream_pattern)
+        for (pattern, (v_type, reason)), stream_pattern
+        in zip(BLOCKLIST_PATTERNS.items(), map(STREAM_BLOCKLIST_PATTERNS.get, BLOCKLIST_PATTERNS))
+    ]
+    _SECRET_RULES = [
+        SafetyRule(re.escape(keyword), "secret_leak", f"Contains sensitive keyword: {keyword}")
+        for keyword in SECRET_KEYWORDS
+    ]
+    CODE_SCANNER = SafetyScanner(CONTENT_RULES + _BLOCKLIST_RULES)
+    OUTPUT_SCANNER = SafetyScanner(CONTENT_RULES + _BLOCKLIST_RULES + _SECRET_RULES)
+
     def __init__(self, content: str = "", user_id: str = "system", context: str = "code"):
         """
         Initialize Guardian.
@@ -63,7 +90,7 @@ class GuardianMinister(RequestGuard):
                         'output' enforces strict secret keyword blocking.
         """
         self.context = context
-        # Initialize RequestGuard (which runs check_content_safety)
+        # Initialize RequestGuard (which runs the scanner from _scanner())
         # We allow empty content if we are just using validate_plan
         super().__init__(content, user_id)
         
@@ -77,6 +104,29 @@ class GuardianMinister(RequestGuard):
         if content:
             self._validate_patterns()
 
+    def _scanner(self) -> SafetyScanner:
+        # Only check secrets strictly if context is 'output'.
+        # In 'code', we assume variable names like 'api_key' are allowed,
+        # unless we implement smarter hardcoded-secret detection.
+        return self.OUTPUT_SCANNER if self.context == "output" else self.CODE_SCANNER
+
+    @classmethod
+    def stream(cls, context: str = "output") -> StreamScanner:
+        """
+        Chunked scanner for streamed generations: feed() each chunk and
+        abort as soon as it returns violations. It scans the bounded
+        STREAM_* pattern forms, so it is an early abort; the verdict on a
+        complete output still comes from GuardianMinister(content).
+        """
+        return (cls.OUTPUT_SCANNER if context == "output" else cls.CODE_SCANNER).stream()
+
+    def get_violations(self) -> List[Dict[str, Any]]:
+        """All violations in the content, in text order."""
+        return [
+            {"violation_type": v.category, "reason": v.reason, "start": v.start, "end": v.end}
+            for v in self.violations
+        ]
+
     def _validate_patterns(self):
         """Run Guardian specific validation logic against blocklist."""
         # If already blocked by RequestGuard base, we might just update our fields or return
@@ -87,23 +137,11 @@ class GuardianMinister(RequestGuard):
             self.violation_type = "safety_filter"
             return
 
-        # Check regex patterns (Always check dangerous code patterns, even in output, to be safe?)
-        # Yes, we don't want output to contain executable dangerous code if it's being displayed or processed.
-        for pattern, (v_type, reason) in self.BLOCKLIST_PATTERNS.items():
-            if re.search(pattern, self.message, re.IGNORECASE):
-                self._block(v_type, reason)
-                return
-
-        # Check secrets
-        # Only check strictly if context is 'output'.
-        # In 'code', we assume variable names like 'api_key' are allowed, 
-        # unless we implement smarter hardcoded-secret detection.
-        if self.context == "output":
-            lower_content = self.message.lower()
-            for keyword in self.SECRET_KEYWORDS:
-                if keyword in lower_content:
-                    self._block("secret_leak", f"Contains sensitive keyword: {keyword}")
-                    return
+        # Dangerous code patterns are always checked, even in output: we don't want
+        # output to contain executable dangerous code if it's being displayed or processed.
+        # The scan already ran in RequestGuard.__init__; report its first violation.
+        if self.violation:
+            self._block(self.violation.category, self.violation.reason)
     
     def _block(self, violation_type: str, reason: str):
         """Internal helper to set block state."""
@@ -5,19 +5,38 @@ The brain of the Kingdom. Gateway delegates ALL strategic decisions here.
 Flow: Guardian check → Memory lookup → Route decision → Agent selection → Verdict
 """
 from fastapi import APIRouter, HTTPException
+from fastapi.responses import Response, StreamingResponse
 from pydantic import BaseModel
-from typing import Optional, Dict, Any, List
+from typing import Optional, Dict, Any, List, Tuple, AsyncIterator
+from contextlib import contextmanager
+import asyncio
 import logging
+import time
+import json
+
+import httpx
 
 from agents.agent_runner import AgentRunner
 from agents.guardian_minister import GuardianMinister
-from services.supabase_client import supabase
-from services.mem0_tool import search_memory, select_memories
+from services.supabase_client import supabase, get_async_supabase
+from services.mem0_tool import asearch_memory, aselect_memories
+from services.registry_cache import get_registry_cache
+from services.router_index import RouterIndex, get_router_cache, get_seed_index
+from services.decision_cache import decision_key, get_decision_cache
+from services.tracing import span, inject, server_timing_ms
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
 runner = AgentRunner()
 
+# Fused mode (/king/decide-execute): agent calls made from the orchestrator
+AGENT_TIMEOUT_SECONDS = 60.0
+FUSED_MEDIA_TYPE = "application/vnd.king.fused+json"
+_agent_client: Optional[httpx.AsyncClient] = None
+
+MIN_ROUTE_SCORE = 0.6  # One seed/"Use for" phrase, or strong learned evidence
+MAX_ROUTE_CANDIDATES = 5
+
 
 class DecideRequest(BaseModel):
     """Request from gateway for strategic decision."""
@@ -25,6 +44,7 @@ class DecideRequest(BaseModel):
     message: str
     session_id: Optional[str] = None
     context: Optional[Dict[str, Any]] = None
+    memory_epoch: Optional[str] = None  # Gateway's memory write counter for the user
 
 
 class AgentVerdict(BaseModel):
@@ -45,75 +65,170 @@ class DecideResponse(BaseModel):
     reasoning: str
     trace_id: str
     guardian_decision: Dict[str, Any]
+    route_candidates: Optional[List[Dict[str, Any]]] = None  # Ranked agents with confidence
+    cached: bool = False  # Served from the per-user decision cache
+    stage_timings_ms: Optional[Dict[str, float]] = None  # guardian, memory_search, memory_select, registry, route, total
 
 
-def _get_registered_agents() -> Dict[str, str]:
-    """Fetch registered agents and their URLs from DB."""
+async def _get_registered_agents() -> Dict[str, str]:
+    """Registered agents and their URLs (in-memory registry cache)."""
     try:
-        result = supabase.table("agent_registry") \
-            .select("agent_name, service_url") \
-            .eq("status", "active") \
-            .execute()
-        return {r["agent_name"]: r["service_url"] for r in (result.data or [])}
+        return await get_registry_cache().get_agents()
     except Exception as e:
         logger.error(f"Failed to fetch agent registry: {e}")
         return {}
 
 
-def _get_agent_spec(agent_name: str) -> Optional[Dict[str, Any]]:
-    """Fetch agent spec from DB (runtime authority)."""
+async def _get_agent_spec(agent_name: str) -> Optional[Dict[str, Any]]:
+    """Active agent spec (runtime authority), from the registry cache."""
     try:
-        result = supabase.table("agent_specs") \
-            .select("*") \
-            .eq("agent_name", agent_name) \
-            .eq("is_active", True) \
-            .single() \
-            .execute()
-        return result.data
+        return await get_registry_cache().get_spec(agent_name)
     except Exception:
         return None
 
 
-def _route_task(message: str, registered_agents: List[str]) -> Dict[str, Any]:
+def _route_task(message: str, registered_agents: List[str], index: Optional[RouterIndex] = None) -> Dict[str, Any]:
     """
     Determine best agent for task.
     Priority: registered > cached ephemeral > spawn new
+
+    Registered agents are ranked by the phrase index (one pass over the
+    message for all agents); the top candidate wins if it scores at least
+    MIN_ROUTE_SCORE.
     """
     msg_lower = message.lower()
+    ranked = (index or get_seed_index()).rank(message, registered_agents)
+    candidates = [c.as_dict() for c in ranked[:MAX_ROUTE_CANDIDATES]]
     
-    # Direct matches for registered agents
-    agent_keywords = {
-        "code_writer": ["write code", "generate code", "create function", "implement"],
-        "code_reviewer": ["review code", "check code", "audit code"],
-        "video_planner": ["video", "youtube", "content plan"],
-        "script_writer": ["script", "screenplay", "dialogue"],
-        "memory_selector": ["remember", "recall", "what did", "history"],
-    }
-    
-    for agent, keywords in agent_keywords.items():
-        if agent in registered_agents:
-            if any(kw in msg_lower for kw in keywords):
-                return {
-                    "decision": "registered",
-                    "agent_name": agent,
-                    "reasoning": f"Keyword match for registered agent: {agent}"
-                }
+    if ranked and ranked[0].score >= MIN_ROUTE_SCORE:
+        best = ranked[0]
+        return {
+            "decision": "registered",
+            "agent_name": best.agent,
+            "confidence": round(best.confidence, 3),
+            "candidates": candidates,
+            "reasoning": f"Phrase match for registered agent: {best.agent} ({', '.join(best.phrases)})"
+        }
     
     # Check for pipeline patterns
     if "generate" in msg_lower and "review" in msg_lower:
         return {
             "decision": "pipeline",
             "pipeline_steps": ["code_writer", "code_reviewer"],
+            "candidates": candidates,
             "reasoning": "Multi-step task requiring code generation and review"
         }
     
     # Default: spawn ephemeral
     return {
         "decision": "ephemeral",
+        "candidates": candidates,
         "reasoning": "No registered agent match, will spawn ephemeral"
     }
 
 
+def _build_enriched_input(request: DecideRequest, memory_context: List[str]) -> Dict[str, Any]:
+    enriched_input = {
+        "original_message": request.message,
+        "user_id": request.user_id,
+        "session_id": request.session_id,
+    }
+    
+    if memory_context:
+        enriched_input["memory_context"] = memory_context
+    
+    if request.context:
+        enriched_input["user_context"] = request.context
+    
+    return enriched_input
+
+
+def _from_cache(cached: DecideResponse, request: DecideRequest, trace_id: str, guardian_decision: Dict[str, Any]) -> DecideResponse:
+    """Cached verdict re-stamped for this request (session, context, exact wording)."""
+    response = cached.model_copy(deep=True, update={
+        "enriched_input": _build_enriched_input(request, cached.memory_context or []),
+        "trace_id": trace_id,
+        "guardian_decision": guardian_decision,
+        "cached": True,
+    })
+    if response.verdict and response.verdict.spec is not None:
+        response.verdict.spec["task"] = request.message
+    return response
+
+
+async def _get_router_index() -> RouterIndex:
+    """Current phrase index (rebuilt on registry version change)."""
+    try:
+        return await get_router_cache().get(get_registry_cache())
+    except Exception as e:
+        logger.error(f"Router index unavailable, using seed phrases: {e}")
+        return get_seed_index()
+
+
+class _StageTimer:
+    """Wall-clock milliseconds per decide stage (parallel stages overlap); each stage is also a trace span."""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.timings: Dict[str, float] = {}
+
+    @contextmanager
+    def stage(self, name: str):
+        start = time.perf_counter()
+        try:
+            with span(name):
+                yield
+        finally:
+            self.timings[name] = round((time.perf_counter() - start) * 1000, 2)
+
+    def finish(self) -> Dict[str, float]:
+        self.timings["total"] = round((time.perf_counter() - self.started) * 1000, 2)
+        return self.timings
+
+
+def _run_guardian(request: DecideRequest) -> Dict[str, Any]:
+    guardian = GuardianMinister(request.message, user_id=request.user_id, context="input")
+    return guardian.get_decision()
+
+
+def _blocked_response(request: DecideRequest, trace_id: str, guardian_decision: Dict[str, Any], timer: _StageTimer) -> DecideResponse:
+    return DecideResponse(
+        action="blocked",
+        verdict=None,
+        enriched_input={"original": request.message},
+        memory_context=None,
+        reasoning=guardian_decision["reason"],
+        trace_id=trace_id,
+        guardian_decision=guardian_decision,
+        stage_timings_ms=timer.finish()
+    )
+
+
+async def _lookup_memory(request: DecideRequest, trace_id: str, timer: _StageTimer) -> Tuple[List[str], bool]:
+    """Mem0 search + LLM selection. Returns (approved memories, ok); ok is False if either step degraded."""
+    try:
+        with timer.stage("memory_search"):
+            raw_result = await asearch_memory(request.message, request.user_id, limit=5)
+        raw_memories = raw_result.get("memories", [])
+        
+        if raw_memories:
+            with timer.stage("memory_select"):
+                selection = await aselect_memories(request.message, raw_memories, request.user_id)
+            return selection.get("approved", []), not selection.get("degraded")
+        return [], not raw_result.get("degraded")
+    except Exception as e:
+        logger.error(f"[{trace_id}] Memory lookup failed: {e}")
+        return [], False
+
+
+async def _load_routing(timer: _StageTimer) -> Tuple[Dict[str, str], RouterIndex, int]:
+    """Registered agents, router index, and the registry version the agents were read at."""
+    with timer.stage("registry"):
+        agents = await _get_registered_agents()
+        version = get_registry_cache().version  # No await since get_agents: same snapshot
+        return agents, await _get_router_index(), version
+
+
 @router.post("/decide", response_model=DecideResponse)
 async def decide(request: DecideRequest) -> DecideResponse:
     """
@@ -124,54 +239,63 @@ async def decide(request: DecideRequest) -> DecideResponse:
     2. Memory lookup for context
     3. Route to appropriate agent
     4. Return verdict for gateway to execute
+    
+    Steps 1, 2 and the registry/router lookup run concurrently; memory
+    selection is cancelled if the Guardian blocks. Repeats of a recent
+    message (same user, registry version and memory epoch) skip steps 2-3
+    via the decision cache; the Guardian always runs.
     """
-    from services.guardrails import generate_trace_id
+    with span("decide") as decide_span:
+        response = await _decide(request)
+        decide_span.set(action=response.action, cached=response.cached)
+        if response.verdict:
+            decide_span.set(agent=response.verdict.agent_name)
+        return response
+
+
+async def _decide(request: DecideRequest) -> DecideResponse:
+    from services.guardrails import generate_trace_id  # The propagated W3C trace id when traced
     trace_id = generate_trace_id()
+    timer = _StageTimer()
+    cache = get_decision_cache()
     
-    # === Step 1: Guardian Minister (Safety Gate) ===
-    guardian = GuardianMinister(request.message, user_id=request.user_id, context="input")
-    guardian_decision = guardian.get_decision()
+    # === Decision cache (the Guardian still runs on the raw message) ===
+    cached = cache.get(decision_key(request.user_id, request.message, get_registry_cache().version, request.memory_epoch))
+    if cached is not None:
+        with timer.stage("guardian"):
+            guardian_decision = await asyncio.to_thread(_run_guardian, request)
+        if guardian_decision["verdict"] == "BLOCKED":
+            return _blocked_response(request, trace_id, guardian_decision, timer)
+        with timer.stage("cache"):
+            response = _from_cache(cached, request, trace_id, guardian_decision)
+        response.stage_timings_ms = timer.finish()
+        return response
     
-    if guardian_decision["verdict"] == "BLOCKED":
-        logger.warning(f"[{trace_id}] Guardian BLOCKED: {guardian_decision['reason']}")
-        return DecideResponse(
-            action="blocked",
-            verdict=None,
-            enriched_input={"original": request.message},
-            memory_context=None,
-            reasoning=guardian_decision["reason"],
-            trace_id=trace_id,
-            guardian_decision=guardian_decision
-        )
+    # === Steps 1-2 in parallel: Guardian | memory lookup | registry + router index ===
+    memory_task = asyncio.create_task(_lookup_memory(request, trace_id, timer))
+    routing_task = asyncio.create_task(_load_routing(timer))
     
-    # === Step 2: Memory Lookup ===
-    memory_context = []
     try:
-        raw_result = search_memory(request.message, request.user_id, limit=5)
-        raw_memories = raw_result.get("memories", [])
-        
-        if raw_memories:
-            selection = select_memories(request.message, raw_memories, request.user_id)
-            memory_context = selection.get("approved", [])
-    except Exception as e:
-        logger.error(f"[{trace_id}] Memory lookup failed: {e}")
+        with timer.stage("guardian"):
+            guardian_decision = await asyncio.to_thread(_run_guardian, request)
+    except BaseException:
+        memory_task.cancel()
+        routing_task.cancel()
+        raise
     
-    # === Step 3: Build Enriched Input ===
-    enriched_input = {
-        "original_message": request.message,
-        "user_id": request.user_id,
-        "session_id": request.session_id,
-    }
+    if guardian_decision["verdict"] == "BLOCKED":
+        memory_task.cancel()  # Don't spend a memory selection on a blocked request
+        logger.warning(f"[{trace_id}] Guardian BLOCKED: {guardian_decision['reason']}")
+        return _blocked_response(request, trace_id, guardian_decision, timer)
     
-    if memory_context:
-        enriched_input["memory_context"] = memory_context
+    (memory_context, memory_ok), (registered_agents, index, registry_version) = await asyncio.gather(memory_task, routing_task)
     
-    if request.context:
-        enriched_input["user_context"] = request.context
+    # === Step 3: Build Enriched Input ===
+    enriched_input = _build_enriched_input(request, memory_context)
     
     # === Step 4: Route Decision ===
-    registered_agents = _get_registered_agents()
-    route = _route_task(request.message, list(registered_agents.keys()))
+    with timer.stage("route"):
+        route = _route_task(request.message, list(registered_agents.keys()), index)
     
     verdict = None
     
@@ -202,14 +326,97 @@ async def decide(request: DecideRequest) -> DecideResponse:
             }
         )
     
-    return DecideResponse(
+    response = DecideResponse(
         action="execute",
         verdict=verdict,
         enriched_input=enriched_input,
         memory_context=memory_context if memory_context else None,
         reasoning=route["reasoning"],
         trace_id=trace_id,
-        guardian_decision=guardian_decision
+        guardian_decision=guardian_decision,
+        route_candidates=route.get("candidates")
+    )
+    response.stage_timings_ms = timer.finish()
+    if memory_ok and registered_agents:
+        # Don't pin degraded decisions (memory or registry unavailable).
+        # Keyed on the version the route was computed with.
+        cache_key = decision_key(request.user_id, request.message, registry_version, request.memory_epoch)
+        cache.put(cache_key, response, request.user_id)
+    return response
+
+
+def _get_agent_client() -> httpx.AsyncClient:
+    # Created on first use inside the serving event loop; keep-alive to agent services
+    global _agent_client
+    if _agent_client is None:
+        _agent_client = httpx.AsyncClient(timeout=AGENT_TIMEOUT_SECONDS)
+    return _agent_client
+
+
+async def aclose_agent_client() -> None:
+    """Close pooled agent connections (orchestrator shutdown)."""
+    global _agent_client
+    if _agent_client is not None:
+        await _agent_client.aclose()
+        _agent_client = None
+
+
+async def _stream_agent(head: bytes, service_url: str, enriched_input: Dict[str, Any], trace_id: str) -> AsyncIterator[bytes]:
+    """Decision line, then the agent's /execute body passed through unparsed (an error object on non-2xx)."""
+    yield head
+    started = False
+    try:
+        with span("agent", kind="client", url=service_url) as agent_span:
+            async with _get_agent_client().stream(
+                "POST", f"{service_url}/execute", json=enriched_input, headers=inject()
+            ) as resp:
+                agent_span.set(http_status=resp.status_code, server_ms=server_timing_ms(resp.headers))
+                if not resp.is_success:
+                    # A {"detail": ...} error body must not read as agent output
+                    detail = (await resp.aread()).decode("utf-8", "replace")[:500]
+                    logger.error(f"[{trace_id}] Fused agent call returned HTTP {resp.status_code}")
+                    started = True
+                    yield json.dumps({"error": f"Agent returned HTTP {resp.status_code}", "detail": detail}).encode("utf-8")
+                    return
+                async for chunk in resp.aiter_bytes():
+                    started = True
+                    yield chunk
+    except Exception as e:
+        logger.error(f"[{trace_id}] Fused agent call failed: {e}")
+        if not started:
+            yield json.dumps({"error": f"Agent call failed: {e}"}).encode("utf-8")
+
+
+@router.post("/decide-execute")
+async def decide_execute(request: DecideRequest) -> Response:
+    """
+    Fused mode: decide and, for registered agents, call the agent from here.
+    
+    Saves the gateway round trip and the second serialization of the
+    enriched input. The body's first line is the decision JSON. When the
+    X-King-Dispatch header is "orchestrator", the rest of the body is the
+    agent's /execute response, streamed through as it arrives. When it is
+    "gateway" (blocked, pipeline, ephemeral, or no service URL), the caller
+    executes the verdict itself as in split mode.
+    """
+    decision = await decide(request)
+    verdict = decision.verdict
+    dispatch_here = decision.action == "execute" and verdict is not None \
+        and verdict.agent_type == "registered" and bool(verdict.service_url)
+    headers = {
+        "X-King-Trace-Id": decision.trace_id,
+        "X-King-Dispatch": "orchestrator" if dispatch_here else "gateway",
+    }
+    
+    if not dispatch_here:
+        return Response(decision.model_dump_json() + "\n", media_type=FUSED_MEDIA_TYPE, headers=headers)
+    
+    # The agent gets the enriched input directly; don't echo it back
+    head = (decision.model_dump_json(exclude={"enriched_input"}) + "\n").encode("utf-8")
+    return StreamingResponse(
+        _stream_agent(head, verdict.service_url, decision.enriched_input, decision.trace_id),
+        media_type=FUSED_MEDIA_TYPE,
+        headers=headers,
     )
 
 
@@ -223,23 +430,25 @@ async def execute_agent(
     Execute a registered/known agent. Called by gateway after /decide.
     Handles telemetry logging.
     """
-    import time
     start = time.time()
     
     try:
-        response = runner.run(agent_name, input_data)
+        with span("agent", agent=agent_name):
+            response = await runner.arun(agent_name, input_data)
         duration_ms = int((time.time() - start) * 1000)
         
         # Log to agent_runs
-        supabase.table("agent_runs").insert({
-            "agent_name": agent_name,
-            "input": input_data,
-            "output": response.output,
-            "success": response.status == "success",
-            "error": str(response.error) if response.error else None,
-            "duration_ms": duration_ms,
-            "user_id": user_id
-        }).execute()
+        with span("logging", table="agent_runs"):
+            client = await get_async_supabase()
+            await client.table("agent_runs").insert({
+                "agent_name": agent_name,
+                "input": input_data,
+                "output": response.output,
+                "success": response.status == "success",
+                "error": str(response.error) if response.error else None,
+                "duration_ms": duration_ms,
+                "user_id": user_id
+            }).execute()
         
         return {
             "status": response.status,
@@ -13,6 +13,8 @@ from services.agent_dependencies import (
     AGENT_DEPENDENCIES,
 )
 from services.pipeline_executor import PipelineExecutor
+from services.registry_cache import get_registry_cache
+from services.verdict_cache import get_verdict_cache
 from services.action_executor import ActionExecutor, ActionRequest, ActionType
 from services.conversation_service import (
     ConversationService, ConverseRequest, ConverseResponse, Medium
@@ -263,6 +265,7 @@ def rollback_dna(version: str, request: RollbackRequest, _: str = Depends(requir
     # Hot reload agents
     from agents.agent_factory import AgentFactory
     reload_result = AgentFactory.reload()
+    get_registry_cache().invalidate("dna_rollback")
 
     return {
         "status": "rolled_back",
@@ -274,10 +277,12 @@ def rollback_dna(version: str, request: RollbackRequest, _: str = Depends(requir
 
 @router.post("/reload")
 def reload_agents(_: str = Depends(require_admin_key)):
-    """Force reload agent specs from disk. Requires X-Admin-Key header."""
+    """Force reload agent specs from disk and drop cached registry/specs/verdicts. Requires X-Admin-Key header."""
     from agents.agent_factory import AgentFactory
     result = AgentFactory.reload()
-    return {"status": "reloaded", **result}
+    registry_version = get_registry_cache().invalidate("meta_reload")
+    get_verdict_cache().invalidate("meta_reload")
+    return {"status": "reloaded", "registry_version": registry_version, **result}
 
 
 @router.get("/analytics/agents")
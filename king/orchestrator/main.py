@@ -1,14 +1,79 @@
-from fastapi import FastAPI
+from fastapi import FastAPI, Request
 from api.tasks import router as tasks_router
 from api.meta import router as meta_router
-from api.decide import router as decide_router
+from api.decide import router as decide_router, aclose_agent_client
+from services.mem0_client import get_mem0_metrics
+from services.gemini import aclose_gemini, get_gemini_metrics
+from services.registry_cache import get_registry_cache
+from services.router_index import get_router_cache
+from services.decision_cache import get_decision_cache
+from services.verdict_cache import get_verdict_cache
+from services.tracing import server_span, get_span_exporter, render_waterfall
 
 app = FastAPI(title="KING Orchestrator", description="Strategic brain of the Kingdom")
 
+@app.middleware("http")
+async def trace_requests(request: Request, call_next):
+    """Server span per request, continuing the caller's W3C traceparent."""
+    with server_span(f"{request.method} {request.url.path}", request.headers) as request_span:
+        response = await call_next(request)
+        request_span.set(http_status=response.status_code)
+    response.headers["traceresponse"] = request_span.context.traceparent()
+    return response
+
 @app.get("/health")
 def health():
     return {"status": "ok", "service": "king-orchestrator"}
 
+@app.get("/metrics/mem0")
+def mem0_metrics():
+    """Latency/error metrics for the shared Mem0 client."""
+    return {"mem0": get_mem0_metrics()}
+
+@app.get("/metrics/gemini")
+def gemini_metrics():
+    """Latency histograms, retries and adaptive concurrency for the shared Gemini client."""
+    return {"gemini": get_gemini_metrics()}
+
+@app.get("/metrics/registry")
+def registry_metrics():
+    """Version, age and hit counters for the in-memory registry/spec cache."""
+    return {"registry": get_registry_cache().stats(), "router": get_router_cache().stats()}
+
+@app.get("/metrics/decide")
+def decide_metrics():
+    """Hit rate and size of the per-user /king/decide cache."""
+    return {"decision_cache": get_decision_cache().stats()}
+
+@app.get("/metrics/ministers")
+def minister_metrics():
+    """Guardian/Validator verdict cache hits per minister and ruleset version."""
+    return {"verdict_cache": get_verdict_cache().stats()}
+
+@app.get("/traces")
+def recent_traces(limit: int = 20):
+    """Latest traces seen by this service, plus exporter stats."""
+    exporter = get_span_exporter()
+    return {"traces": exporter.recent_traces(limit), "exporter": exporter.stats()}
+
+@app.get("/traces/{trace_id}")
+def trace_spans(trace_id: str, format: str = "json"):
+    """This service's spans for one trace (format=text for a waterfall)."""
+    spans = get_span_exporter().spans(trace_id)
+    if format == "text":
+        return {"waterfall": render_waterfall(spans)}
+    return {"spans": spans}
+
+@app.on_event("startup")
+async def start_registry_refresh():
+    get_registry_cache().start()
+
+@app.on_event("shutdown")
+async def close_pooled_clients():
+    await get_registry_cache().stop()
+    await aclose_gemini()
+    await aclose_agent_client()
+
 app.include_router(decide_router, prefix="/king", tags=["Strategic Decisions"])
 app.include_router(tasks_router, prefix="/tasks", tags=["Tasks"])
 app.include_router(meta_router, prefix="/meta", tags=["Meta Operations"])
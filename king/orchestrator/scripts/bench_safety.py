@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+Safety scan benchmark: compiled SafetyScanner vs the per-pattern loop it
+replaced, for RequestGuard (content rules) and GuardianMinister (content +
+blocklist + secret rules).
+
+Payloads are generated Python-like code: clean, with one violation near the
+end (worst case for a first-match scan), and with violations sprinkled
+throughout (all-violations scan). "stream" feeds the payload to a
+StreamScanner in 256-char chunks, as a streamed generation would arrive.
+
+Usage (from king/orchestrator/):
+    python scripts/bench_safety.py [--sizes 1 10 50 200] [--runs 200] [--json out.json]
+
+Target: a 50KB payload scans in under 1ms. Achieved (p50, 50KB): ~0.8ms for
+the content rules; ~1.7-1.9ms for the full Guardian set, which costs one
+substring search per anchor literal.
+"""
+import os
+import re
+import sys
+import json
+import time
+import random
+from pathlib import Path
+from typing import Callable, Dict, List
+
+# Add orchestrator root to path for imports
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault("SUPABASE_URL", "https://example.supabase.co")
+os.environ.setdefault("SUPABASE_SERVICE_KEY", "bench")
+
+from services.guardrails import BLOCKED_PATTERNS, CONTENT_SCANNER
+from agents.guardian_minister import GuardianMinister
+
+_LINES = [
+    "def handle(request, user_id):",
+    "    result = compute_total(items, discount=0.1)",
+    "    logger.info(f'processed {len(items)} items for {user_id}')",
+    "    for row in rows: totals[row.key] += row.value",
+    "    return {'status': 'ok', 'data': payload}",
+    "# Render the reel script with the chosen hook and budget",
+    "    config = load_config(path)  # reads yaml, never writes",
+]
+
+
+def make_payload(size_kb: int, violations: int, rng: random.Random) -> str:
+    lines: List[str] = []
+    while sum(len(line) + 1 for line in lines) < size_kb * 1024:
+        lines.append(rng.choice(_LINES))
+    for i in range(violations):
+        # Spread evenly, last one near the end
+        at = len(lines) - 1 - i * (len(lines) // max(violations, 1))
+        lines[max(at, 0)] = "    os.system('rm -rf /tmp/cache')"
+    return "\n".join(lines)
+
+
+def legacy_guardian(text: str):
+    """The pre-scanner GuardianMinister check: one search per pattern."""
+    for pattern in BLOCKED_PATTERNS:
+        if re.search(pattern, text, re.IGNORECASE):
+            return pattern
+    for pattern in GuardianMinister.BLOCKLIST_PATTERNS:
+        if re.search(pattern, text, re.IGNORECASE):
+            return pattern
+    return None
+
+
+def streamed(text: str, chunk: int = 256):
+    stream = GuardianMinister.OUTPUT_SCANNER.stream()
+    for i in range(0, len(text), chunk):
+        stream.feed(text[i:i + chunk])
+    return stream.close()
+
+
+def _time(fn: Callable[[str], object], text: str, runs: int) -> Dict[str, float]:
+    samples = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        fn(text)
+        samples.append((time.perf_counter() - start) * 1000)
+    samples.sort()
+    return {"p50_ms": round(samples[len(samples) // 2], 4), "p95_ms": round(samples[int(len(samples) * 0.95)], 4)}
+
+
+def run(sizes: List[int], runs: int) -> List[Dict[str, object]]:
+    rng = random.Random(42)
+    results = []
+    for size in sizes:
+        for label, violations in [("clean", 0), ("one_late", 1), ("many", 20)]:
+            text = make_payload(size, violations, rng)
+            row = {
+                "size_kb": size,
+                "payload": label,
+                "legacy": _time(legacy_guardian, text, runs),
+                "content_first": _time(CONTENT_SCANNER.first, text, runs),
+                "guardian_first": _time(GuardianMinister.OUTPUT_SCANNER.first, text, runs),
+                "guardian_all": _time(GuardianMinister.OUTPUT_SCANNER.all, text, runs),
+                "stream": _time(streamed, text, runs),
+            }
+            results.append(row)
+            print(
+                f"{size:>5}KB {label:<9} legacy p50={row['legacy']['p50_ms']:.3f}ms  "
+                f"content={row['content_first']['p50_ms']:.3f}ms  "
+                f"guardian first={row['guardian_first']['p50_ms']:.3f}ms "
+                f"all={row['guardian_all']['p50_ms']:.3f}ms  "
+                f"stream={row['stream']['p50_ms']:.3f}ms"
+            )
+    return results
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Benchmark the compiled safety scanner")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1, 10, 50, 200], help="Payload sizes in KB")
+    parser.add_argument("--runs", type=int, default=200)
+    parser.add_argument("--json", help="Write results to this file")
+    args = parser.parse_args()
+
+    results = run(args.sizes, args.runs)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+Per-request latency waterfall from KING trace spans.
+
+Spans come from TRACE_EXPORT_PATH files (JSON lines, any number of
+services) and/or live services' /traces/{trace_id} endpoints, and are
+merged into one tree per trace.
+
+Usage (from king/orchestrator/):
+    python scripts/trace_waterfall.py --file /tmp/gateway.jsonl --file /tmp/orchestrator.jsonl
+    python scripts/trace_waterfall.py <trace_id> --url http://localhost:8000 --url http://localhost:8080
+    python scripts/trace_waterfall.py --file spans.jsonl --slowest 5
+    python scripts/trace_waterfall.py <trace_id> --file spans.jsonl --otlp trace.json
+
+Without a trace id, files render the most recent trace (or the --slowest N);
+URLs list each service's recent traces.
+"""
+import sys
+import json
+from pathlib import Path
+from typing import Dict, List
+
+# Add orchestrator root to path for imports
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from services.tracing import load_spans, render_waterfall, to_otlp
+
+
+def _by_trace(spans: List[Dict]) -> Dict[str, List[Dict]]:
+    traces: Dict[str, List[Dict]] = {}
+    seen = set()
+    for s in spans:
+        if s["spanId"] in seen:  # Same span from a file and a service buffer
+            continue
+        seen.add(s["spanId"])
+        traces.setdefault(s["traceId"], []).append(s)
+    return traces
+
+
+def _duration_ns(spans: List[Dict]) -> int:
+    return max(s["endTimeUnixNano"] for s in spans) - min(s["startTimeUnixNano"] for s in spans)
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Render per-request trace waterfalls")
+    parser.add_argument("trace_id", nargs="?", help="Trace to render (32 hex chars)")
+    parser.add_argument("--file", action="append", default=[], help="Span file (TRACE_EXPORT_PATH); repeatable")
+    parser.add_argument("--url", action="append", default=[], help="Service base URL serving /traces; repeatable")
+    parser.add_argument("--slowest", type=int, help="Render the N slowest traces instead of the latest")
+    parser.add_argument("--width", type=int, default=40, help="Bar width in columns")
+    parser.add_argument("--otlp", help="Also write the selected trace(s) as OTLP/JSON to this file")
+    args = parser.parse_args()
+
+    spans: List[Dict] = []
+    for path in args.file:
+        with open(path, encoding="utf-8") as f:
+            spans.extend(load_spans(f))
+
+    if args.url:
+        import httpx
+
+        for url in args.url:
+            base = url.rstrip("/")
+            try:
+                if args.trace_id:
+                    spans.extend(httpx.get(f"{base}/traces/{args.trace_id}", timeout=10).json()["spans"])
+                else:
+                    for t in httpx.get(f"{base}/traces", timeout=10).json()["traces"]:
+                        print(f"{base}  {t['trace_id']}  {t['duration_ms']:>9.1f}ms  {t['status']:<5}  {t['name']}")
+            except Exception as e:
+                print(f"{base}: {e}", file=sys.stderr)
+
+    traces = _by_trace(spans)
+    if args.trace_id:
+        selected = [args.trace_id] if args.trace_id in traces else []
+    elif args.slowest:
+        selected = sorted(traces, key=lambda t: _duration_ns(traces[t]), reverse=True)[:args.slowest]
+    else:
+        latest = max(traces.items(), key=lambda t: max(s["endTimeUnixNano"] for s in t[1]), default=None)
+        selected = [latest[0]] if latest else []
+
+    if not selected:
+        if args.file or args.trace_id:
+            print("No matching spans", file=sys.stderr)
+            sys.exit(1)
+        return
+
+    for trace_id in selected:
+        print(render_waterfall(traces[trace_id], width=args.width))
+        print()
+
+    if args.otlp:
+        with open(args.otlp, "w") as f:
+            json.dump(to_otlp([s for t in selected for s in traces[t]]), f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,175 @@
+"""
+KING Context Packer - Token-budgeted context assembly.
+
+Selects the highest-value snippets across memory tiers and retrieved
+documents so that injected context fits a per-agent token budget:
+
+1. Estimate tokens with a fast local approximation of Gemini/BPE tokenizers
+2. Drop near-duplicate snippets (keep the higher-value one)
+3. Greedily take items by value until the budget is spent,
+   trimming the last item at a word boundary if worthwhile
+
+Mirrors gateway/memory/context_packer.py (services deploy separately, so
+each keeps its own copy); keep the two in sync.
+"""
+import re
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Sequence
+
+# Per-agent context budgets (tokens). Agents not listed get the default.
+DEFAULT_CONTEXT_BUDGET = 800
+AGENT_CONTEXT_BUDGETS: Dict[str, int] = {
+    "memory_selector": 400,
+    "retriever_agent": 300,
+    "code_writer": 1200,
+    "code_reviewer": 1200,
+    "script_writer": 1000,
+    "video_planner": 1000,
+}
+
+# Relative value of each source when scores are comparable
+TIER_WEIGHTS: Dict[str, float] = {
+    "working": 1.0,
+    "episodic": 0.9,
+    "semantic": 1.0,
+    "lineage": 0.8,
+    "collective": 0.6,
+    "document": 0.9,
+    "relation": 0.7,
+}
+
+DUPLICATE_THRESHOLD = 0.8
+MIN_TRIM_TOKENS = 24  # Don't bother trimming into a tiny remainder
+ITEM_OVERHEAD_TOKENS = 2  # Bullet / newline per injected item
+
+_PIECE_RE = re.compile(r"[A-Za-z]+|\d+|[^\sA-Za-z\d]")
+# Words in any script: runs of anything but whitespace and punctuation, so
+# combining vowel signs (Devanagari, Tamil, ...) stay inside their word
+_WORD_RE = re.compile(r"[^\s!-/:-@\[-^`{-~\u2000-\u206f\u3000-\u303f\uff00-\uff0f\u0964\u0965]+")
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Approximate BPE token count without a tokenizer download.
+
+    Common short words are one token, longer words split roughly every
+    4-5 characters, digits group in threes, and each punctuation or
+    non-ASCII character is about one token.
+    """
+    if not text:
+        return 0
+    count = 0
+    for piece in _PIECE_RE.findall(text):
+        c = piece[0]
+        if c.isalpha() and c.isascii():
+            n = len(piece)
+            count += 1 if n <= 6 else 1 + (n - 3) // 4
+        elif c.isdigit():
+            count += (len(piece) + 2) // 3
+        else:
+            count += 1
+    return count
+
+
+def budget_for(agent_name: Optional[str]) -> int:
+    return AGENT_CONTEXT_BUDGETS.get(agent_name or "", DEFAULT_CONTEXT_BUDGET)
+
+
+@dataclass
+class ContextItem:
+    text: str
+    score: float = 0.5
+    source: str = "semantic"
+    metadata: Dict[str, Any] = field(default_factory=dict)
+    tokens: int = 0
+
+    @property
+    def value(self) -> float:
+        return self.score * TIER_WEIGHTS.get(self.source, 0.8)
+
+
+@dataclass
+class PackedContext:
+    items: List[ContextItem] = field(default_factory=list)
+    tokens: int = 0
+    budget: int = 0
+    dropped_duplicates: int = 0
+    dropped_budget: int = 0
+
+    @property
+    def texts(self) -> List[str]:
+        return [i.text for i in self.items]
+
+
+def _word_set(text: str) -> frozenset:
+    return frozenset(_WORD_RE.findall(text.casefold()))
+
+
+def _is_duplicate(a: frozenset, b: frozenset) -> bool:
+    if not a or not b:
+        return False  # Nothing to compare: never treat wordless snippets as duplicates
+    overlap = len(a & b)
+    # Containment catches a short snippet repeated inside a longer one
+    return overlap / min(len(a), len(b)) >= DUPLICATE_THRESHOLD
+
+
+def _trim(text: str, max_tokens: int) -> str:
+    """Cut text to roughly max_tokens at a word boundary."""
+    words = text.split()
+    out, used = [], 0
+    for w in words:
+        t = estimate_tokens(w)
+        if used + t > max_tokens - 1:  # Leave room for the ellipsis
+            break
+        out.append(w)
+        used += t
+    return " ".join(out) + " …" if out else ""
+
+
+def pack_context(
+    items: Sequence[ContextItem],
+    budget: int = DEFAULT_CONTEXT_BUDGET,
+    max_items: Optional[int] = None,
+    allow_trim: bool = True,
+) -> PackedContext:
+    """
+    Choose items under the token budget, highest value first.
+
+    Returns items in selection order (best first).
+    """
+    packed = PackedContext(budget=budget)
+    kept_words: List[frozenset] = []
+
+    for item in sorted(items, key=lambda i: i.value, reverse=True):
+        text = (item.text or "").strip()
+        if not text:
+            continue
+        words = _word_set(text)
+        if any(_is_duplicate(words, k) for k in kept_words):
+            packed.dropped_duplicates += 1
+            continue
+        if max_items is not None and len(packed.items) >= max_items:
+            packed.dropped_budget += 1
+            continue
+
+        tokens = estimate_tokens(text) + ITEM_OVERHEAD_TOKENS
+        remaining = budget - packed.tokens
+        if tokens > remaining:
+            if allow_trim and remaining >= MIN_TRIM_TOKENS:
+                text = _trim(text, remaining - ITEM_OVERHEAD_TOKENS)
+                tokens = estimate_tokens(text) + ITEM_OVERHEAD_TOKENS
+            else:
+                packed.dropped_budget += 1
+                continue
+            if not text:
+                packed.dropped_budget += 1
+                continue
+
+        packed.items.append(ContextItem(
+            text=text, score=item.score, source=item.source,
+            metadata=item.metadata, tokens=tokens,
+        ))
+        packed.tokens += tokens
+        kept_words.append(words)
+
+    return packed
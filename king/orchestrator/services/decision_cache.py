@@ -0,0 +1,128 @@
+"""
+Decision Cache - Short-TTL cache of /king/decide verdicts per user.
+
+Users resend the same message (retries, edits, double taps); a repeat is
+served from memory instead of re-running the Mem0 search, the LLM memory
+selection and routing.
+
+Key: (user_id, message_hash, registry_version, memory_epoch)
+- message_hash: case, spacing and sentence punctuation normalized away
+- registry_version: get_registry_cache().version, so reloads miss
+- memory_epoch: sent by the gateway, bumped on every memory write it makes
+
+Orchestrator-side memory writes (services.mem0_client) call
+notify_memory_write, which drops the user's entries. The Guardian still
+runs on every raw message before the lookup.
+"""
+import os
+import re
+import time
+import hashlib
+import threading
+import unicodedata
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional, Set, Tuple
+
+DECISION_CACHE_TTL_SECONDS = float(os.getenv("DECISION_CACHE_TTL_SECONDS", "30"))
+DECISION_CACHE_MAX_ENTRIES = 5000
+
+# Sentence punctuation before a space or the end; symbols ("c++", "c#") and
+# every script's letters are kept as-is. Mirrors gateway memory/resolution_cache.
+_PUNCTUATION_RE = re.compile(r"[.,!?;:…。、！？，]+(?=\s|$)")
+_SPACE_RE = re.compile(r"\s+")
+
+
+def normalize_text(text: str) -> str:
+    """NFKC + casefold, sentence punctuation dropped, whitespace collapsed."""
+    text = unicodedata.normalize("NFKC", text or "").casefold()
+    return _SPACE_RE.sub(" ", _PUNCTUATION_RE.sub("", text)).strip()
+
+
+def message_hash(message: str) -> str:
+    """Hash of the message with case, spacing and sentence punctuation normalized away."""
+    return hashlib.sha1(normalize_text(message).encode("utf-8")).hexdigest()[:16]
+
+
+def decision_key(user_id: str, message: str, registry_version: int, memory_epoch: Optional[str]) -> Tuple:
+    return (user_id, message_hash(message), registry_version, memory_epoch or "")
+
+
+class DecisionCache:
+    """Thread-safe LRU with per-entry TTL and per-user invalidation."""
+
+    def __init__(self, ttl_seconds: float = DECISION_CACHE_TTL_SECONDS, max_entries: int = DECISION_CACHE_MAX_ENTRIES):
+        self.ttl = ttl_seconds
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[Hashable, Tuple[float, Any, str]]" = OrderedDict()
+        self._by_user: Dict[str, Set[Hashable]] = {}
+        self._stats = {"hits": 0, "misses": 0, "invalidations": 0, "evictions": 0}
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] < time.monotonic():
+                if entry is not None:
+                    self._remove(key)
+                self._stats["misses"] += 1
+                return None
+            self._entries.move_to_end(key)
+            self._stats["hits"] += 1
+            return entry[1]
+
+    def put(self, key: Hashable, value: Any, user_id: str) -> None:
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (time.monotonic() + self.ttl, value, user_id)
+            self._by_user.setdefault(user_id, set()).add(key)
+            while len(self._entries) > self.max_entries:
+                self._remove(next(iter(self._entries)))
+                self._stats["evictions"] += 1
+
+    def invalidate_user(self, user_id: Optional[str]) -> int:
+        """Drop the user's entries (all entries if user_id is None)."""
+        with self._lock:
+            if user_id is None:
+                dropped = len(self._entries)
+                self._entries.clear()
+                self._by_user.clear()
+            else:
+                keys = self._by_user.pop(user_id, set())
+                for key in keys:
+                    self._entries.pop(key, None)
+                dropped = len(keys)
+            if dropped:
+                self._stats["invalidations"] += 1
+            return dropped
+
+    def _remove(self, key: Hashable) -> None:
+        entry = self._entries.pop(key, None)
+        if entry:
+            keys = self._by_user.get(entry[2])
+            if keys:
+                keys.discard(key)
+                if not keys:
+                    del self._by_user[entry[2]]
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self._stats["hits"] + self._stats["misses"]
+            return {
+                **self._stats,
+                "entries": len(self._entries),
+                "hit_rate": round(self._stats["hits"] / lookups, 4) if lookups else 0.0,
+            }
+
+
+# Process-wide cache shared by /king/decide and the memory write paths
+_decision_cache = DecisionCache()
+
+
+def get_decision_cache() -> DecisionCache:
+    return _decision_cache
+
+
+def notify_memory_write(user_id: Optional[str]) -> None:
+    """Called by memory write paths; user_id None means 'unknown user'."""
+    _decision_cache.invalidate_user(user_id)
@@ -260,9 +260,11 @@ def apply_proposal_mutation(proposal_id: str, approved_by: str) -> Dict[str, Any
         "applied_at": datetime.utcnow().isoformat()
     }).eq("id", proposal_id).execute()
 
-    # 8. Hot reload agents
+    # 8. Hot reload agents and drop cached registry/specs
     from agents.agent_factory import AgentFactory
+    from services.registry_cache import get_registry_cache
     reload_result = AgentFactory.reload()
+    get_registry_cache().invalidate(f"dna_mutation:{target_role}")
 
     return {
         "version": version,
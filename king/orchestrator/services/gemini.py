@@ -1,24 +1,66 @@
+"""
+KING Gemini Access - One process-wide, pooled Gemini client for the orchestrator.
+
+- Shared keep-alive HTTP/2 connection (HTTP/1.1 pool if `h2` is missing)
+- Retry with jittered exponential backoff on 429/5xx and transport
+  errors; a Retry-After header sets the minimum wait (and a wait beyond
+  GEMINI_RETRY_AFTER_MAX_SECONDS fails fast instead of sleeping)
+- Adaptive concurrency limit across all callers: grows by one slot per
+  `limit` successes, halves on 429/503 (at most once per cooldown);
+  backoff sleeps don't hold a slot
+- Latency histograms and rolling percentiles (/metrics/gemini)
+
+All requests run on one event loop in a background thread, so
+call_gemini (sync shim for threads and legacy callers) and acall_gemini
+(request handlers) share the same connection, limit and metrics.
+"""
 import os
+import time
+import random
+import asyncio
+import logging
+import threading
+from bisect import bisect_left
+from collections import deque
+from concurrent.futures import Future
+from email.utils import parsedate_to_datetime
+from typing import Any, Awaitable, Callable, Coroutine, Deque, Dict, Optional
+
 import httpx
 from dotenv import load_dotenv
 
+from services.tracing import span
+
 load_dotenv()
 
+logger = logging.getLogger(__name__)
+
 GEMINI_API_KEY = os.getenv("GEMINI_API_KEY", "")
 GEMINI_MODEL = os.getenv("GEMINI_MODEL", "gemini-2.0-flash")
 GEMINI_API_URL = f"https://generativelanguage.googleapis.com/v1beta/models/{GEMINI_MODEL}:generateContent"
+GEMINI_TIMEOUT_SECONDS = 30.0
+GEMINI_MAX_CONNECTIONS = int(os.getenv("GEMINI_MAX_CONNECTIONS", "32"))
+GEMINI_MAX_CONCURRENCY = int(os.getenv("GEMINI_MAX_CONCURRENCY", "16"))  # Starting limit
+GEMINI_MIN_CONCURRENCY = 2
+GEMINI_MAX_RETRIES = int(os.getenv("GEMINI_MAX_RETRIES", "4"))
+GEMINI_BACKOFF_BASE_SECONDS = 0.5
+GEMINI_BACKOFF_MAX_SECONDS = 8.0
+GEMINI_RETRY_AFTER_MAX_SECONDS = 30.0
+GEMINI_OVERLOAD_COOLDOWN_SECONDS = 1.0
 
+RETRYABLE_STATUS = {429, 500, 502, 503, 504}
+OVERLOAD_STATUS = {429, 503}
+LATENCY_BUCKETS_MS = (100, 250, 500, 1000, 2500, 5000, 10000, 30000)
+
+try:
+    import h2  # noqa: F401  (httpx[http2])
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
 
-def call_gemini(prompt: str) -> str:
-    """
-    Call Gemini API and return raw text response.
-    Raises exception on failure.
-    """
-    if not GEMINI_API_KEY:
-        raise ValueError("GEMINI_API_KEY not set")
 
-    headers = {"Content-Type": "application/json"}
-    payload = {
+def _build_payload(prompt: str) -> Dict[str, Any]:
+    return {
         "contents": [{"parts": [{"text": prompt}]}],
         "generationConfig": {
             "temperature": 0.2,
@@ -27,15 +69,8 @@ def call_gemini(prompt: str) -> str:
         }
     }
 
-    response = httpx.post(
-        f"{GEMINI_API_URL}?key={GEMINI_API_KEY}",
-        json=payload,
-        headers=headers,
-        timeout=30.0
-    )
-    response.raise_for_status()
 
-    data = response.json()
+def _extract_text(data: Dict[str, Any]) -> str:
     # Extract text from Gemini response structure
     candidates = data.get("candidates", [])
     if not candidates:
@@ -48,3 +83,319 @@ def call_gemini(prompt: str) -> str:
 
     return parts[0].get("text", "")
 
+
+def retry_after_seconds(response: httpx.Response) -> Optional[float]:
+    """Retry-After as seconds (delta-seconds or HTTP-date), None if absent/invalid."""
+    value = response.headers.get("retry-after")
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+def _percentile(sorted_values, pct: float) -> float:
+    if not sorted_values:
+        return 0.0
+    idx = min(len(sorted_values) - 1, int(round(pct / 100 * (len(sorted_values) - 1))))
+    return sorted_values[idx]
+
+
+class GeminiMetrics:
+    """Call/attempt counters, latency histograms and rolling percentiles."""
+
+    def __init__(self, window: int = 1024):
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.errors = 0
+        self.attempts = 0
+        self.retries = 0
+        self.status: Dict[str, int] = {}
+        self._latency = [0] * (len(LATENCY_BUCKETS_MS) + 1)  # End-to-end, incl. queueing and retries
+        self._queue = [0] * (len(LATENCY_BUCKETS_MS) + 1)  # Waiting for a concurrency slot
+        self._recent: Deque[float] = deque(maxlen=window)
+
+    def record_attempt(self, status: str, queue_ms: float) -> None:
+        with self._lock:
+            self.attempts += 1
+            self.status[status] = self.status.get(status, 0) + 1
+            self._queue[bisect_left(LATENCY_BUCKETS_MS, queue_ms)] += 1
+
+    def record_call(self, latency_ms: float, ok: bool, retries: int) -> None:
+        with self._lock:
+            self.calls += 1
+            self.retries += retries
+            if not ok:
+                self.errors += 1
+            self._latency[bisect_left(LATENCY_BUCKETS_MS, latency_ms)] += 1
+            self._recent.append(latency_ms)
+
+    @staticmethod
+    def _histogram(counts) -> Dict[str, int]:
+        labels = [f"le_{b}ms" for b in LATENCY_BUCKETS_MS] + ["inf"]
+        return dict(zip(labels, counts))
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            recent = sorted(self._recent)
+            return {
+                "calls": self.calls,
+                "errors": self.errors,
+                "attempts": self.attempts,
+                "retries": self.retries,
+                "status": dict(self.status),
+                "p50_ms": round(_percentile(recent, 50), 1),
+                "p95_ms": round(_percentile(recent, 95), 1),
+                "p99_ms": round(_percentile(recent, 99), 1),
+                "latency_histogram": self._histogram(self._latency),
+                "queue_histogram": self._histogram(self._queue),
+            }
+
+
+class AdaptiveLimiter:
+    """
+    AIMD concurrency limit for one event loop.
+
+    Additive increase: +1/limit per success (about one slot per `limit`
+    successes). Multiplicative decrease: halve on overload, at most once
+    per cooldown so one burst of 429s counts as a single signal.
+    """
+
+    def __init__(
+        self,
+        initial: int = GEMINI_MAX_CONCURRENCY,
+        minimum: int = GEMINI_MIN_CONCURRENCY,
+        maximum: int = GEMINI_MAX_CONNECTIONS,
+        cooldown: float = GEMINI_OVERLOAD_COOLDOWN_SECONDS,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.minimum = max(1, minimum)
+        self.maximum = max(self.minimum, maximum)
+        self.limit = float(min(max(initial, self.minimum), self.maximum))
+        self.cooldown = cooldown
+        self._clock = clock
+        self._last_decrease = float("-inf")
+        self._cond: Optional[asyncio.Condition] = None
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        self.decreases = 0
+
+    def _condition(self) -> asyncio.Condition:
+        if self._cond is None:
+            self._cond = asyncio.Condition()
+        return self._cond
+
+    async def acquire(self) -> None:
+        cond = self._condition()
+        async with cond:
+            await cond.wait_for(lambda: self.in_flight < int(self.limit))
+            self.in_flight += 1
+            self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+
+    async def release(self) -> None:
+        cond = self._condition()
+        async with cond:
+            self.in_flight -= 1
+            cond.notify_all()
+
+    def on_success(self) -> None:
+        self.limit = min(self.maximum, self.limit + 1 / self.limit)
+
+    def on_overload(self) -> None:
+        now = self._clock()
+        if now - self._last_decrease < self.cooldown:
+            return
+        self._last_decrease = now
+        self.limit = max(float(self.minimum), self.limit / 2)
+        self.decreases += 1
+        logger.warning(f"Gemini overloaded, concurrency limit -> {int(self.limit)}")
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "limit": int(self.limit),
+            "in_flight": self.in_flight,
+            "peak_in_flight": self.peak_in_flight,
+            "decreases": self.decreases,
+        }
+
+
+class GeminiClient:
+    """Async generateContent client; use from a single event loop."""
+
+    def __init__(
+        self,
+        api_key: str = GEMINI_API_KEY,
+        url: str = GEMINI_API_URL,
+        max_retries: int = GEMINI_MAX_RETRIES,
+        backoff_base: float = GEMINI_BACKOFF_BASE_SECONDS,
+        limiter: Optional[AdaptiveLimiter] = None,
+        metrics: Optional[GeminiMetrics] = None,
+        transport: Optional[httpx.AsyncBaseTransport] = None,
+        sleep: Callable[[float], Awaitable[None]] = asyncio.sleep,
+    ):
+        self.api_key = api_key
+        self.url = url
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.limiter = limiter or AdaptiveLimiter()
+        self.metrics = metrics or GeminiMetrics()
+        self.http2 = HTTP2_AVAILABLE and transport is None
+        self._transport = transport
+        self._sleep = sleep
+        self._client: Optional[httpx.AsyncClient] = None
+
+    def _get_client(self) -> httpx.AsyncClient:
+        # Created on first use inside the client's event loop
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                timeout=GEMINI_TIMEOUT_SECONDS,
+                http2=self.http2,
+                transport=self._transport,
+                limits=httpx.Limits(
+                    max_connections=GEMINI_MAX_CONNECTIONS,
+                    max_keepalive_connections=GEMINI_MAX_CONNECTIONS,
+                ),
+            )
+        return self._client
+
+    def backoff_delay(self, attempt: int, retry_after: Optional[float] = None) -> float:
+        """Full-jitter exponential backoff, never shorter than Retry-After."""
+        delay = random.uniform(0, min(GEMINI_BACKOFF_MAX_SECONDS, self.backoff_base * (2 ** attempt)))
+        return max(delay, retry_after or 0.0)
+
+    async def _attempt(self, prompt: str) -> httpx.Response:
+        queued = time.perf_counter()
+        await self.limiter.acquire()
+        queue_ms = (time.perf_counter() - queued) * 1000
+        try:
+            response = await self._get_client().post(
+                f"{self.url}?key={self.api_key}",
+                json=_build_payload(prompt),
+                headers={"Content-Type": "application/json"}
+            )
+        except httpx.TransportError as e:
+            self.metrics.record_attempt(type(e).__name__, queue_ms)
+            raise
+        finally:
+            await self.limiter.release()
+        self.metrics.record_attempt(str(response.status_code), queue_ms)
+        if response.status_code in OVERLOAD_STATUS:
+            self.limiter.on_overload()
+        elif response.is_success:
+            self.limiter.on_success()
+        return response
+
+    async def generate(self, prompt: str) -> str:
+        """Text of the first candidate. Raises after retries are exhausted."""
+        if not self.api_key:
+            raise ValueError("GEMINI_API_KEY not set")
+
+        start = time.perf_counter()
+        attempt = 0
+        ok = False
+        try:
+            while True:
+                retry_after = None
+                try:
+                    response = await self._attempt(prompt)
+                    if response.status_code not in RETRYABLE_STATUS or attempt >= self.max_retries:
+                        response.raise_for_status()
+                        text = _extract_text(response.json())
+                        ok = True
+                        return text
+                    retry_after = retry_after_seconds(response)
+                    if retry_after is not None and retry_after > GEMINI_RETRY_AFTER_MAX_SECONDS:
+                        response.raise_for_status()  # Not worth holding the request that long
+                    reason = f"HTTP {response.status_code}"
+                except httpx.TransportError as e:
+                    if attempt >= self.max_retries:
+                        raise
+                    reason = type(e).__name__
+
+                delay = self.backoff_delay(attempt, retry_after)
+                attempt += 1
+                logger.warning(f"Gemini {reason}, retry {attempt}/{self.max_retries} in {delay:.2f}s")
+                await self._sleep(delay)
+        finally:
+            self.metrics.record_call((time.perf_counter() - start) * 1000, ok, attempt)
+
+    def stats(self) -> Dict[str, Any]:
+        return {**self.metrics.snapshot(), "concurrency": self.limiter.stats(), "http2": self.http2}
+
+    async def aclose(self) -> None:
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+
+class _LoopThread:
+    """Event loop in a daemon thread; coroutines are submitted from any thread."""
+
+    def __init__(self):
+        self.loop = asyncio.new_event_loop()
+        self.thread = threading.Thread(target=self.loop.run_forever, name="gemini-client", daemon=True)
+        self.thread.start()
+
+    def submit(self, coro: Coroutine) -> Future:
+        return asyncio.run_coroutine_threadsafe(coro, self.loop)
+
+
+# Process-wide client and the loop it runs on (lazy)
+_gemini: Optional[GeminiClient] = None
+_loop_thread: Optional[_LoopThread] = None
+_init_lock = threading.Lock()
+
+
+def get_gemini() -> GeminiClient:
+    global _gemini
+    if _gemini is None:
+        with _init_lock:
+            if _gemini is None:
+                _gemini = GeminiClient()
+    return _gemini
+
+
+def _submit(coro: Coroutine) -> Future:
+    global _loop_thread
+    if _loop_thread is None:
+        with _init_lock:
+            if _loop_thread is None:
+                _loop_thread = _LoopThread()
+    return _loop_thread.submit(coro)
+
+
+def call_gemini(prompt: str) -> str:
+    """
+    Call Gemini API and return raw text response.
+    Raises exception on failure.
+
+    Sync shim: blocks the calling thread (use acall_gemini in handlers).
+    """
+    with span("gemini", kind="client", model=GEMINI_MODEL):
+        return _submit(get_gemini().generate(prompt)).result()
+
+
+async def acall_gemini(prompt: str) -> str:
+    """Async call_gemini (doesn't block the event loop)."""
+    with span("gemini", kind="client", model=GEMINI_MODEL):
+        return await asyncio.wrap_future(_submit(get_gemini().generate(prompt)))
+
+
+def get_gemini_metrics() -> Dict[str, Any]:
+    """Latency/retry/concurrency metrics for the shared client (empty if unused)."""
+    return _gemini.stats() if _gemini else {}
+
+
+async def aclose_gemini() -> None:
+    """Close pooled connections and stop the client loop (orchestrator shutdown)."""
+    global _gemini, _loop_thread
+    if _gemini is not None and _loop_thread is not None:
+        await asyncio.wrap_future(_loop_thread.submit(_gemini.aclose()))
+    if _loop_thread is not None:
+        _loop_thread.loop.call_soon_threadsafe(_loop_thread.loop.stop)
+    _gemini, _loop_thread = None, None
@@ -6,11 +6,13 @@ Protects the system from:
 - LLM failures
 - Abusive patterns
 """
-import re
 import logging
-from typing import Optional, Tuple
+from typing import List, Optional, Tuple
 from uuid import uuid4
 
+from services.safety_scanner import SafetyRule, SafetyScanner, Violation
+from services.tracing import current_trace_id
+
 logger = logging.getLogger(__name__)
 
 # Profanity/sensitive content patterns (basic filter - extend as needed)
@@ -27,13 +29,21 @@ BLOCKED_PATTERNS = [
     r"\b(suicide|self.?harm|kill\s+myself)\b",
 ]
 
-# Compiled patterns for performance
-_compiled_patterns = [re.compile(p, re.IGNORECASE) for p in BLOCKED_PATTERNS]
+# Bounded forms used when scanning streamed content (StreamScanner needs a
+# maximum match length); whole-text checks use BLOCKED_PATTERNS as is
+STREAM_BLOCKED_PATTERNS = {
+    BLOCKED_PATTERNS[1]: r"\b(kill|murder|bomb|terror|attack)\s{1,64}(people|person|someone|humans)",
+    BLOCKED_PATTERNS[2]: r"\b(hate|death\s{1,64}to)\s{1,64}\w{1,64}\s{0,64}(people|race|religion)",
+    BLOCKED_PATTERNS[3]: r"\b(hack|crack|steal)\s{1,64}(password|account|credit|bank)",
+    BLOCKED_PATTERNS[4]: r"\b(suicide|self.?harm|kill\s{1,64}myself)\b",
+}
+
+SAFETY_FILTER = "safety_filter"
 
 
 def generate_trace_id() -> str:
-    """Generate unique trace ID for request tracking."""
-    return str(uuid4())
+    """Trace ID for request tracking: the propagated W3C trace if any, else a new UUID."""
+    return current_trace_id() or str(uuid4())
 
 
 def check_content_safety(message: str) -> Tuple[bool, Optional[str]]:
@@ -43,18 +53,18 @@ def check_content_safety(message: str) -> Tuple[bool, Optional[str]]:
     Returns:
         Tuple of (is_safe, reason_if_blocked)
     """
-    if not message:
-        return True, None
-    
-    for i, pattern in enumerate(_compiled_patterns):
-        if pattern.search(message):
-            # Log for audit (without exposing the content)
-            logger.warning(f"Content blocked by pattern {i}")
-            return False, _get_block_reason(i)
-    
+    violation = CONTENT_SCANNER.first(message)
+    if violation:
+        return False, _log_block(violation)
     return True, None
 
 
+def _log_block(violation: Violation) -> str:
+    # Log for audit (without exposing the content)
+    logger.warning(f"Content blocked by pattern {BLOCKED_PATTERNS.index(violation.pattern)}")
+    return violation.reason
+
+
 def _get_block_reason(pattern_index: int) -> str:
     """Get user-friendly reason for content block."""
     reasons = {
@@ -67,6 +77,14 @@ def _get_block_reason(pattern_index: int) -> str:
     return reasons.get(pattern_index, "I can't process that request.")
 
 
+# Content rules in pattern order; scanned in one pass instead of one search per pattern
+CONTENT_RULES: List[SafetyRule] = [
+    SafetyRule(pattern, SAFETY_FILTER, _get_block_reason(i), STREAM_BLOCKED_PATTERNS.get(pattern))
+    for i, pattern in enumerate(BLOCKED_PATTERNS)
+]
+CONTENT_SCANNER = SafetyScanner(CONTENT_RULES)
+
+
 def safe_llm_response(
     call_fn,
     *args,
@@ -110,8 +128,18 @@ class RequestGuard:
         self.is_safe = True
         self.block_reason = None
         
-        # Run safety check
-        self.is_safe, self.block_reason = check_content_safety(message)
+        # Run safety check (subclasses may scan extra rules in the same pass).
+        # Any safety filter hit blocks, wherever it is relative to other rules' hits.
+        self.violations: List[Violation] = self._scanner().all(message) if message else []
+        blocking = [v for v in self.violations if v.category == SAFETY_FILTER]
+        self.violation: Optional[Violation] = (blocking or self.violations or [None])[0]
+        if blocking:
+            self.is_safe = False
+            self.block_reason = _log_block(self.violation)
+    
+    def _scanner(self) -> SafetyScanner:
+        """Scanner run over the message at construction."""
+        return CONTENT_SCANNER
     
     def get_blocked_response(self) -> dict:
         """Get response for blocked content."""
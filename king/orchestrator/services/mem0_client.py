@@ -0,0 +1,266 @@
+"""
+KING Mem0 Access - One process-wide, pooled Mem0 client for the orchestrator.
+
+Mirrors gateway/memory/mem0_client.py (services deploy separately, so each
+keeps its own copy). services.mem0_tool and every other orchestrator module
+go through get_mem0() instead of constructing their own MemoryClient.
+
+- Shared keep-alive connection pool
+- Sync + async interface (async runs the pooled client in a worker thread)
+- Global concurrency cap across all callers
+- Retry with jittered exponential backoff on transient errors
+- Per-operation latency/error metrics
+- Circuit breaker, adaptive timeout and hedged reads (services.resilience);
+  reads fall back to the last good result while Mem0 is unavailable
+- Writes invalidate the user's cached /king/decide verdicts
+"""
+import os
+import time
+import random
+import asyncio
+import logging
+import threading
+from collections import deque
+from typing import Any, Callable, Deque, Dict, Optional
+
+import httpx
+
+from services.resilience import Dependency, get_dependency
+from services.decision_cache import notify_memory_write
+
+logger = logging.getLogger(__name__)
+
+MEM0_MAX_CONCURRENCY = int(os.getenv("MEM0_MAX_CONCURRENCY", "16"))
+MEM0_MAX_RETRIES = int(os.getenv("MEM0_MAX_RETRIES", "2"))
+MEM0_BACKOFF_BASE_SECONDS = 0.2
+MEM0_BACKOFF_MAX_SECONDS = 2.0
+MEM0_TIMEOUT_SECONDS = float(os.getenv("MEM0_TIMEOUT_SECONDS", "30"))
+
+# Transient Mem0 SDK errors (matched by name: class paths differ across mem0ai versions)
+_RETRYABLE_ERROR_NAMES = {"NetworkError", "RateLimitError"}
+
+
+def _is_retryable(exc: Exception) -> bool:
+    if isinstance(exc, (httpx.TransportError, TimeoutError, ConnectionError)):
+        return True
+    return type(exc).__name__ in _RETRYABLE_ERROR_NAMES
+
+
+def _percentile(sorted_values, pct: float) -> float:
+    if not sorted_values:
+        return 0.0
+    idx = min(len(sorted_values) - 1, int(round(pct / 100 * (len(sorted_values) - 1))))
+    return sorted_values[idx]
+
+
+class Mem0Metrics:
+    """Rolling per-operation latency and error counters."""
+
+    def __init__(self, window: int = 1024):
+        self._window = window
+        self._lock = threading.Lock()
+        self._ops: Dict[str, Dict[str, Any]] = {}
+
+    def record(self, op: str, latency_ms: float, ok: bool, retries: int = 0) -> None:
+        with self._lock:
+            stats = self._ops.setdefault(op, {
+                "calls": 0, "errors": 0, "retries": 0,
+                "latencies": deque(maxlen=self._window),
+            })
+            stats["calls"] += 1
+            stats["retries"] += retries
+            if not ok:
+                stats["errors"] += 1
+            stats["latencies"].append(latency_ms)
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        with self._lock:
+            result = {}
+            for op, stats in self._ops.items():
+                latencies = sorted(stats["latencies"])
+                result[op] = {
+                    "calls": stats["calls"],
+                    "errors": stats["errors"],
+                    "retries": stats["retries"],
+                    "p50_ms": round(_percentile(latencies, 50), 1),
+                    "p95_ms": round(_percentile(latencies, 95), 1),
+                    "p99_ms": round(_percentile(latencies, 99), 1),
+                }
+            return result
+
+
+class Mem0Client:
+    """
+    Wrapper around a single MemoryClient.
+
+    Exposes the same method names the SDK uses (search, add, get_all, get,
+    delete, batch_delete) plus `a`-prefixed async variants.
+    """
+
+    def __init__(
+        self,
+        client: Any,
+        max_concurrency: int = MEM0_MAX_CONCURRENCY,
+        max_retries: int = MEM0_MAX_RETRIES,
+        backoff_base: float = MEM0_BACKOFF_BASE_SECONDS,
+        metrics: Optional[Mem0Metrics] = None,
+        dependency: Optional[Dependency] = None,
+    ):
+        self._client = client
+        self._semaphore = threading.BoundedSemaphore(max_concurrency)
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.metrics = metrics or Mem0Metrics()
+        self.dependency = dependency or Dependency("mem0")
+
+    @property
+    def raw(self) -> Any:
+        """Underlying SDK client (for calls not wrapped here)."""
+        return self._client
+
+    def _call(self, op: str, fn: Callable, *args, **kwargs) -> Any:
+        attempt = 0
+        start = time.perf_counter()
+        with self._semaphore:
+            while True:
+                try:
+                    result = fn(*args, **kwargs)
+                    self.metrics.record(op, (time.perf_counter() - start) * 1000, True, attempt)
+                    return result
+                except Exception as e:
+                    if attempt >= self.max_retries or not _is_retryable(e):
+                        self.metrics.record(op, (time.perf_counter() - start) * 1000, False, attempt)
+                        raise
+                    delay = min(MEM0_BACKOFF_MAX_SECONDS, self.backoff_base * (2 ** attempt))
+                    delay *= random.uniform(0.5, 1.0)  # jitter
+                    attempt += 1
+                    logger.warning(f"Mem0 {op} failed ({e}), retry {attempt}/{self.max_retries} in {delay:.2f}s")
+                    time.sleep(delay)
+
+    # Only search is latency-homogeneous enough for adaptive timeouts and
+    # hedging; paged get_all/get get the breaker and stale fallback only.
+    _ADAPTIVE_READS = {"search"}
+
+    def _read(self, op: str, *args, **kwargs) -> Any:
+        fn = getattr(self._client, op)
+        adaptive = op in self._ADAPTIVE_READS
+        return self.dependency.call_sync(
+            lambda: self._call(op, fn, *args, **kwargs),
+            hedge=adaptive, timeout=adaptive, stale_key=_stale_key(op, args, kwargs)
+        )
+
+    async def _aread(self, op: str, *args, **kwargs) -> Any:
+        fn = getattr(self._client, op)
+        adaptive = op in self._ADAPTIVE_READS
+        return await self.dependency.call(
+            lambda: asyncio.to_thread(self._call, op, fn, *args, **kwargs),
+            hedge=adaptive, timeout=adaptive, stale_key=_stale_key(op, args, kwargs)
+        )
+
+    def _write(self, op: str, *args, **kwargs) -> Any:
+        # Breaker only: writes are neither hedged nor cut short
+        fn = getattr(self._client, op)
+        return self.dependency.call_sync(lambda: self._call(op, fn, *args, **kwargs), timeout=False)
+
+    # --- Sync interface ---
+
+    def search(self, *args, **kwargs) -> Any:
+        return self._read("search", *args, **kwargs)
+
+    def add(self, *args, **kwargs) -> Any:
+        try:
+            return self._write("add", *args, **kwargs)
+        finally:
+            notify_memory_write(kwargs.get("user_id"))
+
+    def get_all(self, *args, **kwargs) -> Any:
+        return self._read("get_all", *args, **kwargs)
+
+    def get(self, *args, **kwargs) -> Any:
+        return self._read("get", *args, **kwargs)
+
+    def delete(self, *args, **kwargs) -> Any:
+        try:
+            return self._write("delete", *args, **kwargs)
+        finally:
+            notify_memory_write(None)  # Owner unknown from a memory id
+
+    def batch_delete(self, *args, **kwargs) -> Any:
+        try:
+            return self._write("batch_delete", *args, **kwargs)
+        finally:
+            notify_memory_write(None)
+
+    # --- Async interface ---
+
+    async def asearch(self, *args, **kwargs) -> Any:
+        return await self._aread("search", *args, **kwargs)
+
+    async def aadd(self, *args, **kwargs) -> Any:
+        return await asyncio.to_thread(self.add, *args, **kwargs)
+
+    async def aget_all(self, *args, **kwargs) -> Any:
+        return await self._aread("get_all", *args, **kwargs)
+
+    async def aget(self, *args, **kwargs) -> Any:
+        return await self._aread("get", *args, **kwargs)
+
+    async def adelete(self, *args, **kwargs) -> Any:
+        return await asyncio.to_thread(self.delete, *args, **kwargs)
+
+    async def abatch_delete(self, *args, **kwargs) -> Any:
+        return await asyncio.to_thread(self.batch_delete, *args, **kwargs)
+
+
+def _stale_key(op: str, args: tuple, kwargs: Dict[str, Any]) -> str:
+    return repr((op, args, sorted(kwargs.items())))
+
+
+# Lazy process-wide singleton
+_mem0 = None
+_mem0_lock = threading.Lock()
+
+
+def _build_sdk_client(api_key: str) -> Any:
+    from mem0 import MemoryClient
+
+    pool = httpx.Client(
+        timeout=MEM0_TIMEOUT_SECONDS,
+        limits=httpx.Limits(
+            max_connections=MEM0_MAX_CONCURRENCY,
+            max_keepalive_connections=MEM0_MAX_CONCURRENCY,
+        ),
+    )
+    try:
+        return MemoryClient(api_key=api_key, client=pool)
+    except TypeError:
+        # Older mem0ai without custom client support
+        pool.close()
+        return MemoryClient(api_key=api_key)
+
+
+def get_mem0() -> Optional[Mem0Client]:
+    """Get the shared Mem0 client, or None if Mem0 is not configured."""
+    global _mem0
+    if _mem0 is None:
+        with _mem0_lock:
+            if _mem0 is None:
+                api_key = os.getenv("MEM0_API_KEY")
+                if api_key:
+                    try:
+                        _mem0 = Mem0Client(
+                            _build_sdk_client(api_key.strip()),
+                            dependency=get_dependency("mem0")
+                        )
+                    except Exception as e:
+                        print(f"Warning: Failed to init Mem0 client: {e}")
+                        _mem0 = False
+                else:
+                    print("Warning: MEM0_API_KEY is not set. Memory functions will be disabled.")
+                    _mem0 = False
+    return _mem0 if _mem0 else None
+
+
+def get_mem0_metrics() -> Dict[str, Dict[str, Any]]:
+    """Latency/error metrics for the shared client (empty if not initialised)."""
+    return _mem0.metrics.snapshot() if _mem0 else {}
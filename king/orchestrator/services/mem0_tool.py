@@ -13,24 +13,19 @@ import os
 import logging
 from typing import Optional, List, Dict, Any
 
-logger = logging.getLogger(__name__)
+from services.mem0_client import get_mem0
+from services.resilience import DependencyUnavailable
+from services.context_packer import ContextItem, pack_context, budget_for
 
-# Lazy initialization to avoid import errors if mem0ai not installed
-_client = None
+logger = logging.getLogger(__name__)
 
 
 def _get_client():
-    """Get or create Mem0 client (lazy initialization)."""
-    global _client
-    if _client is None:
-        api_key = os.getenv("MEM0_API_KEY")
-        if not api_key:
-            raise ValueError("MEM0_API_KEY environment variable not set")
-        
-        from mem0 import MemoryClient
-        _client = MemoryClient(api_key=api_key)
-        logger.info("Mem0 client initialized")
-    return _client
+    """Get the shared, pooled Mem0 client (services.mem0_client)."""
+    client = get_mem0()
+    if client is None:
+        raise ValueError("MEM0_API_KEY environment variable not set")
+    return client
 
 
 def add_memory(
@@ -93,7 +88,8 @@ def search_memory(
         enable_graph: Include graph relations in response
 
     Returns:
-        Dict with 'memories' list and optional 'relations' list
+        Dict with 'memories' list and optional 'relations' list;
+        'degraded' is True when the search failed and the lists are empty fallbacks
     """
     try:
         client = _get_client()
@@ -103,17 +99,54 @@ def search_memory(
             filters["agent_id"] = agent_id
 
         result = client.search(query, filters=filters, limit=limit, enable_graph=enable_graph)
+        return _split_search_result(result, user_id)
 
-        # Extract memories and relations
-        memories = result.get("results", []) if isinstance(result, dict) else result
-        relations = result.get("relations", []) if isinstance(result, dict) else []
+    except DependencyUnavailable:
+        # Mem0 circuit open and nothing cached for this query: degrade immediately
+        logger.warning(f"Mem0 unavailable, searching without memory for user={user_id}")
+        return _degraded_search()
+    except Exception as e:
+        logger.error(f"Failed to search memory: {e}")
+        return _degraded_search()
 
-        logger.info(f"Memory search for user={user_id}: {len(memories)} memories, {len(relations)} relations")
-        return {"memories": memories, "relations": relations}
 
+async def asearch_memory(
+    query: str,
+    user_id: str,
+    agent_id: Optional[str] = None,
+    limit: int = 5,
+    enable_graph: bool = True
+) -> Dict[str, Any]:
+    """Async search_memory for request handlers (same return shape)."""
+    try:
+        client = _get_client()
+
+        filters = {"user_id": user_id}
+        if agent_id:
+            filters["agent_id"] = agent_id
+
+        result = await client.asearch(query, filters=filters, limit=limit, enable_graph=enable_graph)
+        return _split_search_result(result, user_id)
+
+    except DependencyUnavailable:
+        logger.warning(f"Mem0 unavailable, searching without memory for user={user_id}")
+        return _degraded_search()
     except Exception as e:
         logger.error(f"Failed to search memory: {e}")
-        return {"memories": [], "relations": []}
+        return _degraded_search()
+
+
+def _degraded_search() -> Dict[str, Any]:
+    return {"memories": [], "relations": [], "degraded": True}
+
+
+def _split_search_result(result: Any, user_id: str) -> Dict[str, Any]:
+    # Extract memories and relations
+    memories = result.get("results", []) if isinstance(result, dict) else result
+    relations = result.get("relations", []) if isinstance(result, dict) else []
+
+    logger.info(f"Memory search for user={user_id}: {len(memories)} memories, {len(relations)} relations")
+    return {"memories": memories, "relations": relations}
 
 
 def get_all_memories(user_id: str, limit: int = 100) -> List[Dict[str, Any]]:
@@ -155,29 +188,55 @@ def select_memories(
         user_id: User identifier for context
 
     Returns:
-        Dict with 'approved' list, 'rejected' list, 'confidence', and counts
+        Dict with 'approved' list, 'rejected' list, 'confidence', and counts;
+        'degraded' is True when the selector failed and every memory was passed through
     """
     if not raw_memories:
-        return {"approved": [], "rejected": [], "confidence": 1.0, "memory_used": 0, "memory_rejected": 0}
+        return _empty_selection()
 
     # Import here to avoid circular dependency
     from agents.agent_runner import AgentRunner
 
+    candidate_texts = _candidate_texts(raw_memories)
+    response = AgentRunner().run(
+        role="memory_selector",
+        input_data={"query": query, "candidate_memories": candidate_texts}
+    )
+    return _selection_from_response(response, candidate_texts, user_id)
+
+
+async def aselect_memories(
+    query: str,
+    raw_memories: List[Dict[str, Any]],
+    user_id: str
+) -> Dict[str, Any]:
+    """Async select_memories: awaits the memory_selector's Gemini call."""
+    if not raw_memories:
+        return _empty_selection()
+
+    from agents.agent_runner import AgentRunner
+
+    candidate_texts = _candidate_texts(raw_memories)
+    response = await AgentRunner().arun(
+        role="memory_selector",
+        input_data={"query": query, "candidate_memories": candidate_texts}
+    )
+    return _selection_from_response(response, candidate_texts, user_id)
+
+
+def _empty_selection() -> Dict[str, Any]:
+    return {"approved": [], "rejected": [], "confidence": 1.0, "memory_used": 0, "memory_rejected": 0}
+
+
+def _candidate_texts(raw_memories: List[Dict[str, Any]]) -> List[str]:
     # Extract memory text for selector input
-    candidate_texts = [
+    return [
         m.get("memory", m.get("content", str(m)))
         for m in raw_memories
     ]
 
-    runner = AgentRunner()
-    response = runner.run(
-        role="memory_selector",
-        input_data={
-            "query": query,
-            "candidate_memories": candidate_texts
-        }
-    )
 
+def _selection_from_response(response, candidate_texts: List[str], user_id: str) -> Dict[str, Any]:
     if response.status != "success" or not response.output:
         logger.warning(f"Memory selector failed for user={user_id}, passing all memories")
         return {
@@ -185,7 +244,8 @@ def select_memories(
             "rejected": [],
             "confidence": 0.0,
             "memory_used": len(candidate_texts),
-            "memory_rejected": 0
+            "memory_rejected": 0,
+            "degraded": True
         }
 
     approved = response.output.get("approved_memories", [])
@@ -207,7 +267,8 @@ def enrich_prompt_with_memory(
     prompt: str,
     user_id: str,
     agent_id: Optional[str] = None,
-    max_memories: int = 3
+    max_memories: int = 3,
+    max_tokens: Optional[int] = None
 ) -> str:
     """
     Enrich a prompt with relevant memories + graph relationships.
@@ -217,6 +278,7 @@ def enrich_prompt_with_memory(
         user_id: User identifier
         agent_id: Optional agent filter
         max_memories: Max memories to include
+        max_tokens: Token budget for injected context (default: agent's budget)
 
     Returns:
         Enriched prompt with memory context and entity relationships
@@ -228,21 +290,33 @@ def enrich_prompt_with_memory(
     if not memories and not relations:
         return prompt
 
+    # Memories and relations compete for one budget, best first
+    items = [
+        ContextItem(text=m.get('memory', m.get('content', '')), score=m.get("score", 0.5), source="semantic")
+        for m in memories
+    ] + [
+        ContextItem(
+            text=f"{r.get('source')} --[{r.get('relationship')}]--> {r.get('target')}",
+            score=r.get("score", 0.5), source="relation"
+        )
+        for r in relations
+    ]
+    packed = pack_context(items, budget=max_tokens or budget_for(agent_id), allow_trim=False)
+
     sections = []
 
     # Add memories
-    if memories:
-        memory_lines = [f"- {m.get('memory', m.get('content', ''))}" for m in memories]
+    memory_lines = [f"- {i.text}" for i in packed.items if i.source == "semantic"]
+    if memory_lines:
         sections.append("## Relevant Context from Memory\n" + "\n".join(memory_lines))
 
     # Add graph relationships
-    if relations:
-        rel_lines = [
-            f"- {r.get('source')} --[{r.get('relationship')}]--> {r.get('target')}"
-            for r in relations
-        ]
+    rel_lines = [f"- {i.text}" for i in packed.items if i.source == "relation"]
+    if rel_lines:
         sections.append("## Entity Relationships\n" + "\n".join(rel_lines))
 
+    if not sections:
+        return prompt
+
     enriched = "\n\n".join(sections) + f"\n\n## Current Request\n{prompt}"
     return enriched
-
@@ -0,0 +1,178 @@
+"""
+Registry Cache - In-memory agent_registry / agent_specs snapshot.
+
+Routing reads agents and specs from memory instead of querying Supabase
+per decision:
+
+- One snapshot of both tables, loaded together (single-flight)
+- Background refresh every REGISTRY_REFRESH_SECONDS; a stale snapshot is
+  served while a refresh runs, and kept if the refresh fails
+- `version` increments whenever the content changes or the cache is
+  invalidated, so callers can key derived caches on it
+- invalidate() from /meta/reload, rollback and DNA mutation drops the
+  snapshot; the next read reloads it
+"""
+import os
+import time
+import json
+import asyncio
+import hashlib
+import logging
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+REGISTRY_REFRESH_SECONDS = float(os.getenv("REGISTRY_REFRESH_SECONDS", "60"))
+
+Loader = Callable[[], Awaitable[Tuple[Dict[str, str], Dict[str, Dict[str, Any]]]]]
+
+
+async def _load_from_supabase() -> Tuple[Dict[str, str], Dict[str, Dict[str, Any]]]:
+    from services.supabase_client import get_async_supabase
+
+    client = await get_async_supabase()
+    registry, specs = await asyncio.gather(
+        client.table("agent_registry")
+            .select("agent_name, service_url")
+            .eq("status", "active")
+            .execute(),
+        client.table("agent_specs")
+            .select("*")
+            .eq("is_active", True)
+            .execute(),
+    )
+    agents = {r["agent_name"]: r["service_url"] for r in (registry.data or [])}
+    spec_map = {s["agent_name"]: s for s in (specs.data or [])}
+    return agents, spec_map
+
+
+@dataclass
+class RegistrySnapshot:
+    agents: Dict[str, str] = field(default_factory=dict)
+    specs: Dict[str, Dict[str, Any]] = field(default_factory=dict)
+    digest: str = ""
+    loaded_at: float = 0.0
+
+
+def _digest(agents: Dict[str, str], specs: Dict[str, Dict[str, Any]]) -> str:
+    payload = json.dumps([agents, specs], sort_keys=True, default=str)
+    return hashlib.sha1(payload.encode("utf-8")).hexdigest()[:12]
+
+
+class RegistryCache:
+    """Versioned, background-refreshed registry/spec snapshot."""
+
+    def __init__(self, refresh_seconds: float = REGISTRY_REFRESH_SECONDS, loader: Optional[Loader] = None):
+        self.refresh_seconds = refresh_seconds
+        self._loader = loader or _load_from_supabase
+        self._snapshot: Optional[RegistrySnapshot] = None
+        self._refresh_task: Optional[asyncio.Task] = None
+        self._loop_task: Optional[asyncio.Task] = None
+        self.version = 0
+        self._generation = 0  # Bumped by invalidate(); loads started earlier are discarded
+        self.stats_counters = {"reads": 0, "refreshes": 0, "refresh_errors": 0, "invalidations": 0}
+
+    # --- Reads ---
+
+    async def get_agents(self) -> Dict[str, str]:
+        """Active agents -> service URL."""
+        return (await self._current()).agents
+
+    async def get_spec(self, agent_name: str) -> Optional[Dict[str, Any]]:
+        """Active spec row for the agent, or None."""
+        return (await self._current()).specs.get(agent_name)
+
+    async def get_specs(self) -> Dict[str, Dict[str, Any]]:
+        """All active spec rows by agent name."""
+        return (await self._current()).specs
+
+    async def _current(self) -> RegistrySnapshot:
+        self.stats_counters["reads"] += 1
+        snapshot = self._snapshot
+        if snapshot is None:
+            # Cold or invalidated: wait for the (shared) load
+            return await asyncio.shield(self._refresh())
+        if time.monotonic() - snapshot.loaded_at >= self.refresh_seconds:
+            self._refresh()  # Serve stale, revalidate in background
+        return snapshot
+
+    # --- Refresh ---
+
+    def _refresh(self) -> "asyncio.Task[RegistrySnapshot]":
+        if self._refresh_task is None or self._refresh_task.done():
+            self._refresh_task = asyncio.create_task(self._load())
+        return self._refresh_task
+
+    async def _load(self) -> RegistrySnapshot:
+        self.stats_counters["refreshes"] += 1
+        generation = self._generation
+        try:
+            agents, specs = await self._loader()
+        except Exception as e:
+            self.stats_counters["refresh_errors"] += 1
+            logger.error(f"Registry refresh failed: {e}")
+            if self._snapshot is not None:
+                return self._snapshot
+            # Nothing to fall back to: serve empty and retry on next read
+            return RegistrySnapshot(loaded_at=time.monotonic() - self.refresh_seconds)
+
+        snapshot = RegistrySnapshot(agents, specs, _digest(agents, specs), time.monotonic())
+        if generation != self._generation:
+            return snapshot  # Invalidated mid-load: don't install possibly stale data
+        if self._snapshot is None or self._snapshot.digest != snapshot.digest:
+            self.version += 1
+        self._snapshot = snapshot
+        return snapshot
+
+    def invalidate(self, reason: str = "") -> int:
+        """Drop the snapshot so the next read reloads. Returns the new version."""
+        self._snapshot = None
+        self._refresh_task = None
+        self._generation += 1
+        self.version += 1
+        self.stats_counters["invalidations"] += 1
+        logger.info(f"Registry cache invalidated ({reason or 'manual'}), version={self.version}")
+        return self.version
+
+    # --- Background loop ---
+
+    def start(self) -> None:
+        if self._loop_task is None or self._loop_task.done():
+            self._loop_task = asyncio.create_task(self._refresh_loop())
+
+    async def stop(self) -> None:
+        if self._loop_task:
+            self._loop_task.cancel()
+            try:
+                await self._loop_task
+            except asyncio.CancelledError:
+                pass
+            self._loop_task = None
+
+    async def _refresh_loop(self) -> None:
+        while True:
+            await self._refresh()
+            await asyncio.sleep(self.refresh_seconds)
+
+    def stats(self) -> Dict[str, Any]:
+        snapshot = self._snapshot
+        return {
+            **self.stats_counters,
+            "version": self.version,
+            "digest": snapshot.digest if snapshot else None,
+            "agents": len(snapshot.agents) if snapshot else 0,
+            "specs": len(snapshot.specs) if snapshot else 0,
+            "age_s": round(time.monotonic() - snapshot.loaded_at, 1) if snapshot else None,
+        }
+
+
+# Process-wide cache
+_registry_cache: Optional[RegistryCache] = None
+
+
+def get_registry_cache() -> RegistryCache:
+    global _registry_cache
+    if _registry_cache is None:
+        _registry_cache = RegistryCache()
+    return _registry_cache
@@ -11,6 +11,7 @@ import logging
 from agents.agent_runner import AgentRunner
 from agents.base_agent import AgentResponse
 from services.mem0_tool import search_memory
+from services.context_packer import ContextItem, pack_context
 
 logger = logging.getLogger(__name__)
 
@@ -47,27 +48,20 @@ def rag_search(query: str, user_id: str, top_k: int = 3) -> List[Dict[str, Any]]
 def format_docs(raw_docs: List[Dict[str, Any]], max_tokens: int = 1200) -> List[Dict[str, Any]]:
     """
     Formats raw document chunks for agent injection.
-    - Trims content to a token limit
+    - Packs the highest-scoring, non-duplicate chunks under a token budget
     - Ensures proper citation
     """
-    chunks = []
-    current_tokens = 0
-    
-    for doc in raw_docs:
-        content = doc["content"]
-        # Very rough token estimation (4 chars per token)
-        est_tokens = len(content) // 4
-        
-        if current_tokens + est_tokens > max_tokens:
-            break
-            
-        chunks.append({
-            "text": content,
-            "source": doc["source"]
-        })
-        current_tokens += est_tokens
-        
-    return chunks
+    items = [
+        ContextItem(text=doc["content"], score=doc.get("score", 0.0), source="document",
+                    metadata={"source": doc["source"]})
+        for doc in raw_docs
+    ]
+    packed = pack_context(items, budget=max_tokens)
+
+    return [
+        {"text": item.text, "source": item.metadata["source"]}
+        for item in packed.items
+    ]
 
 class RetrievalService:
     def __init__(self):
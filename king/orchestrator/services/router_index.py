@@ -0,0 +1,376 @@
+"""
+Router Index - Weighted phrase index for /king/decide routing.
+
+Each agent gets a weighted set of phrases from:
+- SEED_PHRASES (the original hand-written routing keywords)
+- agent_specs.purpose and agent_registry.description ("Use for: a, b, c")
+- Historical successful routes (frequent words/bigrams from agent_runs inputs)
+
+All phrases go into one Aho-Corasick automaton, so a message is scored
+against every agent in a single pass: O(message length) no matter how many
+agents are registered. The index is rebuilt when the registry cache version
+changes (spec reload, rollback, DNA mutation) and periodically to pick up
+new history.
+"""
+import os
+import re
+import math
+import time
+import asyncio
+import logging
+import unicodedata
+from collections import Counter, defaultdict, deque
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional, Tuple
+
+from services.registry_cache import RegistryCache, get_registry_cache
+
+logger = logging.getLogger(__name__)
+
+ROUTER_REBUILD_SECONDS = float(os.getenv("ROUTER_REBUILD_SECONDS", "3600"))
+ROUTER_HISTORY_LIMIT = int(os.getenv("ROUTER_HISTORY_LIMIT", "2000"))
+
+# Weights per phrase source
+SEED_WEIGHT = 1.0
+USE_FOR_WEIGHT = 1.0
+DESCRIPTION_WORD_WEIGHT = 0.3
+HISTORY_WEIGHT = 0.8
+MULTIWORD_BONUS = 0.5  # Per extra word: "write code" is more specific than "code"
+
+MIN_HISTORY_COUNT = 2
+MAX_HISTORY_PHRASES = 50  # Per agent
+MIN_WORD_LENGTH = 4
+
+# Original _route_task keywords, kept as a baseline for the core agents
+SEED_PHRASES: Dict[str, List[str]] = {
+    "code_writer": ["write code", "generate code", "create function", "implement"],
+    "code_reviewer": ["review code", "check code", "audit code"],
+    "video_planner": ["video", "youtube", "content plan"],
+    "script_writer": ["script", "screenplay", "dialogue"],
+    "memory_selector": ["remember", "recall", "what did", "history"],
+}
+
+_STOPWORDS = frozenset(
+    "a an and are as at be by for from has have how i in is it me my of on or "
+    "please that the this to use used uses using was what when with you your "
+    "can could would should will any all into about also".split()
+)
+# Word characters of any script, plus combining marks (Devanagari/Tamil vowel
+# signs are not \w, and would otherwise split words apart)
+_MARKS = "".join(chr(c) for c in range(0x300, 0x10000) if unicodedata.category(chr(c)).startswith("M"))
+_TOKEN_RE = re.compile(f"[\\w{_MARKS}]+")
+
+
+def _tokens(text: str) -> List[str]:
+    return _TOKEN_RE.findall(unicodedata.normalize("NFKC", text).casefold())
+
+
+def normalize(text: str) -> str:
+    """Casefolded word tokens joined by single spaces, with a leading space."""
+    return " " + " ".join(_tokens(text))
+
+
+def _content_words(text: str) -> List[str]:
+    return [w for w in _tokens(text) if w not in _STOPWORDS and len(w) >= MIN_WORD_LENGTH]
+
+
+class PhraseMatcher:
+    """
+    Aho-Corasick automaton over normalized phrases.
+
+    Phrases are matched at word starts (a phrase " script" matches "scripts"
+    but not "javascript"), overlapping matches included.
+    """
+
+    def __init__(self, phrases: Iterable[str]):
+        self.phrases: List[str] = []
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._out: List[List[int]] = [[]]
+        for phrase in phrases:
+            self._add(phrase)
+        self._link()
+
+    def _add(self, phrase: str) -> None:
+        node = 0
+        for ch in phrase:
+            nxt = self._goto[node].get(ch)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto[node][ch] = nxt
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append([])
+            node = nxt
+        self._out[node].append(len(self.phrases))
+        self.phrases.append(phrase)
+
+    def _link(self) -> None:
+        queue = deque(self._goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for ch, child in self._goto[node].items():
+                queue.append(child)
+                fail = self._fail[node]
+                while fail and ch not in self._goto[fail]:
+                    fail = self._fail[fail]
+                target = self._goto[fail].get(ch, 0)
+                self._fail[child] = target if target != child else 0
+                self._out[child] = self._out[child] + self._out[self._fail[child]]
+
+    def find(self, text: str) -> List[int]:
+        """Ids of phrases occurring in text (each once)."""
+        goto, fail, out = self._goto, self._fail, self._out
+        found: List[int] = []
+        node = 0
+        for ch in text:
+            while node and ch not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(ch, 0)
+            if out[node]:
+                found.extend(out[node])
+        return list(dict.fromkeys(found))
+
+
+@dataclass
+class RouteCandidate:
+    agent: str
+    score: float
+    confidence: float
+    phrases: List[str] = field(default_factory=list)
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "agent": self.agent,
+            "score": round(self.score, 3),
+            "confidence": round(self.confidence, 3),
+            "phrases": self.phrases,
+        }
+
+
+class RouterIndex:
+    """Phrase -> [(agent, weight)] compiled into one PhraseMatcher."""
+
+    def __init__(self, weights: Dict[str, Dict[str, float]], version: int = 0):
+        # weights: agent -> {phrase: weight}
+        postings: Dict[str, List[Tuple[str, float]]] = defaultdict(list)
+        for agent, phrases in weights.items():
+            for phrase, weight in phrases.items():
+                key = normalize(phrase)
+                if key.strip() and weight > 0:
+                    postings[key].append((agent, weight))
+        self._postings = [postings[p] for p in postings]
+        self.matcher = PhraseMatcher(postings.keys())
+        self.agents = sorted(weights)
+        self.version = version
+        self.built_at = time.monotonic()
+
+    def rank(self, message: str, allowed: Optional[Iterable[str]] = None) -> List[RouteCandidate]:
+        """Agents scored against the message, best first."""
+        allowed_set = set(allowed) if allowed is not None else None
+        scores: Dict[str, float] = defaultdict(float)
+        matched: Dict[str, List[str]] = defaultdict(list)
+        for phrase_id in self.matcher.find(normalize(message)):
+            phrase = self.matcher.phrases[phrase_id].strip()
+            for agent, weight in self._postings[phrase_id]:
+                if allowed_set is None or agent in allowed_set:
+                    scores[agent] += weight
+                    matched[agent].append(phrase)
+
+        total = sum(scores.values())
+        ranked = [
+            # Share of the total score, damped when the evidence is thin
+            RouteCandidate(agent, score, (score / total) * (1 - math.exp(-score)), matched[agent])
+            for agent, score in scores.items()
+        ]
+        ranked.sort(key=lambda c: (-c.score, c.agent))
+        return ranked
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "version": self.version,
+            "agents": len(self.agents),
+            "phrases": len(self.matcher.phrases),
+            "age_s": round(time.monotonic() - self.built_at, 1),
+        }
+
+
+def _phrase_weight(phrase: str, base: float) -> float:
+    return base * (1 + MULTIWORD_BONUS * (len(phrase.split()) - 1))
+
+
+def _use_for_phrases(description: str) -> List[str]:
+    """'... Use for: a, b, c' -> ['a', 'b', 'c']."""
+    _, sep, tail = description.partition("Use for:")
+    if not sep:
+        return []
+    return [p.strip() for p in re.split(r"[,;]", tail) if p.strip()]
+
+
+def _history_phrases(messages: List[str]) -> Counter:
+    counts: Counter = Counter()
+    for message in messages:
+        words = _content_words(message)
+        seen = set(words) | {f"{a} {b}" for a, b in zip(words, words[1:])}
+        counts.update(seen)  # Once per message
+    return counts
+
+
+def build_router_index(
+    specs: Dict[str, Dict[str, Any]],
+    descriptions: Dict[str, str],
+    history: List[Tuple[str, str]],
+    version: int = 0,
+) -> RouterIndex:
+    """
+    Build the index from spec purposes, registry descriptions and
+    (agent_name, message) pairs of successful runs.
+
+    Learned words (purpose/description/history) are divided by the number
+    of agents sharing them, so generic words don't decide routes.
+    """
+    weights: Dict[str, Dict[str, float]] = defaultdict(dict)
+
+    def add(agent: str, phrase: str, weight: float) -> None:
+        phrase = phrase.lower().strip()
+        if phrase:
+            weights[agent][phrase] = max(weights[agent].get(phrase, 0.0), weight)
+
+    # Explicit phrases: full weight
+    for agent, phrases in SEED_PHRASES.items():
+        for phrase in phrases:
+            add(agent, phrase, _phrase_weight(phrase, SEED_WEIGHT))
+    for agent, description in descriptions.items():
+        for phrase in _use_for_phrases(description or ""):
+            add(agent, phrase, _phrase_weight(phrase, USE_FOR_WEIGHT))
+
+    # Learned words: down-weighted by how many agents share them
+    learned: Dict[str, Dict[str, float]] = defaultdict(dict)
+    for agent in set(specs) | set(descriptions):
+        text = f"{(specs.get(agent) or {}).get('purpose') or ''} {descriptions.get(agent) or ''}"
+        for word in _content_words(text):
+            learned[agent][word] = DESCRIPTION_WORD_WEIGHT
+
+    by_agent: Dict[str, List[str]] = defaultdict(list)
+    for agent, message in history:
+        if agent and message:
+            by_agent[agent].append(message)
+    for agent, messages in by_agent.items():
+        counts = _history_phrases(messages)
+        for phrase, count in counts.most_common(MAX_HISTORY_PHRASES):
+            if count < MIN_HISTORY_COUNT:
+                break
+            share = count / len(messages)
+            weight = _phrase_weight(phrase, HISTORY_WEIGHT * share)
+            learned[agent][phrase] = max(learned[agent].get(phrase, 0.0), weight)
+
+    df = Counter(phrase for phrases in learned.values() for phrase in phrases)
+    for agent, phrases in learned.items():
+        for phrase, weight in phrases.items():
+            add(agent, phrase, weight / df[phrase])
+
+    return RouterIndex(weights, version)
+
+
+# --- Loading ---
+
+Sources = Tuple[Dict[str, str], List[Tuple[str, str]]]
+SourceLoader = Callable[[], Awaitable[Sources]]
+
+
+def _run_message(run_input: Any) -> str:
+    if not isinstance(run_input, dict):
+        return ""
+    for key in ("original_message", "message", "task", "prompt"):
+        value = run_input.get(key)
+        if isinstance(value, str):
+            return value
+    return ""
+
+
+async def _load_from_supabase() -> Sources:
+    from services.supabase_client import get_async_supabase
+
+    client = await get_async_supabase()
+    registry, runs = await asyncio.gather(
+        client.table("agent_registry")
+            .select("agent_name, description")
+            .eq("status", "active")
+            .execute(),
+        client.table("agent_runs")
+            .select("agent_name, agent_role, input, input_json")
+            .eq("success", True)
+            .order("created_at", desc=True)
+            .limit(ROUTER_HISTORY_LIMIT)
+            .execute(),
+    )
+    descriptions = {r["agent_name"]: r.get("description") or "" for r in (registry.data or [])}
+    # Orchestrator runs write agent_name/input, gateway runs agent_role/input_json
+    history = [
+        (r.get("agent_name") or r.get("agent_role"), _run_message(r.get("input") or r.get("input_json")))
+        for r in (runs.data or [])
+    ]
+    return descriptions, history
+
+
+class RouterIndexCache:
+    """Router index kept in step with the registry cache version."""
+
+    def __init__(self, rebuild_seconds: float = ROUTER_REBUILD_SECONDS, loader: Optional[SourceLoader] = None):
+        self.rebuild_seconds = rebuild_seconds
+        self._loader = loader or _load_from_supabase
+        self._index: Optional[RouterIndex] = None
+        self._build_task: Optional[asyncio.Task] = None
+        self.stats_counters = {"builds": 0, "source_errors": 0}
+
+    async def get(self, registry: Optional[RegistryCache] = None) -> RouterIndex:
+        registry = registry or get_registry_cache()
+        specs = await registry.get_specs()
+        index = self._index
+        if index is None or index.version != registry.version:
+            # New specs: wait for the rebuild so routing sees them
+            return await asyncio.shield(self._rebuild(specs, registry.version))
+        if time.monotonic() - index.built_at >= self.rebuild_seconds:
+            self._rebuild(specs, registry.version)  # Pick up new history in background
+        return index
+
+    def _rebuild(self, specs: Dict[str, Dict[str, Any]], version: int) -> "asyncio.Task[RouterIndex]":
+        if self._build_task is None or self._build_task.done():
+            self._build_task = asyncio.create_task(self._build(specs, version))
+        return self._build_task
+
+    async def _build(self, specs: Dict[str, Dict[str, Any]], version: int) -> RouterIndex:
+        try:
+            descriptions, history = await self._loader()
+        except Exception as e:
+            self.stats_counters["source_errors"] += 1
+            logger.error(f"Router index sources failed, building from specs only: {e}")
+            descriptions, history = {}, []
+        self.stats_counters["builds"] += 1
+        self._index = build_router_index(specs, descriptions, history, version)
+        return self._index
+
+    def stats(self) -> Dict[str, Any]:
+        return {**self.stats_counters, **(self._index.stats() if self._index else {})}
+
+
+# Process-wide cache
+_router_cache: Optional[RouterIndexCache] = None
+
+
+def get_router_cache() -> RouterIndexCache:
+    global _router_cache
+    if _router_cache is None:
+        _router_cache = RouterIndexCache()
+    return _router_cache
+
+
+_seed_index: Optional[RouterIndex] = None
+
+
+def get_seed_index() -> RouterIndex:
+    """Index over SEED_PHRASES only (fallback when the cache can't be built)."""
+    global _seed_index
+    if _seed_index is None:
+        _seed_index = build_router_index({}, {}, [])
+    return _seed_index
@@ -1,5 +1,7 @@
 import os
-from supabase import create_client, Client
+import asyncio
+from typing import Optional
+from supabase import create_client, create_async_client, Client, AsyncClient
 
 url = os.getenv("SUPABASE_URL", "")
 key = os.getenv("SUPABASE_SERVICE_KEY", "")
@@ -9,3 +11,18 @@ if not url or not key:
 
 supabase: Client = create_client(url, key)
 
+# Async client for request handlers (one pooled client per process, created lazily
+# because construction must happen inside the running event loop)
+_async_supabase: Optional[AsyncClient] = None
+_async_lock: Optional[asyncio.Lock] = None
+
+
+async def get_async_supabase() -> AsyncClient:
+    global _async_supabase, _async_lock
+    if _async_supabase is None:
+        if _async_lock is None:
+            _async_lock = asyncio.Lock()
+        async with _async_lock:
+            if _async_supabase is None:
+                _async_supabase = await create_async_client(url, key)
+    return _async_supabase
@@ -0,0 +1,129 @@
+"""
+Verdict Cache - Shared LRU of Guardian/Validator minister decisions.
+
+The creation pipeline re-checks the same spec on every correction attempt,
+and AgentRunner builds fresh ministers per call. Both ministers are pure
+functions of (content, ruleset), so identical artifacts are served from
+here.
+
+Key: (minister, ruleset_version, content_hash)
+- ruleset_version: digest of the rules the minister applies (Guardian
+  blocklist, content patterns and secret keywords; Validator required
+  fields and AGENT_DEPENDENCIES), computed once and memoized
+- invalidate() drops every entry and recomputes the digests; /meta/reload
+  calls it after specs or rules change
+"""
+import copy
+import json
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+VERDICT_CACHE_MAX_ENTRIES = 2048
+
+
+def content_hash(content: Any) -> str:
+    """Stable hash for text or JSON-like content."""
+    if not isinstance(content, str):
+        content = json.dumps(content, sort_keys=True, default=str)
+    return hashlib.sha1(content.encode("utf-8")).hexdigest()
+
+
+def _digest(rules: Any) -> str:
+    return hashlib.sha1(json.dumps(rules, sort_keys=True, default=str).encode("utf-8")).hexdigest()[:12]
+
+
+def _guardian_rules() -> Any:
+    from agents.guardian_minister import GuardianMinister
+    from services.guardrails import BLOCKED_PATTERNS
+
+    return [GuardianMinister.BLOCKLIST_PATTERNS, GuardianMinister.SECRET_KEYWORDS, BLOCKED_PATTERNS]
+
+
+def _validator_rules() -> Any:
+    from agents.validator_minister import ValidatorMinister
+    from services.agent_dependencies import AGENT_DEPENDENCIES
+
+    return [ValidatorMinister.REQUIRED_FIELDS, AGENT_DEPENDENCIES]
+
+
+RULESETS: Dict[str, Callable[[], Any]] = {
+    "guardian_minister": _guardian_rules,
+    "validator_minister": _validator_rules,
+}
+
+
+class VerdictCache:
+    """Thread-safe LRU of minister verdicts with per-minister hit metrics."""
+
+    def __init__(self, max_entries: int = VERDICT_CACHE_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[Hashable, Dict[str, Any]]" = OrderedDict()
+        self._versions: Dict[str, str] = {}
+        self._stats: Dict[str, Dict[str, int]] = {}
+        self.invalidations = 0
+
+    def ruleset_version(self, minister: str) -> str:
+        version = self._versions.get(minister)
+        if version is None:
+            loader = RULESETS.get(minister)
+            version = _digest(loader()) if loader else "none"
+            self._versions[minister] = version
+        return version
+
+    def get_or_compute(self, minister: str, content: Any, compute: Callable[[], Dict[str, Any]]) -> Dict[str, Any]:
+        """Cached verdict for (minister, rules, content), computing it on a miss."""
+        key: Tuple[str, str, str] = (minister, self.ruleset_version(minister), content_hash(content))
+        with self._lock:
+            stats = self._stats.setdefault(minister, {"hits": 0, "misses": 0, "evictions": 0})
+            cached = self._entries.get(key)
+            if cached is not None:
+                self._entries.move_to_end(key)
+                stats["hits"] += 1
+                return copy.deepcopy(cached)
+            stats["misses"] += 1
+
+        verdict = compute()
+        with self._lock:
+            self._entries[key] = copy.deepcopy(verdict)
+            while len(self._entries) > self.max_entries:
+                evicted = next(iter(self._entries))
+                del self._entries[evicted]
+                self._stats[evicted[0]]["evictions"] += 1
+        return verdict
+
+    def invalidate(self, reason: str = "") -> None:
+        """Drop all verdicts and recompute ruleset digests on next use."""
+        with self._lock:
+            self._entries.clear()
+            self._versions.clear()
+            self.invalidations += 1
+        logger.info(f"Verdict cache invalidated ({reason or 'manual'})")
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            ministers = {}
+            for minister, counts in self._stats.items():
+                lookups = counts["hits"] + counts["misses"]
+                ministers[minister] = {
+                    **counts,
+                    "hit_rate": round(counts["hits"] / lookups, 4) if lookups else 0.0,
+                    "ruleset_version": self._versions.get(minister),
+                }
+            return {"entries": len(self._entries), "invalidations": self.invalidations, "ministers": ministers}
+
+
+# Process-wide cache shared by AgentRunner (and so PipelineExecutor)
+_verdict_cache: Optional[VerdictCache] = None
+
+
+def get_verdict_cache() -> VerdictCache:
+    global _verdict_cache
+    if _verdict_cache is None:
+        _verdict_cache = VerdictCache()
+    return _verdict_cache
@@ -1,12 +1,25 @@
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Request
 from pydantic import BaseModel
 import google.generativeai as genai
 import os
 import json
+import secrets
+import time
 from typing import Optional, List, Dict, Any
 
 app = FastAPI(title="Script Writer Service")
 
+@app.middleware("http")
+async def trace_context(request: Request, call_next):
+    """Continue the caller's W3C trace and report time spent here (Server-Timing)."""
+    start = time.perf_counter()
+    response = await call_next(request)
+    parent = request.headers.get("traceparent", "").split("-")
+    if len(parent) == 4 and len(parent[1]) == 32:
+        response.headers["traceresponse"] = f"00-{parent[1]}-{secrets.token_hex(8)}-{parent[3]}"
+    response.headers["Server-Timing"] = f"agent;dur={(time.perf_counter() - start) * 1000:.1f}"
+    return response
+
 # Default DNA Rules (Fallback)
 DEFAULT_DNA_RULES = [
     "output valid JSON only",
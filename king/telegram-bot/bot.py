@@ -3,6 +3,8 @@ KING Telegram Bot - Cloud Run webhook service.
 Part of the Kingdom infrastructure.
 """
 import os
+import time
+import secrets
 import httpx
 from fastapi import FastAPI, Request
 from telegram import Update
@@ -17,11 +19,20 @@ ptb_app: Application = None
 
 
 async def call_king(endpoint: str, payload: dict) -> dict:
-    """Call KING Gateway API."""
-    async with httpx.AsyncClient(timeout=120.0) as client:
-        response = await client.post(f"{KING_GATEWAY}/{endpoint}", json=payload)
-        response.raise_for_status()
-        return response.json()
+    """Call KING Gateway API. Each call starts a W3C trace the gateway continues."""
+    trace_id = secrets.token_hex(16)
+    start = time.perf_counter()
+    try:
+        async with httpx.AsyncClient(timeout=120.0) as client:
+            response = await client.post(
+                f"{KING_GATEWAY}/{endpoint}",
+                json=payload,
+                headers={"traceparent": f"00-{trace_id}-{secrets.token_hex(8)}-01"}
+            )
+            response.raise_for_status()
+            return response.json()
+    finally:
+        print(f"[trace {trace_id}] {endpoint} {(time.perf_counter() - start) * 1000:.0f}ms")
 
 
 async def start_handler(update: Update, context):
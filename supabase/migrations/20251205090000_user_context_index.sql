@@ -0,0 +1,21 @@
+-- =============================================================================
+-- User Context Index - Materialized contexts for contextual fingerprinting
+-- One row per (user, context). Maintained incrementally by the gateway on
+-- store_context, replacing per-message Mem0 metadata scans.
+-- =============================================================================
+
+CREATE TABLE IF NOT EXISTS user_contexts (
+    user_id TEXT NOT NULL,
+    context_id TEXT NOT NULL,
+    context_type TEXT NOT NULL DEFAULT 'unknown',  -- from taxonomies (context_type)
+    name TEXT NOT NULL DEFAULT 'unnamed',
+    attributes JSONB DEFAULT '{}',
+    confidence FLOAT DEFAULT 0.5,
+    mention_count INT DEFAULT 1,
+    last_referenced TIMESTAMPTZ DEFAULT now(),
+    created_at TIMESTAMPTZ DEFAULT now(),
+    PRIMARY KEY (user_id, context_id)
+);
+
+-- Index for per-user lookups ordered by confidence
+CREATE INDEX IF NOT EXISTS idx_user_contexts_user ON user_contexts(user_id, confidence DESC);
@@ -0,0 +1,18 @@
+-- =============================================================================
+-- Batched taxonomy usage counts
+-- The gateway accumulates usage increments in-process and flushes them
+-- periodically in one call instead of one RPC per routing decision.
+-- =============================================================================
+
+-- p_items: [{"taxonomy_type": "...", "value": "...", "count": N}, ...]
+CREATE OR REPLACE FUNCTION increment_taxonomy_usage_batch(p_items JSONB)
+RETURNS void AS $$
+BEGIN
+    UPDATE taxonomies t
+    SET usage_count = t.usage_count + (item->>'count')::INT,
+        last_used_at = now()
+    FROM jsonb_array_elements(p_items) AS item
+    WHERE t.taxonomy_type = item->>'taxonomy_type'
+      AND t.value = item->>'value';
+END;
+$$ LANGUAGE plpgsql;
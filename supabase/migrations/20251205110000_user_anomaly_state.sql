@@ -0,0 +1,11 @@
+-- =============================================================================
+-- User Anomaly State - Decayed identity-suspicion counters per user
+-- Written in batches by the gateway's anomaly accumulator (memory/anomaly.py).
+-- counters: {"<anomaly_type>": [value, updated_at_epoch, count], ...}
+-- =============================================================================
+
+CREATE TABLE IF NOT EXISTS user_anomaly_state (
+    user_id TEXT PRIMARY KEY,
+    counters JSONB NOT NULL DEFAULT '{}',
+    updated_at TIMESTAMPTZ DEFAULT now()
+);
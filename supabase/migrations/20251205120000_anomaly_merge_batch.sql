@@ -0,0 +1,54 @@
+-- =============================================================================
+-- Batched anomaly counter merges
+-- Gateway instances flush only the increments they accumulated since their
+-- last flush; each delta is merged into the stored counter under a row lock
+-- (both decayed to the later timestamp, then summed), so concurrent instances
+-- never overwrite each other's increments. Returns the merged rows so the
+-- caller can refresh its in-process copy.
+-- =============================================================================
+
+-- p_items: [{"user_id": "...", "counters": {"<anomaly_type>": [value, updated_at_epoch, count]}}, ...]
+CREATE OR REPLACE FUNCTION merge_anomaly_counters_batch(p_items JSONB, p_half_life DOUBLE PRECISION)
+RETURNS TABLE(out_user_id TEXT, out_counters JSONB) AS $$
+DECLARE
+    item JSONB;
+    delta RECORD;
+    merged JSONB;
+    prev JSONB;
+    t DOUBLE PRECISION;
+BEGIN
+    FOR item IN SELECT * FROM jsonb_array_elements(p_items) LOOP
+        INSERT INTO user_anomaly_state (user_id, counters)
+        VALUES (item->>'user_id', '{}')
+        ON CONFLICT (user_id) DO NOTHING;
+
+        SELECT s.counters INTO merged
+        FROM user_anomaly_state s
+        WHERE s.user_id = item->>'user_id'
+        FOR UPDATE;
+
+        FOR delta IN SELECT * FROM jsonb_each(item->'counters') LOOP
+            prev := merged->delta.key;
+            IF prev IS NULL THEN
+                merged := merged || jsonb_build_object(delta.key, delta.value);
+            ELSE
+                t := GREATEST((prev->>1)::FLOAT8, (delta.value->>1)::FLOAT8);
+                merged := merged || jsonb_build_object(delta.key, jsonb_build_array(
+                    (prev->>0)::FLOAT8 * power(2, -(t - (prev->>1)::FLOAT8) / p_half_life)
+                        + (delta.value->>0)::FLOAT8 * power(2, -(t - (delta.value->>1)::FLOAT8) / p_half_life),
+                    t,
+                    (prev->>2)::INT + (delta.value->>2)::INT
+                ));
+            END IF;
+        END LOOP;
+
+        UPDATE user_anomaly_state s
+        SET counters = merged, updated_at = now()
+        WHERE s.user_id = item->>'user_id';
+
+        out_user_id := item->>'user_id';
+        out_counters := merged;
+        RETURN NEXT;
+    END LOOP;
+END;
+$$ LANGUAGE plpgsql;
@@ -0,0 +1,15 @@
+-- =============================================================================
+-- Spawn decision type on agent_runs
+-- Gateway /spawn runs used to log agent_name as "<decision>:<agent>", so the
+-- orchestrator router (which learns from agent_runs by agent_name) saw
+-- pseudo-agents. The decision type now has its own column.
+-- =============================================================================
+
+ALTER TABLE agent_runs ADD COLUMN IF NOT EXISTS decision TEXT;
+
+-- Split rows logged in the old combined form
+UPDATE agent_runs
+SET decision = split_part(agent_name, ':', 1),
+    agent_name = substr(agent_name, strpos(agent_name, ':') + 1),
+    agent_role = substr(agent_name, strpos(agent_name, ':') + 1)
+WHERE decision IS NULL AND agent_name LIKE '%:%';
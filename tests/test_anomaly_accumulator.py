@@ -0,0 +1,109 @@
+import asyncio
+import unittest
+import os
+import sys
+from unittest.mock import MagicMock, patch
+
+# Add gateway to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'king', 'gateway')))
+
+from memory import anomaly
+from memory.anomaly import AnomalyAccumulator
+
+DAY = 24 * 3600
+
+
+class TestAnomalyAccumulator(unittest.TestCase):
+
+    def setUp(self):
+        self.acc = AnomalyAccumulator(half_life_seconds=DAY, flag_threshold=1.5, persist=False)
+
+    def test_accumulates_per_type(self):
+        async def scenario():
+            await self.acc.record("u1", [("contradiction", 0.8), ("style_change", 0.4)], now=0)
+            await self.acc.record("u1", [("contradiction", 0.8)], now=0)
+
+        asyncio.run(scenario())
+        self.assertEqual(self.acc.suspicion("u1", now=0), {"contradiction": 1.6, "style_change": 0.4})
+        self.assertTrue(self.acc.is_flagged("u1", now=0))
+
+    def test_decays_by_half_life(self):
+        asyncio.run(self.acc.record("u1", [("contradiction", 1.0)], now=0))
+        self.assertAlmostEqual(self.acc.suspicion("u1", now=DAY)["contradiction"], 0.5)
+        self.assertAlmostEqual(self.acc.suspicion("u1", now=3 * DAY)["contradiction"], 0.125)
+        self.assertFalse(self.acc.is_flagged("u1", now=DAY))
+
+    def test_events_after_decay_build_on_decayed_value(self):
+        async def scenario():
+            await self.acc.record("u1", [("knowledge_gap", 1.0)], now=0)
+            counters = await self.acc.record("u1", [("knowledge_gap", 1.0)], now=DAY)
+            return counters["knowledge_gap"]
+
+        counter = asyncio.run(scenario())
+        self.assertAlmostEqual(counter.value, 1.5)
+        self.assertEqual(counter.count, 2)
+
+    def test_unknown_user_has_no_suspicion(self):
+        self.assertEqual(asyncio.run(self.acc.get("nobody")), {})
+        self.assertEqual(self.acc.total("nobody"), 0)
+
+
+class TestAnomalyPersistence(unittest.TestCase):
+
+    def setUp(self):
+        self.client = MagicMock()
+        self.client.table.return_value.select.return_value.eq.return_value.execute.return_value.data = [
+            {"counters": {"contradiction": [1.0, 0, 3]}}
+        ]
+        patcher = patch.object(anomaly, "_get_supabase", return_value=self.client)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_flush_sends_only_increments_and_refreshes_merged_state(self):
+        acc = AnomalyAccumulator(half_life_seconds=DAY)
+        # Another instance raised the stored counter meanwhile; the RPC returns the merge
+        self.client.rpc.return_value.execute.return_value.data = [
+            {"out_user_id": "u1", "out_counters": {"contradiction": [2.5, 0, 5]}}
+        ]
+
+        async def scenario():
+            await acc.record("u1", [("contradiction", 0.5)], now=0)
+            return await acc.flush()
+
+        self.assertEqual(asyncio.run(scenario()), 1)
+        name, params = self.client.rpc.call_args[0]
+        self.assertEqual(name, "merge_anomaly_counters_batch")
+        self.assertEqual(params["p_items"], [{"user_id": "u1", "counters": {"contradiction": [0.5, 0, 1]}}])
+        self.assertEqual(acc.suspicion("u1", now=0), {"contradiction": 2.5})
+        self.assertEqual(asyncio.run(acc.flush()), 0)  # Nothing left to send
+
+    def test_failed_flush_keeps_increments(self):
+        acc = AnomalyAccumulator(half_life_seconds=DAY)
+        self.client.rpc.return_value.execute.side_effect = [RuntimeError("down"), MagicMock(data=[])]
+
+        async def scenario():
+            await acc.record("u1", [("contradiction", 0.5)], now=0)
+            self.assertEqual(await acc.flush(), 0)
+            await acc.record("u1", [("contradiction", 0.5)], now=0)
+            return await acc.flush()
+
+        self.assertEqual(asyncio.run(scenario()), 1)
+        params = self.client.rpc.call_args[0][1]
+        self.assertEqual(params["p_items"][0]["counters"], {"contradiction": [1.0, 0, 2]})
+
+    def test_entries_expire_and_are_bounded(self):
+        acc = AnomalyAccumulator(half_life_seconds=DAY, ttl_seconds=60, max_users=2)
+        for user_id in ("u1", "u2", "u3"):
+            asyncio.run(acc.get(user_id))
+        self.assertEqual(list(acc._users), ["u2", "u3"])
+
+        with patch.object(anomaly.time, "monotonic", return_value=anomaly.time.monotonic() + 61):
+            self.client.table.return_value.select.return_value.eq.return_value.execute.return_value.data = [
+                {"counters": {"contradiction": [2.0, 0, 4]}}
+            ]
+            asyncio.run(acc.get("u2"))
+        self.assertEqual(acc._users["u2"][1]["contradiction"].count, 4)  # Reloaded after the TTL
+
+
+if __name__ == "__main__":
+    unittest.main()
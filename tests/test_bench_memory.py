@@ -0,0 +1,35 @@
+import unittest
+import os
+import sys
+
+# Add gateway and its scripts to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'king', 'gateway')))
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'king', 'gateway', 'scripts')))
+
+from bench_memory import build_parser, run_benchmarks, SCENARIOS
+
+
+class TestBenchHarness(unittest.TestCase):
+
+    def test_all_scenarios_run_against_fakes(self):
+        args = build_parser().parse_args([
+            "--users", "3", "--ops", "2", "--memories", "20",
+            "--mem0-latency-ms", "0", "--llm-latency-ms", "0", "--db-latency-ms", "0",
+        ])
+        results = run_benchmarks(args)
+        self.assertEqual(set(results), set(SCENARIOS))
+        for name, rows in results.items():
+            self.assertEqual(rows[0]["ops"], 6, name)
+            self.assertEqual(rows[0]["errors"], 0, name)
+
+    def test_local_tier_option(self):
+        args = build_parser().parse_args([
+            "--users", "2", "--ops", "2", "--scenario", "resolve", "write", "--local",
+            "--mem0-latency-ms", "0", "--llm-latency-ms", "0", "--db-latency-ms", "0",
+        ])
+        results = run_benchmarks(args)
+        self.assertEqual(results["resolve"][0]["errors"], 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,80 @@
+import asyncio
+import unittest
+import os
+import sys
+
+# Add gateway to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'king', 'gateway')))
+
+from memory.fingerprint import UserContext
+from memory.context_index import ContextIndex
+
+
+class TestContextIndex(unittest.TestCase):
+
+    def test_backfill_runs_once_per_user(self):
+        calls = []
+
+        async def backfill(user_id):
+            calls.append(user_id)
+            return [UserContext(context_id="apollo", context_type="project", name="Apollo")]
+
+        async def scenario():
+            index = ContextIndex(backfill=backfill, persist=False)
+            first = await index.get_contexts("u1")
+            second = await index.get_contexts("u1")
+            return first, second
+
+        first, second = asyncio.run(scenario())
+        self.assertEqual([c.context_id for c in first], ["apollo"])
+        self.assertEqual([c.context_id for c in second], ["apollo"])
+        self.assertEqual(calls, ["u1"])
+
+    def test_entries_expire_and_are_bounded(self):
+        calls = []
+
+        async def backfill(user_id):
+            calls.append(user_id)
+            return []
+
+        async def scenario():
+            expiring = ContextIndex(backfill=backfill, persist=False, ttl_seconds=0)
+            await expiring.get_contexts("u1")
+            await expiring.get_contexts("u1")  # Expired: reloaded (other instances' rows)
+            bounded = ContextIndex(persist=False, max_users=2)
+            for user in ("u1", "u2", "u1", "u3"):
+                await bounded.get_contexts(user)
+            return list(bounded._users)
+
+        self.assertEqual(asyncio.run(scenario()), ["u1", "u3"])
+        self.assertEqual(calls, ["u1", "u1"])
+
+    def test_upsert_merges_counts_and_attributes(self):
+        async def scenario():
+            index = ContextIndex(persist=False)
+            await index.upsert("u1", UserContext(
+                context_id="apollo", context_type="project", name="Apollo",
+                attributes={"language": "python"}, confidence=0.6,
+            ))
+            await index.upsert("u1", UserContext(
+                context_id="apollo", context_type="project", name="Apollo",
+                attributes={"framework": "fastapi"}, confidence=0.9,
+            ))
+            return await index.get("u1", "apollo")
+
+        ctx = asyncio.run(scenario())
+        self.assertEqual(ctx.mention_count, 2)
+        self.assertEqual(ctx.confidence, 0.9)
+        self.assertEqual(ctx.attributes, {"language": "python", "framework": "fastapi"})
+
+    def test_users_are_isolated(self):
+        async def scenario():
+            index = ContextIndex(persist=False)
+            await index.upsert("u1", UserContext(context_id="a", context_type="role", name="Dev"))
+            return await index.get_contexts("u2")
+
+        self.assertEqual(asyncio.run(scenario()), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
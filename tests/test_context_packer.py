@@ -0,0 +1,71 @@
+import unittest
+import os
+import sys
+
+# Add gateway to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'king', 'gateway')))
+
+from memory.context_packer import ContextItem, pack_context, estimate_tokens
+
+
+class TestEstimateTokens(unittest.TestCase):
+
+    def test_plain_english_close_to_bpe(self):
+        # ~10 tokens with common BPE tokenizers
+        self.assertTrue(8 <= estimate_tokens("The user prefers Python with type hints everywhere.") <= 12)
+
+    def test_code_and_numbers_count_more_than_chars_over_four(self):
+        text = "def f(x): return {'a': [1, 2, 3]}"
+        self.assertGreater(estimate_tokens(text), len(text) // 4)
+
+    def test_empty(self):
+        self.assertEqual(estimate_tokens(""), 0)
+
+
+class TestPackContext(unittest.TestCase):
+
+    def test_respects_budget_and_prefers_value(self):
+        items = [
+            ContextItem(text="low value note about lunch " * 5, score=0.2),
+            ContextItem(text="User deploys Apollo on Cloud Run", score=0.9),
+            ContextItem(text="User prefers type hints", score=0.7),
+        ]
+        packed = pack_context(items, budget=20, allow_trim=False)
+        self.assertEqual(packed.texts, ["User deploys Apollo on Cloud Run", "User prefers type hints"])
+        self.assertLessEqual(packed.tokens, 20)
+        self.assertEqual(packed.dropped_budget, 1)
+
+    def test_drops_near_duplicates(self):
+        items = [
+            ContextItem(text="User prefers Python type hints", score=0.9),
+            ContextItem(text="user prefers python type hints!", score=0.5),
+            ContextItem(text="Apollo ships on Fridays", score=0.4),
+        ]
+        packed = pack_context(items, budget=500)
+        self.assertEqual(packed.texts, ["User prefers Python type hints", "Apollo ships on Fridays"])
+        self.assertEqual(packed.dropped_duplicates, 1)
+
+    def test_non_latin_snippets_are_not_merged(self):
+        texts = ["मुझे चाय पसंद है", "मेरा नाम राहुल है", "என் பெயர் ராகுல்"]
+        packed = pack_context([ContextItem(text=t, score=0.9) for t in texts], budget=500)
+        self.assertEqual(packed.texts, texts)
+        packed = pack_context([ContextItem(text=t, score=0.9) for t in ["मुझे चाय पसंद है", "मुझे चाय पसंद है।"]], budget=500)
+        self.assertEqual(packed.dropped_duplicates, 1)
+
+    def test_trims_last_item_to_fit(self):
+        long_text = " ".join(["word"] * 100)
+        packed = pack_context([ContextItem(text=long_text, score=1.0)], budget=40)
+        self.assertEqual(len(packed.items), 1)
+        self.assertTrue(packed.items[0].text.endswith("…"))
+        self.assertLessEqual(packed.tokens, 40)
+
+    def test_tier_weight_breaks_ties(self):
+        items = [
+            ContextItem(text="Kingdom rule about JSON output", score=0.8, source="collective"),
+            ContextItem(text="User project uses FastAPI", score=0.8, source="semantic"),
+        ]
+        self.assertEqual(pack_context(items, budget=500, max_items=1).texts, ["User project uses FastAPI"])
+
+
+if __name__ == "__main__":
+    unittest.main()
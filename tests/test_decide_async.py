@@ -0,0 +1,95 @@
+import asyncio
+import json
+import os
+import sys
+import time
+import unittest
+from unittest.mock import patch
+
+# Add orchestrator to path (supabase_client needs credentials at import)
+os.environ.setdefault("SUPABASE_URL", "https://example.supabase.co")
+os.environ.setdefault("SUPABASE_SERVICE_KEY", "test-key")
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'king', 'orchestrator')))
+
+from api import decide as decide_module
+from api.decide import DecideRequest, decide
+from services import mem0_tool
+from services.mem0_client import Mem0Client
+from services.registry_cache import RegistryCache
+from services.router_index import RouterIndexCache
+
+LATENCY = 0.2
+
+
+class SlowMem0SDK:
+    def search(self, query, filters=None, limit=5, enable_graph=True):
+        time.sleep(LATENCY)  # Blocking SDK call, must run off the event loop
+        return {"results": [{"memory": "User writes Python"}], "relations": []}
+
+
+async def slow_registry_loader():
+    await asyncio.sleep(LATENCY)
+    return {"code_writer": "http://cw"}, {}
+
+
+async def no_route_sources():
+    return {}, []
+
+
+GEMINI_CALLS = []
+
+
+async def fake_gemini(prompt):
+    GEMINI_CALLS.append(prompt)
+    await asyncio.sleep(LATENCY)
+    return json.dumps({"approved_memories": ["User writes Python"], "rejected_memories": [], "confidence": 0.9})
+
+
+class TestDecideIsNonBlocking(unittest.TestCase):
+
+    def setUp(self):
+        client = Mem0Client(SlowMem0SDK())
+        registry = RegistryCache(loader=slow_registry_loader)
+        router_cache = RouterIndexCache(loader=no_route_sources)
+        for patcher in [
+            patch.object(mem0_tool, "get_mem0", lambda: client),
+            patch("agents.agent_runner.acall_gemini", fake_gemini),
+            patch.object(decide_module, "get_registry_cache", lambda: registry),
+            patch.object(decide_module, "get_router_cache", lambda: router_cache),
+        ]:
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def test_concurrent_decisions_overlap(self):
+        requests = [DecideRequest(user_id=f"u{i}", message="please write code for a parser") for i in range(10)]
+
+        async def run():
+            start = time.perf_counter()
+            responses = await asyncio.gather(*(decide(r) for r in requests))
+            return responses, time.perf_counter() - start
+
+        responses, elapsed = asyncio.run(run())
+        self.assertTrue(all(r.action == "execute" for r in responses))
+        self.assertEqual(responses[0].verdict.agent_name, "code_writer")
+        self.assertEqual(responses[0].memory_context, ["User writes Python"])
+        # Each decision waits ~2 x LATENCY; serialized, ten would take ~6s
+        self.assertLess(elapsed, 3 * LATENCY * 3)
+
+    def test_stages_run_concurrently(self):
+        response = asyncio.run(decide(DecideRequest(user_id="solo", message="please write code for a parser")))
+        timings = response.stage_timings_ms
+        for stage in ("guardian", "memory_search", "memory_select", "registry", "route", "total"):
+            self.assertIn(stage, timings)
+        # Search + selection (2 x LATENCY) overlap the registry load (LATENCY)
+        self.assertLess(timings["total"], timings["memory_search"] + timings["memory_select"] + timings["registry"] - 50)
+
+    def test_blocked_request_skips_memory_selection(self):
+        GEMINI_CALLS.clear()
+        response = asyncio.run(decide(DecideRequest(user_id="blocked", message="import subprocess; os.system('rm -rf /')")))
+        self.assertEqual(response.action, "blocked")
+        self.assertNotIn("memory_select", response.stage_timings_ms)
+        self.assertEqual(GEMINI_CALLS, [])
+
+
+if __name__ == '__main__':
+    unittest.main()
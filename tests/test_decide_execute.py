@@ -0,0 +1,104 @@
+import asyncio
+import json
+import os
+import sys
+import unittest
+from unittest.mock import patch
+
+import httpx
+
+# Add orchestrator to path (supabase_client needs credentials at import)
+os.environ.setdefault("SUPABASE_URL", "https://example.supabase.co")
+os.environ.setdefault("SUPABASE_SERVICE_KEY", "test-key")
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'king', 'orchestrator')))
+
+from api import decide as decide_module
+from api.decide import DecideRequest, decide_execute
+from services import mem0_tool
+from services.decision_cache import DecisionCache
+from services.mem0_client import Mem0Client
+from services.registry_cache import RegistryCache
+from services.router_index import RouterIndexCache
+
+
+class EmptyMem0SDK:
+    def search(self, query, filters=None, limit=5, enable_graph=True):
+        return {"results": [], "relations": []}
+
+
+async def registry_loader():
+    return {"code_writer": "http://code-writer"}, {}
+
+
+async def no_route_sources():
+    return {}, []
+
+
+class TestDecideExecute(unittest.TestCase):
+
+    def setUp(self):
+        self.agent_requests = []
+        self.agent_status = 200
+
+        def agent_handler(request: httpx.Request) -> httpx.Response:
+            self.agent_requests.append(json.loads(request.content))
+            if self.agent_status != 200:
+                return httpx.Response(self.agent_status, json={"detail": "Agent crashed"})
+            return httpx.Response(200, json={"code": "def parse(): ...", "language": "python"})
+
+        agent_client = httpx.AsyncClient(transport=httpx.MockTransport(agent_handler))
+        registry = RegistryCache(loader=registry_loader)
+        for patcher in [
+            patch.object(mem0_tool, "get_mem0", lambda: Mem0Client(EmptyMem0SDK())),
+            patch.object(decide_module, "get_registry_cache", lambda: registry),
+            patch.object(decide_module, "get_router_cache", lambda: RouterIndexCache(loader=no_route_sources)),
+            patch.object(decide_module, "get_decision_cache", lambda: DecisionCache()),
+            patch.object(decide_module, "_agent_client", agent_client),
+        ]:
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def _call(self, message):
+        async def run():
+            response = await decide_execute(DecideRequest(user_id="u1", message=message, session_id="s1"))
+            if hasattr(response, "body_iterator"):
+                body = b"".join([chunk async for chunk in response.body_iterator])
+            else:
+                body = response.body
+            return response.headers, body
+
+        headers, body = asyncio.run(run())
+        head, _, rest = body.partition(b"\n")
+        return headers, json.loads(head), rest
+
+    def test_registered_agent_dispatched_and_streamed(self):
+        headers, decision, rest = self._call("please write code for a parser")
+        self.assertEqual(headers["x-king-dispatch"], "orchestrator")
+        self.assertEqual(decision["verdict"]["agent_name"], "code_writer")
+        self.assertNotIn("enriched_input", decision)
+        self.assertEqual(json.loads(rest)["language"], "python")
+        self.assertEqual(self.agent_requests[0]["original_message"], "please write code for a parser")
+        self.assertEqual(self.agent_requests[0]["session_id"], "s1")
+
+    def test_agent_error_status_becomes_error_marker(self):
+        self.agent_status = 503
+        headers, decision, rest = self._call("please write code for a parser")
+        self.assertEqual(headers["x-king-dispatch"], "orchestrator")
+        output = json.loads(rest)
+        self.assertEqual(output["error"], "Agent returned HTTP 503")
+        self.assertIn("Agent crashed", output["detail"])
+
+    def test_ephemeral_and_blocked_left_to_gateway(self):
+        headers, decision, rest = self._call("tell me a joke")
+        self.assertEqual(headers["x-king-dispatch"], "gateway")
+        self.assertEqual(decision["verdict"]["agent_type"], "ephemeral")
+        self.assertIn("enriched_input", decision)
+        self.assertEqual(rest, b"")
+
+        headers, decision, _ = self._call("import subprocess")
+        self.assertEqual((headers["x-king-dispatch"], decision["action"]), ("gateway", "blocked"))
+        self.assertEqual(self.agent_requests, [])
+
+
+if __name__ == '__main__':
+    unittest.main()
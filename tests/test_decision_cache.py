@@ -0,0 +1,135 @@
+import asyncio
+import json
+import os
+import sys
+import unittest
+from unittest.mock import patch
+
+# Add orchestrator to path (supabase_client needs credentials at import)
+os.environ.setdefault("SUPABASE_URL", "https://example.supabase.co")
+os.environ.setdefault("SUPABASE_SERVICE_KEY", "test-key")
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'king', 'orchestrator')))
+
+from api import decide as decide_module
+from api.decide import DecideRequest, decide
+from services import mem0_tool
+from services.decision_cache import DecisionCache, message_hash
+from services import decision_cache as decision_cache_module
+from services.mem0_client import Mem0Client
+from services.registry_cache import RegistryCache
+from services.router_index import RouterIndexCache
+
+
+class CountingMem0SDK:
+    def __init__(self):
+        self.searches = 0
+
+    def search(self, query, filters=None, limit=5, enable_graph=True):
+        self.searches += 1
+        return {"results": [{"memory": "User writes Python"}], "relations": []}
+
+    def add(self, messages, **kwargs):
+        return {"results": []}
+
+
+async def registry_loader():
+    return {"code_writer": "http://cw"}, {}
+
+
+async def no_route_sources():
+    return {}, []
+
+
+async def fake_gemini(prompt):
+    return json.dumps({"approved_memories": ["User writes Python"], "rejected_memories": [], "confidence": 0.9})
+
+
+class TestDecisionCache(unittest.TestCase):
+
+    def setUp(self):
+        self.sdk = CountingMem0SDK()
+        self.client = Mem0Client(self.sdk)
+        self.registry = RegistryCache(loader=registry_loader)
+        self.cache = DecisionCache(ttl_seconds=30)
+        for patcher in [
+            patch.object(mem0_tool, "get_mem0", lambda: self.client),
+            patch("agents.agent_runner.acall_gemini", fake_gemini),
+            patch.object(decide_module, "get_registry_cache", lambda: self.registry),
+            patch.object(decide_module, "get_router_cache", lambda: RouterIndexCache(loader=no_route_sources)),
+            patch.object(decide_module, "get_decision_cache", lambda: self.cache),
+            patch.object(decision_cache_module, "_decision_cache", self.cache),
+        ]:
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def _decide(self, message, **kwargs):
+        return asyncio.run(decide(DecideRequest(user_id="u1", message=message, **kwargs)))
+
+    def test_repeat_is_served_from_cache(self):
+        first = self._decide("Please write code for a parser", session_id="s1")
+        again = self._decide("please write code for a parser!", session_id="s2")
+        self.assertEqual(self.sdk.searches, 1)
+        self.assertFalse(first.cached)
+        self.assertTrue(again.cached)
+        self.assertEqual(again.verdict.agent_name, "code_writer")
+        self.assertEqual(again.enriched_input["session_id"], "s2")
+        self.assertNotEqual(again.trace_id, first.trace_id)
+
+    def test_memory_write_and_epoch_invalidate(self):
+        self._decide("write code for a parser", memory_epoch="a.0.0")
+        self._decide("write code for a parser", memory_epoch="a.0.1")  # Gateway wrote memory
+        self.assertEqual(self.sdk.searches, 2)
+        self.client.add([{"role": "user", "content": "I moved to Go"}], user_id="u1")
+        self._decide("write code for a parser", memory_epoch="a.0.1")
+        self.assertEqual(self.sdk.searches, 3)
+
+    def test_registry_version_change_misses(self):
+        self._decide("write code for a parser")
+        self.registry.invalidate("spec reload")
+        self._decide("write code for a parser")
+        self.assertEqual(self.sdk.searches, 2)
+
+    def test_keyed_on_registry_version_used_for_routing(self):
+        get_index = decide_module._get_router_index
+
+        async def reload_mid_decide():
+            self.registry.invalidate("spec reload")  # Lands after the agents were read
+            return await get_index()
+
+        with patch.object(decide_module, "_get_router_index", reload_mid_decide):
+            self._decide("write code for a parser")
+        self.assertFalse(self._decide("write code for a parser").cached)
+        self.assertEqual(self.sdk.searches, 2)
+
+    def test_guardian_runs_before_lookup(self):
+        self._decide("write code for a parser")
+        verdict = {"verdict": "BLOCKED", "risk_level": "CRITICAL", "reason": "policy changed", "violation_type": "x"}
+        with patch.object(decide_module, "_run_guardian", lambda request: verdict):
+            blocked = self._decide("write code for a parser")
+        self.assertEqual(blocked.action, "blocked")
+        self.assertEqual(self.sdk.searches, 1)  # Blocked on the cache-hit path
+
+    def test_degraded_memory_is_not_cached(self):
+        self.sdk.search = lambda *args, **kwargs: (_ for _ in ()).throw(ConnectionError("mem0 down"))
+        for _ in range(2):
+            self.assertFalse(self._decide("write code for a parser").cached)
+        self.assertEqual(self.cache.stats()["hits"], 0)
+
+    def test_message_hash_keeps_scripts_and_symbols(self):
+        self.assertEqual(message_hash("  Write  CODE!"), message_hash("write code"))
+        self.assertNotEqual(message_hash("मेरा नाम क्या है"), message_hash("तुम्हारा नाम क्या है"))
+        self.assertNotEqual(message_hash("Привет мир"), message_hash("Пока мир"))
+        self.assertNotEqual(message_hash("learn c++"), message_hash("learn c"))
+
+    def test_lru_eviction_and_stats(self):
+        cache = DecisionCache(max_entries=2)
+        for i in range(3):
+            cache.put(("u", message_hash(f"m{i}")), i, "u")
+        self.assertIsNone(cache.get(("u", message_hash("m0"))))
+        self.assertEqual(cache.get(("u", message_hash("M2 "))), 2)
+        self.assertEqual(cache.stats()["evictions"], 1)
+        self.assertEqual(cache.invalidate_user("u"), 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
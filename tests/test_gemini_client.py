@@ -0,0 +1,126 @@
+import asyncio
+import json
+import os
+import sys
+import unittest
+from unittest.mock import patch
+
+import httpx
+
+# Add orchestrator to path (supabase_client needs credentials at import)
+os.environ.setdefault("SUPABASE_URL", "https://example.supabase.co")
+os.environ.setdefault("SUPABASE_SERVICE_KEY", "test-key")
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'king', 'orchestrator')))
+
+from services import gemini as gemini_module
+from services.gemini import AdaptiveLimiter, GeminiClient, retry_after_seconds
+
+
+def ok(text="hi"):
+    return httpx.Response(200, json={"candidates": [{"content": {"parts": [{"text": text}]}}]})
+
+
+class ScriptedTransport(httpx.AsyncBaseTransport):
+    """Returns queued responses in order, then 200s; tracks concurrent requests."""
+
+    def __init__(self, responses=(), delay=0.0):
+        self.responses = list(responses)
+        self.delay = delay
+        self.requests = 0
+        self.in_flight = 0
+        self.peak = 0
+
+    async def handle_async_request(self, request):
+        self.requests += 1
+        self.in_flight += 1
+        self.peak = max(self.peak, self.in_flight)
+        try:
+            await asyncio.sleep(self.delay)
+            prompt = json.loads(request.content)["contents"][0]["parts"][0]["text"]
+            if self.responses:
+                response = self.responses.pop(0)
+                if isinstance(response, Exception):
+                    raise response
+                return response
+            return ok(prompt)
+        finally:
+            self.in_flight -= 1
+
+
+class TestGeminiClient(unittest.TestCase):
+
+    def _client(self, transport, **kwargs):
+        self.sleeps = []
+
+        async def fake_sleep(delay):
+            self.sleeps.append(delay)
+
+        return GeminiClient(api_key="k", url="https://gemini.test", transport=transport, sleep=fake_sleep, **kwargs)
+
+    def test_retries_honor_retry_after(self):
+        transport = ScriptedTransport([
+            httpx.Response(429, headers={"Retry-After": "3"}),
+            httpx.Response(503),
+            httpx.ConnectError("reset"),
+        ])
+        client = self._client(transport)
+        self.assertEqual(asyncio.run(client.generate("hello")), "hello")
+        self.assertEqual(transport.requests, 4)
+        self.assertGreaterEqual(self.sleeps[0], 3.0)
+        self.assertLessEqual(max(self.sleeps[1:]), 2.0)  # Jittered base * 2**attempt
+        stats = client.stats()
+        self.assertEqual((stats["calls"], stats["retries"], stats["attempts"]), (1, 3, 4))
+        self.assertEqual(stats["status"], {"429": 1, "503": 1, "ConnectError": 1, "200": 1})
+
+    def test_gives_up_and_fails_fast(self):
+        client = self._client(ScriptedTransport([httpx.Response(500)] * 3), max_retries=2)
+        with self.assertRaises(httpx.HTTPStatusError):
+            asyncio.run(client.generate("x"))
+        self.assertEqual(client.stats()["errors"], 1)
+
+        for response in [httpx.Response(400), httpx.Response(429, headers={"Retry-After": "120"})]:
+            transport = ScriptedTransport([response])
+            with self.assertRaises(httpx.HTTPStatusError):
+                asyncio.run(self._client(transport).generate("x"))
+            self.assertEqual(transport.requests, 1)
+
+    def test_concurrency_capped_and_adaptive(self):
+        transport = ScriptedTransport(delay=0.01)
+        client = self._client(transport, limiter=AdaptiveLimiter(initial=3, minimum=1, maximum=4))
+
+        async def burst():
+            return await asyncio.gather(*[client.generate(str(i)) for i in range(20)])
+
+        self.assertEqual(asyncio.run(burst()), [str(i) for i in range(20)])
+        self.assertLessEqual(transport.peak, 4)
+        self.assertEqual(client.limiter.limit, 4)  # Grew on success, capped at maximum
+
+        now = [0.0]
+        limiter = AdaptiveLimiter(initial=16, minimum=2, maximum=32, cooldown=1.0, clock=lambda: now[0])
+        limiter.on_overload()
+        limiter.on_overload()  # Same burst: ignored
+        self.assertEqual(limiter.limit, 8)
+        now[0] = 2.0
+        for _ in range(3):
+            limiter.on_overload()
+            now[0] += 2.0
+        self.assertEqual(limiter.limit, 2)
+
+    def test_retry_after_formats(self):
+        self.assertEqual(retry_after_seconds(httpx.Response(429, headers={"Retry-After": "1.5"})), 1.5)
+        self.assertIsNone(retry_after_seconds(httpx.Response(429)))
+        self.assertIsNone(retry_after_seconds(httpx.Response(429, headers={"Retry-After": "soon"})))
+        past = retry_after_seconds(httpx.Response(503, headers={"Retry-After": "Wed, 21 Oct 2015 07:28:00 GMT"}))
+        self.assertEqual(past, 0.0)
+
+    def test_sync_shim_and_async_share_one_client(self):
+        client = GeminiClient(api_key="k", url="https://gemini.test", transport=ScriptedTransport())
+        with patch.object(gemini_module, "_gemini", client):
+            self.assertEqual(gemini_module.call_gemini("sync"), "sync")
+            self.assertEqual(asyncio.run(gemini_module.acall_gemini("async")), "async")
+            self.assertEqual(gemini_module.get_gemini_metrics()["calls"], 2)
+            asyncio.run(gemini_module.aclose_gemini())
+
+
+if __name__ == '__main__':
+    unittest.main()
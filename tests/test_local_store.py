@@ -0,0 +1,112 @@
+import asyncio
+import unittest
+from unittest.mock import MagicMock, patch
+import os
+import sys
+
+# Add gateway to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'king', 'gateway')))
+
+from memory.local_store import LocalMemoryStore, L1MemoryClient
+from memory.mem0_client import Mem0Client
+
+
+class TestLocalMemoryStore(unittest.TestCase):
+
+    def setUp(self):
+        self.store = LocalMemoryStore(":memory:")
+
+    def test_search_ranks_relevant_first_and_scopes_users(self):
+        self.store.upsert("u1", "User deploys the Apollo service on Cloud Run")
+        self.store.upsert("u1", "Favourite colour is green")
+        self.store.upsert("u2", "Apollo deployment notes for another user")
+        results = self.store.search("how do I deploy Apollo", "u1", limit=5)
+        self.assertEqual(len(results), 2)
+        self.assertIn("Apollo", results[0]["memory"])
+        self.assertGreater(results[0]["score"], results[1]["score"])
+
+    def test_replace_user_keeps_recent_provisional(self):
+        self.store.upsert("u1", "stale canonical", memory_id="old")
+        self.store.upsert("u1", "just written", provisional=True)
+        self.store.replace_user("u1", [{"id": "m1", "memory": "fresh canonical"}])
+        contents = {r["memory"] for r in self.store.search("canonical written", "u1", limit=10)}
+        self.assertEqual(contents, {"fresh canonical", "just written"})
+        self.assertTrue(self.store.is_warm("u1"))
+
+
+class TestL1MemoryClient(unittest.TestCase):
+
+    def test_offline_write_then_read(self):
+        client = L1MemoryClient(LocalMemoryStore(":memory:"))
+
+        async def scenario():
+            await client.aadd([{"role": "user", "content": "I prefer Python type hints"}], user_id="u1")
+            return await client.asearch("python hints", user_id="u1", limit=3)
+
+        result = asyncio.run(scenario())
+        self.assertEqual(result["results"][0]["memory"], "I prefer Python type hints")
+
+    def test_cold_user_falls_back_then_serves_locally(self):
+        sdk = MagicMock()
+        sdk.search.return_value = {"results": [{"id": "r1", "memory": "remote"}]}
+        sdk.get_all.return_value = {"results": [{"id": "m1", "memory": "Apollo runs on Cloud Run"}], "next": None}
+        client = L1MemoryClient(LocalMemoryStore(":memory:"), Mem0Client(sdk, backoff_base=0.0))
+
+        async def scenario():
+            first = await client.asearch("Apollo", user_id="u1")
+            await asyncio.gather(*client._reconciling.values())  # Pruned once done
+            second = await client.asearch("Apollo", user_id="u1")
+            return first, second
+
+        first, second = asyncio.run(scenario())
+        self.assertEqual(first["results"][0]["id"], "r1")
+        self.assertEqual(second["results"][0]["id"], "m1")
+        self.assertEqual(sdk.search.call_count, 1)
+        self.assertEqual(client.stats["local_hits"], 1)
+        self.assertEqual(client._reconciling, {})
+
+    def test_truncated_pull_is_not_served_locally(self):
+        sdk = MagicMock()
+        sdk.search.return_value = {"results": [{"id": "r1", "memory": "remote"}]}
+        sdk.get_all.side_effect = lambda **kw: {
+            "results": [{"id": f"m{kw['page']}", "memory": "Apollo runs on Cloud Run"}], "next": "more"
+        }
+        client = L1MemoryClient(LocalMemoryStore(":memory:"), Mem0Client(sdk, backoff_base=0.0))
+
+        async def scenario():
+            with patch("memory.local_store.RECONCILE_MAX_MEMORIES", 2):
+                await client.asearch("Apollo", user_id="u1")
+                await asyncio.gather(*client._reconciling.values())
+                return await client.asearch("Apollo", user_id="u1")
+
+        second = asyncio.run(scenario())
+        self.assertEqual(second["results"][0]["id"], "r1")
+        self.assertEqual(sdk.get_all.call_count, 2)  # Stopped at the cap, and not pulled again
+        self.assertEqual(client.stats["partial"], 1)
+        self.assertEqual(client.stats["local_hits"], 0)
+        self.assertFalse(client.store.is_warm("u1"))
+
+    def test_writes_do_not_reconcile_and_filters_bypass(self):
+        sdk = MagicMock()
+        sdk.search.return_value = {"results": [{"id": "r1", "memory": "remote"}]}
+        sdk.add.return_value = {"results": []}
+        store = LocalMemoryStore(":memory:")
+        store.replace_user("u1", [])  # Warm
+        client = L1MemoryClient(store, Mem0Client(sdk, backoff_base=0.0))
+
+        async def scenario():
+            for i in range(3):
+                await client.aadd(f"note {i}", user_id="u1")
+            local = await client.asearch("note", user_id="u1")
+            filtered = await client.asearch("note", user_id="u1", filters={"agent_id": "code_writer"})
+            return local, filtered
+
+        local, filtered = asyncio.run(scenario())
+        self.assertEqual(sdk.get_all.call_count, 0)
+        self.assertEqual(len(local["results"]), 3)
+        self.assertEqual(filtered["results"][0]["id"], "r1")
+        self.assertEqual(client.stats["bypassed"], 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
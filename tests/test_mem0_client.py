@@ -0,0 +1,53 @@
+import asyncio
+import unittest
+from unittest.mock import MagicMock
+import os
+import sys
+
+# Add gateway to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'king', 'gateway')))
+
+from memory.mem0_client import Mem0Client
+
+
+class NetworkError(Exception):
+    """Stand-in matching the mem0 SDK error name."""
+
+
+class TestMem0Client(unittest.TestCase):
+
+    def setUp(self):
+        self.sdk = MagicMock()
+        self.client = Mem0Client(self.sdk, max_concurrency=2, max_retries=2, backoff_base=0.0)
+
+    def test_retries_transient_errors(self):
+        self.sdk.search.side_effect = [NetworkError("timeout"), {"results": []}]
+        self.assertEqual(self.client.search("q", user_id="u"), {"results": []})
+        self.assertEqual(self.sdk.search.call_count, 2)
+        stats = self.client.metrics.snapshot()["search"]
+        self.assertEqual(stats["calls"], 1)
+        self.assertEqual(stats["retries"], 1)
+        self.assertEqual(stats["errors"], 0)
+
+    def test_does_not_retry_permanent_errors(self):
+        self.sdk.add.side_effect = ValueError("bad payload")
+        with self.assertRaises(ValueError):
+            self.client.add([{"role": "user", "content": "x"}], user_id="u")
+        self.assertEqual(self.sdk.add.call_count, 1)
+        self.assertEqual(self.client.metrics.snapshot()["add"]["errors"], 1)
+
+    def test_gives_up_after_max_retries(self):
+        self.sdk.delete.side_effect = NetworkError("down")
+        with self.assertRaises(NetworkError):
+            self.client.delete("m1")
+        self.assertEqual(self.sdk.delete.call_count, 3)
+
+    def test_async_interface(self):
+        self.sdk.get_all.return_value = {"results": [{"id": "1"}]}
+        result = asyncio.run(self.client.aget_all(filters={"user_id": "u"}))
+        self.assertEqual(result["results"][0]["id"], "1")
+        self.sdk.get_all.assert_called_once_with(filters={"user_id": "u"})
+
+
+if __name__ == "__main__":
+    unittest.main()
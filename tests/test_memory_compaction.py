@@ -0,0 +1,102 @@
+import asyncio
+import os
+import sys
+import tempfile
+import unittest
+from unittest.mock import MagicMock
+
+# Add gateway to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'king', 'gateway')))
+
+from memory import compaction
+from memory.compaction import CompactionCheckpoint, CompactionJob, group_memories
+from memory.mem0_client import Mem0Client
+
+
+def _memories():
+    # Week 1: three notes about editing, week 3: three about posting times,
+    # then two recent notes that must be kept verbatim
+    texts = [
+        ("2025-01-02", "User edits videos in DaVinci Resolve"),
+        ("2025-01-03", "User edits videos in DaVinci Resolve on Linux"),
+        ("2025-01-04", "User prefers DaVinci Resolve for editing videos"),
+        ("2025-01-16", "User posts Instagram reels at 7pm"),
+        ("2025-01-17", "User posts Instagram reels at 7pm on weekdays"),
+        ("2025-01-18", "Best time for user Instagram reels posts is 7pm"),
+        ("2025-03-01", "User asked about thumbnails"),
+        ("2025-03-02", "User asked about captions"),
+    ]
+    return [
+        {"id": f"m{i}", "memory": t, "created_at": f"{d}T10:00:00Z"}
+        for i, (d, t) in enumerate(texts)
+    ] + [{"id": "s1", "memory": "Semantic fact", "metadata": {"type": "semantic"}}]
+
+
+class TestGrouping(unittest.TestCase):
+
+    def test_extractive_summary_keeps_distinct_non_latin_memories(self):
+        texts = ["मुझे चाय पसंद है", "मेरा नाम राहुल है", "मैं दिल्ली में रहता हूँ"]
+        self.assertEqual(compaction.extractive_summary(texts).split("\n"), texts)
+
+    def test_groups_by_window_and_topic(self):
+        groups = group_memories(_memories()[:6])
+        self.assertEqual([[m["id"] for m in g] for g in groups], [["m0", "m1", "m2"], ["m3", "m4", "m5"]])
+
+    def test_windows_split_same_topic(self):
+        memories = _memories()[:3]
+        memories[2]["created_at"] = "2025-02-20T10:00:00Z"
+        self.assertEqual(group_memories(memories), [])
+
+
+class TestCompactionJob(unittest.TestCase):
+
+    def setUp(self):
+        compaction._compaction_model = False  # Extractive summaries only
+        self.sdk = MagicMock()
+        self.sdk.get_all.return_value = {"results": _memories(), "next": None}
+        self.client = Mem0Client(self.sdk, backoff_base=0.0)
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.path = os.path.join(self.tmp.name, "checkpoint.json")
+
+    def _job(self, dry_run=False):
+        return CompactionJob(
+            client=self.client, dry_run=dry_run, checkpoint=CompactionCheckpoint(self.path),
+            min_memories=5, keep_recent=2, writes_per_second=0,
+        )
+
+    def test_dry_run_reports_without_writing(self):
+        report = asyncio.run(self._job(dry_run=True).run(["u1"]))
+        self.assertEqual(report.users[0].episodic, 8)
+        self.assertEqual(report.summary()["groups"], 2)
+        self.sdk.add.assert_not_called()
+        self.sdk.batch_delete.assert_not_called()
+
+    def test_apply_summarizes_and_deletes_originals(self):
+        report = asyncio.run(self._job().run(["u1"]))
+        self.assertEqual(report.summary()["summaries_added"], 2)
+        self.assertEqual(report.summary()["deleted"], 6)
+        deleted = [d["memory_id"] for call in self.sdk.batch_delete.call_args_list for d in call[0][0]]
+        self.assertNotIn("m6", deleted)  # Recent memories are kept
+        self.assertEqual(self.sdk.add.call_args.kwargs["metadata"]["source"], "compaction")
+
+        # Completed users are skipped on the next scheduled run
+        again = asyncio.run(self._job().run(["u1"]))
+        self.assertEqual(again.users[0].skipped, "recently compacted")
+
+    def test_failed_delete_resumes_from_checkpoint(self):
+        self.sdk.batch_delete.side_effect = ValueError("mem0 rejected")
+        first = asyncio.run(self._job().run(["u1"]))
+        self.assertEqual(first.summary()["deleted"], 0)
+        self.assertEqual(len(CompactionCheckpoint(self.path).pending("u1")), 6)
+
+        self.sdk.batch_delete.side_effect = None
+        self.sdk.add.reset_mock()
+        second = asyncio.run(self._job().run(["u1"]))
+        self.assertEqual(second.users[0].resumed_deletes, 6)
+        self.assertEqual(CompactionCheckpoint(self.path).pending("u1"), [])
+        self.sdk.add.assert_not_called()  # Summaries were not written twice
+
+
+if __name__ == "__main__":
+    unittest.main()
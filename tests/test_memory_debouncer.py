@@ -0,0 +1,80 @@
+import asyncio
+import unittest
+import os
+import sys
+
+# Add gateway to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'king', 'gateway')))
+
+from memory.reflection import MemoryDebouncer
+
+
+class TestMemoryDebouncer(unittest.TestCase):
+
+    def setUp(self):
+        self.flushed = []
+
+        async def flush_fn(**kwargs):
+            self.flushed.append(kwargs)
+            return {"stored": True}
+
+        self.flush_fn = flush_fn
+
+    def test_coalesces_rapid_turns(self):
+        loads = []
+
+        async def loader():
+            loads.append(1)
+            return "summary", "session"
+
+        async def scenario():
+            debouncer = MemoryDebouncer(debounce_seconds=0.05, flush_fn=self.flush_fn)
+            for i in range(3):
+                debouncer.submit("u1", "s1", f"msg {i}", f"reply {i}", loader)
+            await asyncio.sleep(0.15)
+            await debouncer.flush_all()
+
+        asyncio.run(scenario())
+        self.assertEqual(len(self.flushed), 1)
+        self.assertEqual([t["user_message"] for t in self.flushed[0]["turns"]], ["msg 0", "msg 1", "msg 2"])
+        self.assertEqual(self.flushed[0]["memory_summary"], "summary")
+        self.assertEqual(len(loads), 1)
+
+    def test_max_turns_flushes_immediately(self):
+        async def scenario():
+            debouncer = MemoryDebouncer(debounce_seconds=10, max_turns=2, flush_fn=self.flush_fn)
+            debouncer.submit("u1", "s1", "a", "b")
+            debouncer.submit("u1", "s1", "c", "d")
+            self.assertEqual(debouncer.pending_turns("u1"), 0)
+            await debouncer.flush_all()
+
+        asyncio.run(scenario())
+        self.assertEqual(len(self.flushed), 1)
+        self.assertEqual(len(self.flushed[0]["turns"]), 2)
+
+    def test_session_change_splits_batches(self):
+        async def scenario():
+            debouncer = MemoryDebouncer(debounce_seconds=10, flush_fn=self.flush_fn)
+            debouncer.submit("u1", "s1", "a", "b")
+            debouncer.submit("u1", "s2", "c", "d")
+            await debouncer.flush_all()
+
+        asyncio.run(scenario())
+        self.assertEqual(sorted(f["session_id"] for f in self.flushed), ["s1", "s2"])
+
+    def test_max_wait_bounds_latency(self):
+        async def scenario():
+            debouncer = MemoryDebouncer(debounce_seconds=0.1, max_wait_seconds=0.15, flush_fn=self.flush_fn)
+            for i in range(5):
+                debouncer.submit("u1", "s1", f"m{i}", "r")
+                await asyncio.sleep(0.05)
+            await asyncio.sleep(0.2)
+            await debouncer.flush_all()
+
+        asyncio.run(scenario())
+        self.assertGreaterEqual(len(self.flushed), 2)
+        self.assertEqual(sum(len(f["turns"]) for f in self.flushed), 5)
+
+
+if __name__ == "__main__":
+    unittest.main()
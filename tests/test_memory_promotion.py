@@ -0,0 +1,73 @@
+import asyncio
+import unittest
+from unittest.mock import MagicMock
+import os
+import sys
+
+# Add gateway to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'king', 'gateway')))
+
+from memory.dedup import cluster_near_duplicates
+from memory.mem0_client import Mem0Client
+from memory.promotion import PromotionJob
+
+
+DUPES = [
+    "User prefers Python with type hints for backend services",
+    "The user prefers Python with type hints for backend services",
+    "User prefers Python with type hints for all backend services",
+]
+
+
+class TestDedup(unittest.TestCase):
+
+    def test_clusters_near_duplicates(self):
+        texts = DUPES + ["Instagram Reels perform best at 15-30 seconds"]
+        clusters = cluster_near_duplicates(texts, threshold=0.5)
+        self.assertEqual([sorted(c) for c in clusters], [[0, 1, 2]])
+
+    def test_distinct_texts_not_clustered(self):
+        texts = ["deploy the gateway to cloud run", "hook must come in first three seconds"]
+        self.assertEqual(cluster_near_duplicates(texts), [])
+
+    def test_non_latin_texts(self):
+        distinct = ["मुझे चाय पसंद है", "मेरा नाम राहुल है", "मैं दिल्ली में रहता हूँ"]
+        self.assertEqual(cluster_near_duplicates(distinct), [])
+        dupes = ["उपयोगकर्ता को बैकएंड के लिए पायथन पसंद है", "उपयोगकर्ता को बैकएंड के लिए पायथन पसंद है।"]
+        self.assertEqual(cluster_near_duplicates(dupes), [[0, 1]])
+        self.assertEqual(cluster_near_duplicates(["!!!", "...", "?"]), [])  # No words: never duplicates
+
+
+class TestPromotionJob(unittest.TestCase):
+
+    def setUp(self):
+        self.sdk = MagicMock()
+        pages = {
+            1: {"results": [{"id": f"m{i}", "memory": t} for i, t in enumerate(DUPES)], "next": "p2"},
+            2: {"results": [{"id": "m9", "memory": "Unrelated note about video hooks"}], "next": None},
+        }
+        self.sdk.get_all.side_effect = lambda filters, page, page_size: pages[page]
+        self.client = Mem0Client(self.sdk, backoff_base=0.0)
+
+    def test_dry_run_reports_without_writing(self):
+        job = PromotionJob(client=self.client, dry_run=True, threshold=0.5)
+        report = asyncio.run(job.run(["u1"]))
+        user = report.users[0]
+        self.assertEqual(user.pages, 2)
+        self.assertEqual(user.memories_scanned, 4)
+        self.assertEqual(len(user.clusters), 1)
+        self.sdk.add.assert_not_called()
+        self.sdk.batch_delete.assert_not_called()
+
+    def test_apply_promotes_and_bulk_deletes(self):
+        job = PromotionJob(client=self.client, dry_run=False, threshold=0.5)
+        report = asyncio.run(job.run(["u1"]))
+        self.assertEqual(report.summary()["promoted"], 1)
+        self.assertEqual(report.summary()["deleted"], 3)
+        self.sdk.add.assert_called_once()
+        deleted = self.sdk.batch_delete.call_args[0][0]
+        self.assertEqual(sorted(d["memory_id"] for d in deleted), ["m0", "m1", "m2"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,93 @@
+import unittest
+import os
+import sys
+
+# Add gateway to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'king', 'gateway')))
+
+from memory.types import Memory, MemoryType
+from memory.relevance import (
+    RelevanceScorer,
+    HashingEmbedder,
+    samples_from_selector_runs,
+    calibrate_thresholds,
+    evaluate,
+)
+
+
+def _mem(content: str) -> Memory:
+    return Memory(content=content, memory_type=MemoryType.SEMANTIC)
+
+
+class TestRelevanceScorer(unittest.TestCase):
+
+    def setUp(self):
+        self.scorer = RelevanceScorer(approve_threshold=0.5, reject_threshold=0.1)
+
+    def test_embedder_is_normalized(self):
+        vec = HashingEmbedder(dim=64).embed_one("deploy the python service")
+        self.assertAlmostEqual(sum(v * v for v in vec), 1.0, places=6)
+
+    def test_relevant_memory_scores_higher(self):
+        query = "write a python function for the Apollo project"
+        scored = self.scorer.score(query, [
+            _mem("Instagram Reels perform best at 15-30 seconds"),
+            _mem("User prefers python type hints in the Apollo project"),
+        ])
+        self.assertIn("Apollo", scored[0].memory.content)
+        self.assertGreater(scored[0].score, scored[1].score)
+
+    def test_triage_buckets(self):
+        query = "python deployment for Apollo"
+        result = self.scorer.triage(query, [
+            _mem("Apollo python deployment uses Cloud Run"),
+            _mem("Hook must come in first 3 seconds"),
+        ])
+        self.assertEqual([s.memory.content for s in result.approved], ["Apollo python deployment uses Cloud Run"])
+        self.assertEqual([s.memory.content for s in result.rejected], ["Hook must come in first 3 seconds"])
+
+    def test_non_latin_and_stopword_only_queries(self):
+        result = self.scorer.triage("मुझे चाय पसंद है", [_mem("उपयोगकर्ता को चाय पसंद है"), _mem("Hook must come in first 3 seconds")])
+        self.assertEqual([s.memory.content for s in result.approved + result.ambiguous], ["उपयोगकर्ता को चाय पसंद है"])
+        result = self.scorer.triage("what is this", [_mem("Apollo runs on Cloud Run")])
+        self.assertEqual((len(result.ambiguous), len(result.rejected)), (1, 0))
+
+    def test_invalid_thresholds(self):
+        with self.assertRaises(ValueError):
+            RelevanceScorer(approve_threshold=0.2, reject_threshold=0.5)
+
+
+class TestCalibration(unittest.TestCase):
+
+    def test_samples_from_selector_runs(self):
+        runs = [{
+            "input_json": {"query": "q", "candidate_memories": [{"content": "a"}, {"content": "b"}]},
+            "output_json": {"approved_memories": ["a"]},
+        }]
+        samples = samples_from_selector_runs(runs)
+        self.assertEqual(samples, [
+            {"query": "q", "content": "a", "approved": True},
+            {"query": "q", "content": "b", "approved": False},
+        ])
+
+    def test_calibrate_separable(self):
+        scored = [(0.05, False), (0.1, False), (0.3, True), (0.35, False), (0.7, True), (0.9, True)]
+        reject_t, approve_t = calibrate_thresholds(scored, target_precision=1.0)
+        self.assertGreater(reject_t, 0.1)
+        self.assertLessEqual(reject_t, 0.3)
+        self.assertEqual(approve_t, 0.7)
+
+    def test_evaluate_reports_rates(self):
+        scorer = RelevanceScorer(approve_threshold=0.5, reject_threshold=0.1)
+        samples = [
+            {"query": "python Apollo", "content": "Apollo python service", "approved": True},
+            {"query": "python Apollo", "content": "video hook timing", "approved": False},
+        ]
+        report = evaluate(scorer, samples)
+        self.assertEqual(report["samples"], 2)
+        self.assertEqual(report["local_agreement"], 1.0)
+        self.assertEqual(report["escalation_rate"], 0.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,86 @@
+import asyncio
+import os
+import sys
+import unittest
+
+# Add orchestrator to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'king', 'orchestrator')))
+
+from services.registry_cache import RegistryCache
+
+
+class FakeRegistry:
+    def __init__(self):
+        self.loads = 0
+        self.fail = False
+        self.agents = {"code_writer": "http://cw"}
+
+    async def load(self):
+        self.loads += 1
+        await asyncio.sleep(0.01)
+        if self.fail:
+            raise ConnectionError("supabase down")
+        return dict(self.agents), {"code_writer": {"agent_name": "code_writer", "version": 1}}
+
+
+class TestRegistryCache(unittest.TestCase):
+
+    def setUp(self):
+        self.db = FakeRegistry()
+
+    def test_concurrent_cold_reads_share_one_load(self):
+        cache = RegistryCache(refresh_seconds=60, loader=self.db.load)
+
+        async def run():
+            return await asyncio.gather(*(cache.get_agents() for _ in range(20)))
+
+        results = asyncio.run(run())
+        self.assertEqual(self.db.loads, 1)
+        self.assertTrue(all(r == {"code_writer": "http://cw"} for r in results))
+        self.assertEqual(cache.version, 1)
+
+    def test_stale_snapshot_served_while_refreshing(self):
+        cache = RegistryCache(refresh_seconds=0, loader=self.db.load)
+
+        async def run():
+            await cache.get_agents()
+            self.db.agents["script_writer"] = "http://sw"
+            stale = await cache.get_agents()  # Triggers background refresh
+            await asyncio.sleep(0.05)
+            return stale, await cache.get_agents()
+
+        stale, fresh = asyncio.run(run())
+        self.assertNotIn("script_writer", stale)
+        self.assertIn("script_writer", fresh)
+        self.assertEqual(cache.version, 2)
+
+    def test_failed_refresh_keeps_snapshot(self):
+        cache = RegistryCache(refresh_seconds=0, loader=self.db.load)
+
+        async def run():
+            await cache.get_agents()
+            self.db.fail = True
+            await cache.get_agents()
+            await asyncio.sleep(0.05)
+            return await cache.get_spec("code_writer")
+
+        self.assertEqual(asyncio.run(run())["version"], 1)
+        self.assertEqual(cache.stats()["refresh_errors"], 1)
+
+    def test_invalidate_forces_reload_and_bumps_version(self):
+        cache = RegistryCache(refresh_seconds=60, loader=self.db.load)
+
+        async def run():
+            await cache.get_agents()
+            version = cache.invalidate("test")
+            self.db.agents = {}
+            return version, await cache.get_agents()
+
+        version, agents = asyncio.run(run())
+        self.assertEqual(version, 2)
+        self.assertEqual(agents, {})
+        self.assertEqual(self.db.loads, 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,141 @@
+import unittest
+import asyncio
+import os
+import sys
+import time
+
+# Add gateway to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'king', 'gateway')))
+
+from memory.resilience import CircuitBreaker, Dependency, DependencyUnavailable
+from memory.mem0_client import Mem0Client
+
+
+def _warm(dep, latency_ms=10.0, n=50):
+    for _ in range(n):
+        dep.latency.record(latency_ms)
+
+
+class TestCircuitBreaker(unittest.TestCase):
+
+    def test_opens_then_half_open_probe_closes(self):
+        breaker = CircuitBreaker(failure_threshold=2, recovery_seconds=0.05)
+        breaker.record_failure()
+        self.assertTrue(breaker.allow())
+        breaker.record_failure()
+        self.assertFalse(breaker.allow())
+
+        time.sleep(0.06)
+        self.assertTrue(breaker.allow())   # The probe
+        self.assertFalse(breaker.allow())  # Only one probe at a time
+        breaker.record_success()
+        self.assertEqual(breaker.state, CircuitBreaker.CLOSED)
+
+
+class TestDependency(unittest.TestCase):
+
+    def test_fails_fast_and_serves_stale_when_open(self):
+        dep = Dependency("test", failure_threshold=2, recovery_seconds=60)
+        calls = []
+
+        async def ok():
+            calls.append("ok")
+            return "fresh"
+
+        async def down():
+            calls.append("down")
+            raise ConnectionError("refused")
+
+        async def run():
+            self.assertEqual(await dep.call(ok, stale_key="q"), "fresh")
+            for _ in range(2):
+                self.assertEqual(await dep.call(down, stale_key="q"), "fresh")
+            calls.clear()
+            self.assertEqual(await dep.call(down, stale_key="q"), "fresh")
+            with self.assertRaises(DependencyUnavailable):
+                await dep.call(down, stale_key="other")
+
+        asyncio.run(run())
+        self.assertEqual(calls, [])  # Open circuit never reached the dependency
+        self.assertEqual(dep.stats()["state"], "open")
+        self.assertEqual(dep.stats()["rejected"], 2)
+
+    def test_bad_requests_do_not_trip_breaker(self):
+        dep = Dependency("test", failure_threshold=1)
+
+        async def bad():
+            raise ValueError("invalid filter")
+
+        async def run():
+            for _ in range(3):
+                with self.assertRaises(ValueError):
+                    await dep.call(bad)
+
+        asyncio.run(run())
+        self.assertEqual(dep.breaker.state, CircuitBreaker.CLOSED)
+
+    def test_hedge_beats_slow_primary(self):
+        dep = Dependency("test", min_timeout=0.01)
+        _warm(dep, latency_ms=10)
+        delays = iter([1.0, 0.0])
+
+        async def fetch():
+            await asyncio.sleep(next(delays))
+            return "done"
+
+        async def run():
+            start = time.perf_counter()
+            result = await dep.call(fetch, hedge=True)
+            return result, time.perf_counter() - start
+
+        result, elapsed = asyncio.run(run())
+        self.assertEqual(result, "done")
+        self.assertLess(elapsed, 0.5)
+        self.assertEqual((dep.counters["hedges"], dep.counters["hedge_wins"]), (1, 1))
+
+    def test_adaptive_timeout_bounds_brownout(self):
+        dep = Dependency("test", min_timeout=0.05, max_timeout=5)
+        _warm(dep, latency_ms=10)
+        self.assertAlmostEqual(dep.timeout(), 0.05)
+
+        def hang():
+            time.sleep(0.5)
+
+        start = time.perf_counter()
+        with self.assertRaises(TimeoutError):
+            dep.call_sync(hang)
+        self.assertLess(time.perf_counter() - start, 0.3)
+        self.assertEqual(dep.counters["timeouts"], 1)
+
+
+class FlakySDK:
+    def __init__(self):
+        self.fail = False
+
+    def search(self, query, user_id=None, limit=5):
+        if self.fail:
+            raise ConnectionError("mem0 down")
+        return {"results": [{"memory": f"{user_id}: {query}"}]}
+
+
+class TestMem0ClientDegradation(unittest.TestCase):
+
+    def test_search_falls_back_to_last_good_result(self):
+        sdk = FlakySDK()
+        client = Mem0Client(sdk, max_retries=0, dependency=Dependency("mem0", failure_threshold=1))
+
+        async def run():
+            first = await client.asearch(query="likes", user_id="u1")
+            sdk.fail = True
+            second = await client.asearch(query="likes", user_id="u1")
+            with self.assertRaises(DependencyUnavailable):
+                await client.asearch(query="other", user_id="u1")
+            return first, second
+
+        first, second = asyncio.run(run())
+        self.assertEqual(first, second)
+        self.assertEqual(client.dependency.counters["stale_served"], 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,123 @@
+import unittest
+import asyncio
+import os
+import sys
+from collections import OrderedDict
+from unittest.mock import patch
+
+# Add gateway to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'king', 'gateway')))
+
+from memory import resolver as resolver_module
+from memory.resolver import MemoryResolver
+from memory import resolution_cache
+from memory.resolution_cache import ResolutionCache, memory_epoch, notify_memory_write, query_hash
+
+
+class FakeMem0:
+    def __init__(self):
+        self.searches = 0
+
+    async def asearch(self, query, user_id=None, limit=10):
+        self.searches += 1
+        return {"results": [{"id": "m1", "memory": f"{user_id} likes short scripts", "score": 0.9}]}
+
+
+class FakeEntityResolver:
+    def __init__(self):
+        self.calls = 0
+
+    async def resolve(self, raw_handle):
+        self.calls += 1
+        return {"id": "entity-1"}
+
+
+class TestResolutionCache(unittest.TestCase):
+
+    def setUp(self):
+        self.plans = 0
+
+        async def fake_plan(query, user_id, agent_name, session_context=None):
+            self.plans += 1
+            return {"tiers": ["episodic"], "limit_per_tier": 3, "filters": {"keywords": []}}
+
+        patcher = patch.object(resolver_module, "create_search_plan", fake_plan)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        self.mem0 = FakeMem0()
+        self.entity = FakeEntityResolver()
+        self.cache = ResolutionCache(ttl_seconds=60)
+        self.resolver = MemoryResolver(self.mem0, self.entity, cache=self.cache)
+
+    def _resolve(self, query="What do I like?", **kwargs):
+        kwargs.setdefault("user_id", "tg_42")
+        kwargs.setdefault("session_id", "s1")
+        return asyncio.run(self.resolver.resolve(query, resolve_entity=True, **kwargs))
+
+    def test_repeat_resolve_is_served_from_cache(self):
+        first = self._resolve()
+        second = self._resolve("what do i like")  # Same normalized query
+        self.assertEqual(first.total_count, second.total_count)
+        self.assertEqual((self.plans, self.mem0.searches, self.entity.calls), (1, 1, 1))
+        self.assertGreater(self.cache.stats()["hit_rate"], 0)
+
+    def test_write_invalidates_user_but_keeps_entity_mapping(self):
+        self._resolve()
+        self.cache.invalidate_user("entity-1")
+        self._resolve()
+        self.assertEqual((self.plans, self.mem0.searches, self.entity.calls), (2, 2, 1))
+
+    def test_different_session_reuses_plan_only(self):
+        self._resolve(session_id="s1")
+        self._resolve(session_id="s2")
+        self.assertEqual((self.plans, self.mem0.searches), (1, 2))
+
+    def test_working_memories_bypass_cache(self):
+        self._resolve(working_memories=[])
+        self._resolve(working_memories=[])
+        self.assertEqual(self.mem0.searches, 2)
+
+    def test_ttl_expiry(self):
+        cache = ResolutionCache(ttl_seconds=0)
+        cache.put("k", 1, users=["u"])
+        self.assertIsNone(cache.get("k"))
+        self.assertEqual(cache.stats()["entries"], 0)
+
+    def test_lru_eviction(self):
+        cache = ResolutionCache(ttl_seconds=60, max_entries=2)
+        for i in range(3):
+            cache.put(i, i, users=["u"])
+        self.assertIsNone(cache.get(0))
+        self.assertEqual(cache.get(2), 2)
+        self.assertEqual(cache.stats()["evictions"], 1)
+
+    def test_query_hash_normalizes(self):
+        self.assertEqual(query_hash("Hello,  World!"), query_hash("hello world"))
+        self.assertNotEqual(query_hash("hello world"), query_hash("hello there"))
+        # Non-Latin scripts and symbols are part of the key
+        self.assertNotEqual(query_hash("मेरा नाम क्या है"), query_hash("मेरा काम क्या है"))
+        self.assertNotEqual(query_hash("என் பெயர்"), query_hash("உன் பெயர்"))
+        self.assertNotEqual(query_hash("learn c++"), query_hash("learn c"))
+        self.assertEqual(query_hash("ＣＡＦÉ?"), query_hash("café"))
+
+    def test_memory_epoch_changes_on_write(self):
+        before, other = memory_epoch("epoch-user"), memory_epoch("other-user")
+        notify_memory_write("epoch-user")
+        self.assertNotEqual(memory_epoch("epoch-user"), before)
+        self.assertEqual(memory_epoch("other-user"), other)
+        notify_memory_write(None)  # Unknown owner: every user's epoch moves
+        self.assertNotEqual(memory_epoch("other-user"), other)
+
+    def test_user_epochs_are_pruned_after_retention(self):
+        clock = [1000.0]
+        with patch.object(resolution_cache, "_user_epochs", OrderedDict()), \
+                patch.object(resolution_cache.time, "monotonic", lambda: clock[0]):
+            notify_memory_write("pruned-user")
+            clock[0] += resolution_cache.MEMORY_EPOCH_RETENTION_SECONDS
+            notify_memory_write("recent-user")
+            self.assertEqual(list(resolution_cache._user_epochs), ["recent-user"])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,104 @@
+import asyncio
+import os
+import sys
+import time
+import unittest
+
+# Add orchestrator to path (supabase_client needs credentials at import)
+os.environ.setdefault("SUPABASE_URL", "https://example.supabase.co")
+os.environ.setdefault("SUPABASE_SERVICE_KEY", "test-key")
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'king', 'orchestrator')))
+
+from services.router_index import PhraseMatcher, RouterIndexCache, build_router_index, normalize
+from services.registry_cache import RegistryCache
+from api.decide import _route_task
+
+CORE_AGENTS = ["code_writer", "code_reviewer", "video_planner", "script_writer", "memory_selector"]
+
+DESCRIPTIONS = {
+    "ambedkar": "Constitutional Architect - drafts and maintains Kingdom Constitution. Use for: governance, constitution, laws, rules",
+    "code_reviewer": "Reviews code for bugs, security, performance. Use for: code review, audit, quality checks",
+}
+
+
+class TestPhraseMatcher(unittest.TestCase):
+
+    def test_overlapping_word_start_matches(self):
+        matcher = PhraseMatcher([normalize(p) for p in ["script", "write code", "code", "he"]])
+        found = {matcher.phrases[i].strip() for i in matcher.find(normalize("Write code: scripts in JavaScript, hello"))}
+        self.assertEqual(found, {"write code", "code", "script", "he"})
+
+
+class TestRouterIndex(unittest.TestCase):
+
+    def test_seed_routes_match_original_keywords(self):
+        index = build_router_index({}, {}, [])
+        self.assertEqual(_route_task("please write code for a parser", CORE_AGENTS, index)["agent_name"], "code_writer")
+        self.assertEqual(_route_task("Plan my YouTube video", CORE_AGENTS, index)["agent_name"], "video_planner")
+        self.assertEqual(_route_task("do you remember my name", CORE_AGENTS, index)["agent_name"], "memory_selector")
+        self.assertEqual(_route_task("generate a thing and review it", CORE_AGENTS, index)["decision"], "pipeline")
+        self.assertEqual(_route_task("tell me a joke", CORE_AGENTS, index)["decision"], "ephemeral")
+
+    def test_unregistered_agents_are_not_routed(self):
+        index = build_router_index({}, {}, [])
+        route = _route_task("write a video script", ["script_writer"], index)
+        self.assertEqual(route["agent_name"], "script_writer")
+        self.assertEqual([c["agent"] for c in route["candidates"]], ["script_writer"])
+
+    def test_new_agent_from_description_and_history(self):
+        specs = {"ambedkar": {"agent_name": "ambedkar", "purpose": "Draft the Kingdom constitution"}}
+        history = [("tax_advisor", "how much gst on my invoice"), ("tax_advisor", "gst filing deadline for invoice")]
+        index = build_router_index(specs, DESCRIPTIONS, history)
+        agents = CORE_AGENTS + ["ambedkar", "tax_advisor"]
+
+        route = _route_task("Amend the constitution rules", agents, index)
+        self.assertEqual(route["agent_name"], "ambedkar")
+        self.assertGreater(route["confidence"], 0.5)
+        ranked = index.rank("what gst applies to this invoice", agents)
+        self.assertEqual(ranked[0].agent, "tax_advisor")
+        self.assertEqual(index.rank("security audit of my code", agents)[0].agent, "code_reviewer")
+
+    def test_non_latin_history(self):
+        self.assertEqual(normalize("मेरा बजट बनाओ!"), " मेरा बजट बनाओ")
+        history = [("budget_planner", "मासिक बजट योजना बनाओ"), ("budget_planner", "मासिक खर्च का बजट")]
+        index = build_router_index({}, {}, history)
+        self.assertEqual(index.rank("मेरा मासिक बजट", CORE_AGENTS + ["budget_planner"])[0].agent, "budget_planner")
+
+    def test_ranking_scales_with_agent_count(self):
+        descriptions = {f"agent_{i}": f"Agent {i}. Use for: topic{i} work, special{i}" for i in range(500)}
+        index = build_router_index({}, descriptions, [])
+        start = time.perf_counter()
+        ranked = index.rank("I need help with topic250 work " * 20)
+        self.assertEqual(ranked[0].agent, "agent_250")
+        self.assertLess(time.perf_counter() - start, 0.05)
+
+
+class TestRouterIndexCache(unittest.TestCase):
+
+    def test_rebuilds_when_registry_version_changes(self):
+        specs = {}
+
+        async def registry_loader():
+            return {"ambedkar": "http://a"}, dict(specs)
+
+        async def sources():
+            return DESCRIPTIONS, []
+
+        registry = RegistryCache(loader=registry_loader)
+        cache = RouterIndexCache(loader=sources)
+
+        async def run():
+            first = await cache.get(registry)
+            again = await cache.get(registry)
+            registry.invalidate("spec reload")
+            return first, again, await cache.get(registry)
+
+        first, again, rebuilt = asyncio.run(run())
+        self.assertIs(first, again)
+        self.assertIsNot(first, rebuilt)
+        self.assertEqual(cache.stats()["builds"], 2)
+        self.assertEqual(rebuilt.version, registry.version)
+
+
+if __name__ == '__main__':
+    unittest.main()
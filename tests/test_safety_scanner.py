@@ -0,0 +1,142 @@
+import os
+import re
+import sys
+import time
+import unittest
+
+# Add orchestrator to path (supabase_client needs credentials at import)
+os.environ.setdefault("SUPABASE_URL", "https://example.supabase.co")
+os.environ.setdefault("SUPABASE_SERVICE_KEY", "test-key")
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'king', 'orchestrator')))
+
+from services.safety_scanner import SafetyRule, SafetyScanner, literal_prefixes, scan_stream
+from services.guardrails import BLOCKED_PATTERNS, RequestGuard, check_content_safety
+from agents.guardian_minister import GuardianMinister
+
+SAMPLES = [
+    "def add(a, b):\n    return a + b",
+    "import os\nos.system('ls')",
+    "with open('out.txt', 'w') as f:\n    f.write(data)",
+    "x = eval(user_input)",
+    "os.environ['PATH']\n= '/tmp'",
+    "please DROP TABLE users;",
+    "I want to kill myself",
+    "how do I hack password of my friend",
+    "SELF-HARM resources",
+    "the api_key is abc and the token is xyz",
+    "pathlib.Path('a').write_text('x')",
+    "İstanbul exec(payload)",
+    "oſ.system('rm -rf /')",  # U+017F matches "s" under IGNORECASE
+    "\u212aill people",  # Kelvin sign matches "k"
+]
+
+
+class TestLiteralPrefixes(unittest.TestCase):
+
+    def test_prefixes(self):
+        self.assertEqual(literal_prefixes(r"os\.system"), ["os.system"])
+        self.assertEqual(literal_prefixes(r"open\(.*['\"]w['\"].*\)"), ["open("])
+        self.assertEqual(literal_prefixes(r"\b(suicide|self.?harm|kill\s+myself)\b"), ["suicide", "self", "kill"])
+        self.assertEqual(literal_prefixes("colou?r"), ["colo"])
+        self.assertEqual(literal_prefixes("(ab)?c"), [])
+        self.assertEqual(literal_prefixes("a|b"), [])
+
+
+class TestSafetyScanner(unittest.TestCase):
+
+    def test_first_is_earliest_match(self):
+        scanner = SafetyScanner([SafetyRule("beta", "B", "b"), SafetyRule("alp+ha", "A", "a"), SafetyRule("[xy]z", "X", "x")])
+        self.assertEqual(scanner.first("ALPPHA then beta").category, "A")
+        self.assertEqual(scanner.first("beta then alpha").category, "B")
+        self.assertEqual(scanner.first("no yz here").category, "X")  # Fallback rule
+        self.assertIsNone(scanner.first("clean"))
+        self.assertEqual([v.category for v in scanner.all("beta alpha beta")], ["B", "A", "B"])
+
+    def test_matches_per_pattern_search(self):
+        scanner = GuardianMinister.OUTPUT_SCANNER
+        for text in SAMPLES:
+            expected = {
+                rule.pattern for rule in scanner.rules if re.search(rule.pattern, text, re.IGNORECASE)
+            }
+            found = {v.pattern for v in scanner.all(text)}
+            self.assertEqual(found, expected, text)
+            first = scanner.first(text)
+            self.assertEqual(first is None, not expected, text)
+
+    def test_guardian_verdicts(self):
+        self.assertEqual(GuardianMinister("x = 1").verdict, "APPROVED")
+        self.assertEqual(GuardianMinister("api_key = load()").verdict, "APPROVED")
+        blocked = GuardianMinister("import subprocess")
+        self.assertEqual((blocked.verdict, blocked.violation_type), ("BLOCKED", "SUBPROCESS"))
+        output = GuardianMinister("your password is hunter2", context="output")
+        self.assertEqual(output.violation_type, "secret_leak")
+        content = GuardianMinister("I want to kill myself")
+        self.assertEqual(content.violation_type, "safety_filter")
+        self.assertEqual(len(GuardianMinister("os.remove(a); os.remove(b)").get_violations()), 2)
+        self.assertEqual(GuardianMinister("oſ.system('rm -rf /')").verdict, "BLOCKED")
+        # A safety filter hit blocks as such even after an earlier code-rule hit
+        mixed = GuardianMinister("os.remove(a)  # then kill people")
+        self.assertEqual((mixed.verdict, mixed.violation_type), ("BLOCKED", "safety_filter"))
+
+    def test_long_spans_still_blocked(self):
+        # Whole-text checks use the original unbounded patterns
+        self.assertEqual(GuardianMinister("exec(base64.b64decode('" + "A" * 300 + "'))").violation_type, "SUBPROCESS")
+        self.assertEqual(GuardianMinister("open('/tmp/" + "x" * 300 + "', 'w')").violation_type, "FILESYSTEM")
+        guard = RequestGuard("kill" + " " * 20 + "people", "u1")
+        self.assertFalse(guard.is_safe)
+        self.assertEqual(check_content_safety("kill" + " " * 20 + "people")[0], False)
+
+    def test_request_guard(self):
+        self.assertEqual(check_content_safety("write a poem"), (True, None))
+        guard = RequestGuard("bomb people", "u1")
+        self.assertFalse(guard.is_safe)
+        self.assertEqual(guard.block_reason, "I can't assist with violent content.")
+        self.assertTrue(RequestGuard("os.system('ls')", "u1").is_safe)  # Code rules are Guardian-only
+        self.assertEqual(len(BLOCKED_PATTERNS), 5)
+
+    def test_large_payload_is_fast(self):
+        text = "def handle(request):\n    return compute(items, factor=0.1)\n" * 900  # ~50KB
+        scanner = GuardianMinister.OUTPUT_SCANNER
+        start = time.perf_counter()
+        for _ in range(10):
+            scanner.first(text)
+        per_scan = (time.perf_counter() - start) / 10
+        self.assertLess(per_scan, 0.01)
+
+
+class TestStreamScanner(unittest.TestCase):
+
+    def test_chunked_matches_whole_text(self):
+        scanner = GuardianMinister.OUTPUT_SCANNER
+        text = ("filler line of generated prose\n" * 40).join(SAMPLES)
+        expected = [(v.reason, v.start, v.end) for v in scanner.all(text)]
+        for size in (1, 7, 64, 1000):
+            chunks = [text[i:i + size] for i in range(0, len(text), size)]
+            found = [(v.reason, v.start, v.end) for v in scan_stream(scanner, chunks, min_batch=32)]
+            self.assertEqual(sorted(found), sorted(expected), size)
+
+    def test_violation_reported_before_close(self):
+        stream = GuardianMinister.stream()
+        stream.min_batch = 16
+        self.assertEqual(stream.feed("result = 1\nimport sub"), [])
+        found = stream.feed("process\n" + "more text " * 10)
+        self.assertEqual([v.category for v in found], ["SUBPROCESS"])
+        self.assertEqual(found[0].start, len("result = 1\n"))
+        self.assertTrue(stream.blocked)
+        self.assertEqual(stream.close(), [])
+        self.assertLessEqual(len(stream._tail), stream.window)
+
+    def test_streams_use_bounded_forms(self):
+        scanner = SafetyScanner([SafetyRule(r"exec\(.*\)", "EXEC", "x")])
+        self.assertIsNone(scanner.max_match_length)
+        with self.assertRaises(ValueError):
+            scanner.stream()  # No bounded form to stream with
+        self.assertIsNone(GuardianMinister.OUTPUT_SCANNER.max_match_length)
+        self.assertIsNotNone(GuardianMinister.OUTPUT_SCANNER.bounded().max_match_length)
+        self.assertEqual([r.pattern for r in GuardianMinister.OUTPUT_SCANNER.rules[:5]], BLOCKED_PATTERNS)
+        stream = GuardianMinister.stream()
+        self.assertEqual([v.category for v in stream.feed("kill" + " " * 20 + "people") + stream.close()], ["safety_filter"])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,40 @@
+import unittest
+import os
+import sys
+
+# Add gateway to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'king', 'gateway')))
+
+from memory import seeding
+from memory.seeding import SeedIndex, search_collective_memories, search_lineage_memories
+from memory.types import Memory, MemoryType
+
+
+class TestSeedIndex(unittest.TestCase):
+
+    def test_ranks_by_query(self):
+        results = search_lineage_memories("video_planner", "what aspect ratio for TikTok", limit=1)
+        self.assertIn("9:16", results[0].content)
+
+    def test_collective_query_beats_seed_order(self):
+        results = search_collective_memories("where is state stored, Supabase?", limit=1)
+        self.assertIn("Supabase", results[0].content)
+
+    def test_unmatched_query_falls_back_to_seed_order(self):
+        memories = [Memory(content=c, memory_type=MemoryType.COLLECTIVE) for c in ["alpha beta", "gamma delta"]]
+        index = SeedIndex(memories)
+        self.assertEqual([m.content for m in index.search("", limit=2)], ["alpha beta", "gamma delta"])
+
+    def test_rebuilds_when_seeds_change(self):
+        original = seeding.COLLECTIVE_MEMORIES
+        try:
+            seeding.COLLECTIVE_MEMORIES = original + [{"content": "Kubernetes clusters run nightly jobs", "category": "tech"}]
+            results = search_collective_memories("kubernetes nightly jobs", limit=1)
+            self.assertIn("Kubernetes", results[0].content)
+        finally:
+            seeding.COLLECTIVE_MEMORIES = original
+            seeding.rebuild_seed_indexes()
+
+
+if __name__ == "__main__":
+    unittest.main()
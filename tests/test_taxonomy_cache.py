@@ -0,0 +1,58 @@
+import asyncio
+import unittest
+from unittest.mock import MagicMock, patch
+import os
+import sys
+
+# Add gateway to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'king', 'gateway')))
+
+from memory import taxonomy
+from memory.taxonomy import TaxonomyType
+
+
+class TestTaxonomyCache(unittest.TestCase):
+
+    def setUp(self):
+        taxonomy._taxonomy_cache.clear()
+        taxonomy._refresh_tasks.clear()
+        taxonomy._pending_values.clear()
+        taxonomy._pending_usage.clear()
+        taxonomy._flush_task = None
+        self.client = MagicMock()
+        self.client.table.return_value.select.return_value.eq.return_value.order.return_value \
+            .execute.return_value.data = [{"value": "chat"}, {"value": "debug"}]
+        patcher = patch.object(taxonomy, "_get_supabase", return_value=self.client)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_concurrent_cold_reads_share_one_fetch(self):
+        async def scenario():
+            return await asyncio.gather(*[taxonomy.get_taxonomy_values(TaxonomyType.INTENT) for _ in range(20)])
+
+        results = asyncio.run(scenario())
+        self.assertTrue(all(r == ["chat", "debug"] for r in results))
+        self.assertEqual(self.client.table.return_value.select.call_count, 1)
+
+    def test_writes_are_batched(self):
+        async def scenario():
+            await taxonomy.get_taxonomy_values(TaxonomyType.INTENT)
+            await taxonomy.add_taxonomy_value(TaxonomyType.INTENT, "Deploy App")
+            for _ in range(3):
+                await taxonomy.increment_usage(TaxonomyType.INTENT, "chat")
+            # New value is visible before any write happens
+            values = await taxonomy.get_taxonomy_values(TaxonomyType.INTENT)
+            self.client.table.return_value.upsert.assert_not_called()
+            written = await taxonomy.flush_taxonomy_writes()
+            return values, written
+
+        values, written = asyncio.run(scenario())
+        self.assertIn("deploy_app", values)
+        self.assertEqual(written, {"values": 1, "usage": 1})
+        self.client.rpc.assert_called_once_with("increment_taxonomy_usage_batch", {
+            "p_items": [{"taxonomy_type": "intent", "value": "chat", "count": 3}]
+        })
+
+
+if __name__ == "__main__":
+    unittest.main()
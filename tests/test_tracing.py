@@ -0,0 +1,155 @@
+import asyncio
+import importlib.util
+import json
+import os
+import sys
+import unittest
+from unittest.mock import patch
+
+import httpx
+from fastapi.testclient import TestClient
+
+# Add orchestrator to path (supabase_client needs credentials at import)
+os.environ.setdefault("SUPABASE_URL", "https://example.supabase.co")
+os.environ.setdefault("SUPABASE_SERVICE_KEY", "test-key")
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'king', 'orchestrator')))
+
+from api import decide as decide_module
+from services import mem0_tool
+from services import tracing
+from services.decision_cache import DecisionCache
+from services.mem0_client import Mem0Client
+from services.registry_cache import RegistryCache
+from services.router_index import RouterIndexCache
+from services.tracing import SpanExporter, parse_traceparent, render_waterfall, span, to_otlp
+
+# Gateway and orchestrator both have a top-level main.py; load the orchestrator's by path
+_spec = importlib.util.spec_from_file_location(
+    "orchestrator_main", os.path.join(os.path.dirname(__file__), '..', 'king', 'orchestrator', 'main.py')
+)
+orchestrator_main = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(orchestrator_main)
+
+PARENT = "00-4bf92f3577b34da6a3ce929d0e0e4736-00f067aa0ba902b7-01"
+TRACE_ID = "4bf92f3577b34da6a3ce929d0e0e4736"
+
+
+class EmptyMem0SDK:
+    def search(self, query, filters=None, limit=5, enable_graph=True):
+        return {"results": [], "relations": []}
+
+
+async def registry_loader():
+    return {"code_writer": "http://code-writer"}, {}
+
+
+async def no_route_sources():
+    return {}, []
+
+
+class TestTraceContext(unittest.TestCase):
+
+    def setUp(self):
+        self.exporter = SpanExporter(path="")
+        patcher = patch.object(tracing, "_span_exporter", self.exporter)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_parse_traceparent(self):
+        ctx = parse_traceparent(PARENT)
+        self.assertEqual((ctx.trace_id, ctx.span_id, ctx.sampled), (TRACE_ID, "00f067aa0ba902b7", True))
+        self.assertEqual(ctx.traceparent(), PARENT)
+        for bad in [None, "", "00-abc-def-01", "00-" + "0" * 32 + "-00f067aa0ba902b7-01", "ff" + PARENT[2:]]:
+            self.assertIsNone(parse_traceparent(bad), bad)
+
+    def test_tasks_and_threads_inherit_the_active_span(self):
+        async def run():
+            with span("root", parent=parse_traceparent(PARENT)) as root:
+                def in_thread():
+                    with span("threaded"):
+                        pass
+
+                async def in_task():
+                    with span("task"):
+                        await asyncio.to_thread(in_thread)
+
+                await asyncio.gather(asyncio.create_task(in_task()), asyncio.create_task(in_task()))
+            return root
+
+        root = asyncio.run(run())
+        spans = {s["spanId"]: s for s in self.exporter.spans(TRACE_ID)}
+        self.assertEqual(len(spans), 5)
+        self.assertEqual(root.parent_id, "00f067aa0ba902b7")
+        for s in spans.values():
+            if s["name"] == "task":
+                self.assertEqual(s["parentSpanId"], root.context.span_id)
+            if s["name"] == "threaded":
+                self.assertEqual(spans[s["parentSpanId"]]["name"], "task")
+        self.assertIsNone(tracing.current_trace_id())
+
+    def test_errors_recorded_and_otlp_export(self):
+        with self.assertRaises(ValueError):
+            with span("failing", parent=parse_traceparent(PARENT), agent="code_writer"):
+                raise ValueError("boom")
+        [record] = self.exporter.spans(TRACE_ID)
+        self.assertEqual((record["status"], record["error"]), ("error", "ValueError: boom"))
+        otlp = to_otlp([record])["resourceSpans"][0]
+        self.assertEqual(otlp["resource"]["attributes"][0]["value"]["stringValue"], "king-orchestrator")
+        exported = otlp["scopeSpans"][0]["spans"][0]
+        self.assertEqual(exported["status"]["code"], 2)
+        self.assertEqual(exported["attributes"], [{"key": "agent", "value": {"stringValue": "code_writer"}}])
+
+
+class TestDecideTracing(unittest.TestCase):
+
+    def setUp(self):
+        self.exporter = SpanExporter(path="")
+        self.agent_headers = []
+
+        def agent_handler(request: httpx.Request) -> httpx.Response:
+            self.agent_headers.append(request.headers)
+            return httpx.Response(200, json={"code": "..."}, headers={"Server-Timing": "agent;dur=12.5"})
+
+        registry = RegistryCache(loader=registry_loader)
+        for patcher in [
+            patch.object(tracing, "_span_exporter", self.exporter),
+            patch.object(mem0_tool, "get_mem0", lambda: Mem0Client(EmptyMem0SDK())),
+            patch.object(decide_module, "get_registry_cache", lambda: registry),
+            patch.object(decide_module, "get_router_cache", lambda: RouterIndexCache(loader=no_route_sources)),
+            patch.object(decide_module, "get_decision_cache", lambda: DecisionCache()),
+            patch.object(decide_module, "_agent_client", httpx.AsyncClient(transport=httpx.MockTransport(agent_handler))),
+        ]:
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.client = TestClient(orchestrator_main.app)
+
+    def test_trace_continues_through_decide_to_agent(self):
+        response = self.client.post(
+            "/king/decide-execute",
+            json={"user_id": "u1", "message": "please write code for a parser"},
+            headers={"traceparent": PARENT},
+        )
+        decision = json.loads(response.content.partition(b"\n")[0])
+        self.assertEqual(decision["trace_id"], TRACE_ID)
+        self.assertEqual(parse_traceparent(response.headers["traceresponse"]).trace_id, TRACE_ID)
+
+        spans = self.exporter.spans(TRACE_ID)
+        by_name = {s["name"]: s for s in spans}
+        for stage in ["POST /king/decide-execute", "decide", "guardian", "memory_search", "registry", "route", "agent"]:
+            self.assertIn(stage, by_name)
+        self.assertEqual(by_name["POST /king/decide-execute"]["parentSpanId"], "00f067aa0ba902b7")
+        self.assertEqual(by_name["guardian"]["parentSpanId"], by_name["decide"]["spanId"])
+        self.assertEqual(by_name["agent"]["attributes"]["server_ms"], 12.5)
+
+        # The agent sees the agent span as its parent
+        sent = parse_traceparent(self.agent_headers[0]["traceparent"])
+        self.assertEqual((sent.trace_id, sent.span_id), (TRACE_ID, by_name["agent"]["spanId"]))
+
+        waterfall = render_waterfall(spans)
+        self.assertIn(f"trace {TRACE_ID}", waterfall)
+        self.assertIn("(callee 12.5ms)", waterfall)
+        self.assertEqual(self.client.get(f"/traces/{TRACE_ID}").json()["spans"][0]["traceId"], TRACE_ID)
+
+
+if __name__ == '__main__':
+    unittest.main()
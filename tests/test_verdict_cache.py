@@ -0,0 +1,66 @@
+import os
+import sys
+import unittest
+from unittest.mock import patch
+
+# Add orchestrator to path (supabase_client needs credentials at import)
+os.environ.setdefault("SUPABASE_URL", "https://example.supabase.co")
+os.environ.setdefault("SUPABASE_SERVICE_KEY", "test-key")
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'king', 'orchestrator')))
+
+from agents import agent_runner as agent_runner_module
+from agents.agent_runner import AgentRunner
+from services.agent_dependencies import AGENT_DEPENDENCIES
+from services.verdict_cache import VerdictCache
+
+SPEC = {
+    "role": "tax_helper",
+    "purpose": "Explains GST rules for small business invoices",
+    "dna_rules": ["Cite the rule"],
+    "output_schema": {"type": "object"},
+    "dependencies": ["tax_lookup"],
+}
+
+
+class TestVerdictCache(unittest.TestCase):
+
+    def setUp(self):
+        self.cache = VerdictCache(max_entries=4)
+        patcher = patch.object(agent_runner_module, "get_verdict_cache", lambda: self.cache)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.runner = AgentRunner()
+
+    def test_repeat_guardian_checks_hit(self):
+        for _ in range(3):
+            out = self.runner.run("guardian_minister", {"content": "import socket", "context": "output"}).output
+            self.assertEqual(out["violation_type"], "NETWORK")
+        self.runner.run("guardian_minister", {"content": "import socket", "context": "code"})
+        stats = self.cache.stats()["ministers"]["guardian_minister"]
+        self.assertEqual((stats["hits"], stats["misses"]), (2, 2))
+
+    def test_verdicts_are_copies(self):
+        first = self.runner.run("validator_minister", {"spec": SPEC}).output
+        first["issues"].append("mutated by caller")
+        again = self.runner.run("validator_minister", {"spec": dict(SPEC)}).output
+        self.assertEqual(again["issues"], ["Dependency not found in registry: tax_lookup"])
+
+    def test_dependency_map_change_needs_invalidate(self):
+        self.assertEqual(self.runner.run("validator_minister", {"spec": SPEC}).output["verdict"], "INVALID")
+        version = self.cache.ruleset_version("validator_minister")
+        with patch.dict(AGENT_DEPENDENCIES, {"tax_lookup": []}):
+            self.cache.invalidate("dependency map changed")
+            self.assertNotEqual(self.cache.ruleset_version("validator_minister"), version)
+            self.assertEqual(self.runner.run("validator_minister", {"spec": SPEC}).output["verdict"], "VALID")
+        self.cache.invalidate("restore")
+
+    def test_lru_eviction(self):
+        for i in range(6):
+            self.runner.run("guardian_minister", {"content": f"x = {i}"})
+        stats = self.cache.stats()
+        self.assertEqual(stats["entries"], 4)
+        self.assertEqual(stats["ministers"]["guardian_minister"]["evictions"], 2)
+
+
+if __name__ == '__main__':
+    unittest.main()